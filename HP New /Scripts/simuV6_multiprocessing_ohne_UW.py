@@ -6,7 +6,8 @@ from math import radians, sin, cos, asin, sqrt
 from datetime import datetime
 from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
-from functools import partial
+from collections import defaultdict
+from scipy.spatial import cKDTree
 
 # Debug settings
 DEBUG = False  # Reduziere Debug-Ausgaben
@@ -25,6 +26,11 @@ MIXED_USE_BUILDINGS = {
     "1130"   # Wohngebäude mit Gewerbe und Industrie
 }
 
+POWER_FACTOR = 0.95
+
+# Schwellwert für consumer nodes auf demselben Flurstück (0.0001 ≈ 11m)
+FLURID_RADIUS = 0.0001
+
 def debug_print(*args, **kwargs):
     if DEBUG:
         print(*args, **kwargs)
@@ -401,7 +407,79 @@ def find_consumer_node_by_flurid(building_id, building_data, nodes_data):
     return None, None, None
 
 
-def create_loads(net, node_id_to_bus, building_data, load_data, scenario):
+def _building_coordinates(bdata):
+    """(latitude, longitude) des ersten Gebäudeteils oder None."""
+    if not bdata.get("Gebaeudeteile") or not bdata["Gebaeudeteile"][0].get("Koordinaten"):
+        return None
+    coords = bdata["Gebaeudeteile"][0]["Koordinaten"][0]
+    return coords["latitude"], coords["longitude"]
+
+
+def build_consumer_index(building_data, nodes_data):
+    """
+    Ordnet alle Gebäude einmalig einem consumer node zu.
+
+    Gleiche Regeln wie find_consumer_node_by_flurid, aber mit einem KD-Baum
+    über die consumer nodes und einem FLURID -> Koordinaten Hash-Index statt
+    eines Scans aller Gebäude und Knoten pro Gebäude.
+
+    Args:
+        building_data: Dictionary mit allen Gebäudedaten
+        nodes_data: Liste der Netzwerkknoten
+
+    Returns:
+        dict: building_id -> (closest_node, distance, method)
+    """
+    consumer_nodes = [node for node in nodes_data if node['tags'].get('power') == 'consumer']
+    if not consumer_nodes:
+        return {building_id: (None, None, None) for building_id in building_data}
+
+    # KD-Baum in (lon, lat), gleiche euklidische Distanz wie bisher
+    tree = cKDTree(np.array([(node['lon'], node['lat']) for node in consumer_nodes]))
+
+    # Koordinaten aller Gebäude je Flurstück (in Reihenfolge von building_data)
+    flurid_coordinates = defaultdict(list)
+    for bdata in building_data.values():
+        coords = _building_coordinates(bdata)
+        if coords is not None:
+            flurid_coordinates[bdata.get("FLURID")].append(coords)
+
+    # 1. consumer node auf demselben Flurstück - einmal je FLURID
+    flurid_match = {}
+    for flurid, coordinates in flurid_coordinates.items():
+        flurid_match[flurid] = None
+        for lat, lon in coordinates:
+            hits = tree.query_ball_point((lon, lat), FLURID_RADIUS)
+            distances = {i: sqrt((lon - consumer_nodes[i]['lon']) ** 2 + (lat - consumer_nodes[i]['lat']) ** 2)
+                         for i in hits}
+            hits = [i for i in hits if distances[i] < FLURID_RADIUS]
+            if hits:
+                # Erster Knoten in Reihenfolge von nodes_data
+                first = min(hits)
+                flurid_match[flurid] = (consumer_nodes[first], distances[first])
+                break
+
+    assignments = {}
+    for building_id, bdata in building_data.items():
+        flurid = bdata.get("FLURID")
+        coords = _building_coordinates(bdata)
+        if not flurid or coords is None:
+            assignments[building_id] = (None, None, None)
+        elif flurid_match.get(flurid) is not None:
+            node, distance = flurid_match[flurid]
+            assignments[building_id] = (node, distance, 'flurid')
+        else:
+            # 2. Fallback: nächstgelegener consumer node
+            distance, i = tree.query((coords[1], coords[0]))
+            assignments[building_id] = (consumer_nodes[int(i)], float(distance), 'proximity')
+
+    return assignments
+
+
+def create_loads(net, node_id_to_bus, building_data, load_data, scenario, consumer_index=None):
+    if consumer_index is None:
+        consumer_index = build_consumer_index(building_data, nodes_data)
+
     loads_created = 0
     skipped_buildings = 0
     total_power_mw = 0
@@ -427,8 +505,7 @@ def create_loads(net, node_id_to_bus, building_data, load_data, scenario):
                 continue
 
             p_mw = load_data[building_id][scenario] / 1000.0
-            power_factor = 0.95
-            q_mvar = p_mw * np.tan(np.arccos(power_factor))
+            q_mvar = p_mw * np.tan(np.arccos(POWER_FACTOR))
 
             # Gebäudefunktion auswerten
             building_type = building.get('Gebaeudefunktion', '')
@@ -442,10 +519,8 @@ def create_loads(net, node_id_to_bus, building_data, load_data, scenario):
             else:
                 commercial_power_mw += p_mw
 
-            # Neue Methode zum Finden des consumer node
-            closest_node, distance, method = find_consumer_node_by_flurid(
-                building_id, building_data, nodes_data
-            )
+            # Vorab berechnete Zuordnung zum consumer node
+            closest_node, distance, method = consumer_index[building_id]
 
             if closest_node is None:
                 debug_print(f"No suitable consumer node found for building {building_id}")
@@ -498,80 +573,117 @@ def create_loads(net, node_id_to_bus, building_data, load_data, scenario):
     return loads_created, total_power_mw, residential_power_mw, commercial_power_mw
 
 
-def run_single_scenario(scenario_data, net, node_id_to_bus, building_data, load_data, trafo_mapping):
-    """
-    Einzelnes Szenario ausführen - für Multiprocessing optimiert
+def prepare_scenarios(net, node_id_to_bus, building_data, load_data, scenarios, consumer_index):
     """
-    POWER_FACTOR = 0.95
-
-    # Gebäudekategorisierung
-    RESIDENTIAL_BUILDINGS = {
-        "1000",  # Wohngebäude
-        "1010",  # Wohnhaus
-        "2463",  # Garage
-        "1313",  # Gartenhaus
-        "3270"  # Gebäude im botanischen Garten
-    }
+    Bereitet alle Szenarien einmalig vor.
 
-    MIXED_USE_BUILDINGS = {
-        "1120",  # Wohngebäude mit Handel und Dienstleistungen
-        "1130"  # Wohngebäude mit Gewerbe und Industrie
-    }
+    Jedes Gebäude mit Lastdaten und consumer node bekommt genau eine Last im
+    Basisnetz (p_mw = 0); die Szenarien unterscheiden sich nur in den
+    Lastwerten, die als Matrix (Szenarien × Lasten) vorliegen.
 
-    scenario = scenario_data
-    net_copy = pp.copy.deepcopy(net)
+    Returns:
+        dict mit p_mw / q_mvar (Szenarien × Lasten), load_index (Index der
+        angelegten Lasten in net.load, Spaltenreihenfolge), loads_created,
+        total_power_mw, residential_power_mw, commercial_power_mw je Szenario
+    """
+    scenario_pos = {scenario: i for i, scenario in enumerate(scenarios)}
+    n_scenarios = len(scenarios)
 
-    loads_created = 0
-    total_power_mw = 0
-    residential_power_mw = 0
-    commercial_power_mw = 0
-    load_data_list = []
+    residential_power_mw = np.zeros(n_scenarios)
+    commercial_power_mw = np.zeros(n_scenarios)
+    load_columns = []
+    load_index = []
 
-    # Lasten sammeln
     for building_id, building in building_data.items():
-        if building_id not in load_data or scenario not in load_data[building_id]:
+        if building_id not in load_data:
             continue
 
-        p_mw = load_data[building_id][scenario] / 1000.0
-        q_mvar = p_mw * np.tan(np.arccos(POWER_FACTOR))
+        # Lastwerte des Gebäudes je Szenario (NaN = keine Daten)
+        p_mw = np.full(n_scenarios, np.nan)
+        for scenario, value in load_data[building_id].items():
+            if scenario in scenario_pos:
+                p_mw[scenario_pos[scenario]] = value / 1000.0
+        has_load = ~np.isnan(p_mw)
 
-        # Gebäudecode aus der JSON-Struktur
+        # Last kategorisieren basierend auf dem Gebäudecode
         building_code = building.get('Gebaeudecode')
-
-        # Last kategorisieren basierend auf dem Code
         if building_code in RESIDENTIAL_BUILDINGS:
-            residential_power_mw += p_mw
+            residential_power_mw[has_load] += p_mw[has_load]
         elif building_code in MIXED_USE_BUILDINGS:
-            residential_power_mw += p_mw * 0.5
-            commercial_power_mw += p_mw * 0.5
+            residential_power_mw[has_load] += p_mw[has_load] * 0.5
+            commercial_power_mw[has_load] += p_mw[has_load] * 0.5
         else:
-            commercial_power_mw += p_mw
+            commercial_power_mw[has_load] += p_mw[has_load]
 
-        closest_node, _, _ = find_consumer_node_by_flurid(building_id, building_data, nodes_data)
-        if closest_node is None:
+        closest_node, _, _ = consumer_index.get(building_id, (None, None, None))
+        if closest_node is None or str(closest_node['id']) not in node_id_to_bus:
             continue
 
-        node_id = str(closest_node['id'])
-        if node_id in node_id_to_bus:
-            bus = node_id_to_bus[node_id]
-            # Einzelne Last direkt erstellen
-            pp.create_load(
-                net_copy,
-                bus=bus,
-                p_mw=p_mw,
-                q_mvar=q_mvar,
-                name=f"Load {building_id}",
-                scaling=1.0
-            )
-            loads_created += 1
-            total_power_mw += p_mw
+        load_index.append(pp.create_load(
+            net,
+            bus=node_id_to_bus[str(closest_node['id'])],
+            p_mw=0.0,
+            q_mvar=0.0,
+            name=f"Load {building_id}",
+            scaling=1.0
+        ))
+        load_columns.append(p_mw)
+
+    p_mw = np.column_stack(load_columns) if load_columns else np.zeros((n_scenarios, 0))
+    has_load = ~np.isnan(p_mw)
+    # Fehlende Szenariodaten: Last bleibt bei 0 (wie nicht angelegt)
+    p_mw = np.where(has_load, p_mw, 0.0)
+
+    return {
+        "load_index": load_index,
+        "p_mw": p_mw,
+        "q_mvar": p_mw * np.tan(np.arccos(POWER_FACTOR)),
+        "loads_created": has_load.sum(axis=1),
+        "total_power_mw": p_mw.sum(axis=1),
+        "residential_power_mw": residential_power_mw,
+        "commercial_power_mw": commercial_power_mw
+    }
+
+
+# Zustand je Worker-Prozess (per fork geerbt bzw. einmal je Worker übertragen)
+_WORKER_STATE = {}
+
+
+def _init_scenario_worker(net, trafo_mapping, scenarios, scenario_loads):
+    """Initializer: Basisnetz und Lastmatrizen einmal je Worker ablegen."""
+    _WORKER_STATE.update(
+        net=net,
+        trafo_mapping=trafo_mapping,
+        scenarios=scenarios,
+        loads=scenario_loads
+    )
+
+
+def run_single_scenario(scenario_idx):
+    """
+    Einzelnes Szenario ausführen - für Multiprocessing optimiert
+
+    Der Worker rechnet auf seinem eigenen Basisnetz und setzt nur die
+    Lastwerte des Szenarios (keine Kopie des Netzes je Szenario).
+    """
+    net = _WORKER_STATE["net"]
+    trafo_mapping = _WORKER_STATE["trafo_mapping"]
+    loads = _WORKER_STATE["loads"]
+    scenario = _WORKER_STATE["scenarios"][scenario_idx]
+
+    # Lastwerte in place setzen - nur gültig, solange net.load genau die
+    # vorbereiteten Lasten in Spaltenreihenfolge enthält
+    if list(net.load.index) != loads["load_index"]:
+        raise ValueError("net.load enthält nicht nur die vorbereiteten Lasten")
+    net.load["p_mw"] = loads["p_mw"][scenario_idx]
+    net.load["q_mvar"] = loads["q_mvar"][scenario_idx]
 
     scenario_results = {
         "scenario": scenario,
-        "loads_created": loads_created,
-        "total_power_mw": total_power_mw,
-        "residential_power_mw": residential_power_mw,
-        "commercial_power_mw": commercial_power_mw,
+        "loads_created": int(loads["loads_created"][scenario_idx]),
+        "total_power_mw": float(loads["total_power_mw"][scenario_idx]),
+        "residential_power_mw": float(loads["residential_power_mw"][scenario_idx]),
+        "commercial_power_mw": float(loads["commercial_power_mw"][scenario_idx]),
         "transformer_loading": [],
         "success": False
     }
@@ -579,7 +691,7 @@ def run_single_scenario(scenario_data, net, node_id_to_bus, building_data, load_
     try:
         # Optimierte Power Flow Berechnung
         pp.runpp(
-            net_copy,
+            net,
             algorithm='nr',
             max_iteration=40,
             tolerance_mva=1e-3,
@@ -593,16 +705,18 @@ def run_single_scenario(scenario_data, net, node_id_to_bus, building_data, load_
         )
 
         # Transformator-Ergebnisse verarbeiten
-        trafo_results = []
-        for idx, trafo in net_copy.res_trafo.iterrows():
-            trafo_results.append({
+        res_trafo = net.res_trafo
+        scenario_results["transformer_loading"] = [
+            {
                 "trafo_id": trafo_mapping.get(idx, f"unknown_{idx}"),
-                "p_hv_mw": float(trafo['p_hv_mw']),
-                "q_hv_mvar": float(trafo['q_hv_mvar']),
-                "loading_percent": float(trafo['loading_percent'])
-            })
-
-        scenario_results["transformer_loading"] = trafo_results
+                "p_hv_mw": float(p_hv),
+                "q_hv_mvar": float(q_hv),
+                "loading_percent": float(loading)
+            }
+            for idx, p_hv, q_hv, loading in zip(
+                res_trafo.index, res_trafo['p_hv_mw'], res_trafo['q_hv_mvar'], res_trafo['loading_percent']
+            )
+        ]
         scenario_results["success"] = True
 
     except pp.LoadflowNotConverged as e:
@@ -611,9 +725,6 @@ def run_single_scenario(scenario_data, net, node_id_to_bus, building_data, load_
     except Exception as e:
         scenario_results["error"] = f"Error in scenario calculation: {str(e)}"
         scenario_results["success"] = False
-    finally:
-        # Speicher freigeben
-        del net_copy
 
     return scenario_results
 
@@ -647,6 +758,10 @@ def main():
         sample_building = next(iter(load_data.values()))
         scenarios = list(sample_building.keys())
 
+        # Gebäude -> Bus einmalig zuordnen, Lasten einmalig anlegen
+        consumer_index = build_consumer_index(building_data, nodes_data)
+        scenario_loads = prepare_scenarios(net, node_id_to_bus, building_data, load_data, scenarios, consumer_index)
+
         results = {
             "metadata": {
                 "datum": datetime.now().isoformat(),
@@ -666,19 +781,17 @@ def main():
         num_processes = max(1, multiprocessing.cpu_count() - 1)
         print(f"Using {num_processes} processes for parallel computation")
 
-        # Partial function für Pool
-        run_scenario_partial = partial(
-            run_single_scenario,
-            net=net,
-            node_id_to_bus=node_id_to_bus,
-            building_data=building_data,  # Jetzt wird building_data verwendet
-            load_data=load_data,  # Jetzt wird load_data verwendet
-            trafo_mapping=trafo_mapping
-        )
-
-        # Parallel Processing der Szenarien
-        with ProcessPoolExecutor(max_workers=num_processes) as executor:
-            scenario_results = list(executor.map(run_scenario_partial, scenarios))
+        # Parallel Processing der Szenarien: Basisnetz und Lasten einmal je Worker,
+        # danach wird nur noch der Szenario-Index übertragen
+        with ProcessPoolExecutor(
+            max_workers=num_processes,
+            initializer=_init_scenario_worker,
+            initargs=(net, trafo_mapping, scenarios, scenario_loads)
+        ) as executor:
+            scenario_results = list(executor.map(
+                run_single_scenario, range(len(scenarios)),
+                chunksize=max(1, len(scenarios) // (4 * num_processes))
+            ))
 
         # Ergebnisse zusammenführen
         successful_scenarios = 0
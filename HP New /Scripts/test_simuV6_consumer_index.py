@@ -0,0 +1,87 @@
+"""
+Tests für die einmalige Gebäude -> consumer node Zuordnung in simuV6_multiprocessing_ohne_UW.
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("scipy")
+pp = pytest.importorskip("pandapower")
+
+SCRIPT = Path(__file__).with_name("simuV6_multiprocessing_ohne_UW.py")
+
+NODES = [
+    {"id": 1, "lat": 51.0000, "lon": 14.0000, "tags": {"power": "consumer"}},
+    {"id": 2, "lat": 51.0010, "lon": 14.0010, "tags": {"power": "consumer"}},
+    {"id": 3, "lat": 51.00005, "lon": 14.00005, "tags": {"power": "consumer"}},
+    {"id": 4, "lat": 51.0020, "lon": 14.0020, "tags": {"power": "pole"}},
+    {"id": 5, "lat": 51.0030, "lon": 14.0030, "tags": {"power": "consumer"}},
+]
+
+
+def _building(flurid, lat, lon):
+    return {
+        "FLURID": flurid,
+        "Gebaeudecode": "1010",
+        "Gebaeudeteile": [{"Koordinaten": [{"latitude": lat, "longitude": lon}]}],
+    }
+
+
+BUILDINGS = {
+    # Knoten 1 und 3 liegen beide im Radius: der erste in nodes_data gewinnt
+    "B1": _building("F1", 51.00002, 14.00002),
+    # Kein Knoten in der Nähe, aber B1 auf demselben Flurstück
+    "B2": _building("F1", 51.0015, 14.0015),
+    # Nächster consumer node, der pole-Knoten 4 zählt nicht
+    "B3": _building("F2", 51.0021, 14.0021),
+    "B4": _building("F3", 51.0029, 14.0031),
+    # Ohne FLURID bzw. Koordinaten keine Zuordnung
+    "B5": _building(None, 51.0, 14.0),
+    "B6": {"FLURID": "F4", "Gebaeudeteile": []},
+}
+
+
+@pytest.fixture
+def simu(tmp_path, monkeypatch):
+    """Skript laden; es liest das Netz beim Import aus dem Arbeitsverzeichnis."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "branitzer_siedlung_ns_v3_ohne_UW.json").write_text(
+        json.dumps({"nodes": NODES, "ways": []}), encoding="utf-8"
+    )
+    spec = importlib.util.spec_from_file_location("simuV6_ohne_UW", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_consumer_index_matches_per_building_lookup(simu):
+    index = simu.build_consumer_index(BUILDINGS, NODES)
+
+    for building_id in BUILDINGS:
+        node, distance, method = simu.find_consumer_node_by_flurid(building_id, BUILDINGS, NODES)
+        indexed_node, indexed_distance, indexed_method = index[building_id]
+        assert indexed_node == node, building_id
+        assert indexed_method == method, building_id
+        assert indexed_distance == pytest.approx(distance), building_id
+
+    assert [index[b][2] for b in BUILDINGS] == ["flurid", "flurid", "proximity", "proximity", None, None]
+    assert index["B1"][0]["id"] == 1
+
+
+def test_scenario_worker_rejects_foreign_loads(simu):
+    net = pp.create_empty_network()
+    node_id_to_bus = {str(node["id"]): pp.create_bus(net, vn_kv=0.4) for node in NODES}
+    load_data = {"B1": {"s1": 2.0, "s2": 4.0}, "B3": {"s2": 1.0}}
+    index = simu.build_consumer_index(BUILDINGS, NODES)
+    loads = simu.prepare_scenarios(net, node_id_to_bus, BUILDINGS, load_data, ["s1", "s2"], index)
+
+    assert list(net.load.index) == loads["load_index"]
+    assert loads["p_mw"].tolist() == [[0.002, 0.0], [0.004, 0.001]]
+
+    pp.create_load(net, bus=node_id_to_bus["5"], p_mw=0.1)
+    simu._init_scenario_worker(net, {}, ["s1", "s2"], loads)
+    with pytest.raises(ValueError):
+        simu.run_single_scenario(0)
@@ -15,11 +15,12 @@ Process:
 - Train/Load baseline model; predict mean, q10, q90
 - Calibrate intervals (conformal or quantile loss)
 - Post-process: clip negatives to 0; ensure length 8760; finite values
-- Write one JSON per building; accumulate metrics
+- Write one JSON per building and the columnar load matrix; accumulate metrics
 
 Outputs (per building):
 - processed/lfa/{building_id}.json with keys:
   x-version,building_id,series[8760],q10[8760],q90[8760],metadata{forecast_date,model_version}
+- processed/lfa/load_matrix/ (8760 × buildings × [series, q10, q90], memory-mappable)
 - eval/lfa/metrics.csv (MAE, RMSE, MAPE, PICP_90) per building + macro avg
 
 Integration:
@@ -37,6 +38,7 @@ import json
 import logging
 import math
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
@@ -58,6 +60,62 @@ except ImportError:
     logger.warning("LightGBM not available, using fallback model")
     LIGHTGBM_AVAILABLE = False
 
+try:
+    from src.lfa_load_matrix import LoadMatrixWriter, remove_load_matrix
+    LOAD_MATRIX_AVAILABLE = True
+except ImportError:
+    try:
+        # Fallback for direct execution
+        from lfa_load_matrix import LoadMatrixWriter, remove_load_matrix
+        LOAD_MATRIX_AVAILABLE = True
+    except ImportError:
+        LOAD_MATRIX_AVAILABLE = False
+
+# lgb.Sequence (LightGBM >= 3.3) streams training rows in batches
+LGB_SEQUENCE_AVAILABLE = LIGHTGBM_AVAILABLE and hasattr(lgb, "Sequence")
+
+
+class _BuildingHourRows(lgb.Sequence if LGB_SEQUENCE_AVAILABLE else object):
+    """
+    Rows of the building-hour feature matrix, assembled on demand.
+    
+    Row i is building i // n_hours at hour i % n_hours. Weather features come
+    from the hourly matrix and building features from the building matrix, so
+    the (buildings × hours) × features matrix is never stored as a whole.
+    """
+    
+    def __init__(self, hourly: np.ndarray, building: np.ndarray, hourly_pos: List[int],
+                 building_pos: List[int], batch_size: int, scaler: Optional[StandardScaler] = None):
+        self.hourly = hourly
+        self.building = building
+        self.hourly_pos = np.asarray(hourly_pos, dtype=np.intp)
+        self.building_pos = np.asarray(building_pos, dtype=np.intp)
+        self.n_columns = len(hourly_pos) + len(building_pos)
+        self.batch_size = batch_size
+        self.scaler = scaler
+    
+    def __len__(self) -> int:
+        return self.building.shape[0] * self.hourly.shape[0]
+    
+    def __getitem__(self, idx: Union[int, slice, List[int]]) -> np.ndarray:
+        single = isinstance(idx, (int, np.integer))
+        if single:
+            rows = np.array([range(len(self))[idx]])
+        elif isinstance(idx, slice):
+            rows = np.arange(*idx.indices(len(self)))
+        else:
+            rows = np.asarray(idx, dtype=np.intp)
+        
+        n_hours = self.hourly.shape[0]
+        X = np.empty((len(rows), self.n_columns))
+        X[:, self.hourly_pos] = self.hourly[rows % n_hours]
+        X[:, self.building_pos] = self.building[rows // n_hours]
+        if self.scaler is not None:
+            # Same arithmetic as StandardScaler.transform, without its per-call overhead
+            X -= self.scaler.mean_
+            X /= self.scaler.scale_
+        return X[0] if single else X
+
 
 class LoadForecastingAgent:
     """
@@ -235,16 +293,107 @@ class LoadForecastingAgent:
     
     def _is_holiday(self, dates: pd.DatetimeIndex) -> pd.Series:
         """Simple holiday detection (German holidays)."""
-        holidays = []
-        for date in dates:
-            # New Year, Christmas, Easter (simplified)
-            if (date.month == 1 and date.day == 1) or \
-               (date.month == 12 and date.day in [24, 25, 26]) or \
-               (date.month == 4 and date.day in [1, 2, 3]):  # Simplified Easter
-                holidays.append(1)
+        month = np.asarray(dates.month)
+        day = np.asarray(dates.day)
+        # New Year, Christmas, Easter (simplified)
+        holidays = (
+            ((month == 1) & (day == 1))
+            | ((month == 12) & np.isin(day, [24, 25, 26]))
+            | ((month == 4) & np.isin(day, [1, 2, 3]))  # Simplified Easter
+        )
+        return pd.Series(holidays.astype(np.int64), index=dates)
+    
+    def _training_columns(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame) -> List[Tuple[str, str]]:
+        """
+        Column layout of the long training frame as (column, source) pairs.
+        
+        Building columns (except IDs) override weather features of the same name,
+        keeping the feature's position.
+        """
+        columns = {col: 'features' for col in features_df.columns}
+        for col in buildings_df.columns:
+            if col not in ['building_id', 'id']:  # Skip ID columns
+                columns[col] = 'building'
+        return list(columns.items())
+    
+    def _synthetic_demand(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame) -> np.ndarray:
+        """
+        Synthetic hourly demand for all buildings as one (buildings × hours) array.
+        
+        The demand is the per-building base load broadcast against an hourly
+        profile (degree hours, time of day, weekend, season). Noise is drawn
+        building by building from the global NumPy seed, so a fixed seed gives
+        the same demand as the former row-by-row generator.
+        """
+        # iterrows() upcast each row to the frame's common dtype; keep those values
+        features = pd.DataFrame(features_df.to_numpy(), index=features_df.index, columns=features_df.columns)
+        buildings = pd.DataFrame(buildings_df.to_numpy(), columns=buildings_df.columns)
+        
+        # Base demand characteristics by building type
+        base_demand_kw = np.array([
+            self._get_base_demand(
+                building.get('function', 'residential'),
+                building.get('floor_area', 100.0),
+                building.get('year', 1990)
+            )
+            for building in buildings.to_dict('records')
+        ], dtype=float)
+        
+        n_hours = len(features)
+        hour = features['hour'].to_numpy(dtype=float)
+        
+        # Weather influence: 2% increase per degree day
+        if 'heating_degree_days' in features.columns:
+            profile = 1.0 + 0.02 * features['heating_degree_days'].to_numpy(dtype=float)
+        else:
+            profile = np.ones(n_hours)
+        
+        # Time-of-day pattern: morning peak, evening peak, night
+        time_of_day = np.select(
+            [(6 <= hour) & (hour <= 9), (17 <= hour) & (hour <= 21), (23 <= hour) | (hour <= 5)],
+            [1.3, 1.4, 0.6],
+            default=1.0
+        )
+        
+        # Day-of-week pattern: higher weekend demand
+        weekend = np.where(features['is_weekend'].to_numpy().astype(bool), 1.1, 1.0)
+        
+        # Seasonal pattern
+        day_of_year = features['day_of_year'].to_numpy(dtype=float)
+        seasonal_factor = 1.0 + 0.4 * np.cos(2 * np.pi * (day_of_year - 15) / 365)
+        
+        # Same multiplication order as the per-hour formula
+        demand = base_demand_kw[:, None] * profile[None, :]
+        demand *= time_of_day
+        demand *= weekend
+        demand *= seasonal_factor
+        
+        # Add noise (5%), one building after another
+        noise = np.random.normal(0, 0.05, size=demand.shape)
+        demand *= (1.0 + noise)
+        
+        # Ensure positive (NaN becomes 0 as well)
+        return np.where(demand > 0.0, demand, 0.0)
+    
+    def _training_frame(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                        demand: np.ndarray) -> pd.DataFrame:
+        """Long-format training frame (building-major) for the given buildings and demand rows."""
+        n_buildings, n_hours = demand.shape
+        features = features_df.to_numpy()
+        buildings = buildings_df.to_numpy()
+        
+        data = {
+            'building_id': np.repeat(buildings_df['building_id'].to_numpy(), n_hours),
+            'timestamp': np.tile(features_df.index.to_numpy(), n_buildings),
+            'demand_kw': demand.reshape(-1),
+        }
+        for col, source in self._training_columns(features_df, buildings_df):
+            if source == 'features':
+                data[col] = np.tile(features[:, features_df.columns.get_loc(col)], n_buildings)
             else:
-                holidays.append(0)
-        return pd.Series(holidays, index=dates)
+                data[col] = np.repeat(buildings[:, buildings_df.columns.get_loc(col)], n_hours)
+        
+        return pd.DataFrame(data).infer_objects()
     
     def generate_synthetic_training_data(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -259,70 +408,36 @@ class LoadForecastingAgent:
         """
         logger.info("Generating synthetic training data...")
         
-        training_data = []
+        demand = self._synthetic_demand(features_df, buildings_df)
+        training_df = self._training_frame(features_df, buildings_df, demand)
         
-        for _, building in buildings_df.iterrows():
-            building_id = building['building_id']
-            floor_area = building.get('floor_area', 100.0)
-            building_type = building.get('function', 'residential')
-            year_built = building.get('year', 1990)
-            
-            # Base demand characteristics by building type
-            base_demand_kw = self._get_base_demand(building_type, floor_area, year_built)
-            
-            # Generate 8760 hours of synthetic demand
-            for hour_idx, (timestamp, features) in enumerate(features_df.iterrows()):
-                # Base demand
-                demand = base_demand_kw
-                
-                # Weather influence
-                if 'heating_degree_days' in features:
-                    hdd = features['heating_degree_days']
-                    demand *= (1.0 + 0.02 * hdd)  # 2% increase per degree day
-                
-                # Time-of-day pattern
-                hour = features['hour']
-                if 6 <= hour <= 9:  # Morning peak
-                    demand *= 1.3
-                elif 17 <= hour <= 21:  # Evening peak
-                    demand *= 1.4
-                elif 23 <= hour or hour <= 5:  # Night
-                    demand *= 0.6
-                
-                # Day-of-week pattern
-                if features['is_weekend']:
-                    demand *= 1.1  # Higher weekend demand
-                
-                # Seasonal pattern
-                day_of_year = features['day_of_year']
-                seasonal_factor = 1.0 + 0.4 * np.cos(2 * np.pi * (day_of_year - 15) / 365)
-                demand *= seasonal_factor
-                
-                # Add noise
-                noise = np.random.normal(0, 0.05)  # 5% noise
-                demand *= (1.0 + noise)
-                
-                # Ensure positive
-                demand = max(0.0, demand)
-                
-                # Add building features to training data
-                building_features = {}
-                for col in building.index:
-                    if col not in ['building_id', 'id']:  # Skip ID columns
-                        building_features[col] = building[col]
-                
-                training_data.append({
-                    'building_id': building_id,
-                    'timestamp': timestamp,
-                    'demand_kw': demand,
-                    **features.to_dict(),
-                    **building_features
-                })
-        
-        training_df = pd.DataFrame(training_data)
         logger.info(f"Generated {len(training_df)} training samples")
         return training_df
     
+    def iter_synthetic_training_chunks(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                                       chunk_buildings: int = 64):
+        """
+        Yield the synthetic training data in chunks of buildings.
+        
+        Concatenating the chunks gives the frame of generate_synthetic_training_data
+        for the same seed, without holding all of it in memory at once.
+        
+        Args:
+            features_df: Engineered features
+            buildings_df: Building metadata
+            chunk_buildings: Number of buildings per chunk
+            
+        Yields:
+            DataFrame with synthetic demand data for one chunk of buildings
+        """
+        if chunk_buildings < 1:
+            raise ValueError(f"chunk_buildings must be positive, got {chunk_buildings}")
+        
+        demand = self._synthetic_demand(features_df, buildings_df)
+        for start in range(0, len(buildings_df), chunk_buildings):
+            stop = start + chunk_buildings
+            yield self._training_frame(features_df, buildings_df.iloc[start:stop], demand[start:stop])
+    
     def _get_base_demand(self, building_type: str, floor_area: float, year_built: int) -> float:
         """Get base demand in kW based on building characteristics."""
         # Base demand per m² by building type (kWh/m²/year)
@@ -367,45 +482,107 @@ class LoadForecastingAgent:
         X_scaled = self.scaler.fit_transform(X)
         
         if LIGHTGBM_AVAILABLE:
-            # Train mean model
-            train_data = lgb.Dataset(X_scaled, label=y)
-            self.mean_model = lgb.train(
-                self.model_params,
-                train_data,
-                num_boost_round=100,
-                valid_sets=[train_data],
-                callbacks=[lgb.log_evaluation(0)]
-            )
-            
-            # Train quantile models
-            for q in self.quantiles:
-                if q != 0.5:  # Skip median, use mean model
-                    quantile_params = self.model_params.copy()
-                    quantile_params['objective'] = 'quantile'
-                    quantile_params['alpha'] = q
-                    
-                    self.quantile_models[q] = lgb.train(
-                        quantile_params,
-                        train_data,
-                        num_boost_round=100,
-                        valid_sets=[train_data],
-                        callbacks=[lgb.log_evaluation(0)]
-                    )
+            self._fit_lightgbm(lgb.Dataset(X_scaled, label=y))
         else:
-            # Fallback: simple linear model
-            from sklearn.linear_model import LinearRegression
-            self.mean_model = LinearRegression()
-            self.mean_model.fit(X_scaled, y)
-            
-            # Simple quantile estimation
-            for q in self.quantiles:
-                if q != 0.5:
-                    residuals = y - self.mean_model.predict(X_scaled)
-                    quantile_value = np.quantile(residuals, q)
-                    self.quantile_models[q] = quantile_value
+            self._fit_fallback(X_scaled, y)
         
         logger.info("Models trained successfully")
     
+    def train_models_chunked(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                             chunk_buildings: int = 64) -> None:
+        """
+        Train mean and quantile models without building the long training frame.
+        
+        Weather features (hours × features) and building features (buildings ×
+        features) are kept apart and combined batch by batch: the scaler is fitted
+        with partial_fit and LightGBM reads the rows through a lgb.Sequence of
+        chunk_buildings × hours rows. Features and targets equal those of
+        generate_synthetic_training_data for the same seed.
+        
+        Args:
+            features_df: Engineered features
+            buildings_df: Building metadata
+            chunk_buildings: Number of buildings per batch
+        """
+        if chunk_buildings < 1:
+            raise ValueError(f"chunk_buildings must be positive, got {chunk_buildings}")
+        
+        logger.info(f"Training models in chunks of {chunk_buildings} buildings...")
+        
+        self.feature_columns = [col for col, _ in self._training_columns(features_df, buildings_df)]
+        rows = self._building_hour_rows(features_df, buildings_df, chunk_buildings)
+        y = self._synthetic_demand(features_df, buildings_df).reshape(-1)
+        
+        # Scale features
+        self.scaler = StandardScaler()
+        for start in range(0, len(rows), rows.batch_size):
+            self.scaler.partial_fit(rows[start:start + rows.batch_size])
+        rows.scaler = self.scaler
+        
+        if LIGHTGBM_AVAILABLE and LGB_SEQUENCE_AVAILABLE:
+            self._fit_lightgbm(lgb.Dataset(rows, label=y))
+        elif LIGHTGBM_AVAILABLE:
+            self._fit_lightgbm(lgb.Dataset(rows[0:len(rows)], label=y))
+        else:
+            self._fit_fallback(rows[0:len(rows)], y)
+        
+        logger.info(f"Models trained successfully on {len(rows)} samples")
+    
+    def _building_hour_rows(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                            batch_buildings: int, scaler: Optional[StandardScaler] = None) -> _BuildingHourRows:
+        """Lazy (buildings × hours) × feature_columns matrix, batch_buildings × hours rows per batch."""
+        building_cols = [col for col in self.feature_columns
+                         if col in buildings_df.columns and col not in ['building_id', 'id']]
+        hourly_cols = [col for col in self.feature_columns if col not in building_cols]
+        position = {col: j for j, col in enumerate(self.feature_columns)}
+        return _BuildingHourRows(
+            hourly=features_df[hourly_cols].to_numpy(dtype=float),
+            building=buildings_df[building_cols].to_numpy(dtype=float),
+            hourly_pos=[position[col] for col in hourly_cols],
+            building_pos=[position[col] for col in building_cols],
+            batch_size=batch_buildings * len(features_df),
+            scaler=scaler
+        )
+    
+    def _fit_lightgbm(self, train_data: "lgb.Dataset") -> None:
+        """Train the LightGBM mean model and one model per non-median quantile."""
+        # Train mean model
+        self.mean_model = lgb.train(
+            self.model_params,
+            train_data,
+            num_boost_round=100,
+            valid_sets=[train_data],
+            callbacks=[lgb.log_evaluation(0)]
+        )
+        
+        # Train quantile models
+        for q in self.quantiles:
+            if q != 0.5:  # Skip median, use mean model
+                quantile_params = self.model_params.copy()
+                quantile_params['objective'] = 'quantile'
+                quantile_params['alpha'] = q
+                
+                self.quantile_models[q] = lgb.train(
+                    quantile_params,
+                    train_data,
+                    num_boost_round=100,
+                    valid_sets=[train_data],
+                    callbacks=[lgb.log_evaluation(0)]
+                )
+    
+    def _fit_fallback(self, X_scaled: np.ndarray, y: np.ndarray) -> None:
+        """Fallback: linear mean model with residual quantile offsets."""
+        from sklearn.linear_model import LinearRegression
+        self.mean_model = LinearRegression()
+        self.mean_model.fit(X_scaled, y)
+        
+        # Simple quantile estimation
+        for q in self.quantiles:
+            if q != 0.5:
+                residuals = y - self.mean_model.predict(X_scaled)
+                quantile_value = np.quantile(residuals, q)
+                self.quantile_models[q] = quantile_value
+    
     def predict_quantiles(self, features_df: pd.DataFrame, building_id: str) -> Dict[str, List[float]]:
         """
         Predict demand quantiles for a building.
@@ -452,13 +629,121 @@ class LoadForecastingAgent:
         
         # Post-process: ensure positive values and finite
         for key in predictions:
-            predictions[key] = [
-                max(0.0, float(val)) if np.isfinite(val) else 0.0 
-                for val in predictions[key]
-            ]
+            predictions[key] = self._clip_forecast(np.asarray(predictions[key], dtype=float)).tolist()
         
         return predictions
     
+    @staticmethod
+    def _clip_forecast(values: np.ndarray) -> np.ndarray:
+        """Clip negatives to 0 and replace non-finite values by 0."""
+        return np.where(np.isfinite(values) & (values > 0.0), values, 0.0)
+    
+    def _predict_block(self, X_scaled: np.ndarray, pool: Optional[ThreadPoolExecutor] = None) -> Dict[str, np.ndarray]:
+        """Predict all quantiles for one scaled feature block (one pass per model)."""
+        if LIGHTGBM_AVAILABLE and self.mean_model is not None:
+            models = {}
+            for q in self.quantiles:
+                if q == 0.5:
+                    models['q50'] = self.mean_model
+                elif q in self.quantile_models:
+                    models[f'q{int(q*100)}'] = self.quantile_models[q]
+            
+            if pool is None:
+                raw = {key: model.predict(X_scaled) for key, model in models.items()}
+            else:
+                # LightGBM releases the GIL while predicting, so models run concurrently
+                futures = {key: pool.submit(model.predict, X_scaled) for key, model in models.items()}
+                raw = {key: future.result() for key, future in futures.items()}
+        else:
+            # Fallback predictions
+            mean_pred = self.mean_model.predict(X_scaled)
+            raw = {'q50': mean_pred}
+            for q in self.quantiles:
+                if q != 0.5:
+                    if q in self.quantile_models:
+                        raw[f'q{int(q*100)}'] = mean_pred + self.quantile_models[q]
+                    else:
+                        # Default ±20% for q10/q90
+                        factor = 0.8 if q == 0.1 else 1.2 if q == 0.9 else 1.0
+                        raw[f'q{int(q*100)}'] = mean_pred * factor
+        
+        return {key: self._clip_forecast(values) for key, values in raw.items()}
+    
+    def iter_forecast_batches(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                              batch_buildings: int = 256, n_threads: int = 1):
+        """
+        Predict demand quantiles for many buildings, one batch of buildings at a time.
+        
+        The weather features are scaled once; each batch stacks its buildings'
+        (hours × features) blocks into one matrix that every model predicts in a
+        single call.
+        
+        Args:
+            features_df: Engineered features for 8760 hours
+            buildings_df: Building metadata (same columns as in training)
+            batch_buildings: Number of buildings per prediction batch
+            n_threads: Threads across the quantile models (1 = sequential)
+            
+        Yields:
+            Tuple of (building_ids, predictions) with one (hours × buildings) array per quantile key
+        """
+        if batch_buildings < 1:
+            raise ValueError(f"batch_buildings must be positive, got {batch_buildings}")
+        
+        rows = self._building_hour_rows(features_df, buildings_df, batch_buildings, scaler=self.scaler)
+        n_hours = len(features_df)
+        building_ids = buildings_df['building_id'].tolist()
+        
+        pool = ThreadPoolExecutor(max_workers=n_threads) if n_threads > 1 else None
+        try:
+            for start in range(0, len(building_ids), batch_buildings):
+                stop = min(start + batch_buildings, len(building_ids))
+                predictions = self._predict_block(rows[start * n_hours:stop * n_hours], pool)
+                yield building_ids[start:stop], {
+                    key: values.reshape(stop - start, n_hours).T for key, values in predictions.items()
+                }
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    
+    def predict_quantiles_batch(self, features_df: pd.DataFrame, buildings_df: pd.DataFrame,
+                                batch_buildings: int = 256, n_threads: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Predict demand quantiles for all buildings.
+        
+        Args:
+            features_df: Engineered features for 8760 hours
+            buildings_df: Building metadata (same columns as in training)
+            batch_buildings: Number of buildings per prediction batch
+            n_threads: Threads across the quantile models (1 = sequential)
+            
+        Returns:
+            Dictionary with one (hours × buildings) array per quantile key, columns
+            in the order of buildings_df
+        """
+        batches = [predictions for _, predictions in
+                   self.iter_forecast_batches(features_df, buildings_df, batch_buildings, n_threads)]
+        if not batches:
+            return {}
+        return {key: np.hstack([batch[key] for batch in batches]) for key in batches[0]}
+    
+    def _load_matrix_writer(self, building_ids: List) -> Optional["LoadMatrixWriter"]:
+        """Writer for <output_dir>/load_matrix, or None if disabled or unavailable."""
+        if not LOAD_MATRIX_AVAILABLE:
+            logger.warning("Load matrix store not available, writing JSON forecasts only")
+            return None
+        if not self.config.get("write_load_matrix", True):
+            # Readers prefer the store, so an old one would shadow the new JSON forecasts
+            if remove_load_matrix(self.output_dir):
+                logger.info(f"Removed outdated load matrix store in {self.output_dir}")
+            return None
+        
+        metadata = {
+            "forecast_date": datetime.utcnow().isoformat() + "Z",
+            "model_version": self.model_version
+        }
+        return LoadMatrixWriter(self.output_dir, building_ids, units="kW", metadata=metadata)
+    
     def save_building_forecast(self, building_id: str, predictions: Dict, 
                              features_df: pd.DataFrame) -> None:
         """
@@ -604,35 +889,58 @@ class LoadForecastingAgent:
             # 2. Engineer features
             features_df = self.engineer_features(weather_df, buildings_df)
             
-            # 3. Generate training data
-            training_df = self.generate_synthetic_training_data(features_df, buildings_df)
-            
-            # 4. Train models
-            self.train_models(training_df)
+            # 3./4. Generate training data and train models
+            chunk_buildings = self.config.get("training_chunk_buildings")
+            if chunk_buildings:
+                # Stream building chunks into LightGBM instead of one long frame
+                self.train_models_chunked(features_df, buildings_df, chunk_buildings)
+            else:
+                training_df = self.generate_synthetic_training_data(features_df, buildings_df)
+                self.train_models(training_df)
             
-            # 5. Generate forecasts for each building
+            # 5. Generate forecasts in building batches (one prediction pass per model)
             all_metrics = []
             processed_buildings = 0
+            writer = self._load_matrix_writer(buildings_df['building_id'].tolist())
+            completed = False
             
-            for _, building in buildings_df.iterrows():
-                building_id = building['building_id']
-                
-                # Predict quantiles
-                predictions = self.predict_quantiles(features_df, building_id)
-                
-                # Save building forecast
-                self.save_building_forecast(building_id, predictions, features_df)
-                
-                # Calculate metrics
-                metrics = self.calculate_metrics(predictions)
-                metrics['building_id'] = building_id
-                metrics['model_version'] = self.model_version
-                all_metrics.append(metrics)
-                
-                processed_buildings += 1
-                
-                if processed_buildings % 10 == 0:
+            batches = self.iter_forecast_batches(
+                features_df, buildings_df,
+                batch_buildings=self.config.get("batch_size", 256),
+                n_threads=self.config.get("prediction_threads", 1)
+            )
+            try:
+                for building_ids, batch_predictions in batches:
+                    # Write the whole batch into the columnar load store
+                    if writer is not None:
+                        zeros = np.zeros((len(features_df), len(building_ids)))
+                        writer.write_block(building_ids, np.stack(
+                            [batch_predictions.get(key, zeros) for key in ('q50', 'q10', 'q90')], axis=2
+                        ))
+                    
+                    for i, building_id in enumerate(building_ids):
+                        predictions = {key: values[:, i].tolist() for key, values in batch_predictions.items()}
+                        
+                        # Save building forecast
+                        self.save_building_forecast(building_id, predictions, features_df)
+                        
+                        # Calculate metrics
+                        metrics = self.calculate_metrics(predictions)
+                        metrics['building_id'] = building_id
+                        metrics['model_version'] = self.model_version
+                        all_metrics.append(metrics)
+                        
+                        processed_buildings += 1
+                    
                     logger.info(f"Processed {processed_buildings}/{len(buildings_df)} buildings")
+                completed = True
+            finally:
+                # A failed run leaves no store, so readers fall back to the JSON files
+                if writer is not None:
+                    if completed:
+                        writer.close()
+                    else:
+                        writer.abort()
             
             # 6. Save aggregated metrics
             self.save_metrics(all_metrics)
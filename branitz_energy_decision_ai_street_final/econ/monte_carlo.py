@@ -3,14 +3,196 @@ Monte Carlo Economics
 
 Provides Monte Carlo simulation for NPV/LCoH distributions with deterministic seeding.
 Now includes CO₂ sampling and P10/P50/P90 summaries.
+
+All trials are drawn as one (n × 4) array of standard normals (CapEx, electricity
+price, grid and heat emission factors) and evaluated in closed form, so 100k+
+trials take milliseconds. Variance-reduction samplers (antithetic, Latin
+hypercube, scrambled Sobol) and P10/P50/P90 convergence diagnostics are
+available; n can be sized from a target confidence instead of fixed.
 """
 
 import math
-import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Union
 from optimize.cost_models import npv
 
+try:
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+SAMPLERS = ("random", "antithetic", "lhs", "sobol")
+QUANTILES = (0.10, 0.50, 0.90)
+PILOT_TRIALS = 1024
+MAX_TRIALS = 1_000_000
+
+# Columns of the standard-normal draw matrix
+_CAPEX, _EL_PRICE, _GRID_CO2, _HEAT_CO2 = range(4)
+
+
+def _inv_norm_cdf(u: np.ndarray) -> np.ndarray:
+    """Standard normal quantile function for an array of uniforms in (0, 1)."""
+    u = np.clip(u, 1e-12, 1 - 1e-12)
+    if SCIPY_AVAILABLE:
+        return ndtri(u)
+    return np.vectorize(NormalDist().inv_cdf, otypes=[float])(u)
+
+
+def standard_normal_draws(n: int, dim: int, sampler: str = "random", seed: int = 42) -> np.ndarray:
+    """
+    Draw an (n × dim) matrix of standard normals with the given sampler.
+
+    Samplers:
+        random:     plain pseudo-random draws
+        antithetic: pairs (z, −z) in consecutive rows
+        lhs:        Latin hypercube (one draw per 1/n stratum and dimension)
+        sobol:      scrambled Sobol sequence (requires scipy)
+
+    Raises:
+        ValueError: If n < 1 or the sampler is unknown
+        ImportError: If sampler is "sobol" and scipy is not installed
+    """
+    if n < 1:
+        raise ValueError(f"Number of trials must be at least 1, got {n}")
+    rng = np.random.default_rng(seed)
+
+    if sampler == "random":
+        return rng.standard_normal((n, dim))
+    if sampler == "antithetic":
+        half = rng.standard_normal(((n + 1) // 2, dim))
+        z = np.empty((2 * len(half), dim))
+        z[0::2], z[1::2] = half, -half
+        return z[:n]
+    if sampler == "lhs":
+        strata = np.argsort(rng.random((n, dim)), axis=0)
+        return _inv_norm_cdf((strata + rng.random((n, dim))) / n)
+    if sampler == "sobol":
+        if not SCIPY_AVAILABLE:
+            raise ImportError("Sobol sampling requires scipy. Please install scipy")
+        u = qmc.Sobol(d=dim, scramble=True, seed=seed).random_base2(max(0, math.ceil(math.log2(n))))
+        return _inv_norm_cdf(u[:n])
+    raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLERS}")
+
+
+def quantile_convergence(
+    values: Sequence[float],
+    checkpoints: Optional[Sequence[int]] = None,
+    quantiles: Tuple[float, ...] = QUANTILES,
+) -> Dict[str, List[float]]:
+    """
+    P10/P50/P90 (or other quantiles) of the first k trials for growing k.
+
+    Args:
+        values: Trial results in draw order.
+        checkpoints: Trial counts to evaluate (default: powers of two up to len(values), plus len(values)).
+        quantiles: Quantiles to track.
+
+    Returns:
+        {"n": [...], "p10": [...], "p50": [...], "p90": [...]}
+    """
+    values = np.asarray(values, dtype=float)
+    if checkpoints is None:
+        checkpoints = [2 ** k for k in range(4, int(math.log2(max(len(values), 1))) + 1)]
+        checkpoints.append(len(values))
+    checkpoints = sorted({int(c) for c in checkpoints if 0 < c <= len(values)})
+
+    out: Dict[str, List[float]] = {"n": checkpoints}
+    for q in quantiles:
+        out[f"p{round(q * 100)}"] = [float(np.quantile(values[:c], q)) for c in checkpoints]
+    return out
+
+
+def trials_for_confidence(
+    values: Sequence[float],
+    rel_halfwidth: float = 0.01,
+    confidence: float = 0.95,
+    quantiles: Tuple[float, ...] = QUANTILES,
+) -> int:
+    """
+    Trials needed so each quantile's confidence interval is within ±rel_halfwidth.
+
+    Uses the asymptotic standard error of a sample quantile,
+    SE = √(p(1−p)/n) / f(q_p), with the density f estimated from the pilot
+    ``values``. This is exact for plain sampling and conservative for the
+    variance-reduction samplers.
+
+    Raises:
+        ValueError: If rel_halfwidth ≤ 0 or confidence is not in (0, 1)
+    """
+    if rel_halfwidth <= 0:
+        raise ValueError(f"Relative half-width must be positive, got {rel_halfwidth}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"Confidence must be in (0, 1), got {confidence}")
+
+    values = np.asarray(values, dtype=float)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    h = max(0.01, 2.0 / math.sqrt(len(values)))
+    required = 1
+    for p in quantiles:
+        lo, q, hi = np.quantile(values, [max(p - h, 0.0), p, min(p + h, 1.0)])
+        if hi <= lo or q == 0:
+            continue  # degenerate (constant) distribution: any n is exact
+        density = (min(p + h, 1.0) - max(p - h, 0.0)) / (hi - lo)
+        halfwidth = rel_halfwidth * abs(q)
+        required = max(required, math.ceil(p * (1 - p) * (z / (density * halfwidth)) ** 2))
+    return required
+
+
+def _base_inputs(segments_df: pd.DataFrame, econ: Dict, catalog_df: pd.DataFrame) -> Dict[str, float]:
+    """Base CapEx from catalog costs and annual energy terms, without per-row iteration."""
+    if "dn" in catalog_df.columns:
+        cost_map = pd.Series(
+            catalog_df.get("cost_eur_per_m", pd.Series(0.0, index=catalog_df.index)).astype(float).values,
+            index=catalog_df["dn"].astype(int).values,
+        )
+        cost_map = cost_map[~cost_map.index.duplicated(keep="last")]
+    else:
+        cost_map = pd.Series(dtype=float)
+
+    length = segments_df.get("length_m", pd.Series(0.0, index=segments_df.index)).astype(float)
+    dn = segments_df.get("DN", pd.Series(0, index=segments_df.index)).astype(int)
+    capex_base = float((length * dn.map(cost_map).fillna(0.0).astype(float)).sum())
+
+    return {
+        "capex_base": capex_base,
+        "pump_mwh": float(segments_df.get("pump_MWh", pd.Series([0.0])).sum()),
+        "loss_mwh": float(segments_df.get("heat_loss_MWh", pd.Series([0.0])).sum()),
+        "mean_el": float(econ.get("price_el", 0.25)),         # €/kWh_el
+        "heat_cost": float(econ.get("cost_heat_prod", 55.0)), # €/MWh_th
+        "years": int(econ.get("years", 30)),
+        "r": float(econ.get("r", 0.04)),
+    }
+
+
+def _evaluate(z: np.ndarray, base: Dict[str, float], sigmas: Tuple[float, float, float, float],
+              grid_co2_mean: float, heat_co2_mean: float) -> Dict[str, np.ndarray]:
+    """Closed-form NPV, LCoH and CO₂ for every row of standard normals."""
+    capex_sigma, el_price_sigma, grid_co2_sigma, heat_co2_sigma = sigmas
+    pump_mwh, loss_mwh, years = base["pump_mwh"], base["loss_mwh"], base["years"]
+
+    # stochastic CapEx and electricity price (lognormal around the means)
+    capex = base["capex_base"] * np.exp(capex_sigma * z[:, _CAPEX])
+    el_price = base["mean_el"] * np.exp(el_price_sigma * z[:, _EL_PRICE])
+
+    # annual operating cost (energy + simple O&M as 1% CapEx); NPV is linear in it
+    annual_cost = (pump_mwh * 1000.0 * el_price) + (loss_mwh * base["heat_cost"]) + 0.01 * capex
+    pv = capex + npv(0.0, 1.0, years, base["r"]) * annual_cost
+
+    # rough LCoH proxy: €/MWh_tot over project lifetime
+    lcoh = pv / max(1.0, years * (pump_mwh + loss_mwh))
+
+    # emission factors (lognormal positives)
+    grid_factor = grid_co2_mean * np.exp(grid_co2_sigma * z[:, _GRID_CO2])
+    heat_factor = heat_co2_mean * np.exp(heat_co2_sigma * z[:, _HEAT_CO2])
+    co2_tons = pump_mwh * grid_factor + loss_mwh * heat_factor
+
+    return {"npv": pv, "lcoh": lcoh, "co2_tons": co2_tons}
+
 
 def run_monte_carlo(
     assignment: Dict[str, int],
@@ -18,7 +200,7 @@ def run_monte_carlo(
     design: Dict,
     econ: Dict,
     catalog_df: pd.DataFrame,
-    n: int = 500,
+    n: Optional[int] = 500,
     capex_sigma: float = 0.2,
     el_price_sigma: float = 0.25,
     # CO2 settings (means in tCO2/MWh, sigmas are lognormal std-devs)
@@ -27,6 +209,9 @@ def run_monte_carlo(
     heat_co2_mean_t_per_MWh: float = 0.20,
     heat_co2_sigma: float = 0.10,
     seed: int = 42,
+    sampler: str = "random",
+    target_rel_halfwidth: float = 0.01,
+    confidence: float = 0.95,
 ) -> Dict:
     """
     Return dict with lists for npv, lcoh, pump_mwh, heat_loss_mwh, co2_tons and a 'summary'
@@ -41,11 +226,14 @@ def run_monte_carlo(
         design: (unused here, kept for API compatibility).
         econ: contains price_el [€/kWh el], cost_heat_prod [€/MWh th], years, r.
         catalog_df: at least columns ['dn', 'cost_eur_per_m'].
-        n: number of Monte-Carlo trials (default 500).
+        n: number of Monte-Carlo trials (default 500). None sizes n from a pilot run so that
+           the NPV and CO2 P10/P50/P90 are within ±target_rel_halfwidth at the given confidence.
         capex_sigma/el_price_sigma: lognormal sigmas for CapEx and electricity price.
         grid_co2_mean_t_per_MWh/heat_co2_mean_t_per_MWh: mean emission factors for electricity and heat.
         grid_co2_sigma/heat_co2_sigma: lognormal sigmas for emission factors.
         seed: deterministic seed.
+        sampler: 'random', 'antithetic', 'lhs' or 'sobol' (see standard_normal_draws).
+        target_rel_halfwidth/confidence: precision target used when n is None.
 
     Returns:
         {
@@ -56,80 +244,47 @@ def run_monte_carlo(
           "co2_tons": List[float],
           "summary": {
              "npv_p10": float, "npv_p50": float, "npv_p90": float,
-             "co2_p10": float, "co2_p50": float, "co2_p90": float
-          }
+             "co2_p10": float, "co2_p50": float, "co2_p90": float,
+             "n": int, "sampler": str
+          },
+          "convergence": {"npv": {...}, "co2_tons": {...}}  # see quantile_convergence
         }
     """
-    rnd = random.Random(seed)
-
-    # derive base CapEx from catalog costs
-    cost_map = {
-        int(r["dn"]): float(r.get("cost_eur_per_m", 0.0))
-        for _, r in catalog_df.iterrows() if "dn" in r
-    }
-    capex_base = 0.0
-    for _, r in segments_df.iterrows():
-        length = float(r.get("length_m", 0.0))
-        dn = int(r.get("DN", 0))
-        capex_base += length * float(cost_map.get(dn, 0.0))
-
-    # base annual opex energy terms if provided
-    pump_mwh = float(segments_df.get("pump_MWh", pd.Series([0.0])).sum())
-    loss_mwh = float(segments_df.get("heat_loss_MWh", pd.Series([0.0])).sum())
-
-    mean_el = float(econ.get("price_el", 0.25))         # €/kWh_el
-    heat_cost = float(econ.get("cost_heat_prod", 55.0)) # €/MWh_th
-    years = int(econ.get("years", 30))
-    r = float(econ.get("r", 0.04))
-
-    samples = []
-    for i in range(n):
-        # stochastic CapEx and electricity price
-        capex = capex_base * rnd.lognormvariate(0.0, capex_sigma)
-        el_price = mean_el * rnd.lognormvariate(0.0, el_price_sigma)
+    base = _base_inputs(segments_df, econ, catalog_df)
+    sigmas = (capex_sigma, el_price_sigma, grid_co2_sigma, heat_co2_sigma)
 
-        # annual operating cost (energy + simple O&M as 1% CapEx)
-        annual_cost = (pump_mwh * 1000.0 * el_price) + (loss_mwh * heat_cost) + 0.01 * capex
+    def simulate(trials: int) -> Dict[str, np.ndarray]:
+        z = standard_normal_draws(trials, 4, sampler=sampler, seed=seed)
+        return _evaluate(z, base, sigmas, grid_co2_mean_t_per_MWh, heat_co2_mean_t_per_MWh)
 
-        pv = npv(capex, annual_cost, years, r)
+    if n is None:
+        pilot = simulate(PILOT_TRIALS)
+        n = max(
+            trials_for_confidence(pilot["npv"], target_rel_halfwidth, confidence),
+            trials_for_confidence(pilot["co2_tons"], target_rel_halfwidth, confidence),
+            PILOT_TRIALS,
+        )
+        n = min(n, MAX_TRIALS)
 
-        # rough LCoH proxy: €/MWh_tot over project lifetime
-        denom = max(1.0, years * (pump_mwh + loss_mwh))
-        lcoh = (pv / denom)
-
-        # emission factors (lognormal positives)
-        grid_factor = grid_co2_mean_t_per_MWh * rnd.lognormvariate(0.0, grid_co2_sigma)
-        heat_factor = heat_co2_mean_t_per_MWh * rnd.lognormvariate(0.0, heat_co2_sigma)
-
-        co2_tons = pump_mwh * grid_factor + loss_mwh * heat_factor
-
-        samples.append({
-            "trial": i,
-            "npv": pv,
-            "lcoh": lcoh,
-            "pump_mwh": pump_mwh,
-            "heat_loss_mwh": loss_mwh,
-            "co2_tons": co2_tons,
-        })
-
-    df = pd.DataFrame(samples)
+    samples = simulate(n)
 
     # summaries
-    npv_p10 = df["npv"].quantile(0.10)
-    npv_p50 = df["npv"].quantile(0.50)
-    npv_p90 = df["npv"].quantile(0.90)
-    co2_p10 = df["co2_tons"].quantile(0.10)
-    co2_p50 = df["co2_tons"].quantile(0.50)
-    co2_p90 = df["co2_tons"].quantile(0.90)
+    npv_p10, npv_p50, npv_p90 = (float(v) for v in np.quantile(samples["npv"], QUANTILES))
+    co2_p10, co2_p50, co2_p90 = (float(v) for v in np.quantile(samples["co2_tons"], QUANTILES))
 
     return {
-        "npv": df["npv"].tolist(),
-        "lcoh": df["lcoh"].tolist(),
-        "pump_mwh": df["pump_mwh"].tolist(),
-        "heat_loss_mwh": df["heat_loss_mwh"].tolist(),
-        "co2_tons": df["co2_tons"].tolist(),
+        "npv": samples["npv"].tolist(),
+        "lcoh": samples["lcoh"].tolist(),
+        "pump_mwh": np.full(n, base["pump_mwh"]).tolist(),
+        "heat_loss_mwh": np.full(n, base["loss_mwh"]).tolist(),
+        "co2_tons": samples["co2_tons"].tolist(),
         "summary": {
             "npv_p10": npv_p10, "npv_p50": npv_p50, "npv_p90": npv_p90,
             "co2_p10": co2_p10, "co2_p50": co2_p50, "co2_p90": co2_p90,
+            "n": n, "sampler": sampler,
+        },
+        "convergence": {
+            "npv": quantile_convergence(samples["npv"]),
+            "co2_tons": quantile_convergence(samples["co2_tons"]),
         },
-    } 
\ No newline at end of file
+    }
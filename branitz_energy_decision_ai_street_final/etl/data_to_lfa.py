@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Union
 from datetime import datetime, timedelta
 import argparse
 
+from .label_synthesis import LABEL_FORMATS, write_labels
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -353,60 +355,26 @@ def _generate_synthetic_weather(year: int) -> pd.DataFrame:
     return pd.DataFrame(weather_data)
 
 
-def synthesize_labels(df_b: pd.DataFrame, weather_df: pd.DataFrame, out_dir: str = "data/interim/meters") -> None:
+def synthesize_labels(df_b: pd.DataFrame, weather_df: pd.DataFrame, out_dir: str = "data/interim/meters",
+                      output_format: str = "per_building", chunk_buildings: int = 256) -> None:
     """
     Generate synthetic heat demand labels using DIN-style physics.
     
+    P_h(t) = (H_tr + H_ve) * (T_in - T_out(t)) * sanierungs_faktor is computed as
+    one (buildings × hours) matrix per chunk of buildings.
+    
     Args:
         df_b: Building DataFrame with physics coefficients
         weather_df: Weather DataFrame with hourly temperatures
         out_dir: Output directory for meter data
+        output_format: "per_building" (one Parquet per building), "dataset" (Parquet
+            part files with a building_id column) or "load_matrix" (columnar LFA store)
+        chunk_buildings: Number of buildings computed and written at once
     """
     logger.info("Generating synthetic heat demand labels...")
     
-    out_path = Path(out_dir)
-    out_path.mkdir(parents=True, exist_ok=True)
-    
-    # Ensure weather data has timestamp index
-    if 'timestamp' not in weather_df.columns:
-        raise ValueError("Weather data must have 'timestamp' column")
-    
-    weather_df = weather_df.set_index('timestamp')
-    
-    for _, building in df_b.iterrows():
-        building_id = building['building_id']
-        
-        # Compute hourly heat demand using DIN formula
-        # P_h(t) = (H_tr + H_ve) * (T_in - T_out(t)) * sanierungs_faktor
-        T_in = building['innentemperatur']
-        H_tr = building['H_tr']
-        H_ve = building['H_ve']
-        sanierungs_faktor = building['sanierungs_faktor']
-        
-        # Calculate heat demand for each hour
-        heat_demand = []
-        for timestamp, row in weather_df.iterrows():
-            T_out = row['T_out']
-            
-            # DIN heat demand formula (in W)
-            P_h = (H_tr + H_ve) * (T_in - T_out) * sanierungs_faktor
-            
-            # Clip at 0 (no cooling) and convert to kW
-            P_h = max(0.0, P_h) / 1000.0
-            
-            heat_demand.append({
-                'timestamp': timestamp,
-                'demand_kw': P_h
-            })
-        
-        # Create DataFrame and save
-        demand_df = pd.DataFrame(heat_demand)
-        building_file = out_path / f"{building_id}.parquet"
-        demand_df.to_parquet(building_file, index=False)
-        
-        logger.debug(f"Generated labels for building {building_id}")
-    
-    logger.info(f"Synthetic labels written to: {out_path}")
+    write_labels(df_b, weather_df, out_dir, id_col='building_id', t_in_col='innentemperatur',
+                 output_format=output_format, chunk_buildings=chunk_buildings)
 
 
 def main():
@@ -417,6 +385,9 @@ def main():
     parser.add_argument("--year", type=int, default=2024, help="Target year for weather data")
     parser.add_argument("--write-meters", type=bool, default=False, help="Generate synthetic meter data")
     parser.add_argument("--output-dir", default="data/processed", help="Output directory")
+    parser.add_argument("--labels-format", choices=LABEL_FORMATS, default="dataset",
+                        help="Synthetic label layout: Parquet dataset, LFA load matrix or one file per building")
+    parser.add_argument("--label-chunk", type=int, default=256, help="Buildings per label chunk")
     
     args = parser.parse_args()
     
@@ -436,7 +407,8 @@ def main():
         # Generate synthetic labels if requested
         if args.write_meters:
             meters_dir = Path(args.output_dir).parent / "interim" / "meters"
-            synthesize_labels(buildings_df, weather_df, str(meters_dir))
+            synthesize_labels(buildings_df, weather_df, str(meters_dir),
+                              output_format=args.labels_format, chunk_buildings=args.label_chunk)
         
         logger.info("ETL pipeline completed successfully")
         
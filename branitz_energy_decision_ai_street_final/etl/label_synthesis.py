@@ -0,0 +1,151 @@
+"""
+Synthetic Label Synthesis: DIN-Physics Heat Demand for Many Buildings
+
+Vectorized label generator shared by the ETL pipelines. The hourly heat demand
+P_h(t) = (H_tr + H_ve) * (T_in - T_out(t)) * sanierungs_faktor is computed for
+a whole chunk of buildings as one (buildings × hours) matrix by broadcasting the
+per-building coefficients against the weather series.
+
+Labels are written in one of three layouts:
+- "dataset": one Parquet part file per building chunk (building_id, timestamp, demand_kw)
+- "load_matrix": the shared columnar LFA load store (<out_dir>/load_matrix)
+- "per_building": one Parquet file per building (legacy layout)
+"""
+
+import logging
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.lfa_load_matrix import LoadMatrixWriter
+    LOAD_MATRIX_AVAILABLE = True
+except ImportError:
+    LOAD_MATRIX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+LABEL_FORMATS = ("dataset", "load_matrix", "per_building")
+DATASET_PART_GLOB = "part-*.parquet"
+
+
+def weather_timestamps(weather_df: pd.DataFrame) -> pd.DatetimeIndex:
+    """Hourly timestamps from a 'timestamp' column or a DatetimeIndex."""
+    if 'timestamp' in weather_df.columns:
+        return pd.DatetimeIndex(weather_df['timestamp'])
+    if isinstance(weather_df.index, pd.DatetimeIndex):
+        return weather_df.index
+    raise ValueError("Weather data must have 'timestamp' column")
+
+
+def compute_label_matrix(df_b: pd.DataFrame, T_out: np.ndarray, t_in_col: str = 'T_in') -> np.ndarray:
+    """
+    Compute DIN heat demand labels for a set of buildings.
+
+    Args:
+        df_b: Building DataFrame with H_tr, H_ve, sanierungs_faktor and indoor temperature
+        T_out: Hourly outdoor temperatures (°C)
+        t_in_col: Column with the indoor set temperature (°C)
+
+    Returns:
+        Array (buildings × hours) of heat demand in kW, clipped at 0 (no cooling)
+    """
+    H = (df_b['H_tr'] + df_b['H_ve']).to_numpy(dtype=float)
+    T_in = df_b[t_in_col].to_numpy(dtype=float)
+    faktor = df_b['sanierungs_faktor'].to_numpy(dtype=float)
+    T_out = np.asarray(T_out, dtype=float)
+
+    # DIN heat demand formula (in W)
+    P_h = H[:, None] * (T_in[:, None] - T_out[None, :]) * faktor[:, None]
+
+    # Clip at 0 (no cooling, NaN as well) and convert to kW
+    return np.where(P_h > 0.0, P_h, 0.0) / 1000.0
+
+
+def iter_label_chunks(df_b: pd.DataFrame, weather_df: pd.DataFrame, id_col: str = 'id',
+                      t_in_col: str = 'T_in', chunk_buildings: int = 256
+                      ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Yield (building_ids, labels) per chunk of buildings.
+
+    Only one (chunk_buildings × hours) matrix is held in memory at a time.
+    """
+    if chunk_buildings < 1:
+        raise ValueError(f"chunk_buildings must be positive, got {chunk_buildings}")
+
+    T_out = weather_df['T_out'].to_numpy(dtype=float)
+    for start in range(0, len(df_b), chunk_buildings):
+        chunk = df_b.iloc[start:start + chunk_buildings]
+        yield chunk[id_col].astype(str).to_numpy(), compute_label_matrix(chunk, T_out, t_in_col)
+
+
+def write_labels(df_b: pd.DataFrame, weather_df: pd.DataFrame, out_dir: Union[str, Path],
+                 id_col: str = 'id', t_in_col: str = 'T_in', output_format: str = "dataset",
+                 chunk_buildings: int = 256) -> Path:
+    """
+    Generate and write synthetic heat demand labels for all buildings.
+
+    Args:
+        df_b: Building DataFrame with physics coefficients
+        weather_df: Weather DataFrame with hourly temperatures
+        out_dir: Output directory for meter data
+        id_col: Building ID column
+        t_in_col: Indoor set temperature column
+        output_format: "dataset", "load_matrix" or "per_building"
+        chunk_buildings: Number of buildings computed and written at once
+
+    Returns:
+        Output directory
+    """
+    if output_format not in LABEL_FORMATS:
+        raise ValueError(f"Unknown label format '{output_format}', expected one of {LABEL_FORMATS}")
+    if output_format == "load_matrix" and not LOAD_MATRIX_AVAILABLE:
+        raise ImportError("Load matrix store (src.lfa_load_matrix) is not importable")
+
+    out_path = Path(out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+
+    timestamps = weather_timestamps(weather_df)
+    n_hours = len(timestamps)
+    chunks = iter_label_chunks(df_b, weather_df, id_col, t_in_col, chunk_buildings)
+
+    if output_format == "load_matrix":
+        with LoadMatrixWriter(out_path, df_b[id_col].astype(str).tolist(), quantiles=("series",),
+                              hours=n_hours, units="kW", metadata={"source": "din_physics_labels"}) as writer:
+            for building_ids, labels in chunks:
+                writer.write_block(building_ids, labels.T[:, :, None])
+        logger.info(f"Synthetic labels for {len(df_b)} buildings written to: {writer.store_dir}")
+        return out_path
+
+    if output_format == "dataset":
+        # Stale parts from an earlier run would otherwise be read as part of the dataset
+        for stale in out_path.glob(DATASET_PART_GLOB):
+            stale.unlink()
+
+    for part, (building_ids, labels) in enumerate(chunks):
+        if output_format == "dataset":
+            part_df = pd.DataFrame({
+                'building_id': np.repeat(building_ids, n_hours),
+                'timestamp': np.tile(timestamps.to_numpy(), len(building_ids)),
+                'demand_kw': labels.reshape(-1)
+            })
+            part_df.to_parquet(out_path / f"part-{part:05d}.parquet", index=False)
+        else:
+            for building_id, demand in zip(building_ids, labels):
+                demand_df = pd.DataFrame({'timestamp': timestamps, 'demand_kw': demand})
+                demand_df.to_parquet(out_path / f"{building_id}.parquet", index=False)
+                logger.debug(f"Generated labels for building {building_id}")
+
+    logger.info(f"Synthetic labels for {len(df_b)} buildings written to: {out_path}")
+    return out_path
+
+
+def read_labels(out_dir: Union[str, Path], buildings: Optional[list] = None) -> pd.DataFrame:
+    """Read a label dataset (building_id, timestamp, demand_kw), optionally for some buildings."""
+    parts = sorted(Path(out_dir).glob(DATASET_PART_GLOB))
+    if not parts:
+        raise FileNotFoundError(f"No label dataset found in {out_dir}")
+    filters = [('building_id', 'in', [str(b) for b in buildings])] if buildings is not None else None
+    return pd.concat([pd.read_parquet(p, filters=filters) for p in parts], ignore_index=True)
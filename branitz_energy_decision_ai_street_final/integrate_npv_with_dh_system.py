@@ -39,6 +39,8 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--report-html", type=str, default="compliance_report.html", help="Report filename")
     p.add_argument("--export-geojson", type=Path, help="Write per-segment GeoJSON to this path")
     p.add_argument("--monte-carlo", type=int, default=0, help="Trials for Monte Carlo (0 = skip)")
+    p.add_argument("--mc-sampler", type=str, default="random",
+                   choices=["random", "antithetic", "lhs", "sobol"], help="Monte Carlo sampler")
     # Minimal design/econ knobs
     p.add_argument("--T-supply", type=float, default=80.0)
     p.add_argument("--T-return", type=float, default=50.0)
@@ -135,7 +137,8 @@ def main(argv=None) -> int:
     if args.monte_carlo and args.monte_carlo > 0:
         try:
             from econ.monte_carlo import run_monte_carlo
-            mc = run_monte_carlo(assignment, per_seg_df, design, econ, catalog_df, n=int(args.monte_carlo))
+            mc = run_monte_carlo(assignment, per_seg_df, design, econ, catalog_df, n=int(args.monte_carlo),
+                                 sampler=args.mc_sampler)
             mc_summary = mc.get("summary", {})
         except Exception as e:
             mc_summary = {"error": str(e)}
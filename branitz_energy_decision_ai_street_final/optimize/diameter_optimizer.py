@@ -9,7 +9,8 @@ All functions are pure, deterministic, and include comprehensive input validatio
 """
 
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, astuple
 from typing import Dict, List, Tuple, Optional
 import math
 from collections import defaultdict
@@ -18,6 +19,8 @@ from optimize.catalogs import load_pipe_catalog, PipeType
 from optimize.physics_models import segment_hydraulics, segment_heat_loss_W, G
 from optimize.cost_models import annual_pump_energy_mwhel, npv
 from optimize.en13941_checks import check_velocity, check_deltaT
+from optimize.incremental_eval import IncrementalEvaluator
+from optimize.global_dp import solve_head_budget_dp
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -72,6 +75,7 @@ class DiameterOptimizer:
           - v_feasible_target [m/s]  (default 1.3), v_limit [m/s] (default 1.5)
           - deltaT_min [K]           (default 30.0)
           - K_minor [-]              (default 0.0) — applied in hydraulics per segment
+          - head_max_m [m]           (default None) — worst supply path head limit (global mode)
     econ : dict
         Required keys:
           - price_el [€/kWh_el], cost_heat_prod [€/MWh_th]
@@ -94,10 +98,19 @@ class DiameterOptimizer:
         
         # Load and validate pipe catalog
         self.catalog = self._load_catalog(catalog_csv)
+        self._dn_index: Dict[int, int] = {pipe.dn: i for i, pipe in enumerate(self.catalog)}
         
         # Initialize assignment: seg_id -> dn
         self.assignment: Dict[str, int] = {}
         
+        # Per-segment × per-DN tables for local_improve and the global DP, built on first use
+        # and rebuilt whenever the inputs they were built from (_table_key) change
+        self._incremental: Optional[IncrementalEvaluator] = None
+        self._incremental_key: Optional[Tuple] = None
+        
+        # Solve time and bound statistics of the last run / optimize_global call
+        self.solver_stats: Dict = {}
+        
         logger.debug(f"Initialized optimizer with {len(segments)} segments and {len(self.catalog)} pipe types")
     
     def _validate_segments(self, segments: List[Segment]) -> None:
@@ -125,6 +138,7 @@ class DiameterOptimizer:
         design.setdefault('v_limit', 1.5)
         design.setdefault('deltaT_min', 30.0)
         design.setdefault('K_minor', 0.0)
+        design.setdefault('head_max_m', None)
         
         # Validate values
         if design['eta_pump'] <= 0 or design['eta_pump'] > 1:
@@ -137,6 +151,8 @@ class DiameterOptimizer:
             raise ValueError(f"Velocity limit must be positive, got {design['v_limit']} m/s")
         if design['deltaT_min'] <= 0:
             raise ValueError(f"Minimum deltaT must be positive, got {design['deltaT_min']} K")
+        if design['head_max_m'] is not None and design['head_max_m'] <= 0:
+            raise ValueError(f"Head limit must be positive, got {design['head_max_m']} m")
     
     def _validate_econ(self, econ: Dict) -> None:
         """Validate economic parameters."""
@@ -172,6 +188,48 @@ class DiameterOptimizer:
         logger.debug(f"Loaded {len(valid_catalog)} valid pipe types from catalog")
         return valid_catalog
     
+    def _pipe_for_dn(self, dn: int) -> Optional[PipeType]:
+        """Look up the catalog entry for a DN (None if not in the catalog)."""
+        idx = self._dn_index.get(dn)
+        return self.catalog[idx] if idx is not None else None
+    
+    def _table_key(self) -> Tuple:
+        """Inputs of the segment × DN tables: segments, design, econ and catalog."""
+        return (
+            tuple(astuple(seg) for seg in self.segments),
+            tuple(sorted(self.design.items())),
+            tuple(sorted(self.econ.items())),
+            tuple(astuple(pipe) for pipe in self.catalog),
+        )
+    
+    def _current_evaluator(self, key: Optional[Tuple] = None) -> Optional[IncrementalEvaluator]:
+        """Segment × DN tables if built and still matching the inputs, else None."""
+        if self._incremental is None:
+            return None
+        if self._incremental_key != (key if key is not None else self._table_key()):
+            return None
+        return self._incremental
+    
+    def _evaluator(self) -> IncrementalEvaluator:
+        """Segment × DN tables, rebuilt when segments, design, econ or catalog changed."""
+        key = self._table_key()
+        if self._current_evaluator(key) is None:
+            self._incremental = IncrementalEvaluator(self.segments, self.catalog, self.design, self.econ)
+            self._incremental_key = key
+        return self._incremental
+    
+    @staticmethod
+    def _gap(npv_eur: float, lower_bound_npv_eur: float) -> float:
+        """Relative optimality gap of an NPV against a lower bound (0 = proven optimal)."""
+        if npv_eur <= 0:
+            return 0.0
+        return max(0.0, (npv_eur - lower_bound_npv_eur) / npv_eur)
+    
+    def _head_ok(self, metrics: Dict) -> bool:
+        """Worst supply path head within head_max_m (always True without a limit)."""
+        head_max_m = self.design['head_max_m']
+        return head_max_m is None or metrics["head_required_m"] <= head_max_m
+    
     def _pick_smallest_dn_for_velocity(self, V_dot: float, v_target: float) -> int:
         """Pick the smallest DN that satisfies velocity target."""
         for pipe in self.catalog:
@@ -208,7 +266,7 @@ class DiameterOptimizer:
                 continue
             
             # Find pipe type for this DN
-            pipe = next((p for p in self.catalog if p.dn == self.assignment[seg.seg_id]), None)
+            pipe = self._pipe_for_dn(self.assignment[seg.seg_id])
             if pipe is None or pipe.d_inner_m is None:
                 logger.warning(f"No valid pipe found for DN {self.assignment[seg.seg_id]}")
                 continue
@@ -267,6 +325,34 @@ class DiameterOptimizer:
         
         return self.assignment.copy()
     
+    def _segment_heat_loss_W(self, seg: Segment, pipe: PipeType) -> float:
+        """Heat loss of one segment with the scalar model (W/m or U-value from the catalog)."""
+        heat_loss_W = 0.0
+        if seg.V_dot_m3s > 0:  # Only calculate for segments with flow
+            if pipe.w_loss_w_per_m is not None:
+                # Use direct W/m
+                heat_loss_W = segment_heat_loss_W(
+                    U_or_Wpm=pipe.w_loss_w_per_m,
+                    d_outer=pipe.d_outer_m or pipe.d_inner_m + 0.01,
+                    T_f=self.design['T_supply'] if seg.is_supply else self.design['T_return'],
+                    T_soil=self.design['T_soil'],
+                    L=seg.length_m,
+                    is_direct_Wpm=True
+                )
+            elif pipe.u_wpermk is not None and pipe.d_outer_m is not None:
+                # Use U-value
+                heat_loss_W = segment_heat_loss_W(
+                    U_or_Wpm=pipe.u_wpermk,
+                    d_outer=pipe.d_outer_m,
+                    T_f=self.design['T_supply'] if seg.is_supply else self.design['T_return'],
+                    T_soil=self.design['T_soil'],
+                    L=seg.length_m,
+                    is_direct_Wpm=False
+                )
+            else:
+                logger.debug(f"No heat loss data for segment {seg.seg_id}, treating as 0 W")
+        return heat_loss_W
+    
     def evaluate_quick(self, assignment: Dict[str, int]) -> Dict:
         """
         Compute comprehensive metrics for a given diameter assignment.
@@ -286,57 +372,41 @@ class DiameterOptimizer:
             total_heat_loss_W = 0.0
             total_capex = 0.0
             
-            # Evaluate each segment
-            for seg in self.segments:
+            # Evaluate each segment; the kernel tables are only read if local_improve or
+            # the global DP already built them for the current inputs
+            evaluator = self._current_evaluator()
+            for s, seg in enumerate(self.segments):
                 if seg.seg_id not in assignment:
                     logger.warning(f"Segment {seg.seg_id} not in assignment")
                     continue
                 
                 # Find pipe type
-                pipe = next((p for p in self.catalog if p.dn == assignment[seg.seg_id]), None)
+                pipe = self._pipe_for_dn(assignment[seg.seg_id])
                 if pipe is None:
                     logger.warning(f"No pipe found for DN {assignment[seg.seg_id]}")
                     continue
                 
-                # Calculate hydraulic parameters
-                v, dp, h = segment_hydraulics(
-                    V_dot=seg.V_dot_m3s,
-                    d_inner=pipe.d_inner_m,
-                    L=seg.length_m,
-                    rho=self.design['rho'],
-                    mu=self.design['mu'],
-                    epsilon=4.5e-5,
-                    K_minor=self.design['K_minor']
-                )
+                # Hydraulics and heat loss from the segment × DN kernel tables
+                k = self._dn_index[assignment[seg.seg_id]]
+                if evaluator is not None and evaluator.valid[s, k]:
+                    v = float(evaluator.velocity[s, k])
+                    dp = float(evaluator.dp[s, k])
+                    h = dp / (self.design['rho'] * G)
+                    heat_loss_W = float(evaluator.heat_loss_W[s, k])
+                else:
+                    # No tables, or entries the kernel masks: the scalar models raise the same errors as before
+                    v, dp, h = segment_hydraulics(
+                        V_dot=seg.V_dot_m3s,
+                        d_inner=pipe.d_inner_m,
+                        L=seg.length_m,
+                        rho=self.design['rho'],
+                        mu=self.design['mu'],
+                        epsilon=4.5e-5,
+                        K_minor=self.design['K_minor']
+                    )
+                    heat_loss_W = self._segment_heat_loss_W(seg, pipe)
                 
                 all_velocities.append(v)
-                
-                # Calculate heat loss
-                heat_loss_W = 0.0
-                if seg.V_dot_m3s > 0:  # Only calculate for segments with flow
-                    if pipe.w_loss_w_per_m is not None:
-                        # Use direct W/m
-                        heat_loss_W = segment_heat_loss_W(
-                            U_or_Wpm=pipe.w_loss_w_per_m,
-                            d_outer=pipe.d_outer_m or pipe.d_inner_m + 0.01,
-                            T_f=self.design['T_supply'] if seg.is_supply else self.design['T_return'],
-                            T_soil=self.design['T_soil'],
-                            L=seg.length_m,
-                            is_direct_Wpm=True
-                        )
-                    elif pipe.u_wpermk is not None and pipe.d_outer_m is not None:
-                        # Use U-value
-                        heat_loss_W = segment_heat_loss_W(
-                            U_or_Wpm=pipe.u_wpermk,
-                            d_outer=pipe.d_outer_m,
-                            T_f=self.design['T_supply'] if seg.is_supply else self.design['T_return'],
-                            T_soil=self.design['T_soil'],
-                            L=seg.length_m,
-                            is_direct_Wpm=False
-                        )
-                    else:
-                        logger.debug(f"No heat loss data for segment {seg.seg_id}, treating as 0 W")
-                
                 total_heat_loss_W += heat_loss_W
                 
                 # Calculate capex
@@ -444,83 +514,122 @@ class DiameterOptimizer:
         """
         Perform best-improving hill-climb with ±1 DN step per segment.
         
+        Candidates are scored with the incremental evaluator (table lookups and
+        O(1) deltas on path pressure drops, totals and NPV); only the current
+        and the chosen assignment go through evaluate_quick.
+        
         Returns (improved, best_assignment, best_metrics) where improved is True
         if a better solution was found.
         """
         logger.debug("Starting local improvement")
         
         current_assignment = self.assignment.copy()
+        evaluator = self._evaluator()
         current_metrics = self.evaluate_quick(current_assignment)
         best_npv = current_metrics["npv_eur"]
-        best_assignment = current_assignment.copy()
-        best_metrics = current_metrics.copy()
-        improved = False
+        best_move = None
+        
+        evaluator.reset(current_assignment)
         
         # Try ±1 DN step for each segment
-        for seg in self.segments:
+        for pos, seg in enumerate(self.segments):
             if seg.V_dot_m3s == 0:
                 continue  # Skip zero-flow segments
             
             current_dn = current_assignment[seg.seg_id]
-            
-            # Find current DN index in catalog
-            try:
-                current_idx = next(i for i, p in enumerate(self.catalog) if p.dn == current_dn)
-            except StopIteration:
+            current_idx = self._dn_index.get(current_dn)
+            if current_idx is None:
                 logger.warning(f"Current DN {current_dn} not found in catalog for segment {seg.seg_id}")
                 continue
             
-            # Try smaller DN
-            if current_idx > 0:
-                candidate_assignment = current_assignment.copy()
-                candidate_assignment[seg.seg_id] = self.catalog[current_idx - 1].dn
-                
-                try:
-                    candidate_metrics = self.evaluate_quick(candidate_assignment)
-                    
-                    # Check constraints
-                    if (candidate_metrics["velocity_ok"] and 
-                        candidate_metrics["deltaT_ok"] and
-                        candidate_metrics["npv_eur"] < best_npv):
-                        
-                        best_npv = candidate_metrics["npv_eur"]
-                        best_assignment = candidate_assignment.copy()
-                        best_metrics = candidate_metrics.copy()
-                        improved = True
-                        logger.debug(f"Improved segment {seg.seg_id}: DN{current_dn} → DN{self.catalog[current_idx - 1].dn}")
-                
-                except Exception as e:
-                    logger.debug(f"Failed to evaluate smaller DN for segment {seg.seg_id}: {e}")
-            
-            # Try larger DN
-            if current_idx < len(self.catalog) - 1:
-                candidate_assignment = current_assignment.copy()
-                candidate_assignment[seg.seg_id] = self.catalog[current_idx + 1].dn
-                
-                try:
-                    candidate_metrics = self.evaluate_quick(candidate_assignment)
-                    
-                    # Check constraints
-                    if (candidate_metrics["velocity_ok"] and 
-                        candidate_metrics["deltaT_ok"] and
-                        candidate_metrics["npv_eur"] < best_npv):
-                        
-                        best_npv = candidate_metrics["npv_eur"]
-                        best_assignment = candidate_assignment.copy()
-                        best_metrics = candidate_metrics.copy()
-                        improved = True
-                        logger.debug(f"Improved segment {seg.seg_id}: DN{current_dn} → DN{self.catalog[current_idx + 1].dn}")
+            for candidate_idx in (current_idx - 1, current_idx + 1):
+                if not 0 <= candidate_idx < len(self.catalog):
+                    continue
                 
-                except Exception as e:
-                    logger.debug(f"Failed to evaluate larger DN for segment {seg.seg_id}: {e}")
-        
-        if improved:
-            self.assignment = best_assignment.copy()
-            logger.debug(f"Local improvement found: NPV improved to {best_npv:.0f} €")
-        else:
+                # None if the candidate violates velocity/deltaT or cannot be evaluated
+                candidate_npv = evaluator.candidate_npv(pos, candidate_idx)
+                if candidate_npv is not None and candidate_npv < best_npv:
+                    best_npv = candidate_npv
+                    best_move = (seg.seg_id, self.catalog[candidate_idx].dn)
+                    logger.debug(f"Improved segment {seg.seg_id}: DN{current_dn} → DN{self.catalog[candidate_idx].dn}")
+        
+        if best_move is None:
             logger.debug("No local improvement found")
+            return False, current_assignment.copy(), current_metrics.copy()
+        
+        best_assignment = current_assignment.copy()
+        best_assignment[best_move[0]] = best_move[1]
+        best_metrics = self.evaluate_quick(best_assignment)
+        self.assignment = best_assignment.copy()
+        logger.debug(f"Local improvement found: NPV improved to {best_metrics['npv_eur']:.0f} €")
+        
+        return True, best_assignment, best_metrics
+    
+    def optimize_global(self, head_resolution_m: float = 0.01) -> Tuple[Dict[str, int], Dict, Dict]:
+        """
+        NPV-optimal DN assignment over the whole network (head-budget DP).
+        
+        Solves the tree as one problem under the v_limit and head_max_m constraints
+        instead of hill-climbing from the greedy start (see optimize.global_dp).
+        Pressure drops are bucketed at ``head_resolution_m``; the returned stats give
+        a proven lower bound and the optimality gap of the assignment against it.
+        
+        Returns (assignment, metrics, solver_stats) and sets self.assignment.
+        """
+        logger.info("Starting global diameter optimization")
+        start = time.perf_counter()
+        
+        result = solve_head_budget_dp(
+            self._evaluator(),
+            head_resolution_m=head_resolution_m,
+            head_max_m=self.design['head_max_m'],
+        )
+        self.assignment = {
+            seg.seg_id: self.catalog[k].dn for seg, k in zip(self.segments, result.idx)
+        }
+        metrics = self.evaluate_quick(self.assignment)
+        solve_time_s = time.perf_counter() - start
+        
+        self.solver_stats = {
+            "mode": "global",
+            "solve_time_s": solve_time_s,
+            "npv_eur": metrics["npv_eur"],
+            "lower_bound_npv_eur": result.lower_bound_npv_eur,
+            "optimality_gap": self._gap(metrics["npv_eur"], result.lower_bound_npv_eur),
+            "head_resolution_m": head_resolution_m,
+            "n_buckets": result.n_buckets,
+            "head_ok": self._head_ok(metrics),
+        }
+        logger.info(
+            f"Global optimum: NPV = {metrics['npv_eur']:.0f} € "
+            f"(gap {self.solver_stats['optimality_gap']:.2%}, {solve_time_s:.2f} s)"
+        )
+        
+        return self.assignment.copy(), metrics, self.solver_stats.copy()
+    
+    def compare_solvers(self, head_resolution_m: float = 0.01) -> Dict:
+        """
+        Run the heuristic and the global mode on the same segments.
         
-        return improved, best_assignment, best_metrics
+        Both entries report NPV, solve time and the optimality gap against the
+        global lower bound. self.assignment is left at the global solution.
+        
+        Returns {"heuristic": stats, "global": stats}.
+        """
+        _, heuristic_metrics, _ = self.run(mode="heuristic")
+        heuristic = dict(self.solver_stats)
+        _, global_metrics, _ = self.run(mode="global", head_resolution_m=head_resolution_m)
+        global_stats = dict(self.solver_stats)
+        
+        lower_bound = global_stats["lower_bound_npv_eur"]
+        heuristic["lower_bound_npv_eur"] = lower_bound
+        heuristic["optimality_gap"] = self._gap(heuristic_metrics["npv_eur"], lower_bound)
+        
+        logger.info(
+            f"Heuristic NPV {heuristic_metrics['npv_eur']:.0f} € in {heuristic['solve_time_s']:.2f} s, "
+            f"global NPV {global_metrics['npv_eur']:.0f} € in {global_stats['solve_time_s']:.2f} s"
+        )
+        return {"heuristic": heuristic, "global": global_stats}
     
     def validate_with_pandapipes(self) -> Dict:
         """
@@ -534,46 +643,68 @@ class DiameterOptimizer:
             "note": "TODO: hook real pandapipes validation (hydraulic + thermal)."
         }
     
-    def run(self) -> Tuple[Dict[str, int], Dict, Dict]:
+    def run(self, mode: str = "heuristic", head_resolution_m: float = 0.01) -> Tuple[Dict[str, int], Dict, Dict]:
         """
         Orchestrate the complete optimization process.
         
+        ``mode`` is "heuristic" (greedy sizing plus ±1 DN hill-climb) or "global"
+        (head-budget DP, see optimize_global). Solve time and bounds of the run are
+        left in self.solver_stats.
+        
         Returns (assignment, metrics, validation) where:
         - assignment: seg_id -> dn mapping
         - metrics: comprehensive evaluation results
         - validation: pandapipes validation results (stub)
         """
-        logger.info("Starting diameter optimization")
-        
-        # Step 1: Initial feasible assignment
-        self.initial_feasible()
+        if mode not in ("heuristic", "global"):
+            raise ValueError(f"Unknown optimization mode: {mode}")
         
-        # Step 2: Evaluate baseline
-        baseline_metrics = self.evaluate_quick(self.assignment)
-        logger.info(f"Baseline NPV: {baseline_metrics['npv_eur']:.0f} €")
+        logger.info(f"Starting diameter optimization ({mode} mode)")
         
-        # Step 3: Local improvement loop
-        iteration = 0
-        max_iterations = 10  # Prevent infinite loops
-        
-        while iteration < max_iterations:
-            improved, best_assignment, best_metrics = self.local_improve()
+        if mode == "global":
+            # Steps 1-3: Solve the whole tree at once
+            self.optimize_global(head_resolution_m=head_resolution_m)
+        else:
+            start = time.perf_counter()
             
-            if not improved:
-                logger.info(f"Converged after {iteration} iterations")
-                break
+            # Step 1: Initial feasible assignment
+            self.initial_feasible()
             
-            iteration += 1
-            logger.info(f"Iteration {iteration}: NPV = {best_metrics['npv_eur']:.0f} €")
-        
-        if iteration >= max_iterations:
-            logger.warning(f"Reached maximum iterations ({max_iterations})")
+            # Step 2: Evaluate baseline
+            baseline_metrics = self.evaluate_quick(self.assignment)
+            logger.info(f"Baseline NPV: {baseline_metrics['npv_eur']:.0f} €")
+            
+            # Step 3: Local improvement loop
+            iteration = 0
+            max_iterations = 10  # Prevent infinite loops
+            
+            while iteration < max_iterations:
+                improved, best_assignment, best_metrics = self.local_improve()
+                
+                if not improved:
+                    logger.info(f"Converged after {iteration} iterations")
+                    break
+                
+                iteration += 1
+                logger.info(f"Iteration {iteration}: NPV = {best_metrics['npv_eur']:.0f} €")
+            
+            if iteration >= max_iterations:
+                logger.warning(f"Reached maximum iterations ({max_iterations})")
+            
+            self.solver_stats = {
+                "mode": "heuristic",
+                "solve_time_s": time.perf_counter() - start,
+                "iterations": iteration,
+            }
         
         # Step 4: Final validation
         validation = self.validate_with_pandapipes()
         
         # Step 5: Final evaluation
         final_metrics = self.evaluate_quick(self.assignment)
+        if mode == "heuristic":
+            self.solver_stats["npv_eur"] = final_metrics["npv_eur"]
+            self.solver_stats["head_ok"] = self._head_ok(final_metrics)
         
         logger.info(f"Optimization complete: NPV = {final_metrics['npv_eur']:.0f} €")
         logger.info(f"Final assignment: {self.assignment}")
@@ -0,0 +1,186 @@
+"""
+Incremental Delta-Evaluation for District Heating Diameter Optimization
+
+This module precomputes per-segment × per-DN tables (velocity, pressure drop,
+heat loss, CAPEX) once and scores single-segment DN changes as deltas on the
+current state: the changed segment's path pressure drop, the heat-loss and
+CAPEX totals and the resulting NPV. A ±1 DN hill-climb sweep therefore costs
+O(segments) table lookups instead of O(segments²) hydraulic evaluations.
+
+The objective mirrors DiameterOptimizer.evaluate_quick (worst supply path head,
+pump energy, heat losses, O&M, NPV); full metric dicts are still produced by
+evaluate_quick.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from optimize.catalogs import PipeType
+from optimize.physics_models import hydraulics_matrix, heat_loss_matrix
+from optimize.cost_models import annual_pump_energy_mwhel, npv
+from optimize.en13941_checks import check_velocity, check_deltaT
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["IncrementalEvaluator"]
+
+
+class IncrementalEvaluator:
+    """
+    Table-driven evaluator for single-segment DN changes.
+
+    Parameters
+    ----------
+    segments : list[Segment]
+        Optimizer segments (order defines path tie-breaking, as in evaluate_quick).
+    catalog : list[PipeType]
+        Pipe catalog sorted by DN, all entries with d_inner_m.
+    design, econ : dict
+        Validated design and economic parameters of the DiameterOptimizer.
+    epsilon : float
+        Pipe roughness [m] used for hydraulics.
+    """
+
+    def __init__(self, segments: List, catalog: List[PipeType], design: Dict, econ: Dict,
+                 epsilon: float = 4.5e-5):
+        self.segments = segments
+        self.catalog = catalog
+        self.design = design
+        self.econ = econ
+        self.dn_index: Dict[int, int] = {pipe.dn: k for k, pipe in enumerate(catalog)}
+
+        n = len(segments)
+        self._build_tables(epsilon)
+
+        # Supply path bookkeeping (paths ordered by first supply segment, like evaluate_quick)
+        path_order: Dict[str, int] = {}
+        self.path_of = np.full(n, -1, dtype=int)
+        for s, seg in enumerate(segments):
+            if seg.is_supply:
+                self.path_of[s] = path_order.setdefault(seg.path_id, len(path_order))
+        self.path_ids = list(path_order)
+        self.path_vdot_peak = np.zeros(len(path_order))
+        for s, seg in enumerate(segments):
+            if seg.is_supply:
+                p = self.path_of[s]
+                self.path_vdot_peak[p] = max(self.path_vdot_peak[p], float(seg.V_dot_m3s))
+
+        self.deltaT_ok = check_deltaT(design['T_supply'] - design['T_return'], design['deltaT_min'])
+        self.idx = np.zeros(n, dtype=int)
+
+    def _build_tables(self, epsilon: float) -> None:
+        """Evaluate hydraulics, heat loss and CAPEX for every segment × DN pair in one kernel call."""
+        V_dot = np.array([seg.V_dot_m3s for seg in self.segments], dtype=float)
+        L = np.array([seg.length_m for seg in self.segments], dtype=float)
+        T_f = np.array([
+            self.design['T_supply'] if seg.is_supply else self.design['T_return'] for seg in self.segments
+        ], dtype=float)
+
+        def catalog_column(attr: str) -> np.ndarray:
+            return np.array([np.nan if getattr(p, attr) is None else getattr(p, attr) for p in self.catalog])
+
+        hydraulics = hydraulics_matrix(
+            V_dot, L, catalog_column("d_inner_m"),
+            rho=self.design['rho'], mu=self.design['mu'],
+            epsilon=epsilon, K_minor=self.design['K_minor'],
+        )
+        heat = heat_loss_matrix(
+            V_dot, L, T_f, self.design['T_soil'],
+            catalog_column("w_loss_w_per_m"), catalog_column("u_wpermk"), catalog_column("d_outer_m"),
+        )
+
+        # Pairs evaluate_quick raises for make any assignment using them infeasible
+        self.valid = hydraulics.valid & np.isfinite(heat)
+        self.velocity = np.where(self.valid, hydraulics.velocity, 0.0)
+        self.dp = np.where(self.valid, hydraulics.dp, 0.0)
+        self.heat_loss_W = np.where(self.valid, heat, 0.0)
+        cost = np.nan_to_num(catalog_column("cost_eur_per_m"))
+        self.capex = L[:, None] * cost[None, :]
+
+    def reset(self, assignment: Dict[str, int]) -> None:
+        """
+        Set the current assignment and recompute totals, path sums and maxima.
+
+        Raises KeyError if a segment is unassigned or its DN is not in the catalog.
+        """
+        self.idx = np.array([self.dn_index[assignment[seg.seg_id]] for seg in self.segments], dtype=int)
+        rows = np.arange(len(self.segments))
+        self._cur_dp = self.dp[rows, self.idx]
+        self._cur_heat = self.heat_loss_W[rows, self.idx]
+        self._cur_capex = self.capex[rows, self.idx]
+        self._cur_velocity = self.velocity[rows, self.idx]
+        self._n_invalid = int((~self.valid[rows, self.idx]).sum())
+
+        # Sequential sums in segment order, as evaluate_quick accumulates them
+        self.path_dp = np.zeros(len(self.path_ids))
+        for s in np.flatnonzero(self.path_of >= 0):
+            self.path_dp[self.path_of[s]] += self._cur_dp[s]
+        self.total_heat_loss_W = float(sum(self._cur_heat))
+        self.total_capex = float(sum(self._cur_capex))
+        self._update_maxima()
+
+    def _update_maxima(self) -> None:
+        """Top-two velocities and worst/second-worst paths of the current state."""
+        velocities = self._cur_velocity
+        order = np.argsort(-velocities, kind="stable")
+        self._v_top = order[0] if len(order) > 0 else -1
+        self._v_first = velocities[order[0]] if len(order) > 0 else -np.inf
+        self._v_second = velocities[order[1]] if len(order) > 1 else -np.inf
+
+        # Ties resolve to the earlier path, like max() over evaluate_quick's path dict
+        order = np.lexsort((np.arange(len(self.path_dp)), -self.path_dp))
+        self._p_first = order[0] if len(order) > 0 else -1
+        self._p_second = order[1] if len(order) > 1 else -1
+
+    def _objective(self, dp_max: float, vdot_worst: float, heat_W: float, capex: float) -> float:
+        """NPV of one state (raises ValueError where evaluate_quick would)."""
+        pump_MWh = annual_pump_energy_mwhel(
+            dp_sum_pa=dp_max,
+            V_dot_path_m3s=vdot_worst,
+            eta_pump=float(self.design["eta_pump"]),
+            hours=float(self.design["hours"]),
+        )
+        heat_loss_MWh = heat_W * self.design['hours'] / 1e6
+        annual_opex = (pump_MWh * self.econ['price_el'] * 1000
+                       + heat_loss_MWh * self.econ['cost_heat_prod']
+                       + self.econ['o_and_m_rate'] * capex)
+        return npv(float(capex), float(annual_opex), self.econ['years'], self.econ['r'])
+
+    def candidate_npv(self, s: int, k: int) -> Optional[float]:
+        """
+        NPV after changing segment ``s`` to catalog index ``k``.
+
+        Returns None if the candidate would fail evaluate_quick or its
+        velocity/deltaT checks.
+        """
+        cur = self.idx[s]
+        if not self.valid[s, k] or self._n_invalid - (not self.valid[s, cur]) > 0 or not self.deltaT_ok:
+            return None
+
+        other_v = self._v_second if s == self._v_top else self._v_first
+        if not check_velocity(max(other_v, self.velocity[s, k]), self.design['v_limit']):
+            return None
+
+        dp_max, vdot_worst = self._worst_path_after(s, k)
+        heat_W = self.total_heat_loss_W + self.heat_loss_W[s, k] - self._cur_heat[s]
+        capex = self.total_capex + self.capex[s, k] - self._cur_capex[s]
+        try:
+            return self._objective(dp_max, vdot_worst, heat_W, capex)
+        except ValueError:
+            return None
+
+    def _worst_path_after(self, s: int, k: int) -> Tuple[float, float]:
+        """Worst supply path pressure drop and its peak flow after one change (O(1))."""
+        if self._p_first < 0:
+            return 0.0, 0.0
+        p = self.path_of[s]
+        if p < 0:
+            return float(self.path_dp[self._p_first]), float(self.path_vdot_peak[self._p_first])
+
+        new_dp = self.path_dp[p] + self.dp[s, k] - self._cur_dp[s]
+        other = self._p_second if p == self._p_first else self._p_first
+        if other < 0 or new_dp > self.path_dp[other] or (new_dp == self.path_dp[other] and p < other):
+            return float(new_dp), float(self.path_vdot_peak[p])
+        return float(self.path_dp[other]), float(self.path_vdot_peak[other])
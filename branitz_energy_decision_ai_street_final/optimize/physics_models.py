@@ -46,6 +46,14 @@ else:
     def heat_loss_w_per_m(*args, **kwargs):
         raise ImportError("PMA functions not available. Please install agents.pma")
 
+# Array versions (segments × DN matrices) of the scalar models below
+from optimize.hydraulics_kernel import (
+    HydraulicsMatrix,
+    hydraulics_matrix,
+    heat_loss_matrix,
+    swamee_jain_f_array,
+)
+
 # Module constants
 PI: float = math.pi
 G: float = 9.81  # m/s², gravitational acceleration
@@ -59,6 +67,11 @@ __all__ = [
     "swamee_jain_f",
     "segment_hydraulics",
     "segment_heat_loss_W",
+    # Vectorized kernel (optimize.hydraulics_kernel)
+    "HydraulicsMatrix",
+    "hydraulics_matrix",
+    "heat_loss_matrix",
+    "swamee_jain_f_array",
     # Re-exported from agents.pma
     "calc_reynolds",
     "friction_factor_swamee_jain", 
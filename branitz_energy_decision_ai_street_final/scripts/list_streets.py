@@ -1,12 +1,31 @@
 #!/usr/bin/env python3
 """
-List available streets from KPI data.
+List available streets from KPI data, or all district streets (--district).
 """
 
 import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+def list_district_streets():
+    from src.street_index import DEFAULT_BUILDINGS_GEOJSON, load_street_index
+
+    if not Path(DEFAULT_BUILDINGS_GEOJSON).exists():
+        print(f'❌ Buildings file not found: {DEFAULT_BUILDINGS_GEOJSON}')
+        return
+
+    streets = load_street_index(DEFAULT_BUILDINGS_GEOJSON).street_names()
+    for i, street in enumerate(streets, 1):
+        print(f'  {i}. {street}')
+    print(f'Total: {len(streets)} streets in the district')
+
 def main():
+    if '--district' in sys.argv[1:]:
+        list_district_streets()
+        return
+
     kpi_dir = Path('processed/kpi')
     
     if not kpi_dir.exists():
@@ -13,6 +13,11 @@ from typing import Dict, List, Optional, Tuple
 import warnings
 import yaml
 
+from src.cha_connectivity import ComponentStitcher
+from src.cha_network_tables import build_network_tables, write_network_tables
+from src.cha_street_snapping import StreetSnappingEngine
+from src.dataset_registry import get_dataset_registry
+
 warnings.filterwarnings("ignore")
 
 # Import CHAPandapipesSimulator for hydraulic simulation
@@ -55,7 +60,7 @@ class CentralizedHeatingAgent:
         # Load streets
         streets_path = self.config.get("streets_path", "data/geojson/strassen_mit_adressenV3.geojson")
         if os.path.exists(streets_path):
-            self.streets_gdf = gpd.read_file(streets_path)
+            self.streets_gdf = get_dataset_registry().read_geojson(streets_path)
             print(f"✅ Loaded {len(self.streets_gdf)} street segments")
         else:
             print(f"❌ Streets file not found: {streets_path}")
@@ -64,7 +69,7 @@ class CentralizedHeatingAgent:
         # Load buildings
         buildings_path = self.config.get("buildings_path", "data/geojson/hausumringe_mit_adressenV3.geojson")
         if os.path.exists(buildings_path):
-            self.buildings_gdf = gpd.read_file(buildings_path)
+            self.buildings_gdf = get_dataset_registry().read_geojson(buildings_path)
             print(f"✅ Loaded {len(self.buildings_gdf)} buildings")
         else:
             print(f"❌ Buildings file not found: {buildings_path}")
@@ -137,35 +142,13 @@ class CentralizedHeatingAgent:
         components = list(nx.connected_components(self.street_graph))
         print(f"   Found {len(components)} components")
         
-        # Connect all components to the largest component
-        largest_component = max(components, key=len)
-        
-        for i, component in enumerate(components):
-            if component == largest_component:
-                continue
-            
-            # Find closest nodes between largest component and this component
-            min_distance = float("inf")
-            best_connection = None
-            
-            for node1 in largest_component:
-                for node2 in component:
-                    distance = Point(node1).distance(Point(node2))
-                    if distance < min_distance:
-                        min_distance = distance
-                        best_connection = (node1, node2)
-            
-            if best_connection and min_distance < 100:  # Only connect if reasonably close
-                self.street_graph.add_edge(
-                    best_connection[0],
-                    best_connection[1],
-                    weight=min_distance,
-                    street_id="connectivity_fix",
-                    geometry=LineString([best_connection[0], best_connection[1]]),
-                    street_name="Connectivity Fix",
-                    highway_type="service",
-                )
-                print(f"   Connected component {i} with {min_distance:.1f}m link")
+        # Bridge components via KD-tree nearest pairs (only if reasonably close)
+        stitcher = ComponentStitcher(
+            mode=self.config.get("connectivity_repair_mode", "star"),
+            max_distance_m=self.config.get("connectivity_fix_distance_m", 100),
+        )
+        for i, link in enumerate(stitcher.stitch(self.street_graph)):
+            print(f"   Connected component {i} with {link.distance_m:.1f}m link")
         
         if nx.is_connected(self.street_graph):
             print("✅ Successfully connected all components")
@@ -176,22 +159,9 @@ class CentralizedHeatingAgent:
     
     def _snap_plant_to_street(self, plant_utm, streets_utm):
         """Snap plant to nearest point on street network."""
-        min_distance = float("inf")
-        nearest_point = None
-        nearest_street = None
-        
-        for idx, street in streets_utm.iterrows():
-            distance = street.geometry.distance(plant_utm)
-            if distance < min_distance:
-                min_distance = distance
-                try:
-                    nearest_point = street.geometry.interpolate(street.geometry.project(plant_utm))
-                    nearest_street = street
-                except Exception as e:
-                    # If interpolation fails, use the closest point on the line
-                    print(f"⚠️ Interpolation failed for street {idx}, using closest point: {e}")
-                    nearest_point = street.geometry.interpolate(0.5)  # Use midpoint as fallback
-                    nearest_street = street
+        snapper = StreetSnappingEngine(streets_utm)
+        snapped = snapper.snap_point(plant_utm)
+        nearest_point, nearest_street, min_distance = snapped if snapped else (None, None, float("inf"))
         
         if nearest_point:
             # Add plant node to graph
@@ -232,38 +202,26 @@ class CentralizedHeatingAgent:
         
         service_connections = []
         
-        for idx, building in buildings_utm.iterrows():
-            # Skip buildings with invalid geometry
-            if building.geometry is None or building.geometry.is_empty:
-                print(f"⚠️ Skipping building {idx} - invalid geometry")
-                continue
-                
-            building_point = building.geometry.centroid
-            
-            # Validate centroid
-            if building_point.is_empty:
-                print(f"⚠️ Skipping building {idx} - empty centroid")
-                continue
-            
-            # Find nearest point on street network
-            min_distance = float("inf")
-            nearest_point = None
-            nearest_street = None
-            
-            for street_idx, street in streets_utm.iterrows():
-                distance = street.geometry.distance(building_point)
-                if distance < min_distance:
-                    min_distance = distance
-                    try:
-                        nearest_point = street.geometry.interpolate(
-                            street.geometry.project(building_point)
-                        )
-                        nearest_street = street
-                    except Exception as e:
-                        print(f"⚠️ Interpolation failed for building {idx}, street {street_idx}: {e}")
-                        # Use midpoint as fallback
-                        nearest_point = street.geometry.interpolate(0.5)
-                        nearest_street = street
+        # Skip buildings with invalid geometry or empty centroid
+        valid_mask = buildings_utm.geometry.notna() & ~buildings_utm.geometry.is_empty
+        for idx in buildings_utm.index[~valid_mask]:
+            print(f"⚠️ Skipping building {idx} - invalid geometry")
+        centroids = buildings_utm.geometry[valid_mask].centroid
+        empty_centroids = centroids.is_empty
+        for idx in centroids.index[empty_centroids]:
+            print(f"⚠️ Skipping building {idx} - empty centroid")
+        centroids = centroids[~empty_centroids]
+        
+        # Resolve nearest streets for all buildings in one spatial-index query
+        snapper = StreetSnappingEngine(streets_utm)
+        snap = snapper.snap(centroids.values)
+        
+        for i, idx in enumerate(centroids.index):
+            building = buildings_utm.loc[idx]
+            building_point = centroids.loc[idx]
+            nearest_point = Point(snap.snapped_x[i], snap.snapped_y[i])
+            nearest_street = streets_utm.iloc[int(snap.street_positions[i])]
+            min_distance = float(snap.distances[i])
             
             # Calculate heat demand from load profiles
             building_id = building.get("gebaeude", building.get("id", str(idx)))
@@ -354,38 +312,10 @@ class CentralizedHeatingAgent:
             components = list(nx.connected_components(self.street_graph))
             print(f"   Found {len(components)} disconnected components")
             
-            # Connect all components to the main component
-            main_component = components[0]
-            for i in range(1, len(components)):
-                comp = components[i]
-                
-                # Find closest nodes between main component and this component
-                min_distance = float("inf")
-                best_connection = None
-                
-                for node1 in main_component:
-                    for node2 in comp:
-                        distance = Point(node1).distance(Point(node2))
-                        if distance < min_distance:
-                            min_distance = distance
-                            best_connection = (node1, node2)
-                
-                if best_connection:
-                    # Add connection edge
-                    self.street_graph.add_edge(
-                        best_connection[0],
-                        best_connection[1],
-                        weight=min_distance,
-                        street_id="connectivity_fix",
-                        geometry=LineString([best_connection[0], best_connection[1]]),
-                        street_name="Connectivity Fix",
-                        highway_type="service",
-                    )
-                    
-                    # Add all nodes from this component to main component
-                    main_component.update(comp)
-                    
-                    print(f"   Connected component {i} with {min_distance:.1f}m link")
+            # Bridge all components regardless of link length
+            stitcher = ComponentStitcher(mode=self.config.get("connectivity_repair_mode", "star"))
+            for i, link in enumerate(stitcher.stitch(self.street_graph)):
+                print(f"   Connected component {i} with {link.distance_m:.1f}m link")
             
             # Check connectivity again
             if not nx.is_connected(self.street_graph):
@@ -395,11 +325,142 @@ class CentralizedHeatingAgent:
                 print("✅ Successfully connected all network components")
         
         # Create supply and return networks
+        routing_mode = self.config.get("routing_mode", "shortest_path_tree")
+        if routing_mode == "per_building":
+            supply_pipes, return_pipes, successful_routes = self._route_per_building(plant_node)
+        else:
+            supply_pipes, return_pipes, successful_routes = self._route_shortest_path_tree(plant_node)
+        
+        # Convert to DataFrames
+        self.supply_pipes = pd.DataFrame(supply_pipes)
+        self.return_pipes = pd.DataFrame(return_pipes)
+        
+        # Remove duplicates (same street segment used by multiple buildings)
+        self.supply_pipes = self.supply_pipes.drop_duplicates(subset=["start_node", "end_node"])
+        self.return_pipes = self.return_pipes.drop_duplicates(subset=["start_node", "end_node"])
+        
+        total_supply_length = self.supply_pipes["length_m"].sum()
+        total_return_length = self.return_pipes["length_m"].sum()
+        
+        print(f"✅ Created dual-pipe network:")
+        print(
+            f"   - Supply pipes: {len(self.supply_pipes)} unique segments, {total_supply_length/1000:.1f} km total"
+        )
+        print(
+            f"   - Return pipes: {len(self.return_pipes)} unique segments, {total_return_length/1000:.1f} km total"
+        )
+        print(f"   - Total pipe length: {(total_supply_length + total_return_length)/1000:.1f} km")
+        print(
+            f"   - Successfully routed to {successful_routes}/{len(self.service_connections)} buildings"
+        )
+        print(f"   - ALL connections follow street network ✅")
+        
+        return True
+    
+    def _pipe_record(self, start_node, end_node, pipe_type: str, building_id, downstream_buildings: int) -> dict:
+        """Build one supply/return pipe row from the street edge between two nodes."""
+        edge_data = self.street_graph.get_edge_data(start_node, end_node)
+        is_supply = pipe_type == "supply"
+        return {
+            "start_node": start_node,
+            "end_node": end_node,
+            "length_m": edge_data["weight"],
+            "street_id": edge_data["street_id"],
+            "street_name": edge_data["street_name"],
+            "highway_type": edge_data["highway_type"],
+            "pipe_type": pipe_type,
+            "building_served": building_id,
+            "temperature_c": self.config.get('supply_temperature_c', 70) if is_supply else self.config.get('return_temperature_c', 40),
+            "flow_direction": "plant_to_building" if is_supply else "building_to_plant",
+            "follows_street": True,
+            "downstream_buildings": downstream_buildings,
+        }
+    
+    def _route_shortest_path_tree(self, plant_node) -> Tuple[List[dict], List[dict], int]:
+        """
+        Route all buildings along one shortest-path tree rooted at the plant.
+        
+        A single Dijkstra run yields the predecessor of every reachable node.
+        Each building's route is recovered by walking the tree towards the plant
+        until an already-emitted edge is reached, so every street edge is emitted
+        once and attributed to the first building that uses it (same as the
+        per-building routing after de-duplication).
+        """
+        predecessors, distances = nx.dijkstra_predecessor_and_distance(
+            self.street_graph, plant_node, weight="weight"
+        )
+        # Zero-length edges can list tied predecessors for the plant itself
+        parent = {
+            node: preds[0] for node, preds in predecessors.items() if preds and node != plant_node
+        }
+        
+        # Tree order (plant first) for depth and downstream accumulation
+        children: Dict[tuple, List[tuple]] = {}
+        for node, pred in parent.items():
+            children.setdefault(pred, []).append(node)
+        order = [plant_node]
+        depth = {plant_node: 0}
+        for node in order:
+            for child in children.get(node, []):
+                depth[child] = depth[node] + 1
+                order.append(child)
+        
+        # Downstream building counts per tree edge (keyed by the child node)
+        downstream: Dict[tuple, int] = {}
+        for _, service_conn in self.service_connections.iterrows():
+            service_node = (service_conn["connection_x"], service_conn["connection_y"])
+            if service_node in parent:
+                downstream[service_node] = downstream.get(service_node, 0) + 1
+        for node in reversed(order):
+            if node in parent:
+                downstream[parent[node]] = downstream.get(parent[node], 0) + downstream.get(node, 0)
+        
         supply_pipes = []
         return_pipes = []
-        total_supply_length = 0
-        total_return_length = 0
         successful_routes = 0
+        emitted = set()
+        
+        for idx, service_conn in self.service_connections.iterrows():
+            service_node = (service_conn["connection_x"], service_conn["connection_y"])
+            
+            if service_node not in distances:
+                print(
+                    f"❌ No path found to building {service_conn['building_id']} - network connectivity issue"
+                )
+                continue
+            
+            # Walk towards the plant until reaching an edge already in the network
+            new_edges = []
+            node = service_node
+            while node != plant_node and node not in emitted:
+                emitted.add(node)
+                new_edges.append((parent[node], node))
+                node = parent[node]
+            
+            building_id = service_conn["building_id"]
+            for start_node, end_node in reversed(new_edges):
+                supply_pipes.append(
+                    self._pipe_record(start_node, end_node, "supply", building_id, downstream[end_node])
+                )
+            for end_node, start_node in new_edges:
+                return_pipes.append(
+                    self._pipe_record(start_node, end_node, "return", building_id, downstream[start_node])
+                )
+            
+            successful_routes += 1
+            supply_path_length = distances[service_node]
+            print(
+                f"   ✅ Routed to building {building_id} via {depth[service_node]} street segments ({supply_path_length:.1f}m supply + {supply_path_length:.1f}m return)"
+            )
+        
+        return supply_pipes, return_pipes, successful_routes
+    
+    def _route_per_building(self, plant_node) -> Tuple[List[dict], List[dict], int]:
+        """Route each building with its own shortest-path query (legacy mode)."""
+        supply_pipes = []
+        return_pipes = []
+        successful_routes = 0
+        downstream: Dict[tuple, int] = {}
         
         for idx, service_conn in self.service_connections.iterrows():
             service_node = (service_conn["connection_x"], service_conn["connection_y"])
@@ -417,53 +478,17 @@ class CentralizedHeatingAgent:
                 
                 # Create supply pipe segments following street network
                 for i in range(len(supply_path) - 1):
-                    start_node = supply_path[i]
-                    end_node = supply_path[i + 1]
-                    
-                    # Get edge data
-                    edge_data = self.street_graph.get_edge_data(start_node, end_node)
-                    
-                    supply_pipe = {
-                        "start_node": start_node,
-                        "end_node": end_node,
-                        "length_m": edge_data["weight"],
-                        "street_id": edge_data["street_id"],
-                        "street_name": edge_data["street_name"],
-                        "highway_type": edge_data["highway_type"],
-                        "pipe_type": "supply",
-                        "building_served": service_conn["building_id"],
-                        "temperature_c": self.config.get('supply_temperature_c', 70),
-                        "flow_direction": "plant_to_building",
-                        "follows_street": True,
-                    }
-                    
-                    supply_pipes.append(supply_pipe)
-                    total_supply_length += edge_data["weight"]
+                    edge = (supply_path[i], supply_path[i + 1])
+                    downstream[edge] = downstream.get(edge, 0) + 1
+                    supply_pipes.append(
+                        self._pipe_record(edge[0], edge[1], "supply", service_conn["building_id"], 0)
+                    )
                 
                 # Create return pipe segments (reverse path) following street network
                 for i in range(len(supply_path) - 1, 0, -1):
-                    start_node = supply_path[i]
-                    end_node = supply_path[i - 1]
-                    
-                    # Get edge data
-                    edge_data = self.street_graph.get_edge_data(end_node, start_node)
-                    
-                    return_pipe = {
-                        "start_node": start_node,
-                        "end_node": end_node,
-                        "length_m": edge_data["weight"],
-                        "street_id": edge_data["street_id"],
-                        "street_name": edge_data["street_name"],
-                        "highway_type": edge_data["highway_type"],
-                        "pipe_type": "return",
-                        "building_served": service_conn["building_id"],
-                        "temperature_c": self.config.get('return_temperature_c', 40),
-                        "flow_direction": "building_to_plant",
-                        "follows_street": True,
-                    }
-                    
-                    return_pipes.append(return_pipe)
-                    total_return_length += edge_data["weight"]
+                    return_pipes.append(
+                        self._pipe_record(supply_path[i], supply_path[i - 1], "return", service_conn["building_id"], 0)
+                    )
                 
                 successful_routes += 1
                 print(
@@ -475,28 +500,12 @@ class CentralizedHeatingAgent:
                     f"❌ No path found to building {service_conn['building_id']} - network connectivity issue"
                 )
         
-        # Convert to DataFrames
-        self.supply_pipes = pd.DataFrame(supply_pipes)
-        self.return_pipes = pd.DataFrame(return_pipes)
-        
-        # Remove duplicates (same street segment used by multiple buildings)
-        self.supply_pipes = self.supply_pipes.drop_duplicates(subset=["start_node", "end_node"])
-        self.return_pipes = self.return_pipes.drop_duplicates(subset=["start_node", "end_node"])
-        
-        print(f"✅ Created dual-pipe network:")
-        print(
-            f"   - Supply pipes: {len(self.supply_pipes)} unique segments, {total_supply_length/1000:.1f} km total"
-        )
-        print(
-            f"   - Return pipes: {len(self.return_pipes)} unique segments, {total_return_length/1000:.1f} km total"
-        )
-        print(f"   - Total pipe length: {(total_supply_length + total_return_length)/1000:.1f} km")
-        print(
-            f"   - Successfully routed to {successful_routes}/{len(self.service_connections)} buildings"
-        )
-        print(f"   - ALL connections follow street network ✅")
+        for pipe in supply_pipes:
+            pipe["downstream_buildings"] = downstream[(pipe["start_node"], pipe["end_node"])]
+        for pipe in return_pipes:
+            pipe["downstream_buildings"] = downstream[(pipe["end_node"], pipe["start_node"])]
         
-        return True
+        return supply_pipes, return_pipes, successful_routes
     
     def create_dual_service_connections(self) -> bool:
         """Create dual service connections following street network."""
@@ -997,17 +1006,18 @@ class CentralizedHeatingAgent:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Save supply pipes
-        supply_file = output_path / "supply_pipes.csv"
-        self.supply_pipes.to_csv(supply_file, index=False)
-        
-        # Save return pipes
-        return_file = output_path / "return_pipes.csv"
-        self.return_pipes.to_csv(return_file, index=False)
+        # Save human-readable CSV exports
+        if self.config.get("export_network_csv", True):
+            self.supply_pipes.to_csv(output_path / "supply_pipes.csv", index=False)
+            self.return_pipes.to_csv(output_path / "return_pipes.csv", index=False)
+            self.dual_service_connections.to_csv(output_path / "service_connections.csv", index=False)
         
-        # Save service connections
-        service_file = output_path / "service_connections.csv"
-        self.dual_service_connections.to_csv(service_file, index=False)
+        # Save typed network tables (node table + pipes with integer node IDs); written
+        # after the CSV exports, so readers see them as current
+        network_tables = build_network_tables(
+            self.supply_pipes, self.return_pipes, self.dual_service_connections
+        )
+        write_network_tables(network_tables, output_path)
         
         # Save network statistics
         stats_file = output_path / "network_stats.json"
@@ -18,6 +18,12 @@ from dataclasses import dataclass
 from pathlib import Path
 import warnings
 
+try:
+    from src.lfa_load_matrix import load_lfa_matrix
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import load_lfa_matrix
+
 warnings.filterwarnings("ignore")
 
 
@@ -124,6 +130,26 @@ class CHAFlowCalculationEngine:
         """
         return mass_flow_kg_s / self.water_density_kg_m3
     
+    def load_lfa_data(self, lfa_dir: Union[str, Path], building_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Load LFA heat demand data for calculate_building_flows.
+        
+        Reads the load matrix store (or per-building JSON files) through
+        ``load_lfa_matrix``, only for the requested buildings.
+        
+        Args:
+            lfa_dir: LFA output directory
+            building_ids: Buildings to load (None for all)
+        
+        Returns:
+            lfa_data: {building_id: {"series": [...], "q10": [...], "q90": [...]}}
+        """
+        matrix = load_lfa_matrix(lfa_dir, buildings=building_ids)
+        if matrix is None:
+            print(f"⚠️ No LFA data found in {lfa_dir}")
+            return {}
+        return matrix.to_lfa_dict(building_ids)
+    
     def calculate_building_flows(self, lfa_data: Dict[str, Dict]) -> Dict[str, FlowCalculationResult]:
         """
         Calculate flow rates for all buildings from LFA data.
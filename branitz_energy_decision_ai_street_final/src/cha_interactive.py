@@ -24,6 +24,12 @@ import warnings
 import yaml
 import questionary
 
+try:
+    from src.street_index import load_features, load_street_index
+except ImportError:
+    # Fallback for direct execution
+    from street_index import load_features, load_street_index
+
 warnings.filterwarnings("ignore")
 
 class InteractiveCHA:
@@ -49,22 +55,13 @@ class InteractiveCHA:
             return yaml.safe_load(f)
     
     def get_all_street_names(self, geojson_path: str) -> List[str]:
-        """Scans the entire GeoJSON file and returns a sorted list of unique street names."""
+        """Returns a sorted list of unique street names from the district street index."""
         print(f"Reading all street names from {geojson_path}...")
-        street_names = set()
         
         try:
-            with open(geojson_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            for feature in data["features"]:
-                for adr in feature.get("adressen", []):
-                    street_val = adr.get("str")
-                    if street_val:
-                        street_names.add(street_val.strip())
-
+            street_names = load_street_index(geojson_path).street_names()
             print(f"Found {len(street_names)} unique streets.")
-            return sorted(list(street_names))
+            return street_names
         except Exception as e:
             print(f"Error reading street names: {e}")
             return []
@@ -72,19 +69,11 @@ class InteractiveCHA:
     def get_buildings_for_streets(self, geojson_path: str, selected_streets: List[str]) -> List[dict]:
         """Gets all building features for a given list of street names."""
         print(f"Fetching buildings for selected streets...")
-        street_set = {s.lower() for s in selected_streets}
-        selected_features = []
 
         try:
-            with open(geojson_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            for feature in data["features"]:
-                for adr in feature.get("adressen", []):
-                    street_val = adr.get("str")
-                    if street_val and street_val.strip().lower() in street_set:
-                        selected_features.append(feature)
-                        break  # Found a matching street, move to the next building feature
+            offsets = load_street_index(geojson_path).offsets_for_streets(selected_streets)
+            features = load_features(geojson_path)
+            selected_features = [features[i] for i in offsets]
 
             print(f"Found {len(selected_features)} buildings.")
             return selected_features
@@ -95,14 +84,9 @@ class InteractiveCHA:
     def get_all_buildings(self, geojson_path: str) -> List[dict]:
         """Gets all building features from the entire region."""
         print(f"Fetching all buildings from the entire region...")
-        selected_features = []
 
         try:
-            with open(geojson_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            for feature in data["features"]:
-                selected_features.append(feature)
+            selected_features = list(load_features(geojson_path))
 
             print(f"Found {len(selected_features)} buildings in the entire region.")
             return selected_features
@@ -358,6 +342,45 @@ class InteractiveCHA:
 
         return True
     
+    def run_comprehensive_analysis(self, street_name: str) -> Dict:
+        """Run the dual-pipe analysis for one street (non-interactive, used by the agent tools)."""
+        print(f"🚀 Running comprehensive CHA analysis for {street_name}")
+
+        output_dir = self.config.get("output_dir", "street_analysis_outputs")
+        full_data_geojson = self.config.get("buildings_path", "data/geojson/hausumringe_mit_adressenV3.geojson")
+        clean_street_name = street_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+        scenario_name = f"dual_pipe_{clean_street_name}"
+        street_output_dir = os.path.join(output_dir, clean_street_name)
+        os.makedirs(street_output_dir, exist_ok=True)
+
+        try:
+            buildings_features = self.get_buildings_for_streets(full_data_geojson, [street_name])
+            if not buildings_features:
+                return {"status": "error", "message": f"No buildings found on {street_name}"}
+
+            buildings_file = self.create_street_buildings_geojson(buildings_features, street_name, street_output_dir)
+            prepared_buildings_file = self.prepare_buildings_for_dual_pipe_simulation(buildings_file, street_output_dir)
+            if not self.create_dual_pipe_network_for_street(street_name, prepared_buildings_file, street_output_dir):
+                return {"status": "error", "message": f"Failed to create dual-pipe network for {street_name}"}
+
+            with open(os.path.join(street_output_dir, "network_stats.json"), "r") as f:
+                network_stats = json.load(f)
+
+            return {
+                "status": "success",
+                "street_name": street_name,
+                "num_buildings": len(buildings_features),
+                "output_dir": street_output_dir,
+                "map_path": os.path.join(street_output_dir, f"dual_pipe_map_{scenario_name}.html"),
+                "dashboard_path": os.path.join(street_output_dir, f"dual_pipe_dashboard_{scenario_name}.html"),
+                "network_path": os.path.join(street_output_dir, "network_stats.json"),
+                "network_stats": network_stats,
+            }
+
+        except Exception as e:
+            print(f"❌ CHA analysis failed: {e}")
+            return {"status": "error", "message": str(e)}
+    
     def create_dual_pipe_network_for_street(self, street_name: str, buildings_file: str, output_dir: str) -> bool:
         """Create complete dual-pipe district heating network for selected street."""
         print(f"\n{'='*60}")
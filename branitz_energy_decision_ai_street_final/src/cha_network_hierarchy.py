@@ -15,9 +15,14 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Union, Set
 from dataclasses import dataclass
-from pathlib import Path
 import warnings
 
+try:
+    from src.cha_network_tables import load_network_tables
+except ImportError:
+    # Fallback for direct execution
+    from cha_network_tables import load_network_tables
+
 warnings.filterwarnings("ignore")
 
 
@@ -83,6 +88,8 @@ class CHANetworkHierarchyManager:
         self.network_graph = nx.DiGraph()
         self.nodes: Dict[str, NetworkNode] = {}
         self.pipes: Dict[str, NetworkPipe] = {}
+        self.node_names: Dict[int, str] = {}
+        self.node_coordinates: Dict[str, Tuple[float, float]] = {}
         
         # Hierarchy levels
         self.hierarchy_levels = {
@@ -130,19 +137,24 @@ class CHANetworkHierarchyManager:
             success: True if loading successful
         """
         try:
-            cha_dir = Path(cha_output_dir)
+            tables = load_network_tables(cha_output_dir)
             
-            # Load supply pipes
-            supply_pipes_df = pd.read_csv(cha_dir / "supply_pipes.csv")
-            self._load_pipes(supply_pipes_df, 'supply')
+            # Node names: the plant keeps a recognizable ID, other nodes use their numeric ID
+            self.node_names = {
+                node_id: 'plant' if node_type == 'plant' else f"node_{node_id}"
+                for node_id, node_type in zip(tables.nodes['node_id'], tables.nodes['node_type'])
+            }
+            self.node_coordinates = {
+                self.node_names[node_id]: (x, y)
+                for node_id, x, y in zip(tables.nodes['node_id'], tables.nodes['x'], tables.nodes['y'])
+            }
             
-            # Load return pipes
-            return_pipes_df = pd.read_csv(cha_dir / "return_pipes.csv")
-            self._load_pipes(return_pipes_df, 'return')
+            # Load supply and return pipes
+            self._load_pipes(tables.supply_pipes, 'supply')
+            self._load_pipes(tables.return_pipes, 'return')
             
             # Load service connections
-            service_connections_df = pd.read_csv(cha_dir / "service_connections.csv")
-            self._load_service_connections(service_connections_df)
+            self._load_service_connections(tables.service_connections)
             
             # Build network graph
             self._build_network_graph()
@@ -162,9 +174,9 @@ class CHANetworkHierarchyManager:
         for _, row in pipes_df.iterrows():
             pipe_id = f"{pipe_type}_{row.get('street_id', 'unknown')}_{row.get('building_served', 'unknown')}"
             
-            # Parse node coordinates
-            start_node = self._parse_node_coordinates(row['start_node'])
-            end_node = self._parse_node_coordinates(row['end_node'])
+            # Resolve numeric node IDs
+            start_node = self.node_names[row['from_node_id']]
+            end_node = self.node_names[row['to_node_id']]
             
             # Create pipe
             pipe = NetworkPipe(
@@ -211,16 +223,6 @@ class CHANetworkHierarchyManager:
             
             self.pipes[pipe_id] = pipe
     
-    def _parse_node_coordinates(self, node_str: str) -> str:
-        """Parse node coordinates string to node ID."""
-        if isinstance(node_str, str) and node_str.startswith('('):
-            # Extract coordinates from string like "(x, y)"
-            coords = node_str.strip('()').split(',')
-            if len(coords) == 2:
-                x, y = float(coords[0].strip()), float(coords[1].strip())
-                return f"node_{x:.1f}_{y:.1f}"
-        return str(node_str)
-    
     def _build_network_graph(self) -> None:
         """Build network graph from pipes and nodes."""
         # Add nodes
@@ -230,7 +232,7 @@ class CHANetworkHierarchyManager:
                 self.nodes[pipe.start_node] = NetworkNode(
                     node_id=pipe.start_node,
                     node_type=self._determine_node_type(pipe.start_node),
-                    coordinates=(0, 0),  # Will be updated with actual coordinates
+                    coordinates=self.node_coordinates.get(pipe.start_node, (0, 0)),
                     elevation_m=0,
                     pressure_bar=2.0,
                     temperature_c=40,
@@ -242,7 +244,7 @@ class CHANetworkHierarchyManager:
                 self.nodes[pipe.end_node] = NetworkNode(
                     node_id=pipe.end_node,
                     node_type=self._determine_node_type(pipe.end_node),
-                    coordinates=(0, 0),  # Will be updated with actual coordinates
+                    coordinates=self.node_coordinates.get(pipe.end_node, (0, 0)),
                     elevation_m=0,
                     pressure_bar=2.0,
                     temperature_c=40,
@@ -0,0 +1,277 @@
+"""
+CHA Network Tables - Numeric Node IDs for CHA Pipe Networks
+
+This module converts the CHA supply/return pipe and service connection tables,
+whose nodes are coordinate tuples (or their string form after a CSV round trip),
+into a node table with integer IDs and x/y columns plus pipe tables that
+reference nodes by ID. Node strings are parsed numerically, never evaluated.
+
+The tables are the interchange format between CHA stages: they are written as
+typed Parquet files next to the optional CSV exports and every CHA consumer
+reads them back through ``load_network_tables`` (memory-mapped).
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# "(x, y)" tuples (numpy scalars repr as "np.float64(x)") and "POINT (x y)" WKT,
+# as written by DataFrame.to_csv
+_NUMBER = r"(?:np\.float64\()?([-+0-9.eE]+)\)?"
+_NODE_PATTERN = rf"^\s*(?:POINT\s*)?\(\s*{_NUMBER}\s*[,\s]\s*{_NUMBER}\s*\)\s*$"
+
+# Parquet artifact written by CentralizedHeatingAgent.save_results
+NETWORK_TABLE_FILES = {
+    "nodes": "nodes.parquet",
+    "supply_pipes": "supply_pipes.parquet",
+    "return_pipes": "return_pipes.parquet",
+    "service_connections": "service_connections.parquet",
+}
+
+
+@dataclass
+class CHANetworkTables:
+    """CHA network with an integer node table."""
+    nodes: pd.DataFrame  # node_id, x, y, node_type
+    supply_pipes: pd.DataFrame  # from_node_id, to_node_id, length_m, ...
+    return_pipes: pd.DataFrame
+    service_connections: pd.DataFrame  # node_id of the street connection point
+    plant_node_id: int
+
+
+def parse_node_coordinates(values: pd.Series) -> np.ndarray:
+    """
+    Parse node values into an (n, 2) float array.
+
+    Args:
+        values: Coordinate tuples, shapely points or their string forms
+
+    Returns:
+        Array of x/y coordinates (NaN where a value cannot be parsed)
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    coords = np.full((len(values), 2), np.nan)
+    if len(values) == 0:
+        return coords
+
+    is_str = values.map(lambda v: isinstance(v, str)).to_numpy()
+    if is_str.any():
+        parsed = values[is_str].str.extract(_NODE_PATTERN).astype(float)
+        coords[is_str] = parsed.to_numpy()
+
+    for i in np.flatnonzero(~is_str):
+        value = values.iloc[i]
+        if hasattr(value, "x") and hasattr(value, "y"):
+            coords[i] = (value.x, value.y)
+        elif isinstance(value, (tuple, list, np.ndarray)) and len(value) >= 2:
+            coords[i] = (value[0], value[1])
+    return coords
+
+
+def build_network_tables(
+    supply_pipes: pd.DataFrame,
+    return_pipes: pd.DataFrame,
+    service_connections: Optional[pd.DataFrame] = None,
+) -> CHANetworkTables:
+    """
+    Assign integer node IDs to a CHA dual-pipe network.
+
+    Supply and return pipes share one node set (nodes are street positions).
+    The plant is the root of the supply tree: a supply start node that is
+    never a supply end node. Service connections are mapped to the node at
+    their street connection point.
+
+    Args:
+        supply_pipes: CHA supply pipes with start_node/end_node
+        return_pipes: CHA return pipes with start_node/end_node
+        service_connections: CHA service connections with connection_x/connection_y
+
+    Returns:
+        CHANetworkTables
+    """
+    endpoints = [
+        parse_node_coordinates(supply_pipes["start_node"]),
+        parse_node_coordinates(supply_pipes["end_node"]),
+        parse_node_coordinates(return_pipes["start_node"]),
+        parse_node_coordinates(return_pipes["end_node"]),
+    ]
+    all_coords = np.concatenate(endpoints)
+    if np.isnan(all_coords).any():
+        raise ValueError("Could not parse all pipe node coordinates")
+
+    unique_coords, inverse = np.unique(all_coords, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    bounds = np.cumsum([0] + [len(e) for e in endpoints])
+    supply_from, supply_to, return_from, return_to = (
+        inverse[bounds[k]:bounds[k + 1]] for k in range(4)
+    )
+
+    roots = np.setdiff1d(supply_from, supply_to)
+    if len(roots) > 0:
+        plant_node_id = int(supply_from[np.isin(supply_from, roots)][0])
+    elif len(supply_from) > 0:
+        plant_node_id = int(supply_from[0])
+    else:
+        plant_node_id = 0
+
+    nodes = pd.DataFrame(
+        {
+            "node_id": np.arange(len(unique_coords), dtype=np.int64),
+            "x": unique_coords[:, 0],
+            "y": unique_coords[:, 1],
+            "node_type": "junction",
+        }
+    )
+
+    services = None
+    if service_connections is not None:
+        services = service_connections.copy()
+        if len(services) > 0 and len(unique_coords) > 0:
+            service_xy = services[["connection_x", "connection_y"]].to_numpy(dtype=float)
+            _, nearest = cKDTree(unique_coords).query(service_xy)
+            services["node_id"] = nearest.astype(np.int64)
+            nodes.loc[np.unique(nearest), "node_type"] = "service_connection"
+        else:
+            services["node_id"] = pd.Series(dtype=np.int64)
+    if len(nodes) > 0:
+        nodes.loc[plant_node_id, "node_type"] = "plant"
+
+    def _with_ids(pipes: pd.DataFrame, from_ids: np.ndarray, to_ids: np.ndarray) -> pd.DataFrame:
+        table = pipes.drop(columns=["start_node", "end_node"]).reset_index(drop=True)
+        table.insert(0, "from_node_id", from_ids.astype(np.int64))
+        table.insert(1, "to_node_id", to_ids.astype(np.int64))
+        return table
+
+    return CHANetworkTables(
+        nodes=nodes,
+        supply_pipes=_with_ids(supply_pipes, supply_from, supply_to),
+        return_pipes=_with_ids(return_pipes, return_from, return_to),
+        service_connections=services,
+        plant_node_id=plant_node_id,
+    )
+
+
+def _arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast object columns holding mixed Python types (e.g. street_id) to strings."""
+    df = df.copy()
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        missing = values.isna()
+        if values[~missing].map(type).nunique() > 1:
+            df[column] = values.astype(str).where(~missing, None)
+    return df
+
+
+def write_network_tables(tables: CHANetworkTables, output_dir: Union[str, Path]) -> Dict[str, Path]:
+    """
+    Write the network tables as typed Parquet files.
+
+    Args:
+        tables: Network tables to write
+        output_dir: CHA output directory
+
+    Returns:
+        Mapping of table name to written file (empty if pyarrow is unavailable)
+    """
+    if not PYARROW_AVAILABLE:
+        print("⚠️ pyarrow not available - skipping Parquet network tables")
+        return {}
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    written = {}
+    for name, filename in NETWORK_TABLE_FILES.items():
+        table = getattr(tables, name)
+        if table is None:
+            continue
+        arrow_table = pa.Table.from_pandas(_arrow_compatible(table), preserve_index=False)
+        pq.write_table(arrow_table, output_path / filename)
+        written[name] = output_path / filename
+    return written
+
+
+def _parquet_is_current(parquet_path: Path, csv_path: Path) -> bool:
+    """True if the Parquet table exists and the CSV was not rewritten after it."""
+    if not parquet_path.exists():
+        return False
+    if csv_path == parquet_path or not csv_path.exists():
+        return True
+    return parquet_path.stat().st_mtime_ns >= csv_path.stat().st_mtime_ns
+
+
+def read_cha_table(path: Union[str, Path], memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read one CHA table, preferring its Parquet form over CSV.
+
+    Args:
+        path: Table path (``.csv`` or ``.parquet``); a ``.parquet`` sibling of a
+            CSV path is used when present and not older than the CSV
+        memory_map: Memory-map Parquet files instead of reading them into buffers
+
+    Returns:
+        DataFrame
+    """
+    path = Path(path)
+    parquet_path = path.with_suffix(".parquet")
+    if PYARROW_AVAILABLE and _parquet_is_current(parquet_path, path):
+        return pq.read_table(parquet_path, memory_map=memory_map).to_pandas()
+    return pd.read_csv(path)
+
+
+def load_network_tables(cha_dir: Union[str, Path], memory_map: bool = True) -> CHANetworkTables:
+    """
+    Load the CHA network from its output directory.
+
+    Reads the Parquet network tables when present and not older than the CSV
+    exports, and otherwise falls back to the CSV exports (``supply_pipes.csv``, ``return_pipes.csv``,
+    ``service_connections.csv``), assigning node IDs on the fly.
+
+    Args:
+        cha_dir: CHA output directory
+        memory_map: Memory-map Parquet files
+
+    Returns:
+        CHANetworkTables
+    """
+    cha_dir = Path(cha_dir)
+    nodes_path = cha_dir / NETWORK_TABLE_FILES["nodes"]
+
+    parquet_current = all(
+        _parquet_is_current(cha_dir / NETWORK_TABLE_FILES[name], cha_dir / f"{name}.csv")
+        for name in ("supply_pipes", "return_pipes", "service_connections")
+    )
+    if PYARROW_AVAILABLE and nodes_path.exists() and parquet_current:
+        frames = {}
+        for name, filename in NETWORK_TABLE_FILES.items():
+            path = cha_dir / filename
+            frames[name] = pq.read_table(path, memory_map=memory_map).to_pandas() if path.exists() else None
+        nodes = frames["nodes"]
+        plant = nodes.loc[nodes["node_type"] == "plant", "node_id"]
+        return CHANetworkTables(
+            nodes=nodes,
+            supply_pipes=frames["supply_pipes"],
+            return_pipes=frames["return_pipes"],
+            service_connections=frames["service_connections"],
+            plant_node_id=int(plant.iloc[0]) if len(plant) > 0 else 0,
+        )
+
+    return build_network_tables(
+        pd.read_csv(cha_dir / "supply_pipes.csv"),
+        pd.read_csv(cha_dir / "return_pipes.csv"),
+        pd.read_csv(cha_dir / "service_connections.csv"),
+    )
@@ -7,6 +7,14 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import warnings
 
+try:
+    from src.cha_network_tables import load_network_tables
+    from src.cha_timeseries import load_lfa_mass_flows, sink_mass_flow_matrix, run_time_series
+except ImportError:
+    # Fallback for direct execution
+    from cha_network_tables import load_network_tables
+    from cha_timeseries import load_lfa_mass_flows, sink_mass_flow_matrix, run_time_series
+
 warnings.filterwarnings("ignore")
 
 try:
@@ -22,7 +30,9 @@ class CHAPandapipesSimulator:
     def __init__(self, cha_output_dir: str = "processed/cha", config: dict = None):
         self.cha_output_dir = Path(cha_output_dir)
         self.net = None
+        self.network_tables = None
         self.simulation_results = None
+        self.time_series_results = None
         self.config = config or self._get_default_config()
         
         # Thermal simulation parameters
@@ -84,12 +94,11 @@ class CHAPandapipesSimulator:
         
         try:
             # Load network data
-            supply_pipes = pd.read_csv(self.cha_output_dir / "supply_pipes.csv")
-            return_pipes = pd.read_csv(self.cha_output_dir / "return_pipes.csv")
-            service_connections = pd.read_csv(self.cha_output_dir / "service_connections.csv")
+            self.network_tables = load_network_tables(self.cha_output_dir)
             network_stats = json.loads((self.cha_output_dir / "network_stats.json").read_text())
             
-            print(f"✅ Loaded network with {len(supply_pipes)} supply pipes, {len(return_pipes)} return pipes, {len(service_connections)} service connections")
+            tables = self.network_tables
+            print(f"✅ Loaded network with {len(tables.supply_pipes)} supply pipes, {len(tables.return_pipes)} return pipes, {len(tables.service_connections)} service connections")
             
             return True
             
@@ -106,10 +115,10 @@ class CHAPandapipesSimulator:
         print("🏗️ Creating pandapipes network...")
         
         try:
-            # Load network data
-            supply_pipes = pd.read_csv(self.cha_output_dir / "supply_pipes.csv")
-            return_pipes = pd.read_csv(self.cha_output_dir / "return_pipes.csv")
-            service_connections = pd.read_csv(self.cha_output_dir / "service_connections.csv")
+            # Load network data (numeric node table, junction index == node_id)
+            if self.network_tables is None:
+                self.network_tables = load_network_tables(self.cha_output_dir)
+            tables = self.network_tables
             network_stats = json.loads((self.cha_output_dir / "network_stats.json").read_text())
             
             # Create empty pandapipes network
@@ -135,127 +144,38 @@ class CHAPandapipesSimulator:
                 print(f"   Fluid pressure: {self.fluid_pressure_bar} bar")
                 print(f"   Ground temperature: {self.ground_temp_c}°C")
             
-            # Add junctions for all unique nodes
-            all_nodes = set()
-            for _, pipe in supply_pipes.iterrows():
-                all_nodes.add(str(pipe["start_node"]))
-                all_nodes.add(str(pipe["start_node"]))
-            for _, pipe in return_pipes.iterrows():
-                all_nodes.add(str(pipe["start_node"]))
-                all_nodes.add(str(pipe["end_node"]))
-            
-            # Create junctions with thermal boundary conditions
-            node_to_junction = {}
-            plant_node = None
-            
-            for i, node in enumerate(all_nodes):
-                # Parse node coordinates
-                if isinstance(node, str) and node.startswith("(") and node.endswith(")"):
-                    # Handle tuple format "(x, y)"
-                    coords = eval(node)
-                    x, y = coords
-                else:
-                    # Handle other formats
-                    x, y = 0, 0
-                
-                # Determine if this is the plant node (first node or special identifier)
-                is_plant_node = (i == 0) or ("plant" in str(node).lower())
-                if is_plant_node:
-                    plant_node = node
-                
-                # Set initial temperature based on node type
-                if self.thermal_enabled:
-                    if is_plant_node:
-                        initial_temp_k = self.supply_temp_c + 273.15  # Supply temperature
-                    else:
-                        initial_temp_k = self.return_temp_c_init + 273.15  # Return temperature
-                else:
-                    initial_temp_k = 313.15  # Default temperature (40°C)
-                
-                # Create junction with thermal boundary conditions
-                junction = pp.create_junction(
-                    self.net, 
-                    pn_bar=self.fluid_pressure_bar,  # Use configured pressure
-                    tfluid_k=initial_temp_k  # Use thermal boundary conditions
-                )
-                node_to_junction[node] = junction
-                
-                if is_plant_node:
-                    print(f"   Plant junction created at {node} with temperature {self.supply_temp_c}°C")
+            nodes = tables.nodes
+            plant_node_id = tables.plant_node_id
+            is_plant = (nodes["node_id"] == plant_node_id).to_numpy()
             
-            print(f"✅ Created {len(node_to_junction)} junctions with thermal boundary conditions")
+            # Set initial temperature based on node type
+            if self.thermal_enabled:
+                tfluid_k = np.where(is_plant, self.supply_temp_c, self.return_temp_c_init) + 273.15
+            else:
+                tfluid_k = np.full(len(nodes), 313.15)  # Default temperature (40°C)
+            
+            # Create all junctions with thermal boundary conditions in one call
+            pp.create_junctions(
+                self.net,
+                len(nodes),
+                pn_bar=self.fluid_pressure_bar,  # Use configured pressure
+                tfluid_k=tfluid_k,
+                geodata=list(zip(nodes["x"], nodes["y"])),
+                index=nodes["node_id"].to_numpy(),
+            )
+            print(f"   Plant junction created at node {plant_node_id} with temperature {self.supply_temp_c}°C")
+            print(f"✅ Created {len(nodes)} junctions with thermal boundary conditions")
             
             # Add supply pipes with thermal parameters
             print("🔥 Creating supply pipes with thermal parameters...")
-            for _, pipe in supply_pipes.iterrows():
-                start_junction = node_to_junction.get(str(pipe["start_node"]), 0)
-                end_junction = node_to_junction.get(str(pipe["end_node"]), 0)
-                
-                # Get pipe diameter from CHA data if available, otherwise use default
-                diameter_m = pipe.get('d_inner_m', 0.1) if 'd_inner_m' in pipe else 0.1
-                
-                # Configure thermal parameters for supply pipes
-                if self.thermal_enabled:
-                    # Supply pipes: higher heat transfer coefficient for better thermal performance
-                    alpha_w_per_m2k = self.pipe_u_w_per_m2k_default * 1.2  # 20% higher for supply
-                    sections = self.pipe_sections_default
-                    text_k = self.ground_temp_c + 273.15  # Ground temperature in Kelvin
-                else:
-                    # Hydraulic-only mode
-                    alpha_w_per_m2k = 0.0
-                    sections = 1
-                    text_k = 313.15
-                
-                pp.create_pipe_from_parameters(
-                    self.net,
-                    from_junction=start_junction,
-                    to_junction=end_junction,
-                    length_km=pipe["length_m"] / 1000.0,
-                    diameter_m=diameter_m,
-                    k_mm=0.1,  # Default roughness
-                    name=f"supply_{pipe['street_id']}_{pipe['building_served']}",
-                    sections=sections,
-                    alpha_w_per_m2k=alpha_w_per_m2k,
-                    text_k=text_k
-                )
+            self._create_pipes(tables.supply_pipes, "supply", u_factor=1.2)  # 20% higher for supply
             
             # Add return pipes with thermal parameters
             print("❄️ Creating return pipes with thermal parameters...")
-            for _, pipe in return_pipes.iterrows():
-                start_junction = node_to_junction.get(str(pipe["start_node"]), 0)
-                end_junction = node_to_junction.get(str(pipe["end_node"]), 0)
-                
-                # Get pipe diameter from CHA data if available, otherwise use default
-                diameter_m = pipe.get('d_inner_m', 0.1) if 'd_inner_m' in pipe else 0.1
-                
-                # Configure thermal parameters for return pipes
-                if self.thermal_enabled:
-                    # Return pipes: standard heat transfer coefficient
-                    alpha_w_per_m2k = self.pipe_u_w_per_m2k_default
-                    sections = self.pipe_sections_default
-                    text_k = self.ground_temp_c + 273.15  # Ground temperature in Kelvin
-                else:
-                    # Hydraulic-only mode
-                    alpha_w_per_m2k = 0.0
-                    sections = 1
-                    text_k = 313.15
-                
-                pp.create_pipe_from_parameters(
-                    self.net,
-                    from_junction=start_junction,
-                    to_junction=end_junction,
-                    length_km=pipe["length_m"] / 1000.0,
-                    diameter_m=diameter_m,
-                    k_mm=0.1,  # Default roughness
-                    name=f"return_{pipe['street_id']}_{pipe['building_served']}",
-                    sections=sections,
-                    alpha_w_per_m2k=alpha_w_per_m2k,
-                    text_k=text_k
-                )
+            self._create_pipes(tables.return_pipes, "return", u_factor=1.0)
             
             # Add ext_grid at plant (supply source) with thermal boundary conditions
             print("🏭 Creating heat source with thermal boundary conditions...")
-            plant_junction = node_to_junction.get(plant_node, list(node_to_junction.values())[0])
             
             # Set thermal boundary conditions for heat source
             if self.thermal_enabled:
@@ -267,7 +187,7 @@ class CHAPandapipesSimulator:
             
             pp.create_ext_grid(
                 self.net,
-                junction=plant_junction,
+                junction=plant_node_id,
                 p_bar=supply_pressure_bar,
                 t_k=supply_temp_k,
                 name="CHP_Plant",
@@ -276,23 +196,24 @@ class CHAPandapipesSimulator:
             
             print(f"   Heat source: {self.supply_temp_c}°C, {supply_pressure_bar} bar")
             
-            # Add sinks at buildings (heat consumers) with mass flow from LFA
+            # Add sinks at the buildings' street connection junctions
             print("🏠 Creating heat consumers with mass flow rates...")
-            for _, service in service_connections.iterrows():
-                if service["pipe_type"] == "supply_service":
-                    # Find the junction closest to this building
-                    building_junction = list(node_to_junction.values())[0]  # Simplified
-                    
-                    # Get mass flow rate from CHA data if available
-                    mass_flow_kg_s = service.get('mdot_kg_s', 0.1) if 'mdot_kg_s' in service else 0.1
-                    
-                    pp.create_sink(
-                        self.net,
-                        junction=building_junction,
-                        mdot_kg_per_s=mass_flow_kg_s,
-                        name=f"Building_{service['building_id']}",
-                        scaling=1.0
-                    )
+            services = tables.service_connections
+            consumers = services[services["pipe_type"] == "supply_service"]
+            if len(consumers) > 0:
+                # Get mass flow rate from CHA data if available
+                if "mdot_kg_s" in consumers:
+                    mass_flow_kg_s = consumers["mdot_kg_s"].fillna(0.1).to_numpy(dtype=float)
+                else:
+                    mass_flow_kg_s = np.full(len(consumers), 0.1)
+                
+                pp.create_sinks(
+                    self.net,
+                    junctions=consumers["node_id"].to_numpy(),
+                    mdot_kg_per_s=mass_flow_kg_s,
+                    name=[f"Building_{b}" for b in consumers["building_id"]],
+                    scaling=1.0
+                )
             
             print(f"✅ Created pandapipes network with {len(self.net.junction)} junctions and {len(self.net.pipe)} pipes")
             return True
@@ -301,6 +222,41 @@ class CHAPandapipesSimulator:
             print(f"❌ Failed to create pandapipes network: {e}")
             return False
     
+    def _create_pipes(self, pipes: pd.DataFrame, pipe_type: str, u_factor: float) -> None:
+        """Create all pipes of one type with a single bulk pandapipes call."""
+        if len(pipes) == 0:
+            return
+        
+        # Get pipe diameter from CHA data if available, otherwise use default
+        if "d_inner_m" in pipes:
+            diameter_m = pipes["d_inner_m"].fillna(0.1).to_numpy(dtype=float)
+        else:
+            diameter_m = np.full(len(pipes), 0.1)
+        
+        # Configure thermal parameters
+        if self.thermal_enabled:
+            alpha_w_per_m2k = self.pipe_u_w_per_m2k_default * u_factor
+            sections = self.pipe_sections_default
+            text_k = self.ground_temp_c + 273.15  # Ground temperature in Kelvin
+        else:
+            # Hydraulic-only mode
+            alpha_w_per_m2k = 0.0
+            sections = 1
+            text_k = 313.15
+        
+        pp.create_pipes_from_parameters(
+            self.net,
+            from_junctions=pipes["from_node_id"].to_numpy(),
+            to_junctions=pipes["to_node_id"].to_numpy(),
+            length_km=pipes["length_m"].to_numpy(dtype=float) / 1000.0,
+            diameter_m=diameter_m,
+            k_mm=0.1,  # Default roughness
+            name=[f"{pipe_type}_{s}_{b}" for s, b in zip(pipes["street_id"], pipes["building_served"])],
+            sections=sections,
+            alpha_w_per_m2k=alpha_w_per_m2k,
+            text_k=text_k
+        )
+    
     def run_hydraulic_simulation(self) -> bool:
         """Run pandapipes hydraulic and thermal simulation."""
         if not PANDAPIPES_AVAILABLE or self.net is None:
@@ -373,6 +329,74 @@ class CHAPandapipesSimulator:
             }
             return False
     
+    def run_time_series_simulation(self, lfa_dir: str = "processed/lfa", hours: Optional[List[int]] = None,
+                                   output_dir: str = "eval/cha/timeseries", n_workers: Optional[int] = None,
+                                   block_size_h: Optional[int] = None) -> Dict:
+        """
+        Run quasi-static pipeflow over a selected or full set of hours.
+        
+        Sink mass flows follow the LFA 8760 h heat demand series
+        (ṁ = Q / (cp · ΔT)); sinks without a forecast keep their design flow.
+        Annual pump energy and heat losses are summed from the hourly results
+        instead of being extrapolated from one design point.
+        
+        Args:
+            lfa_dir: Directory with LFA building forecasts (<building_id>.json)
+            hours: Hours to simulate (None for the full series)
+            output_dir: Directory for streamed per-hour pipe results and summaries
+            n_workers: Worker processes for independent hour blocks
+            block_size_h: Hours per block (warm starts carry over within a block)
+            
+        Returns:
+            Annual summary dict
+        """
+        if not PANDAPIPES_AVAILABLE or self.net is None:
+            print("❌ Pandapipes network not available")
+            return {"status": "error", "message": "Pandapipes network not available"}
+        
+        ts_config = self.config.get('hydraulic_simulation', {}).get('time_series', {})
+        n_workers = n_workers or ts_config.get('n_workers', 1)
+        block_size_h = block_size_h or ts_config.get('block_size_h', 730)
+        delta_t_k = ts_config.get('delta_t_k', self.supply_temp_c - self.return_temp_c_init)
+        pump_efficiency = self.config.get('hydraulic_simulation', {}).get('pump_efficiency', 0.75)
+        
+        print(f"🕒 Running time-series simulation from {lfa_dir}...")
+        
+        try:
+            building_ids = self.net.sink["name"].astype(str).str.removeprefix("Building_")
+            mass_flows = load_lfa_mass_flows(lfa_dir, building_ids, delta_t_k=delta_t_k)
+            if mass_flows.empty:
+                print(f"❌ No LFA series found in {lfa_dir}")
+                return {"status": "error", "message": f"No LFA series found in {lfa_dir}"}
+            
+            sink_mdot = sink_mass_flow_matrix(self.net, mass_flows)
+            simulation_mode = self.simulation_mode if self.thermal_enabled else "hydraulics"
+            result = run_time_series(
+                self.net,
+                sink_mdot,
+                output_dir,
+                pipeflow_options={
+                    "mode": simulation_mode,
+                    "iter": self.max_iterations,
+                    "tol_p": self.convergence_tolerance,
+                    "tol_v": self.convergence_tolerance,
+                },
+                hours=hours,
+                block_size=block_size_h,
+                n_workers=n_workers,
+                pump_efficiency=pump_efficiency,
+            )
+            self.time_series_results = result
+            
+            annual = result.annual
+            print(f"✅ Time series: {annual['hours_converged']}/{annual['hours_simulated']} hours converged")
+            print(f"   Pump energy: {annual['pump_energy_kwh']:.1f} kWh, heat losses: {annual['heat_loss_kwh']:.1f} kWh")
+            return {"status": "ok", "output_dir": str(result.output_dir), **annual}
+            
+        except Exception as e:
+            print(f"❌ Time-series simulation failed: {e}")
+            return {"status": "error", "message": str(e)}
+    
     def calculate_hydraulic_kpis(self) -> Dict:
         """Calculate hydraulic and thermal KPIs from simulation results."""
         if not self.simulation_results or not self.simulation_results.get("simulation_success"):
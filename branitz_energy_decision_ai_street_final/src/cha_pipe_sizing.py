@@ -14,8 +14,18 @@ import json
 from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
+import sys
 import warnings
 
+import numpy as np
+
+try:
+    from optimize.hydraulics_kernel import colebrook_white_f_array
+except ImportError:
+    # Fallback for direct execution
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from optimize.hydraulics_kernel import colebrook_white_f_array
+
 warnings.filterwarnings("ignore")
 
 
@@ -491,40 +501,7 @@ class CHAPipeSizingEngine:
     
     def _calculate_friction_factor(self, reynolds: float, diameter_m: float) -> float:
         """Calculate friction factor using Colebrook-White equation."""
-        relative_roughness = self.pipe_roughness_m / diameter_m
-        
-        # Handle edge cases
-        if reynolds <= 0:
-            return 0.02  # Default friction factor
-        
-        # Initial guess
-        friction_factor = 0.01
-        
-        # Iterative solution
-        for _ in range(10):
-            try:
-                # Ensure we don't take sqrt of negative number
-                if friction_factor <= 0:
-                    friction_factor = 0.01
-                
-                # Ensure we don't take log of negative or zero
-                log_argument = relative_roughness / 3.7 + 2.51 / (reynolds * math.sqrt(friction_factor))
-                if log_argument <= 0:
-                    friction_factor = 0.02
-                    break
-                
-                friction_factor_new = 1 / (2 * math.log10(log_argument))
-                
-                if abs(friction_factor_new - friction_factor) < 0.001:
-                    break
-                friction_factor = friction_factor_new
-                
-            except (ValueError, ZeroDivisionError):
-                friction_factor = 0.02  # Default friction factor
-                break
-        
-        # Ensure reasonable bounds
-        return max(0.005, min(0.1, friction_factor))
+        return float(colebrook_white_f_array(reynolds, diameter_m, self.pipe_roughness_m))
     
     def _calculate_pressure_drop_per_meter(self, flow_rate_kg_s: float, 
                                          diameter_m: float, 
@@ -536,6 +513,37 @@ class CHAPipeSizingEngine:
             (self.water_density_kg_m3 * velocity_ms**2) / 2
         )
     
+    def calculate_hydraulics_batch(self, flow_rates_kg_s, diameters_m) -> Dict[str, np.ndarray]:
+        """
+        Calculate velocity, Reynolds number, friction factor and pressure drop per meter
+        for many pipes in one vectorized pass.
+        
+        Args:
+            flow_rates_kg_s: Mass flow rates in kg/s (array-like)
+            diameters_m: Inner diameters in meters (array-like, broadcastable)
+        
+        Returns:
+            Dict of arrays: velocity_ms, reynolds_number, friction_factor, pressure_drop_pa_per_m
+        """
+        flow_rates_kg_s = np.asarray(flow_rates_kg_s, dtype=float)
+        diameters_m = np.asarray(diameters_m, dtype=float)
+        
+        area_m2 = np.pi * (diameters_m / 2) ** 2
+        velocity_ms = flow_rates_kg_s / self.water_density_kg_m3 / area_m2
+        reynolds = (velocity_ms * diameters_m) / self.water_kinematic_viscosity_m2_s
+        friction_factor = colebrook_white_f_array(reynolds, diameters_m, self.pipe_roughness_m)
+        pressure_drop_pa_per_m = (
+            friction_factor * (1 / diameters_m) * 
+            (self.water_density_kg_m3 * velocity_ms**2) / 2
+        )
+        
+        return {
+            'velocity_ms': velocity_ms,
+            'reynolds_number': reynolds,
+            'friction_factor': friction_factor,
+            'pressure_drop_pa_per_m': pressure_drop_pa_per_m
+        }
+    
     def get_pipe_category_for_flow(self, flow_rate_kg_s: float) -> str:
         """
         Determine appropriate pipe category based on flow rate.
@@ -652,8 +660,11 @@ class CHAPipeSizingEngine:
             
             # Apply monotone sizing
             iteration_resized = 0
+            pipes_by_id = {}
+            for p in pipes:
+                pipes_by_id.setdefault(p.get('id', p.get('name', '')), p)
             for pipe_id in prioritized_pipes:
-                pipe = next((p for p in pipes if p.get('id', p.get('name', '')) == pipe_id), None)
+                pipe = pipes_by_id.get(pipe_id)
                 if not pipe:
                     continue
                 
@@ -719,21 +730,17 @@ class CHAPipeSizingEngine:
         """
         violations = []
         
-        for pipe in pipe_data:
+        # Calculate hydraulic parameters for all pipes at once
+        hydraulics = self.calculate_hydraulics_batch(
+            [pipe.get('flow_rate_kg_s', 0.1) for pipe in pipe_data],
+            [pipe.get('diameter_m', 0.1) for pipe in pipe_data]
+        )
+        
+        for i, pipe in enumerate(pipe_data):
             pipe_id = pipe.get('id', pipe.get('name', f"pipe_{len(violations)}"))
             pipe_category = pipe.get('pipe_category', 'distribution_pipe')
-            
-            # Get flow rate and diameter
-            flow_rate_kg_s = pipe.get('flow_rate_kg_s', 0.1)
-            diameter_m = pipe.get('diameter_m', 0.1)
-            
-            # Calculate hydraulic parameters
-            velocity_ms = self._calculate_velocity(flow_rate_kg_s, diameter_m)
-            reynolds = self._calculate_reynolds_number(velocity_ms, diameter_m)
-            friction_factor = self._calculate_friction_factor(reynolds, diameter_m)
-            pressure_drop_pa_per_m = self._calculate_pressure_drop_per_meter(
-                flow_rate_kg_s, diameter_m, friction_factor
-            )
+            velocity_ms = hydraulics['velocity_ms'][i]
+            pressure_drop_pa_per_m = hydraulics['pressure_drop_pa_per_m'][i]
             
             # Check against standards limits
             category_limits = self.standards_limits
@@ -0,0 +1,314 @@
+"""
+CHA Time Series - Quasi-Static 8760 h Pipeflow for CHA Networks
+
+This module runs the CHA pandapipes network over a selected or full set of
+hours. Each step only updates the sink mass flows (from the LFA 8760 h heat
+demand series) and warm-starts pipeflow from the previous hour's junction
+pressures and temperatures. Per-hour pipe results are streamed to disk one
+row group per hour, and independent hour blocks can run in a process pool.
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+import copy
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pandapipes as pp
+    PANDAPIPES_AVAILABLE = True
+except ImportError:
+    PANDAPIPES_AVAILABLE = False
+
+try:
+    from src.lfa_load_matrix import load_lfa_matrix
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import load_lfa_matrix
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+HOURS_PER_YEAR = 8760
+WATER_CP_KJ_PER_KGK = 4.18
+WATER_DENSITY_KG_M3 = 977.8  # Water density at 70°C
+
+# Per-pipe columns streamed for every simulated hour
+PIPE_RESULT_COLUMNS = ["v_mean_m_per_s", "p_from_bar", "p_to_bar", "mdot_from_kg_per_s", "t_from_k", "t_to_k"]
+HOURLY_SUMMARY_COLUMNS = [
+    "hour", "converged", "pump_power_w", "heat_loss_w",
+    "total_mdot_kg_s", "min_pressure_bar", "max_velocity_ms",
+]
+
+
+@dataclass
+class TimeSeriesResult:
+    """Outcome of a time-series pipeflow run."""
+    hourly: pd.DataFrame  # one row per simulated hour
+    annual: Dict  # annual pump energy, heat losses and convergence counts
+    output_dir: Path
+
+
+def load_lfa_mass_flows(
+    lfa_dir: Union[str, Path],
+    building_ids: Iterable,
+    delta_t_k: float = 30.0,
+    cp_kj_per_kgk: float = WATER_CP_KJ_PER_KGK,
+) -> pd.DataFrame:
+    """
+    Convert LFA heat demand series into sink mass flows.
+
+    Reads the hourly ``series`` in kW through ``load_lfa_matrix`` (memory-mapped
+    load matrix store, or ``<lfa_dir>/<building_id>.json`` files) and applies
+    ṁ = Q / (cp · ΔT).
+
+    Args:
+        lfa_dir: Directory with LFA building forecasts
+        building_ids: Buildings to load
+        delta_t_k: Supply/return temperature spread (K)
+        cp_kj_per_kgk: Specific heat capacity of water (kJ/(kg·K))
+
+    Returns:
+        DataFrame (hour × building_id) of mass flows in kg/s; buildings without
+        a forecast are omitted
+    """
+    building_ids = [str(b) for b in building_ids]
+    matrix = load_lfa_matrix(lfa_dir, buildings=building_ids)
+    if matrix is None:
+        return pd.DataFrame(index=pd.RangeIndex(0, name="hour"))
+
+    heat_kw = matrix.to_frame(buildings=building_ids, quantile="series", hours=slice(0, HOURS_PER_YEAR))
+    if heat_kw.shape[1] == 0:
+        return pd.DataFrame(index=pd.RangeIndex(0, name="hour"))
+    return heat_kw.clip(lower=0.0) / (cp_kj_per_kgk * delta_t_k)
+
+
+def sink_mass_flow_matrix(net, mass_flows: pd.DataFrame, name_prefix: str = "Building_") -> pd.DataFrame:
+    """
+    Align building mass flows to the sink table of a pandapipes network.
+
+    Sinks are matched by name (``Building_<id>``); sinks without a profile keep
+    their configured ``mdot_kg_per_s`` for every hour.
+
+    Args:
+        net: pandapipes network with sinks
+        mass_flows: DataFrame (hour × building_id) from ``load_lfa_mass_flows``
+        name_prefix: Sink name prefix in front of the building ID
+
+    Returns:
+        DataFrame (hour × sink index) of sink mass flows in kg/s
+    """
+    sink_names = net.sink["name"].astype(str).str.removeprefix(name_prefix)
+    base = net.sink["mdot_kg_per_s"].to_numpy(dtype=float)
+    matrix = np.tile(base, (len(mass_flows), 1))
+
+    columns = mass_flows.columns.get_indexer(sink_names)
+    has_profile = columns >= 0
+    matrix[:, has_profile] = mass_flows.to_numpy(dtype=float)[:, columns[has_profile]]
+    return pd.DataFrame(matrix, index=mass_flows.index, columns=net.sink.index)
+
+
+def _hour_blocks(hours: Sequence[int], block_size: int) -> List[np.ndarray]:
+    """Split the selected hours into contiguous blocks."""
+    hours = np.asarray(hours, dtype=int)
+    return [hours[i:i + block_size] for i in range(0, len(hours), block_size)]
+
+
+def _hour_summary(net, hour: int, converged: bool, pump_efficiency: float, cp_kj_per_kgk: float) -> Dict:
+    """Aggregate one solved hour (pump power per calculate_pump_power, heat loss from pipe ΔT)."""
+    summary = {"hour": int(hour), "converged": bool(converged)}
+    if not converged:
+        return summary
+
+    res_pipe = net.res_pipe
+    mdot = res_pipe["mdot_from_kg_per_s"].to_numpy(dtype=float)
+    dp_pa = (res_pipe["p_from_bar"] - res_pipe["p_to_bar"]).to_numpy(dtype=float) * 1e5
+    summary["pump_power_w"] = float(np.nansum(dp_pa * mdot / WATER_DENSITY_KG_M3) / pump_efficiency)
+    if "t_from_k" in res_pipe and "t_to_k" in res_pipe:
+        dt_k = (res_pipe["t_from_k"] - res_pipe["t_to_k"]).to_numpy(dtype=float)
+        summary["heat_loss_w"] = float(np.nansum(np.abs(mdot) * cp_kj_per_kgk * 1000.0 * dt_k))
+    else:
+        summary["heat_loss_w"] = 0.0
+    summary["total_mdot_kg_s"] = float(net.sink["mdot_kg_per_s"].sum())
+    summary["min_pressure_bar"] = float(net.res_junction["p_bar"].min())
+    summary["max_velocity_ms"] = float(res_pipe["v_mean_m_per_s"].abs().max())
+    return summary
+
+
+class _PipeResultStream:
+    """Append per-hour pipe results to one file (a Parquet row group per hour, else CSV)."""
+
+    def __init__(self, path: Path):
+        self.path = path.with_suffix(".parquet" if PYARROW_AVAILABLE else ".csv")
+        self.writer = None
+
+    def write(self, hour: int, res_pipe: pd.DataFrame) -> None:
+        frame = res_pipe.reindex(columns=PIPE_RESULT_COLUMNS).astype(float)
+        frame.insert(0, "pipe_id", res_pipe.index.to_numpy(dtype=np.int64))
+        frame.insert(0, "hour", np.int64(hour))
+        if PYARROW_AVAILABLE:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="a", header=self.writer is None, index=False)
+            self.writer = True
+
+    def close(self) -> None:
+        if PYARROW_AVAILABLE and self.writer is not None:
+            self.writer.close()
+
+
+def run_hour_block(
+    net,
+    sink_mdot: np.ndarray,
+    hours: Sequence[int],
+    pipeflow_options: Dict,
+    output_file: Optional[Union[str, Path]] = None,
+    pump_efficiency: float = 0.75,
+    cp_kj_per_kgk: float = WATER_CP_KJ_PER_KGK,
+) -> List[Dict]:
+    """
+    Run pipeflow for consecutive hours on one network.
+
+    Only ``net.sink.mdot_kg_per_s`` changes between steps. After each converged
+    hour the junction initial pressures/temperatures are set to its results so
+    the next Newton-Raphson solve starts from the previous solution.
+
+    Args:
+        net: pandapipes network (modified in place)
+        sink_mdot: Array (len(hours) × number of sinks) of mass flows in kg/s
+        hours: Hour indices of the rows of ``sink_mdot``
+        pipeflow_options: Keyword arguments for ``pp.pipeflow``
+        output_file: Per-hour pipe result file (None to skip streaming)
+        pump_efficiency: Pump efficiency for pump power
+        cp_kj_per_kgk: Specific heat capacity for heat losses
+
+    Returns:
+        List of per-hour summary dicts
+    """
+    stream = _PipeResultStream(Path(output_file)) if output_file is not None else None
+    thermal = pipeflow_options.get("mode", "hydraulics") != "hydraulics"
+    summaries = []
+    try:
+        for hour, mdot in zip(hours, sink_mdot):
+            net.sink["mdot_kg_per_s"] = mdot
+            try:
+                pp.pipeflow(net, **pipeflow_options)
+                converged = bool(net.converged)
+            except Exception:
+                converged = False
+
+            if converged:
+                # Warm start: next hour initializes from this solution
+                net.junction["pn_bar"] = net.res_junction["p_bar"].to_numpy()
+                if thermal:
+                    net.junction["tfluid_k"] = net.res_junction["t_k"].to_numpy()
+                if stream is not None:
+                    stream.write(hour, net.res_pipe)
+
+            summaries.append(_hour_summary(net, hour, converged, pump_efficiency, cp_kj_per_kgk))
+    finally:
+        if stream is not None:
+            stream.close()
+    return summaries
+
+
+def _run_hour_block_worker(net_json: str, *args) -> List[Dict]:
+    """Process pool entry point: rebuild the network from JSON, then run the block."""
+    return run_hour_block(pp.from_json_string(net_json), *args)
+
+
+def run_time_series(
+    net,
+    sink_mdot: pd.DataFrame,
+    output_dir: Union[str, Path],
+    pipeflow_options: Dict,
+    hours: Optional[Sequence[int]] = None,
+    block_size: int = HOURS_PER_YEAR,
+    n_workers: int = 1,
+    pump_efficiency: float = 0.75,
+    cp_kj_per_kgk: float = WATER_CP_KJ_PER_KGK,
+) -> TimeSeriesResult:
+    """
+    Run a quasi-static time series over the selected hours.
+
+    Hours are split into contiguous blocks; warm starts carry over within a
+    block and every block starts from the original network state. With
+    ``n_workers > 1`` blocks run in separate processes.
+
+    Args:
+        net: pandapipes network (not modified)
+        sink_mdot: DataFrame (hour × sink index) from ``sink_mass_flow_matrix``
+        output_dir: Directory for per-block pipe results and summaries
+        pipeflow_options: Keyword arguments for ``pp.pipeflow``
+        hours: Hours to simulate (None for every row of ``sink_mdot``)
+        block_size: Hours per block
+        n_workers: Worker processes for independent blocks
+        pump_efficiency: Pump efficiency for pump power
+        cp_kj_per_kgk: Specific heat capacity for heat losses
+
+    Returns:
+        TimeSeriesResult
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    hours = sink_mdot.index.to_numpy() if hours is None else np.sort(np.asarray(hours, dtype=int))
+    sink_mdot = sink_mdot.reindex(columns=net.sink.index)
+    blocks = _hour_blocks(hours, max(int(block_size), 1))
+    block_args = [
+        (
+            sink_mdot.loc[block].to_numpy(dtype=float),
+            block,
+            pipeflow_options,
+            output_dir / f"pipe_results_block_{k:04d}",
+            pump_efficiency,
+            cp_kj_per_kgk,
+        )
+        for k, block in enumerate(blocks)
+    ]
+
+    summaries: List[Dict] = []
+    if n_workers > 1 and len(blocks) > 1:
+        net_json = pp.to_json(net)
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            futures = [executor.submit(_run_hour_block_worker, net_json, *args) for args in block_args]
+            for future in futures:
+                summaries.extend(future.result())
+    else:
+        for args in block_args:
+            summaries.extend(run_hour_block(copy.deepcopy(net), *args))
+
+    hourly = pd.DataFrame(summaries, columns=HOURLY_SUMMARY_COLUMNS)
+    converged = hourly["converged"].astype(bool)
+    annual = {
+        "hours_simulated": int(len(hourly)),
+        "hours_converged": int(converged.sum()),
+        "hours_failed": [int(h) for h in hourly.loc[~converged, "hour"]],
+        # 1 h steps: W summed over hours → Wh
+        "pump_energy_kwh": float(hourly["pump_power_w"].sum() / 1000.0),
+        "heat_loss_kwh": float(hourly["heat_loss_w"].sum() / 1000.0),
+        "peak_pump_power_w": float(hourly["pump_power_w"].max()) if converged.any() else 0.0,
+    }
+
+    if PYARROW_AVAILABLE:
+        hourly.to_parquet(output_dir / "hourly_summary.parquet", index=False)
+    else:
+        hourly.to_csv(output_dir / "hourly_summary.csv", index=False)
+    (output_dir / "annual_summary.json").write_text(json.dumps(annual, indent=2))
+
+    return TimeSeriesResult(hourly=hourly, annual=annual, output_dir=output_dir)
@@ -11,6 +11,12 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import argparse
 
+try:
+    from src.lfa_load_matrix import lfa_building_summary
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import lfa_building_summary
+
 
 def load_json_safe(path: Path) -> Optional[Dict[str, Any]]:
     """Safely load JSON file, return None if not found or invalid."""
@@ -50,24 +56,19 @@ def extract_combined_metrics(root: Path) -> Dict[str, Any]:
     # LFA Metrics
     lfa_dir = root / "processed" / "lfa"
     if lfa_dir.exists():
-        json_files = list(lfa_dir.glob("*.json"))
-        total_heat_kwh = 0.0
-        building_data = []
-        
-        for json_file in json_files:
-            data = load_json_safe(json_file)
-            if data and "series" in data:
-                annual_kwh = sum(data["series"]) if isinstance(data["series"], list) else 0.0
-                total_heat_kwh += annual_kwh
-                building_data.append({
-                    "building_id": json_file.stem,
-                    "annual_heat_mwh": annual_kwh / 1000,
-                    "peak_demand_kw": max(data["series"]) if data["series"] else 0
-                })
+        per_building = lfa_building_summary(lfa_dir)
+        building_data = [
+            {
+                "building_id": row.building_id,
+                "annual_heat_mwh": float(row.annual_sum) / 1000,
+                "peak_demand_kw": float(row.peak),
+            }
+            for row in per_building.itertuples(index=False)
+        ]
         
         metrics["lfa"] = {
-            "total_buildings": len(json_files),
-            "total_annual_heat_mwh": total_heat_kwh / 1000,
+            "total_buildings": len(per_building),
+            "total_annual_heat_mwh": float(per_building["annual_sum"].sum()) / 1000,
             "building_data": building_data
         }
     
@@ -11,6 +11,12 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 import argparse
 
+try:
+    from src.lfa_load_matrix import lfa_building_summary
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import lfa_building_summary
+
 
 def load_json_safe(path: Path) -> Optional[Dict[str, Any]]:
     """Safely load JSON file, return None if not found or invalid."""
@@ -50,28 +56,20 @@ def extract_system_metrics(root: Path) -> Dict[str, Any]:
     # LFA Metrics
     lfa_dir = root / "processed" / "lfa"
     if lfa_dir.exists():
-        json_files = list(lfa_dir.glob("*.json"))
-        total_heat_kwh = 0.0
-        building_data = []
-        peak_thermal_kw = 0.0
-        
-        for json_file in json_files:
-            data = load_json_safe(json_file)
-            if data and "series" in data:
-                annual_kwh = sum(data["series"]) if isinstance(data["series"], list) else 0.0
-                peak_kw = max(data["series"]) if data["series"] else 0.0
-                total_heat_kwh += annual_kwh
-                peak_thermal_kw += peak_kw
-                building_data.append({
-                    "building_id": json_file.stem,
-                    "annual_heat_mwh": annual_kwh / 1000,
-                    "peak_demand_kw": peak_kw
-                })
+        per_building = lfa_building_summary(lfa_dir)
+        building_data = [
+            {
+                "building_id": row.building_id,
+                "annual_heat_mwh": float(row.annual_sum) / 1000,
+                "peak_demand_kw": float(row.peak),
+            }
+            for row in per_building.itertuples(index=False)
+        ]
         
         metrics["lfa"] = {
-            "total_buildings": len(json_files),
-            "total_annual_heat_mwh": total_heat_kwh / 1000,
-            "peak_thermal_kw": peak_thermal_kw,
+            "total_buildings": len(per_building),
+            "total_annual_heat_mwh": float(per_building["annual_sum"].sum()) / 1000,
+            "peak_thermal_kw": float(per_building["peak"].sum()),
             "building_data": building_data
         }
     
@@ -0,0 +1,197 @@
+"""
+Dataset Registry - Process-Wide Cache of Parsed District Datasets
+
+Agent tools create a fresh InteractiveDHA / CentralizedHeatingAgent on every
+call. The registry memoizes what those objects read from disk (GeoDataFrames,
+projected copies with their spatial index, JSON load profiles and derived
+structures such as street routers), so repeated questions about the same
+district skip all I/O and reprojection.
+
+Entries are keyed by resolved file path plus modification time and size, so a
+changed file is re-read on the next access. The registry is bounded by an
+estimated memory budget and evicts least recently used entries first
+(``BRANITZ_DATASET_CACHE_MB``, default 1024 MB).
+
+Cached objects are shared between callers and must be treated as read-only.
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+DEFAULT_MAX_MB = float(os.environ.get("BRANITZ_DATASET_CACHE_MB", 1024))
+
+_REGISTRY: Optional["DatasetRegistry"] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def file_state(path: Union[str, Path]) -> Tuple[str, int, int]:
+    """(resolved path, mtime_ns, size) of a file; the cache key of its datasets."""
+    path = Path(path)
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def estimate_size(value: Any) -> int:
+    """Rough in-memory size of a cached value in bytes."""
+    if hasattr(value, "memory_usage"):
+        try:
+            return int(value.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    nbytes: int
+    state: Optional[Tuple[str, int, int]] = None  # file state of the source file
+
+
+class DatasetRegistry:
+    """LRU cache of parsed datasets keyed by file state, bounded by memory."""
+
+    def __init__(self, max_mb: float = DEFAULT_MAX_MB):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        nbytes: Optional[int] = None,
+        state: Optional[Tuple[str, int, int]] = None
+    ) -> Any:
+        """
+        Cached value for a key, loading it on a miss.
+
+        Args:
+            key: Cache key (include the file state of every input file)
+            loader: Builds the value on a miss
+            nbytes: Memory estimate (default: estimate_size of the value)
+            state: file_state of the source file; entries of older states of
+                the same file are dropped when this one is stored
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].value
+
+        value = loader()
+        entry = _Entry(value, estimate_size(value) if nbytes is None else int(nbytes), state)
+
+        with self._lock:
+            self.misses += 1
+            if state is not None:
+                self._drop(lambda e: e.state is not None and e.state[0] == state[0] and e.state != state)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+        return value
+
+    def _drop(self, predicate: Callable[[_Entry], bool]):
+        for key in [k for k, entry in self._entries.items() if predicate(entry)]:
+            del self._entries[key]
+
+    def _evict(self):
+        total = self.nbytes
+        # Keep at least the newest entry, even if it exceeds the budget on its own
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.nbytes
+            self.evictions += 1
+
+    def read_geojson(self, path: Union[str, Path], crs=None):
+        """
+        GeoDataFrame of a vector file, optionally projected.
+
+        The projected copy is cached separately and its spatial index is built
+        once, so later ``.sindex`` queries on it are free.
+        """
+        state = file_state(path)
+        frame = self.get(("geojson", state), lambda: _read_file(path), state=state)
+        if crs is None or frame.crs is None:
+            return frame
+
+        from pyproj import CRS
+        target = CRS.from_user_input(crs)
+        if frame.crs == target:
+            return frame
+
+        def project():
+            projected = frame.to_crs(target)
+            projected.sindex  # noqa: B018 - build the spatial index once
+            return projected
+
+        return self.get(("geojson", state, target.to_string()), project, state=state)
+
+    def read_json(self, path: Union[str, Path]) -> Any:
+        """Parsed JSON file (e.g. load profiles, LV network data)."""
+        state = file_state(path)
+
+        def load():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        # Parsed JSON takes a few times the file size in memory
+        return self.get(("json", state), load, nbytes=state[2] * 4, state=state)
+
+    def derived(self, name: str, path: Union[str, Path], builder: Callable[[], Any], *params: Hashable) -> Any:
+        """Structure derived from one file (e.g. a street router), rebuilt when the file changes."""
+        state = file_state(path)
+        return self.get((name, state) + tuple(params), builder, state=state)
+
+    def invalidate(self, path: Optional[Union[str, Path]] = None):
+        """Drop all entries of one source file (or everything)."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            resolved = str(Path(path).resolve())
+            self._drop(lambda e: e.state is not None and e.state[0] == resolved)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_mb": round(self.nbytes / 1024 / 1024, 1),
+                "max_mb": round(self.max_bytes / 1024 / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _read_file(path: Union[str, Path]):
+    import geopandas as gpd
+    return gpd.read_file(path)
+
+
+def get_dataset_registry() -> DatasetRegistry:
+    """The registry shared by all tools and agent runners of this process."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = DatasetRegistry()
+        return _REGISTRY
@@ -7,13 +7,14 @@ Converts LFA heat series to electric loads and analyzes feeder utilization
 from __future__ import annotations
 import yaml
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import warnings
 
 warnings.filterwarnings("ignore")
 
-from .dha_adapter import load_lfa_series, load_weather_opt, heat_to_electric_kw
-from .dha_heuristic import aggregate_feeder_loads, write_outputs, run_heuristic_analysis
+from .dha_adapter import load_lfa_heat_matrix, load_weather_opt, hourly_temperatures, heat_to_electric_matrix
+from .dha_heuristic import aggregate_feeder_matrix, feeder_load_frame, top_n_peak_hours_matrix, write_outputs
 
 try:
     from .dha_pandapower import run_loadflow_for_hours
@@ -22,6 +23,10 @@ except ImportError:
     run_loadflow_for_hours = None
     PANDAPOWER_AVAILABLE = False
 
+from .dha_distflow import run_distflow_for_hours, screen_feeder_hours
+
+VOLTAGE_BACKENDS = ("heuristic", "pandapower", "distflow")
+
 def top_n_peak_hours(total_system_kw: pd.Series, n: int) -> list[int]:
     """Get top N peak hours from system load."""
     return list(total_system_kw.nlargest(n).index.astype(int))
@@ -47,6 +52,9 @@ def run(config_path: str = "configs/dha.yml") -> dict:
     eval_dir = cfg.get("eval_dir", "eval/dha")
     pp_enabled = bool(cfg.get("pandapower_enabled", False))
     top_n = int(cfg.get("top_n_hours", 10))
+    pp_workers = int(cfg.get("pandapower_workers", 1))
+    voltage_backend = cfg.get("voltage_backend") or ("pandapower" if pp_enabled else "heuristic")
+    distflow_margin = float(cfg.get("distflow_margin_pu", 0.01))
     
     print(f"📋 Configuration:")
     print(f"   LFA files: {lfa_glob}")
@@ -58,11 +66,17 @@ def run(config_path: str = "configs/dha.yml") -> dict:
     print(f"   Voltage limits: {v_min_pu:.2f} - {v_max_pu:.2f} pu")
     print(f"   Top N hours: {top_n}")
     print(f"   Pandapower enabled: {pp_enabled}")
+    print(f"   Voltage backend: {voltage_backend}")
     
     try:
+        if voltage_backend not in VOLTAGE_BACKENDS:
+            raise ValueError(f"Unknown voltage_backend '{voltage_backend}', expected one of {VOLTAGE_BACKENDS}")
+        
         # Step 1: Load inputs
         print("\n📁 Step 1: Loading inputs...")
-        lfa = load_lfa_series(lfa_glob)
+        print(f"📁 Loading LFA series from: {lfa_glob}")
+        lfa = load_lfa_heat_matrix(lfa_glob)
+        building_ids = lfa.building_ids
         weather = load_weather_opt(weather_path)
         
         # Check if topology file exists
@@ -71,7 +85,6 @@ def run(config_path: str = "configs/dha.yml") -> dict:
             print("   Creating sample topology for demonstration...")
             
             # Create sample topology
-            building_ids = lfa['building_id'].unique()
             sample_topo = pd.DataFrame({
                 'building_id': building_ids,
                 'feeder_id': [f'F{i//5 + 1}' for i in range(len(building_ids))],  # Group by 5
@@ -85,24 +98,42 @@ def run(config_path: str = "configs/dha.yml") -> dict:
         
         # Step 2: Convert heat to electric
         print("\n🔄 Step 2: Converting heat demand to electric load...")
-        lfa_el = heat_to_electric_kw(lfa, weather, bins, cop_default)
+        # Hours × buildings; COP once per hour, broadcast over buildings
+        p_kw, cop = heat_to_electric_matrix(
+            lfa.select(quantile="series"), hourly_temperatures(weather, lfa.n_hours), bins, cop_default
+        )
+        print(f"   COP range: {cop.min():.2f} to {cop.max():.2f}")
+        print(f"   Peak electric demand: {p_kw.max():.1f} kW")
         
         # Step 3: Aggregate per feeder & select top-N hours
         print("\n🔌 Step 3: Aggregating feeder loads...")
-        agg = aggregate_feeder_loads(lfa_el, topo)
+        feeder_kw, feeder_ids, ratings = aggregate_feeder_matrix(p_kw, building_ids, topo)
+        print(f"   Found {len(feeder_ids)} feeders")
         
-        # Select top N peak hours
-        total_system = agg.groupby('hour')['p_kw'].sum()
-        hours = top_n_peak_hours(total_system, top_n)
-        agg_peak = agg[agg['hour'].isin(hours)].copy()
+        # Select top N peak hours, build feeder-hour records only for those
+        hours = top_n_peak_hours_matrix(feeder_kw, top_n)
         
         print(f"   Selected top {len(hours)} peak hours: {hours}")
-        print(f"   Peak system load: {total_system.loc[hours[0]]:.1f} kW")
+        print(f"   Peak system load: {feeder_kw[hours[0]].sum():.1f} kW")
+        
+        if voltage_backend == "distflow":
+            # Screen all hours × feeders; near-limit hours join the analysed set
+            _, near = screen_feeder_hours(feeder_kw, (v_min_pu, v_max_pu), margin_pu=distflow_margin)
+            screened = [int(h) for h in np.flatnonzero(near.any(axis=1)) if h not in hours]
+            print(f"   LinDistFlow screening: {len(screened)} additional near-limit hours")
+            hours = hours + screened
+        
+        agg_peak = feeder_load_frame(feeder_kw, feeder_ids, ratings, hours)
         
         # Step 4: Optional pandapower voltage calculation
-        if pp_enabled and PANDAPOWER_AVAILABLE and run_loadflow_for_hours is not None:
+        if voltage_backend == "distflow":
+            print("\n⚡ Step 4: Running LinDistFlow voltage screening...")
+            agg_peak = run_distflow_for_hours(
+                agg_peak, (v_min_pu, v_max_pu), margin_pu=distflow_margin, workers=pp_workers
+            )
+        elif voltage_backend == "pandapower" and PANDAPOWER_AVAILABLE and run_loadflow_for_hours is not None:
             print("\n⚡ Step 4: Running pandapower load flow analysis...")
-            agg_peak = run_loadflow_for_hours(agg_peak, (v_min_pu, v_max_pu))
+            agg_peak = run_loadflow_for_hours(agg_peak, (v_min_pu, v_max_pu), workers=pp_workers)
         else:
             print("\n⚡ Step 4: Using heuristic voltage calculation...")
             # Use heuristic voltage calculation
@@ -119,7 +150,7 @@ def run(config_path: str = "configs/dha.yml") -> dict:
         
         # Summary statistics
         print("\n📊 DHA Analysis Summary:")
-        print(f"   Buildings analyzed: {len(lfa['building_id'].unique())}")
+        print(f"   Buildings analyzed: {len(building_ids)}")
         print(f"   Feeders: {len(agg_peak['feeder_id'].unique())}")
         print(f"   Peak hours analyzed: {len(hours)}")
         print(f"   Max utilization: {agg_peak['utilization_pct'].max():.1f}%")
@@ -139,8 +170,9 @@ def run(config_path: str = "configs/dha.yml") -> dict:
             "hours": hours,
             "feeder_loads": feeder_csv,
             "violations": viol_csv,
-            "pandapower": bool(pp_enabled and PANDAPOWER_AVAILABLE),
-            "buildings_analyzed": len(lfa['building_id'].unique()),
+            "pandapower": bool(voltage_backend == "pandapower" and PANDAPOWER_AVAILABLE),
+            "voltage_backend": voltage_backend,
+            "buildings_analyzed": len(building_ids),
             "feeders": len(agg_peak['feeder_id'].unique()),
             "max_utilization": float(agg_peak['utilization_pct'].max()),
             "voltage_range": [float(agg_peak['v_end_pu'].min()), float(agg_peak['v_end_pu'].max())]
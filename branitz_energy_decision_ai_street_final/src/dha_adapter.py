@@ -3,60 +3,41 @@
 DHA Adapter: Converts LFA heat series to electric loads using COP bins
 """
 
-import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import Optional, List, Dict
-import glob
+
+try:
+    from src.lfa_load_matrix import LoadMatrix, load_lfa_matrix
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import LoadMatrix, load_lfa_matrix
+
+def load_lfa_heat_matrix(lfa_glob: str) -> LoadMatrix:
+    """Load LFA series (load matrix store or JSON files) as an 8760 × buildings matrix."""
+    # One loader for the memory-mapped store and the per-building JSON files
+    lfa_dir = Path(lfa_glob).parent
+    pattern = Path(lfa_glob).name
+    pattern = pattern[:-len(".json")] if pattern.endswith(".json") else pattern
+    matrix = load_lfa_matrix(lfa_dir, pattern=pattern, hours_required=8760)
+    if matrix is None:
+        raise FileNotFoundError(f"No LFA files found matching: {lfa_glob}")
+    if matrix.n_hours != 8760:
+        raise ValueError(f"LFA load matrix has {matrix.n_hours} hours (expected 8760)")
+    
+    print(f"   Found {len(matrix.building_ids)} LFA buildings")
+    return matrix
 
 def load_lfa_series(lfa_glob: str) -> pd.DataFrame:
-    """Load LFA series from JSON files and convert to DataFrame."""
+    """Load LFA series (load matrix store or JSON files) and convert to DataFrame."""
     print(f"📁 Loading LFA series from: {lfa_glob}")
     
-    # Find all matching files
-    files = glob.glob(lfa_glob)
-    if not files:
-        raise FileNotFoundError(f"No LFA files found matching: {lfa_glob}")
+    matrix = load_lfa_heat_matrix(lfa_glob)
     
-    print(f"   Found {len(files)} LFA files")
-    
-    # Load each file and extract series
-    all_series = []
-    for file_path in files:
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Extract building ID from filename
-            building_id = Path(file_path).stem
-            
-            # Get the series data (8760 hours)
-            if 'series' in data:
-                series = data['series']
-                if len(series) == 8760:
-                    # Create DataFrame with building_id, hour, q_kw
-                    df = pd.DataFrame({
-                        'building_id': building_id,
-                        'hour': range(8760),
-                        'q_kw': series
-                    })
-                    all_series.append(df)
-                else:
-                    print(f"   ⚠️ Warning: {building_id} has {len(series)} hours (expected 8760)")
-            else:
-                print(f"   ⚠️ Warning: {building_id} missing 'series' key")
-                
-        except Exception as e:
-            print(f"   ❌ Error loading {file_path}: {e}")
-            continue
-    
-    if not all_series:
-        raise ValueError("No valid LFA series found")
-    
-    # Combine all series
-    result = pd.concat(all_series, ignore_index=True)
-    print(f"✅ Loaded {len(result)} building-hour records from {len(all_series)} buildings")
+    # Long format: building_id, hour, q_kw (8760 rows per building)
+    result = matrix.to_long(quantile="series", value_name="q_kw")
+    print(f"✅ Loaded {len(result)} building-hour records from {len(matrix.building_ids)} buildings")
     
     return result
 
@@ -80,6 +61,56 @@ def load_weather_opt(weather_path: Optional[str]) -> Optional[pd.DataFrame]:
         print(f"   ❌ Error loading weather: {e}")
         return None
 
+def cop_for_temps(temps: np.ndarray, bins: List[Dict], cop_default: float) -> np.ndarray:
+    """
+    COP per temperature from inclusive [t_min, t_max] bins.
+    
+    The first matching bin in list order wins (as for shared bin edges);
+    temperatures outside all bins or NaN get cop_default.
+    """
+    temps = np.asarray(temps, dtype=float)
+    cop = np.full(temps.shape, float(cop_default))
+    # Assign in reverse so that earlier bins overwrite later ones
+    for bin_info in reversed(bins):
+        in_bin = (bin_info['t_min'] <= temps) & (temps <= bin_info['t_max'])
+        cop[in_bin] = bin_info['cop']
+    return cop
+
+def hourly_temperatures(weather: Optional[pd.DataFrame], n_hours: int = 8760) -> Optional[np.ndarray]:
+    """Outdoor temperature per hour (NaN where weather has no row), or None without weather."""
+    if weather is None or 'T_out_c' not in weather.columns:
+        return None
+    temps = np.full(n_hours, np.nan)
+    hours = weather['hour'].to_numpy(dtype=np.int64)
+    valid = (hours >= 0) & (hours < n_hours)
+    temps[hours[valid]] = weather['T_out_c'].to_numpy(dtype=float)[valid]
+    return temps
+
+def heat_to_electric_matrix(
+    heat_kw: np.ndarray,
+    hourly_temps: Optional[np.ndarray],
+    bins: List[Dict],
+    cop_default: float
+) -> tuple:
+    """
+    Convert an hours × buildings heat matrix to electric load.
+    
+    COP is computed once per hour and broadcast over all buildings.
+    
+    Returns:
+        Tuple of (p_kw matrix, cop per hour); non-finite loads become 0
+    """
+    heat_kw = np.asarray(heat_kw, dtype=float)
+    if hourly_temps is None:
+        cop = np.full(heat_kw.shape[0], float(cop_default))
+    else:
+        cop = cop_for_temps(hourly_temps, bins, cop_default)
+    
+    # Convert heat to electric: P_el = Q_th / COP
+    p_kw = heat_kw / cop[:, None]
+    p_kw[~np.isfinite(p_kw)] = 0.0
+    return p_kw, cop
+
 def heat_to_electric_kw(
     lfa_df: pd.DataFrame, 
     weather: Optional[pd.DataFrame], 
@@ -95,23 +126,17 @@ def heat_to_electric_kw(
     if weather is not None and 'T_out_c' in weather.columns:
         print("   Using temperature-dependent COP bins")
         
-        # Merge weather data by hour
-        result = result.merge(weather[['hour', 'T_out_c']], on='hour', how='left')
-        
-        # Calculate COP based on temperature bins
-        def get_cop_for_temp(temp):
-            for bin_info in bins:
-                if bin_info['t_min'] <= temp <= bin_info['t_max']:
-                    return bin_info['cop']
-            return cop_default
-        
-        # Apply COP calculation
-        result['cop'] = result['T_out_c'].apply(get_cop_for_temp)
+        # COP once per hour, then looked up by each row's hour
+        hours = result['hour'].to_numpy(dtype=np.int64)
+        n_hours = int(max(hours.max(initial=-1), weather['hour'].max()) + 1)
+        temps = hourly_temperatures(weather, n_hours)
+        cop_by_hour = cop_for_temps(temps, bins, cop_default)
+        result['cop'] = cop_by_hour[hours]
         
         # Convert heat to electric: P_el = Q_th / COP
         result['p_kw'] = result['q_kw'] / result['cop']
         
-        print(f"   Temperature range: {result['T_out_c'].min():.1f}°C to {result['T_out_c'].max():.1f}°C")
+        print(f"   Temperature range: {np.nanmin(temps):.1f}°C to {np.nanmax(temps):.1f}°C")
         print(f"   COP range: {result['cop'].min():.2f} to {result['cop'].max():.2f}")
         
     else:
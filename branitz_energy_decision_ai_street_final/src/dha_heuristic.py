@@ -6,36 +6,112 @@ DHA Heuristic Backend: Fast feeder load aggregation and analysis
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Sequence
 import warnings
 
+try:
+    from scipy import sparse
+    SCIPY_SPARSE_AVAILABLE = True
+except ImportError:
+    SCIPY_SPARSE_AVAILABLE = False
+
 warnings.filterwarnings("ignore")
 
-def aggregate_feeder_loads(lfa_el: pd.DataFrame, topo: pd.DataFrame) -> pd.DataFrame:
-    """Aggregate electric loads by feeder and hour."""
-    print("🔌 Aggregating feeder loads...")
+def feeder_incidence(building_ids: Sequence, topo: pd.DataFrame) -> Tuple[object, np.ndarray, np.ndarray]:
+    """
+    Build the building → feeder incidence matrix.
     
-    # Merge topology with electric loads
-    merged = lfa_el.merge(topo, on='building_id', how='inner')
+    Args:
+        building_ids: Building order of the load matrix columns
+        topo: Topology with building_id, feeder_id, feeder_rating_kw
+        
+    Returns:
+        Tuple of (incidence (buildings × feeders, scipy CSR or dense), feeder_ids, feeder ratings in kW)
+    """
+    position = pd.Index([str(b) for b in building_ids])
+    if not position.is_unique:
+        raise ValueError("Building IDs of the load matrix are not unique")
+    rows = position.get_indexer(topo['building_id'].astype(str))
+    linked = topo[rows >= 0]
+    rows = rows[rows >= 0]
     
-    if merged.empty:
+    if linked.empty:
         raise ValueError("No buildings found in topology after merge")
     
-    print(f"   Found {len(merged['building_id'].unique())} buildings in topology")
-    print(f"   Found {len(merged['feeder_id'].unique())} feeders")
+    # Feeders in sorted order (as groupby), rating of each feeder's first building
+    cols, feeder_ids = pd.factorize(linked['feeder_id'], sort=True)
+    ratings = linked.groupby(cols)['feeder_rating_kw'].first().to_numpy(dtype=float)
+    shape = (len(position), len(feeder_ids))
+    
+    if SCIPY_SPARSE_AVAILABLE:
+        incidence = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+    else:
+        incidence = np.zeros(shape)
+        np.add.at(incidence, (rows, cols), 1.0)
+    
+    return incidence, np.asarray(feeder_ids), ratings
+
+def aggregate_feeder_matrix(
+    p_kw: np.ndarray,
+    building_ids: Sequence,
+    topo: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aggregate an hours × buildings electric load matrix per feeder.
+    
+    Returns:
+        Tuple of (feeder loads (hours × feeders), feeder_ids, feeder ratings in kW)
+    """
+    incidence, feeder_ids, ratings = feeder_incidence(building_ids, topo)
+    
+    # (feeders × buildings) @ (buildings × hours), transposed back to hours × feeders
+    feeder_kw = np.asarray(incidence.T @ np.asarray(p_kw, dtype=float).T).T
+    
+    return feeder_kw, feeder_ids, ratings
+
+def feeder_load_frame(
+    feeder_kw: np.ndarray,
+    feeder_ids: np.ndarray,
+    ratings: np.ndarray,
+    hours: Optional[Sequence[int]] = None
+) -> pd.DataFrame:
+    """Feeder-hour records (feeder_id, hour, p_kw, feeder_rating_kw, utilization_pct) for the given hours."""
+    hours = np.arange(feeder_kw.shape[0]) if hours is None else np.sort(np.asarray(hours, dtype=int))
+    loads = feeder_kw[hours]  # hours × feeders
     
-    # Aggregate by feeder and hour
-    agg = merged.groupby(['feeder_id', 'hour']).agg({
-        'p_kw': 'sum',
-        'feeder_rating_kw': 'first'  # Should be same for all buildings on same feeder
-    }).reset_index()
+    agg = pd.DataFrame({
+        'feeder_id': np.repeat(feeder_ids, len(hours)),
+        'hour': np.tile(hours, len(feeder_ids)),
+        'p_kw': loads.T.reshape(-1),
+        'feeder_rating_kw': np.repeat(ratings, len(hours))
+    })
     
     # Calculate utilization percentage
     agg['utilization_pct'] = (agg['p_kw'] / agg['feeder_rating_kw']) * 100
     
     # Handle any division by zero or invalid values
     agg = agg.replace([np.inf, -np.inf], np.nan)
-    agg = agg.dropna()
+    return agg.dropna().reset_index(drop=True)
+
+def aggregate_feeder_loads(lfa_el: pd.DataFrame, topo: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate electric loads by feeder and hour."""
+    print("🔌 Aggregating feeder loads...")
+    
+    # Pivot to hours × buildings, then one incidence product instead of a long merge
+    building_codes, building_ids = pd.factorize(lfa_el['building_id'].astype(str))
+    hour_codes, hour_values = pd.factorize(lfa_el['hour'].astype(int), sort=True)
+    values = lfa_el['p_kw'].to_numpy(dtype=float)
+    p_kw = np.zeros((len(hour_values), len(building_ids)))
+    np.add.at(p_kw, (hour_codes, building_codes), np.where(np.isnan(values), 0.0, values))
+    
+    feeder_kw, feeder_ids, ratings = aggregate_feeder_matrix(p_kw, building_ids, topo)
+    
+    n_linked = np.isin(building_ids, topo['building_id'].astype(str)).sum()
+    print(f"   Found {n_linked} buildings in topology")
+    print(f"   Found {len(feeder_ids)} feeders")
+    
+    agg = feeder_load_frame(feeder_kw, feeder_ids, ratings)
+    agg['hour'] = np.asarray(hour_values)[agg['hour'].to_numpy()]
     
     print(f"✅ Aggregated {len(agg)} feeder-hour records")
     print(f"   Peak utilization: {agg['utilization_pct'].max():.1f}%")
@@ -47,6 +123,19 @@ def top_n_peak_hours(total_system_kw: pd.Series, n: int) -> list[int]:
     """Get top N peak hours from system load."""
     return list(total_system_kw.nlargest(n).index.astype(int))
 
+def top_n_peak_hours_matrix(feeder_kw: np.ndarray, n: int) -> list[int]:
+    """Get top N peak hours (descending, earliest first on ties) from an hours × feeders matrix."""
+    total = feeder_kw.sum(axis=1)
+    n = min(n, len(total))
+    if n <= 0:
+        return []
+    # Partition for the N largest, then order only those
+    top = np.argpartition(-total, n - 1)[:n] if n < len(total) else np.arange(len(total))
+    threshold = total[top].min()
+    candidates = np.flatnonzero(total >= threshold)
+    order = np.lexsort((candidates, -total[candidates]))
+    return [int(h) for h in candidates[order][:n]]
+
 def calculate_heuristic_voltage_drops(
     agg: pd.DataFrame, 
     v_min_pu: float, 
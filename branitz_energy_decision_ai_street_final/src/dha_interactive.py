@@ -13,9 +13,8 @@ import folium
 import geopandas as gpd
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from shapely.geometry import Point, LineString
-from pyproj import Transformer
-import networkx as nx
+from shapely.geometry import LineString
+from pyproj import CRS, Transformer
 from shapely.ops import nearest_points
 import warnings
 
@@ -35,15 +34,31 @@ except ImportError:
     PANDAPOWER_AVAILABLE = False
     print("⚠️ Pandapower not available. Install with: pip install pandapower")
 
+try:
+    from src.dataset_registry import get_dataset_registry
+    from src.dha_street_routing import StreetRouter
+    from src.street_index import DEFAULT_BUILDINGS_GEOJSON, load_street_index
+except ImportError:
+    # Fallback for direct execution
+    from dataset_registry import get_dataset_registry
+    from dha_street_routing import StreetRouter
+    from street_index import DEFAULT_BUILDINGS_GEOJSON, load_street_index
+
 class InteractiveDHA:
     """Interactive DHA with comprehensive visualization and Pandapower integration."""
     
     def __init__(self, config_path: str = "configs/dha.yml"):
         """Initialize Interactive DHA with configuration."""
         self.config = yaml.safe_load(Path(config_path).read_text(encoding="utf-8"))
+        self.registry = get_dataset_registry()
         self.buildings = None
+        self.street_index = None
         self.power_infrastructure = {}
+        self.power_files = {}
         self.streets = None
+        self.streets_file = None
+        self.street_routers = {}
+        self.network_data = None
         self.load_profiles = {}
         self.power_metrics = {}
         
@@ -53,10 +68,11 @@ class InteractiveDHA:
         
         try:
             # Load buildings
-            buildings_file = "data/geojson/hausumringe_mit_adressenV3.geojson"
+            buildings_file = DEFAULT_BUILDINGS_GEOJSON
             if Path(buildings_file).exists():
-                self.buildings = gpd.read_file(buildings_file)
+                self.buildings = self.registry.read_geojson(buildings_file)
                 print(f"   ✅ Loaded {len(self.buildings)} buildings")
+                self._load_street_index(buildings_file)
             else:
                 print(f"   ⚠️ Buildings file not found: {buildings_file}")
                 return False
@@ -76,6 +92,19 @@ class InteractiveDHA:
             print(f"   ❌ Error loading data: {e}")
             return False
     
+    def _load_street_index(self, buildings_file: str):
+        """Load the district street index (row offsets match self.buildings)."""
+        try:
+            index = load_street_index(buildings_file)
+        except Exception as e:
+            print(f"   ⚠️ Street index not available, scanning addresses instead: {e}")
+            return
+        if index.n_buildings == len(self.buildings):
+            self.street_index = index
+            print(f"   ✅ Street index: {len(index.streets)} streets")
+        else:
+            print("   ⚠️ Street index does not match building rows, scanning addresses instead")
+    
     def _load_power_infrastructure(self):
         """Load power infrastructure data."""
         print("   🔌 Loading power infrastructure...")
@@ -90,7 +119,8 @@ class InteractiveDHA:
         
         for infra_type, file_path in power_files.items():
             if Path(file_path).exists():
-                self.power_infrastructure[infra_type] = gpd.read_file(file_path)
+                self.power_files[infra_type] = file_path
+                self.power_infrastructure[infra_type] = self.registry.read_geojson(file_path)
                 print(f"      ✅ Loaded {len(self.power_infrastructure[infra_type])} {infra_type}")
             else:
                 print(f"      ⚠️ {infra_type} file not found: {file_path}")
@@ -103,11 +133,14 @@ class InteractiveDHA:
         
         streets_file = "agents copy/street_final_copy_3/results_test/streets.geojson"
         if Path(streets_file).exists():
-            self.streets = gpd.read_file(streets_file)
+            self.streets = self.registry.read_geojson(streets_file)
+            self.streets_file = streets_file
             print(f"      ✅ Loaded {len(self.streets)} street segments")
         else:
             print(f"      ⚠️ Streets file not found: {streets_file}")
             self.streets = None
+            self.streets_file = None
+        self.street_routers = {}
     
     def _load_load_profiles(self):
         """Load building load profiles."""
@@ -115,8 +148,7 @@ class InteractiveDHA:
         
         load_profiles_file = "thesis-data-2/power-sim/gebaeude_lastphasenV2.json"
         if Path(load_profiles_file).exists():
-            with open(load_profiles_file, "r") as f:
-                self.load_profiles = json.load(f)
+            self.load_profiles = self.registry.read_json(load_profiles_file)
             print(f"      ✅ Loaded load profiles for {len(self.load_profiles)} buildings")
         else:
             print(f"      ⚠️ Load profiles file not found: {load_profiles_file}")
@@ -130,6 +162,16 @@ class InteractiveDHA:
             print("   ❌ No buildings loaded")
             return gpd.GeoDataFrame()
         
+        if self.street_index is not None:
+            # Row offsets of all streets containing the name
+            offsets = self.street_index.search(street_name)
+            if offsets:
+                result = self.buildings.iloc[offsets]
+                print(f"   ✅ Found {len(result)} buildings on {street_name}")
+                return result
+            print(f"   ⚠️ No buildings found on {street_name}")
+            return gpd.GeoDataFrame()
+        
         # Filter buildings by street name in address data
         street_buildings = []
         for idx, building in self.buildings.iterrows():
@@ -169,6 +211,13 @@ class InteractiveDHA:
         
         return False
     
+    def _infrastructure_in(self, infra_type: str, crs) -> gpd.GeoDataFrame:
+        """Infrastructure layer in a CRS (projected copies are shared through the dataset registry)."""
+        file_path = self.power_files.get(infra_type)
+        if file_path and Path(file_path).exists():
+            return self.registry.read_geojson(file_path, crs=crs)
+        return self.power_infrastructure[infra_type].to_crs(crs)
+    
     def compute_proximity_analysis(self, buildings: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """Compute proximity analysis for buildings."""
         print("📏 Computing proximity analysis...")
@@ -190,7 +239,7 @@ class InteractiveDHA:
         # Reproject infrastructure to same CRS
         for infra_type, infra_data in self.power_infrastructure.items():
             if not infra_data.empty:
-                self.power_infrastructure[infra_type] = infra_data.to_crs(utm_crs)
+                self.power_infrastructure[infra_type] = self._infrastructure_in(infra_type, utm_crs)
         
         buildings = buildings.copy()
         buildings["centroid"] = buildings.geometry.centroid
@@ -250,40 +299,33 @@ class InteractiveDHA:
         
         infra = gpd.GeoDataFrame(pd.concat(infra_list, ignore_index=True))
         
-        # Create street network if available
-        G = None
+        # Street routing graph (cached per street layer and CRS)
+        router = None
         if self.streets is not None:
-            G = self._create_street_network()
-        
-        service_lines = []
-        nearest_infra_types = []
-        distances = []
-        routing_methods = []
-        
-        for idx, building in buildings.iterrows():
-            building_centroid = building.geometry.centroid
-            
-            # Find nearest infrastructure
-            nearest_idx = infra.distance(building_centroid).idxmin()
-            nearest_geom = infra.loc[nearest_idx].geometry
-            infra_type = infra.loc[nearest_idx].get("power", "infrastructure")
-            
-            if G is not None:
-                # Use street-following routing
-                service_line, distance, method = self._compute_street_following_connection(
-                    building_centroid, nearest_geom, G
-                )
-            else:
-                # Use straight-line connection
-                nearest_point = nearest_points(building_centroid, nearest_geom)[1]
-                service_line = LineString([building_centroid, nearest_point])
-                distance = building_centroid.distance(nearest_point)
-                method = "straight_line"
-            
-            service_lines.append(service_line)
-            nearest_infra_types.append(infra_type)
-            distances.append(distance)
-            routing_methods.append(method)
+            router = self.get_street_router(buildings.crs)
+        
+        centroids = buildings.geometry.centroid
+        if router is not None and router.n_nodes > 0:
+            # Street-following routing for all buildings in one multi-source Dijkstra
+            routes = router.route_service_lines(centroids.values, infra)
+            service_lines = routes.lines
+            distances = list(routes.distances)
+            routing_methods = routes.methods
+            infra_rows = routes.infra_positions
+        else:
+            # Straight-line connection to the nearest infrastructure
+            infra_rows = infra.sindex.nearest(centroids.values, return_all=False)[1]
+            service_lines, distances = [], []
+            for building_centroid, row in zip(centroids.values, infra_rows):
+                nearest_point = nearest_points(building_centroid, infra.geometry.iloc[row])[1]
+                service_lines.append(LineString([building_centroid, nearest_point]))
+                distances.append(building_centroid.distance(nearest_point))
+            routing_methods = ["straight_line"] * len(service_lines)
+        
+        if "power" in infra.columns:
+            nearest_infra_types = infra["power"].iloc[infra_rows].fillna("infrastructure").tolist()
+        else:
+            nearest_infra_types = ["infrastructure"] * len(service_lines)
         
         # Add service line information to buildings
         buildings = buildings.copy()
@@ -295,111 +337,23 @@ class InteractiveDHA:
         print(f"   ✅ Computed {len(service_lines)} service lines")
         return buildings
     
-    def _create_street_network(self) -> nx.Graph:
-        """Create NetworkX graph from street data."""
-        G = nx.Graph()
-        
-        if self.streets is None or self.streets.empty:
-            return G
-        
-        # Add street segments as edges
-        for idx, street in self.streets.iterrows():
-            coords = list(street.geometry.coords)
-            for i in range(len(coords) - 1):
-                node1 = f"street_{idx}_{i}"
-                node2 = f"street_{idx}_{i+1}"
-                
-                # Add nodes with positions
-                G.add_node(node1, pos=coords[i], node_type="street")
-                G.add_node(node2, pos=coords[i + 1], node_type="street")
-                
-                # Add edge with length as weight
-                length = Point(coords[i]).distance(Point(coords[i + 1]))
-                G.add_edge(node1, node2, weight=length, edge_type="street", length=length)
-        
-        # Connect nearby street nodes
-        node_positions = [G.nodes[n]["pos"] for n in G.nodes() if G.nodes[n]["node_type"] == "street"]
-        node_names = [n for n in G.nodes() if G.nodes[n]["node_type"] == "street"]
-        node_points = [Point(pos) for pos in node_positions]
-        
-        for i, point in enumerate(node_points):
-            for j, other_point in enumerate(node_points):
-                if i != j and not G.has_edge(node_names[i], node_names[j]):
-                    dist = point.distance(other_point)
-                    if dist < 5.0:  # Connect nodes within 5m
-                        G.add_edge(
-                            node_names[i], node_names[j],
-                            weight=dist, edge_type="connection", length=dist
-                        )
-        
-        print(f"   ✅ Created street network with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
-        return G
-    
-    def _compute_street_following_connection(self, building_centroid, nearest_geom, G):
-        """Compute street-following connection between building and infrastructure."""
-        # Find nearest street nodes
-        building_nearest_street = None
-        min_building_distance = float("inf")
-        
-        for node in G.nodes():
-            if G.nodes[node]["node_type"] == "street":
-                node_pos = G.nodes[node]["pos"]
-                node_point = Point(node_pos)
-                distance = building_centroid.distance(node_point)
-                if distance < min_building_distance:
-                    min_building_distance = distance
-                    building_nearest_street = node
-        
-        infra_nearest_street = None
-        min_infra_distance = float("inf")
-        
-        for node in G.nodes():
-            if G.nodes[node]["node_type"] == "street":
-                node_pos = G.nodes[node]["pos"]
-                node_point = Point(node_pos)
-                distance = nearest_geom.centroid.distance(node_point)
-                if distance < min_infra_distance:
-                    min_infra_distance = distance
-                    infra_nearest_street = node
-        
-        # Find shortest path
-        if building_nearest_street and infra_nearest_street:
-            try:
-                path = nx.shortest_path(G, building_nearest_street, infra_nearest_street, weight="weight")
-                
-                # Create path geometry
-                path_coords = []
-                for node in path:
-                    node_pos = G.nodes[node]["pos"]
-                    path_coords.append(node_pos)
-                
-                # Create complete path: building -> street -> infrastructure
-                building_point = (building_centroid.x, building_centroid.y)
-                infra_point = (nearest_geom.centroid.x, nearest_geom.centroid.y)
-                complete_coords = [building_point] + path_coords + [infra_point]
-                service_line = LineString(complete_coords)
-                
-                # Calculate total distance
-                total_distance = 0
-                for i in range(len(complete_coords) - 1):
-                    p1 = Point(complete_coords[i])
-                    p2 = Point(complete_coords[i + 1])
-                    total_distance += p1.distance(p2)
-                
-                return service_line, total_distance, "street_following"
-                
-            except nx.NetworkXNoPath:
-                # Fallback to straight line
-                nearest_point = nearest_points(building_centroid, nearest_geom)[1]
-                service_line = LineString([building_centroid, nearest_point])
-                distance = building_centroid.distance(nearest_point)
-                return service_line, distance, "straight_line_fallback"
-        
-        # Fallback to straight line
-        nearest_point = nearest_points(building_centroid, nearest_geom)[1]
-        service_line = LineString([building_centroid, nearest_point])
-        distance = building_centroid.distance(nearest_point)
-        return service_line, distance, "straight_line_fallback"
+    def get_street_router(self, crs=None) -> StreetRouter:
+        """Street routing graph in the given CRS, built once per loaded street layer."""
+        key = CRS.from_user_input(crs).to_string() if crs is not None else None
+        if key not in self.street_routers:
+            def build():
+                streets = self.streets
+                if crs is not None and streets.crs is not None and streets.crs != CRS.from_user_input(crs):
+                    streets = streets.to_crs(crs)
+                router = StreetRouter(streets, connect_radius_m=5.0)
+                print(f"   ✅ Created street network with {router.n_nodes} nodes and {router.n_edges} edges")
+                return router
+            
+            if self.streets_file and Path(self.streets_file).exists():
+                self.street_routers[key] = self.registry.derived("dha_street_router", self.streets_file, build, key)
+            else:
+                self.street_routers[key] = build()
+        return self.street_routers[key]
     
     def run_pandapower_analysis(self, buildings: gpd.GeoDataFrame, scenario: str = "winter_werktag_abendspitze") -> Dict:
         """Run comprehensive Pandapower analysis."""
@@ -413,15 +367,16 @@ class InteractiveDHA:
             print("   ❌ No buildings to analyze")
             return {}
         
-        # Load network data
+        # Load network data (parsed once per process)
         network_json_path = Path("thesis-data-2/power-sim/branitzer_siedlung_ns_v3_ohne_UW.json")
-        if not network_json_path.exists():
+        if self.network_data is None and not network_json_path.exists():
             print(f"   ⚠️ Network JSON file not found: {network_json_path}")
             return {}
         
         try:
-            with open(network_json_path, "r") as f:
-                network_data = json.load(f)
+            if self.network_data is None:
+                self.network_data = self.registry.read_json(network_json_path)
+            network_data = self.network_data
             
             # Create pandapower network
             net = self._create_pandapower_network(network_data)
@@ -624,7 +579,7 @@ class InteractiveDHA:
         """Add power infrastructure to map."""
         # Add power lines
         if "lines" in self.power_infrastructure and not self.power_infrastructure["lines"].empty:
-            lines_wgs84 = self.power_infrastructure["lines"].to_crs(epsg=4326)
+            lines_wgs84 = self._infrastructure_in("lines", "EPSG:4326")
             for _, row in lines_wgs84.iterrows():
                 if row.geometry.geom_type == "LineString":
                     coords = list(row.geometry.coords)
@@ -635,7 +590,7 @@ class InteractiveDHA:
         
         # Add substations
         if "substations" in self.power_infrastructure and not self.power_infrastructure["substations"].empty:
-            substations_wgs84 = self.power_infrastructure["substations"].to_crs(epsg=4326)
+            substations_wgs84 = self._infrastructure_in("substations", "EPSG:4326")
             for _, row in substations_wgs84.iterrows():
                 centroid = row.geometry.centroid
                 folium.CircleMarker(
@@ -645,7 +600,7 @@ class InteractiveDHA:
         # Add plants and generators
         for infra_type, color in [("plants", "green"), ("generators", "purple")]:
             if infra_type in self.power_infrastructure and not self.power_infrastructure[infra_type].empty:
-                infra_wgs84 = self.power_infrastructure[infra_type].to_crs(epsg=4326)
+                infra_wgs84 = self._infrastructure_in(infra_type, "EPSG:4326")
                 for _, row in infra_wgs84.iterrows():
                     centroid = row.geometry.centroid
                     folium.CircleMarker(
@@ -836,6 +791,9 @@ class InteractiveDHA:
         if self.buildings is None:
             return []
         
+        if self.street_index is not None:
+            return self.street_index.street_names()
+        
         streets = set()
         for idx, building in self.buildings.iterrows():
             if 'adressen' in building and pd.notna(building['adressen']):
@@ -852,22 +810,29 @@ class InteractiveDHA:
         
         return sorted(list(streets))
     
-    def run_comprehensive_analysis(self, street_name: str, scenario: str = "winter_werktag_abendspitze") -> Dict:
-        """Run comprehensive DHA analysis for a street."""
+    def run_comprehensive_analysis(self, street_name: str, scenario: str = "winter_werktag_abendspitze",
+                                   buildings: Optional[gpd.GeoDataFrame] = None) -> Dict:
+        """
+        Run comprehensive DHA analysis for a street.
+        
+        `buildings` are the street's buildings if the caller already selected
+        them (default: filter_buildings_for_street).
+        """
         print(f"🚀 Running comprehensive DHA analysis for {street_name}")
         print("=" * 60)
         
-        # Create output directory
-        output_dir = Path("processed/dha") / street_name.replace(" ", "_")
+        # Create output directory (one per scenario, so scenario results do not overwrite each other)
+        output_dir = Path("processed/dha") / street_name.replace(" ", "_") / scenario
         output_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Load data
-            if not self.load_data():
+            # Load data (skipped when already loaded, e.g. by the district batch runner)
+            if self.buildings is None and not self.load_data():
                 return {"status": "error", "message": "Failed to load data"}
             
             # Filter buildings for street
-            buildings = self.filter_buildings_for_street(street_name)
+            if buildings is None:
+                buildings = self.filter_buildings_for_street(street_name)
             if buildings.empty:
                 return {"status": "error", "message": f"No buildings found on {street_name}"}
             
@@ -1,104 +1,175 @@
 #!/usr/bin/env python3
 """
 DHA Pandapower Backend: Optional accurate load flow analysis
+
+Each feeder is modelled once (ext grid -> line -> load bus) and then solved
+hour by hour: only ``net.load.p_mw`` changes between runs, and every run is
+warm-started from the previous voltages (``init='results'``). Voltages go into
+preallocated arrays, so every hour gets its own load flow result. Independent
+feeders can run in parallel worker processes.
 """
 
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, Optional, Tuple
 import warnings
 
 warnings.filterwarnings("ignore")
 
+# Simple one-line LV feeder model
+DEFAULT_FEEDER_LINE = {
+    "length_km": 0.1,  # Assume 100m line
+    "r_ohm_per_km": 0.1,  # Typical LV cable
+    "x_ohm_per_km": 0.08,
+    "c_nf_per_km": 250,
+    "max_i_ka": 0.5,
+}
+
+
+def build_feeder_net(feeder_id, line: Optional[Dict] = None):
+    """Create the feeder network (Bus -> Line -> Bus) with one load at the LV bus."""
+    import pandapower as pp
+
+    net = pp.create_empty_network()
+
+    # Create buses
+    pp.create_bus(net, vn_kv=0.4, name=f"HV_{feeder_id}")
+    pp.create_bus(net, vn_kv=0.4, name=f"LV_{feeder_id}")
+
+    # Create external grid (infinite bus)
+    pp.create_ext_grid(net, bus=0, vm_pu=1.0, va_degree=0.0)
+
+    # Create line (simple model)
+    pp.create_line_from_parameters(net, from_bus=0, to_bus=1, **(line or DEFAULT_FEEDER_LINE))
+
+    # One load, updated in place for every hour
+    pp.create_load(net, bus=1, p_mw=0.0, name=f"Load_{feeder_id}")
+    return net
+
+
+def run_feeder_timeseries(
+    feeder_id,
+    p_kw: np.ndarray,
+    line: Optional[Dict] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run one load flow per hour on a single feeder model.
+
+    Args:
+        feeder_id: Feeder identifier (for naming only)
+        p_kw: Feeder load per hour (kW)
+        line: Line parameters (default: DEFAULT_FEEDER_LINE)
+
+    Returns:
+        Tuple of (v_end_pu, converged) arrays, one entry per hour; v_end_pu is
+        NaN where the load flow did not converge
+    """
+    import pandapower as pp
+
+    net = build_feeder_net(feeder_id, line)
+    p_mw = np.asarray(p_kw, dtype=float) / 1000.0
+    v_end_pu = np.full(len(p_mw), np.nan)
+    converged = np.zeros(len(p_mw), dtype=bool)
+
+    init = "auto"
+    for i, p in enumerate(p_mw):
+        net.load.at[0, "p_mw"] = p
+        try:
+            pp.runpp(net, algorithm="nr", max_iteration=20, init=init)
+        except Exception:
+            # Restart from a fresh initialisation after a failed hour
+            init = "auto"
+            continue
+        v_end_pu[i] = net.res_bus.vm_pu.iat[1]  # LV bus
+        converged[i] = True
+        init = "results"  # Warm start from this hour's voltages
+
+    return v_end_pu, converged
+
+
+def _feeder_task(task: Tuple) -> Tuple:
+    """Process-pool entry point: (feeder_id, positions, p_kw, line) -> results."""
+    feeder_id, positions, p_kw, line = task
+    v_end_pu, converged = run_feeder_timeseries(feeder_id, p_kw, line)
+    return feeder_id, positions, v_end_pu, converged
+
+
 def run_loadflow_for_hours(
-    agg: pd.DataFrame, 
-    voltage_limits: Tuple[float, float]
+    agg: pd.DataFrame,
+    voltage_limits: Tuple[float, float],
+    workers: int = 1,
+    line: Optional[Dict] = None
 ) -> pd.DataFrame:
-    """Run pandapower load flow analysis for selected hours."""
+    """
+    Run pandapower load flow analysis for selected hours.
+
+    Args:
+        agg: Feeder loads (feeder_id, hour, p_kw, utilization_pct), one row per feeder-hour
+        voltage_limits: (v_min_pu, v_max_pu)
+        workers: Worker processes across feeders (1 = in-process)
+        line: Feeder line parameters (default: DEFAULT_FEEDER_LINE)
+
+    Returns:
+        Copy of agg with v_end_pu and v_violation per feeder-hour
+    """
     print("⚡ Running pandapower load flow analysis...")
-    
+
     v_min_pu, v_max_pu = voltage_limits
-    
+
     try:
-        import pandapower as pp
-        
+        import pandapower  # noqa: F401
+
         print("   ✅ Pandapower imported successfully")
-        
-        # Create a simple network model for each feeder
+
         result = agg.copy()
-        
-        # For each unique feeder, create a simple one-line model
-        for feeder_id in result['feeder_id'].unique():
-            feeder_data = result[result['feeder_id'] == feeder_id]
-            
-            # Create simple network: Bus -> Line -> Bus
-            net = pp.create_empty_network()
-            
-            # Create buses
-            pp.create_bus(net, vn_kv=0.4, name=f"HV_{feeder_id}")
-            pp.create_bus(net, vn_kv=0.4, name=f"LV_{feeder_id}")
-            
-            # Create external grid (infinite bus)
-            pp.create_ext_grid(net, bus=0, vm_pu=1.0, va_degree=0.0)
-            
-            # Create line (simple model)
-            pp.create_line_from_parameters(
-                net, from_bus=0, to_bus=1,
-                length_km=0.1,  # Assume 100m line
-                r_ohm_per_km=0.1,  # Typical LV cable
-                x_ohm_per_km=0.08,
-                c_nf_per_km=250,
-                max_i_ka=0.5
-            )
-            
-            # Create loads for each hour
-            for _, row in feeder_data.iterrows():
-                hour = row['hour']
-                p_kw = row['p_kw']
-                
-                # Create load
-                pp.create_load(net, bus=1, p_mw=p_kw/1000, name=f"Load_{feeder_id}_H{hour}")
-            
-            try:
-                # Run load flow
-                pp.runpp(net, algorithm='nr', max_iteration=20)
-                
-                # Extract results
-                for _, row in feeder_data.iterrows():
-                    hour = row['hour']
-                    mask = (result['feeder_id'] == feeder_id) & (result['hour'] == hour)
-                    
-                    # Get voltage at load bus
-                    v_pu = net.res_bus.vm_pu.iloc[1]  # LV bus
-                    result.loc[mask, 'v_end_pu'] = v_pu
-                    
-                    # Check for violations
-                    result.loc[mask, 'v_violation'] = (v_pu < v_min_pu) or (v_pu > v_max_pu)
-                
-                print(f"   ✅ Feeder {feeder_id}: Load flow converged")
-                
-            except Exception as e:
-                print(f"   ⚠️ Feeder {feeder_id}: Load flow failed ({e}), using heuristic")
-                
-                # Fall back to heuristic for this feeder
-                feeder_mask = result['feeder_id'] == feeder_id
-                result.loc[feeder_mask, 'v_end_pu'] = 1.0 - (result.loc[feeder_mask, 'utilization_pct'] / 100) * 0.2
-                result.loc[feeder_mask, 'v_violation'] = (
-                    (result.loc[feeder_mask, 'v_end_pu'] < v_min_pu) | 
-                    (result.loc[feeder_mask, 'v_end_pu'] > v_max_pu)
-                )
-        
+
+        # One task per feeder, hours in chronological order for warm starts
+        order = np.lexsort((result['hour'].to_numpy(), result['feeder_id'].astype(str).to_numpy()))
+        feeder_ids = result['feeder_id'].to_numpy()[order]
+        p_kw = result['p_kw'].to_numpy(dtype=float)[order]
+        starts = np.flatnonzero(np.r_[True, feeder_ids[1:] != feeder_ids[:-1]])
+        bounds = np.r_[starts, len(order)]
+        tasks = [
+            (feeder_ids[a], order[a:b], p_kw[a:b], line)
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+
+        v_end_pu = np.full(len(result), np.nan)
+        converged = np.zeros(len(result), dtype=bool)
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                feeder_results = list(pool.map(_feeder_task, tasks))
+        else:
+            feeder_results = [_feeder_task(task) for task in tasks]
+
+        for feeder_id, positions, feeder_v, feeder_ok in feeder_results:
+            v_end_pu[positions] = feeder_v
+            converged[positions] = feeder_ok
+            if feeder_ok.all():
+                print(f"   ✅ Feeder {feeder_id}: Load flow converged for {len(positions)} hours")
+            else:
+                print(f"   ⚠️ Feeder {feeder_id}: {int((~feeder_ok).sum())} hours failed, using heuristic")
+
+        # Fall back to heuristic for hours that did not converge
+        heuristic = 1.0 - (result['utilization_pct'].to_numpy(dtype=float) / 100) * 0.2
+        v_end_pu = np.where(converged, v_end_pu, heuristic)
+
+        result['v_end_pu'] = v_end_pu
+        result['v_violation'] = (v_end_pu < v_min_pu) | (v_end_pu > v_max_pu)
+
         print(f"   Voltage range: {result['v_end_pu'].min():.3f} to {result['v_end_pu'].max():.3f} pu")
         print(f"   Voltage violations: {result['v_violation'].sum()} records")
-        
+
         return result
-        
+
     except ImportError:
         print("   ⚠️ Pandapower not available, skipping load flow analysis")
         print("   Install with: pip install pandapower")
         return agg
-    
+
     except Exception as e:
         print(f"   ❌ Pandapower analysis failed: {e}")
         print("   Falling back to heuristic voltage calculation")
@@ -107,7 +178,7 @@ def run_loadflow_for_hours(
 if __name__ == "__main__":
     # Test the pandapower backend
     print("🧪 Testing DHA Pandapower Backend...")
-    
+
     # Sample data
     sample_agg = pd.DataFrame({
         'feeder_id': ['F1', 'F1', 'F2', 'F2'],
@@ -115,11 +186,11 @@ if __name__ == "__main__":
         'p_kw': [20.0, 25.0, 15.0, 18.0],
         'utilization_pct': [40.0, 50.0, 30.0, 36.0]
     })
-    
+
     try:
         result = run_loadflow_for_hours(sample_agg, (0.90, 1.10))
         print("\n📊 Sample pandapower result:")
         print(result)
-        
+
     except Exception as e:
         print(f"❌ Test failed: {e}")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+District Batch Runner: CHA + DHA + EAA for many streets in one worker pool
+
+The district datasets are loaded once in the parent process: buildings, the
+street index, power infrastructure, street routing graph and load profiles
+(InteractiveDHA), the connected CHA street graph with the snapped plant, and
+the memory-mapped LFA load matrix. Worker processes are forked from the parent
+and inherit these structures, so each street only pays for its own routing,
+power flow and economics. All street results are written to one table.
+
+Usage:
+    python -m src.district_batch --streets "An der Bahn,Parkstraße" --workers 4
+    python -m src.district_batch --all --workers 8
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+import copy
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+import warnings
+
+import pandas as pd
+
+try:
+    from src.cha import CentralizedHeatingAgent
+    from src.cha_network_tables import build_network_tables, write_network_tables
+    from src.dha_interactive import InteractiveDHA
+    from src.eaa import EAAConfig, _read_yaml, street_economics
+    from src.lfa_load_matrix import LoadMatrix, load_lfa_matrix
+except ImportError:
+    # Fallback for direct execution
+    from cha import CentralizedHeatingAgent
+    from cha_network_tables import build_network_tables, write_network_tables
+    from dha_interactive import InteractiveDHA
+    from eaa import EAAConfig, _read_yaml, street_economics
+    from lfa_load_matrix import LoadMatrix, load_lfa_matrix
+
+warnings.filterwarnings("ignore")
+
+DEFAULT_SCENARIO = "winter_werktag_abendspitze"
+DEFAULT_OUTPUT_DIR = "processed/batch"
+RESULTS_FILE = "district_results.csv"
+
+RESULT_COLUMNS = [
+    "street_name", "status", "error", "n_buildings",
+    "annual_heat_mwh", "peak_heat_kw",
+    "dh_main_length_km", "dh_service_length_m", "dh_capex_eur",
+    "dh_lcoh_eur_per_mwh", "dh_lcoh_p2_5", "dh_lcoh_p97_5", "dh_co2_kg_per_mwh",
+    "hp_buildings_analyzed", "hp_min_voltage_pu", "hp_max_voltage_pu", "hp_max_transformer_loading_pct",
+    "cha_output_dir", "dha_output_dir", "elapsed_s",
+]
+
+# District data of this process; set in the parent before forking the workers
+_DISTRICT: Optional["DistrictData"] = None
+
+
+@dataclass
+class DistrictData:
+    """District datasets and derived structures shared by all street tasks."""
+    dha: InteractiveDHA
+    cha: Optional[CentralizedHeatingAgent]
+    load_matrix: Optional[LoadMatrix]
+    eaa_config: EAAConfig
+    scenario: str = DEFAULT_SCENARIO
+
+    def street_names(self) -> List[str]:
+        return self.dha.get_available_streets()
+
+
+def load_district(
+    dha_config: str = "configs/dha.yml",
+    cha_config: str = "configs/cha.yml",
+    eaa_config: str = "configs/eaa.yml",
+    lfa_dir: str = "processed/lfa",
+    scenario: str = DEFAULT_SCENARIO
+) -> DistrictData:
+    """Load the district datasets once and precompute the shared structures."""
+    print("🏘️ Loading district data for batch analysis...")
+
+    dha = InteractiveDHA(dha_config)
+    if not dha.load_data():
+        raise RuntimeError("Failed to load district data for DHA")
+    if dha.streets is not None:
+        # Street routing graph in the CRS the proximity analysis projects buildings to
+        crs = dha.buildings.crs
+        dha.get_street_router(crs if crs is not None and not crs.is_geographic else "EPSG:32633")
+
+    cha = CentralizedHeatingAgent(cha_config)
+    if cha.load_data():
+        # Project streets once; every street task reuses the connected graph
+        if cha.streets_gdf.crs is None or cha.streets_gdf.crs.is_geographic:
+            cha.streets_gdf = cha.streets_gdf.to_crs("EPSG:32633")
+        cha.buildings_gdf = None
+        cha.build_connected_street_network()
+    else:
+        print("   ⚠️ CHA street network not available, skipping district heating")
+        cha = None
+
+    load_matrix = load_lfa_matrix(lfa_dir)
+    if load_matrix is None:
+        print(f"   ⚠️ No LFA forecasts in {lfa_dir}, using CHA heat demand defaults")
+
+    eaa_cfg = EAAConfig(**_read_yaml(eaa_config)) if Path(eaa_config).exists() else EAAConfig()
+
+    print("✅ District data loaded")
+    return DistrictData(dha=dha, cha=cha, load_matrix=load_matrix, eaa_config=eaa_cfg, scenario=scenario)
+
+
+def _street_buildings(district: DistrictData, street_name: str):
+    """Buildings with an address on the street (rows of the district buildings)."""
+    dha = district.dha
+    if dha.street_index is not None:
+        return dha.buildings.iloc[dha.street_index.offsets(street_name)]
+    return dha.filter_buildings_for_street(street_name)
+
+
+def _street_building_ids(buildings) -> List[str]:
+    ids = []
+    for idx, building in buildings.iterrows():
+        gebaeude = building.get("gebaeude")
+        if isinstance(gebaeude, str):
+            try:
+                gebaeude = json.loads(gebaeude)
+            except ValueError:
+                pass
+        ids.append(str(gebaeude.get("oi") if isinstance(gebaeude, dict) else building.get("id", idx)))
+    return ids
+
+
+def run_cha_for_street(cha: CentralizedHeatingAgent, buildings, street_name: str) -> Optional[Dict]:
+    """
+    Route the dual-pipe network of one street on a copy of the district street graph.
+
+    Returns:
+        Network statistics, or None if the network could not be built
+    """
+    agent = copy.copy(cha)
+    agent.street_graph = cha.street_graph.copy()
+    agent.buildings_gdf = buildings.copy()
+    if "heating_load_kw" not in agent.buildings_gdf.columns:
+        agent.buildings_gdf["heating_load_kw"] = cha.config.get("default_heating_load_kw", 10.0)
+
+    if not (agent.snap_buildings_to_street_network()
+            and agent.create_dual_pipe_network()
+            and agent.create_dual_service_connections()
+            and agent.calculate_network_statistics()):
+        return None
+
+    clean_street_name = street_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+    output_dir = Path(cha.config.get("output_dir", "processed/cha")) / clean_street_name
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_network_tables(
+        build_network_tables(agent.supply_pipes, agent.return_pipes, agent.dual_service_connections),
+        output_dir
+    )
+    with open(output_dir / "network_stats.json", "w") as f:
+        json.dump(agent.network_stats, f, indent=2)
+
+    return dict(agent.network_stats, output_dir=str(output_dir))
+
+
+def analyze_street(district: DistrictData, street_name: str) -> Dict:
+    """CHA + DHA + EAA for one street; one row of the district results table."""
+    start = time.perf_counter()
+    row = {column: None for column in RESULT_COLUMNS}
+    row.update(street_name=street_name, status="success", error="")
+
+    try:
+        buildings = _street_buildings(district, street_name)
+        row["n_buildings"] = len(buildings)
+        if buildings.empty:
+            raise ValueError(f"No buildings found on {street_name}")
+
+        # Heat demand from the shared LFA matrix (buildings without forecasts are skipped)
+        annual_heat_mwh = None
+        if district.load_matrix is not None:
+            summary = district.load_matrix.summary(_street_building_ids(buildings))
+            if len(summary):
+                annual_heat_mwh = float(summary["annual_sum"].sum()) / 1000.0
+                row["peak_heat_kw"] = float(summary["peak"].sum())
+
+        # District heating network and economics
+        if district.cha is not None:
+            stats = run_cha_for_street(district.cha, buildings, street_name)
+            if stats is not None:
+                row.update(
+                    dh_main_length_km=stats["total_main_length_km"],
+                    dh_service_length_m=stats["total_service_length_m"],
+                    cha_output_dir=stats["output_dir"],
+                )
+                if annual_heat_mwh is None:
+                    annual_heat_mwh = stats["total_heat_demand_mwh"]
+                economics = street_economics(
+                    district.eaa_config, stats["total_main_length_km"] * 1000.0, annual_heat_mwh
+                )
+                row.update(
+                    dh_capex_eur=economics["capex_eur"],
+                    dh_lcoh_eur_per_mwh=economics["lcoh_eur_per_mwh"],
+                    dh_lcoh_p2_5=economics["lcoh_p2_5"],
+                    dh_lcoh_p97_5=economics["lcoh_p97_5"],
+                    dh_co2_kg_per_mwh=economics["co2_kg_per_mwh"],
+                )
+        row["annual_heat_mwh"] = annual_heat_mwh
+
+        # Heat pump feasibility on the shared DHA data, for the same buildings as CHA and EAA
+        dha_result = district.dha.run_comprehensive_analysis(street_name, district.scenario, buildings=buildings)
+        if dha_result.get("status") == "success":
+            power = dha_result.get("power_results") or {}
+            row.update(
+                hp_buildings_analyzed=dha_result["buildings_analyzed"],
+                hp_min_voltage_pu=power.get("min_voltage"),
+                hp_max_voltage_pu=power.get("max_voltage"),
+                hp_max_transformer_loading_pct=power.get("max_transformer_loading"),
+                dha_output_dir=dha_result["output_dir"],
+            )
+        else:
+            row.update(status="partial", error=dha_result.get("message", "DHA analysis failed"))
+
+    except Exception as e:
+        row.update(status="error", error=str(e))
+
+    row["elapsed_s"] = round(time.perf_counter() - start, 2)
+    return row
+
+
+def _init_worker(district_kwargs: Dict):
+    """Load the district in workers that were not forked from a loaded parent."""
+    global _DISTRICT
+    if _DISTRICT is None:
+        _DISTRICT = load_district(**district_kwargs)
+
+
+def _street_task(street_name: str) -> Dict:
+    return analyze_street(_DISTRICT, street_name)
+
+
+def run_district_batch(
+    streets: Optional[List[str]] = None,
+    workers: int = 1,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    **district_kwargs
+) -> pd.DataFrame:
+    """
+    Analyze many streets on one loaded district.
+
+    Args:
+        streets: Street names (default: all streets of the district)
+        workers: Worker processes; with fork they inherit the loaded district
+        output_dir: Directory of the consolidated results table
+        **district_kwargs: Config paths, lfa_dir and scenario for load_district
+
+    Returns:
+        One row per street (RESULT_COLUMNS), also written to <output_dir>/district_results.csv
+    """
+    global _DISTRICT
+    _DISTRICT = load_district(**district_kwargs)
+    streets = list(streets) if streets else _DISTRICT.street_names()
+    print(f"🚀 Analyzing {len(streets)} streets with {workers} worker(s)...")
+
+    start = time.perf_counter()
+    if workers > 1 and len(streets) > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(district_kwargs,)) as pool:
+            rows = list(pool.map(_street_task, streets))
+    else:
+        rows = [_street_task(street) for street in streets]
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    results.to_csv(output_path / RESULTS_FILE, index=False)
+
+    n_ok = int((results["status"] == "success").sum())
+    print(f"\n✅ District batch completed in {time.perf_counter() - start:.1f}s: "
+          f"{n_ok}/{len(results)} streets successful")
+    print(f"   📁 Results table: {output_path / RESULTS_FILE}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="District-wide CHA + DHA + EAA batch analysis")
+    parser.add_argument("--street", action="append", default=[], help="Street name (repeatable)")
+    parser.add_argument("--streets", default="", help="Comma-separated street names")
+    parser.add_argument("--all", action="store_true", help="Analyze all streets of the district")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--scenario", default=DEFAULT_SCENARIO, help="DHA load scenario")
+    parser.add_argument("--lfa-dir", default="processed/lfa", help="LFA output directory")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Results table directory")
+    args = parser.parse_args(argv)
+
+    streets = args.street + [s.strip() for s in args.streets.split(",") if s.strip()]
+    if not streets and not args.all:
+        parser.error("Specify --street/--streets or --all")
+
+    run_district_batch(
+        streets=None if args.all else streets,
+        workers=args.workers,
+        output_dir=args.output_dir,
+        scenario=args.scenario,
+        lfa_dir=args.lfa_dir,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 from __future__ import annotations
-import json, math, os, glob
+import math
 from dataclasses import dataclass
 from pathlib import Path
 import numpy as np
 import pandas as pd
 
+try:
+    from src.lfa_load_matrix import load_lfa_matrix
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import load_lfa_matrix
+
 @dataclass
 class EAAConfig:
     n_samples: int = 1000
@@ -36,17 +42,10 @@ def _read_yaml(p: str) -> dict:
     return yaml.safe_load(Path(p).read_text())
 
 def _annual_heat_from_lfa(lfa_dir: str) -> float | None:
-    files = sorted(glob.glob(os.path.join(lfa_dir, "*.json")))
-    if not files:
+    matrix = load_lfa_matrix(lfa_dir)
+    if matrix is None:
         return None
-    total_kwh = 0.0
-    for f in files:
-        try:
-            data = json.loads(Path(f).read_text())
-            series = data.get("series") or []
-            total_kwh += float(np.nansum(series))
-        except Exception:
-            continue
+    total_kwh = float(matrix.summary()["annual_sum"].sum())
     return total_kwh / 1000.0  # → MWh
 
 def _validate_cha_hydraulic_output(cha_df: pd.DataFrame, config: dict = None) -> bool:
@@ -251,6 +250,47 @@ def _integrate_hydraulic_kpis(cha_df: pd.DataFrame, cfg: EAAConfig = None) -> di
     except Exception:
         return {}
 
+def _monte_carlo_lcoh(cfg: EAAConfig, capex_eur: float, annual_pumping_kwh: float,
+                      total_opex_eur_per_yr: float, annual_heat_mwh: float) -> tuple:
+    """LCOH (€/MWh) and CO2 (kg/MWh) samples under capex, price and grid-intensity uncertainty."""
+    np.random.seed(cfg.seed)
+    n = int(cfg.n_samples)
+
+    # Sample multipliers (mild lognormal uncertainty)
+    capex_mult = np.random.lognormal(mean=0.0, sigma=0.15, size=n)
+    elec_price = np.random.lognormal(mean=np.log(cfg.elec_price_eur_per_kwh), sigma=0.10, size=n)
+    grid_ci = np.random.lognormal(mean=np.log(cfg.grid_co2_kg_per_kwh), sigma=0.10, size=n)
+
+    ann_fac = _annuity_factor(cfg.discount_rate, cfg.lifetime_years)
+    ann_capex = capex_eur * ann_fac * capex_mult
+    pumping_cost = annual_pumping_kwh * elec_price
+
+    lcoh_eur_per_mwh = (ann_capex + pumping_cost + total_opex_eur_per_yr) / max(annual_heat_mwh, 1e-9)
+    co2_kg_per_mwh = (annual_pumping_kwh * grid_ci) / max(annual_heat_mwh, 1e-9)
+    return lcoh_eur_per_mwh, co2_kg_per_mwh
+
+def street_economics(cfg: EAAConfig, pipe_length_m: float, annual_heat_mwh: float,
+                     annual_pumping_kwh: float = 0.0) -> dict:
+    """
+    District heating economics of one street from its routed network.
+
+    Street networks carry no hydraulic diameters, so capex uses the default
+    unit cost per meter of (supply + return) pipe.
+    """
+    ce = cfg.capex_per_m_eur or {}
+    capex_eur = float(pipe_length_m) * ce.get("default", 450)
+    total_opex = capex_eur * cfg.opex_fraction_of_capex + cfg.om_fixed_eur_per_mwh * annual_heat_mwh
+
+    lcoh, co2 = _monte_carlo_lcoh(cfg, capex_eur, annual_pumping_kwh, total_opex, annual_heat_mwh)
+    return {
+        "capex_eur": capex_eur,
+        "annual_heat_mwh": float(annual_heat_mwh),
+        "lcoh_eur_per_mwh": float(np.mean(lcoh)),
+        "lcoh_p2_5": float(np.percentile(lcoh, 2.5)),
+        "lcoh_p97_5": float(np.percentile(lcoh, 97.5)),
+        "co2_kg_per_mwh": float(np.mean(co2)),
+    }
+
 def run(config_path: str = "configs/eaa.yml") -> dict:
     cfgd = _read_yaml(config_path)
     cfg = EAAConfig(**cfgd, **{})  # dataclass init
@@ -349,17 +389,6 @@ def run(config_path: str = "configs/eaa.yml") -> dict:
     annual_heat_mwh = ann_mwh
 
     # --- Monte Carlo (vectorized) ---
-    np.random.seed(cfg.seed)
-    n = int(cfg.n_samples)
-
-    # Sample multipliers (mild lognormal uncertainty)
-    capex_mult = np.random.lognormal(mean=0.0, sigma=0.15, size=n)
-    elec_price = np.random.lognormal(mean=np.log(cfg.elec_price_eur_per_kwh), sigma=0.10, size=n)
-    grid_ci = np.random.lognormal(mean=np.log(cfg.grid_co2_kg_per_kwh), sigma=0.10, size=n)
-
-    ann_fac = _annuity_factor(cfg.discount_rate, cfg.lifetime_years)
-    ann_capex = capex_eur * ann_fac * capex_mult
-    pumping_cost = annual_pumping_kwh * elec_price
     opex_fixed = opex_eur_per_yr_fixed + (cfg.om_fixed_eur_per_mwh * annual_heat_mwh)
     
     # Add enhanced costs
@@ -367,8 +396,9 @@ def run(config_path: str = "configs/eaa.yml") -> dict:
     pump_maintenance_cost = pump_maintenance_cost_eur_per_yr
     total_opex = opex_fixed + thermal_loss_cost + pump_maintenance_cost
 
-    lcoh_eur_per_mwh = (ann_capex + pumping_cost + total_opex) / max(annual_heat_mwh, 1e-9)
-    co2_kg_per_mwh = (annual_pumping_kwh * grid_ci) / max(annual_heat_mwh, 1e-9)
+    lcoh_eur_per_mwh, co2_kg_per_mwh = _monte_carlo_lcoh(
+        cfg, capex_eur, annual_pumping_kwh, total_opex, annual_heat_mwh
+    )
 
     mc = pd.DataFrame({
         "lcoh_eur_per_mwh": lcoh_eur_per_mwh,
@@ -13,6 +13,7 @@ from src.enhanced_agents import (
     DataExplorerAgent,
     EnergyGPT,
 )
+from src.dataset_registry import get_dataset_registry
 import re
 from typing import Union
 import os
@@ -237,6 +238,8 @@ def batch_mode(requests: list[str]):
     print(f"\n--- BATCH PROCESSING COMPLETE ---")
     successful = sum(1 for r in results if r["success"])
     print(f"Successful: {successful}/{len(requests)}")
+    cache = get_dataset_registry().stats()
+    print(f"Dataset cache: {cache['hits']} hits, {cache['misses']} loads, {cache['memory_mb']} MB")
     
     return results
 
@@ -2,12 +2,20 @@
 """
 Enhanced Tools for Multi-Agent System
 Based on the legacy implementation with comprehensive analysis capabilities.
+
+Datasets read by the analysis classes (GeoJSON layers, projected copies, load
+profiles, street routers) are memoized in the process-wide dataset registry
+(src/dataset_registry.py), so repeated tool calls skip I/O and reprojection.
+Complete street analyses are stored in the content-addressed result cache
+(src/result_cache.py) and returned without re-running while their buildings,
+configuration, input files and code are unchanged.
 """
 
 import json
 import os
 import subprocess
 import sys
+import time
 import yaml
 # Try to import ADK tool decorator, fallback to simple decorator
 try:
@@ -37,33 +45,47 @@ try:
     from src.cha_interactive import InteractiveCHA
     from src.dha_interactive import InteractiveDHA
     from src.cha_enhanced_dashboard import create_enhanced_dashboard
+    from src.street_index import DEFAULT_BUILDINGS_GEOJSON, load_street_index
+    from src.result_cache import get_result_cache, street_features
     print("✅ Enhanced tools modules imported successfully")
 except ImportError as e:
     print(f"⚠️ Warning: Could not import enhanced tools modules: {e}")
 
+
+def _cached_analysis(analysis_type, features, params, run, extra_files=()):
+    """Result of a street analysis from the result cache, running it on a miss."""
+    cache = get_result_cache()
+    components = cache.components(analysis_type, features, params, extra_files)
+    result = cache.get(analysis_type, components)
+    if result is not None:
+        return result
+
+    start = time.time()
+    result = run()
+    if result.get("status") == "success":
+        cache.set(analysis_type, components, result, execution_time_s=time.time() - start)
+    return dict(result, cached=False)
+
+
+def _cache_note(result) -> str:
+    if result.get("cached"):
+        return f"\n💾 CACHED RESULT: inputs unchanged, reused analysis {result.get('cache_key', '')[:12]}\n"
+    return ""
+
 @tool
 def get_all_street_names() -> list[str]:
     """
     Returns a list of all available street names in the dataset.
     This tool helps users see what streets are available for analysis.
     """
-    full_data_geojson = "data/geojson/hausumringe_mit_adressenV3.geojson"
+    full_data_geojson = DEFAULT_BUILDINGS_GEOJSON
     print(f"TOOL: Reading all street names from {full_data_geojson}...")
 
     try:
-        with open(full_data_geojson, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        sorted_streets = load_street_index(full_data_geojson).street_names()
     except FileNotFoundError:
         return ["Error: The main data file was not found at the specified path."]
 
-    street_names = set()
-    for feature in data["features"]:
-        for adr in feature.get("adressen", []):
-            street_val = adr.get("str")
-            if street_val:
-                street_names.add(street_val.strip())
-
-    sorted_streets = sorted(list(street_names))
     print(f"TOOL: Found {len(sorted_streets)} unique streets.")
     return sorted_streets
 
@@ -77,26 +99,14 @@ def get_building_ids_for_street(street_name: str) -> list[str]:
     Args:
         street_name: The name of the street to search for.
     """
-    full_data_geojson = "data/geojson/hausumringe_mit_adressenV3.geojson"
+    full_data_geojson = DEFAULT_BUILDINGS_GEOJSON
     print(f"TOOL: Searching for buildings on '{street_name}' in {full_data_geojson}...")
 
     try:
-        with open(full_data_geojson, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        selected_ids = load_street_index(full_data_geojson).building_ids_for_street(street_name)
     except FileNotFoundError:
         return ["Error: The main data file was not found at the specified path."]
 
-    street_set = {street_name.strip().lower()}
-    selected_ids = []
-    for feature in data["features"]:
-        for adr in feature.get("adressen", []):
-            street_val = adr.get("str")
-            if street_val and street_val.strip().lower() in street_set:
-                oi = feature.get("gebaeude", {}).get("oi")
-                if oi:
-                    selected_ids.append(oi)
-                break
-
     print(f"TOOL: Found {len(selected_ids)} buildings.")
     return selected_ids
 
@@ -119,18 +129,19 @@ def run_comprehensive_hp_analysis(
     print(f"TOOL: Running comprehensive HP analysis for '{street_name}' with scenario '{scenario}'...")
 
     try:
-        # Use the existing DHA interactive system
-        dha = InteractiveDHA()
-        
-        # Run comprehensive analysis
-        result = dha.run_comprehensive_analysis(street_name, scenario)
+        # Use the existing DHA interactive system (or its cached result)
+        features = street_features(street_name, DEFAULT_BUILDINGS_GEOJSON, match="search")
+        result = _cached_analysis(
+            "HP", features, {"street_name": street_name, "scenario": scenario},
+            lambda: InteractiveDHA().run_comprehensive_analysis(street_name, scenario),
+        )
         
         # Generate summary
         summary = f"""
 === COMPREHENSIVE HEAT PUMP FEASIBILITY ANALYSIS ===
 Street: {street_name}
 Scenario: {scenario}
-
+{_cache_note(result)}
 📊 ELECTRICAL INFRASTRUCTURE METRICS:
 • Analysis completed using real power infrastructure data
 • Interactive map and dashboard generated
@@ -179,17 +190,22 @@ def run_comprehensive_dh_analysis(street_name: str) -> str:
     print(f"TOOL: Running comprehensive DH analysis for '{street_name}'...")
 
     try:
-        # Use the existing CHA interactive system
+        # Use the existing CHA interactive system (or its cached result)
         cha = InteractiveCHA()
-        
-        # Run comprehensive analysis
-        result = cha.run_comprehensive_analysis(street_name)
+        features = street_features(
+            street_name, cha.config.get("buildings_path", DEFAULT_BUILDINGS_GEOJSON), match="exact"
+        )
+        result = _cached_analysis(
+            "DH", features, {"street_name": street_name},
+            lambda: cha.run_comprehensive_analysis(street_name),
+            extra_files=[cha.config.get("streets_path", "data/geojson/strassen_mit_adressenV3.geojson")],
+        )
         
         # Generate summary
         summary = f"""
 === COMPREHENSIVE DISTRICT HEATING NETWORK ANALYSIS ===
 Street: {street_name}
-
+{_cache_note(result)}
 📊 NETWORK INFRASTRUCTURE:
 • Dual-pipe system design completed
 • Supply and return networks created
@@ -0,0 +1,389 @@
+"""
+LFA Load Matrix - Columnar 8760 h × Building × Quantile Load Store
+
+This module stores the LFA heat demand forecasts of all buildings as one
+float32 array of shape (hours, buildings, quantiles) in ``.npy`` format plus a
+small JSON index (building IDs, quantile names, units). Readers open the array
+memory-mapped, so selecting a few buildings, one quantile or a time slice only
+touches those pages instead of parsing one JSON file per building.
+
+``load_lfa_matrix`` is the single loader for DHA, CHA, EAA and the dashboards.
+It reads ``<lfa_dir>/load_matrix/`` when present and not older than the
+per-building ``<building_id>.json`` files, and otherwise falls back to those
+files, so older outputs keep working. Loads are always returned in kW.
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+import fnmatch
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_YEAR = 8760
+LOAD_MATRIX_DIR = "load_matrix"
+LOAD_MATRIX_FILE = "loads.npy"
+INDEX_FILE = "index.json"
+QUANTILE_KEYS = ("series", "q10", "q90")  # Same keys as the per-building JSON files
+UNIT_TO_KW = {"W": 1e-3, "kW": 1.0, "MW": 1e3}
+
+HourSelection = Union[None, slice, Sequence[int], np.ndarray]
+
+
+@dataclass
+class LoadMatrix:
+    """Hourly loads of many buildings, one column per building and quantile."""
+    loads: np.ndarray  # (hours, buildings, quantiles), memory-mapped when read from a store
+    building_ids: List[str]
+    quantiles: List[str]
+    units: str = "kW"
+    metadata: Dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.building_index = {bid: i for i, bid in enumerate(self.building_ids)}
+
+    @property
+    def n_hours(self) -> int:
+        return self.loads.shape[0]
+
+    def _columns(self, buildings: Optional[Iterable]) -> tuple:
+        if buildings is None:
+            return list(self.building_ids), slice(None)
+        ids = [str(b) for b in buildings if str(b) in self.building_index]
+        return ids, np.array([self.building_index[b] for b in ids], dtype=np.intp)
+
+    def select(
+        self,
+        buildings: Optional[Iterable] = None,
+        quantile: str = "series",
+        hours: HourSelection = None,
+    ) -> np.ndarray:
+        """
+        Array (hours × buildings) for one quantile.
+
+        Args:
+            buildings: Building IDs to return (unknown IDs are skipped); None for all
+            quantile: One of ``self.quantiles`` ("series", "q10", "q90")
+            hours: Slice or index array of hours; None for all
+
+        Returns:
+            Array view (for slices) or copy of the selected loads
+        """
+        if quantile not in self.quantiles:
+            raise KeyError(f"Unknown quantile '{quantile}', available: {self.quantiles}")
+        q = self.quantiles.index(quantile)
+        _, columns = self._columns(buildings)
+        rows = slice(None) if hours is None else hours
+        block = self.loads[rows, :, q]
+        return block if isinstance(columns, slice) else block[:, columns]
+
+    def to_frame(
+        self,
+        buildings: Optional[Iterable] = None,
+        quantile: str = "series",
+        hours: HourSelection = None,
+    ) -> pd.DataFrame:
+        """DataFrame (hour × building_id) for one quantile."""
+        ids, _ = self._columns(buildings)
+        hour_index = np.arange(self.n_hours)[slice(None) if hours is None else hours]
+        return pd.DataFrame(
+            np.asarray(self.select(buildings, quantile, hours)),
+            index=pd.Index(hour_index, name="hour"),
+            columns=ids,
+        )
+
+    def to_long(
+        self,
+        buildings: Optional[Iterable] = None,
+        quantile: str = "series",
+        value_name: str = "q_kw",
+    ) -> pd.DataFrame:
+        """Long DataFrame (building_id, hour, value) ordered by building, then hour."""
+        ids, _ = self._columns(buildings)
+        values = np.asarray(self.select(buildings, quantile))
+        return pd.DataFrame({
+            "building_id": np.repeat(np.array(ids, dtype=object), self.n_hours),
+            "hour": np.tile(np.arange(self.n_hours), len(ids)),
+            value_name: values.T.reshape(-1).astype(float),
+        })
+
+    def to_lfa_dict(self, buildings: Optional[Iterable] = None) -> Dict[str, Dict[str, List[float]]]:
+        """Per-building dicts in the LFA JSON layout ({"series": [...], "q10": [...], ...})."""
+        ids, _ = self._columns(buildings)
+        columns = {q: np.asarray(self.select(ids, q), dtype=float) for q in self.quantiles}
+        return {bid: {q: columns[q][:, i].tolist() for q in self.quantiles} for i, bid in enumerate(ids)}
+
+    def summary(self, buildings: Optional[Iterable] = None, quantile: str = "series") -> pd.DataFrame:
+        """Annual total and peak per building (building_id, annual_sum, peak)."""
+        ids, _ = self._columns(buildings)
+        values = self.select(buildings, quantile)
+        return pd.DataFrame({
+            "building_id": ids,
+            "annual_sum": np.nansum(values, axis=0, dtype=np.float64),
+            "peak": np.nanmax(values, axis=0, initial=0.0).astype(np.float64),
+        })
+
+
+class LoadMatrixWriter:
+    """
+    Incrementally fill a load matrix store, one building (or block) at a time.
+
+    The array is preallocated as a writable memory map, so producers never hold
+    more than one building's series in memory. Buildings that were never written
+    are dropped from the store on ``close``.
+    """
+
+    def __init__(
+        self,
+        lfa_dir: Union[str, Path],
+        building_ids: Sequence,
+        quantiles: Sequence[str] = QUANTILE_KEYS,
+        hours: int = HOURS_PER_YEAR,
+        units: str = "kW",
+        metadata: Optional[Dict] = None,
+    ):
+        self.store_dir = Path(lfa_dir) / LOAD_MATRIX_DIR
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.building_ids = [str(b) for b in building_ids]
+        self.building_index = {bid: i for i, bid in enumerate(self.building_ids)}
+        self.quantiles = list(quantiles)
+        self.units = units
+        self.metadata = dict(metadata or {})
+        self._written = np.zeros(len(self.building_ids), dtype=bool)
+        # Readers must not pair a stale index with the array being rewritten
+        (self.store_dir / INDEX_FILE).unlink(missing_ok=True)
+        self._loads = np.lib.format.open_memmap(
+            self.store_dir / LOAD_MATRIX_FILE, mode="w+", dtype=np.float32,
+            shape=(hours, len(self.building_ids), len(self.quantiles)),
+        )
+
+    def write(self, building_id, values: Mapping[str, Sequence[float]]) -> None:
+        """Write one building's series; missing quantiles are stored as zeros."""
+        i = self.building_index[str(building_id)]
+        hours = self._loads.shape[0]
+        for q, key in enumerate(self.quantiles):
+            series = np.asarray(values.get(key, ()), dtype=np.float32)[:hours]
+            self._loads[:len(series), i, q] = series
+            self._loads[len(series):, i, q] = 0.0
+        self._written[i] = True
+
+    def write_block(self, building_ids: Sequence, loads: np.ndarray) -> None:
+        """Write several buildings at once from an array (hours × buildings × quantiles)."""
+        columns = np.array([self.building_index[str(b)] for b in building_ids], dtype=np.intp)
+        self._loads[:, columns, :] = np.asarray(loads, dtype=np.float32)
+        self._written[columns] = True
+
+    def close(self) -> Path:
+        """Flush the array, drop unwritten buildings and write the index."""
+        ids = self.building_ids
+        if not self._written.all():
+            keep = np.flatnonzero(self._written)
+            loads = np.array(self._loads[:, keep, :])
+            del self._loads
+            np.save(self.store_dir / LOAD_MATRIX_FILE, loads)
+            ids = [ids[i] for i in keep]
+        else:
+            self._loads.flush()
+            del self._loads
+
+        index = {
+            "x-version": "1.0.0",
+            "building_ids": ids,
+            "quantiles": self.quantiles,
+            "units": self.units,
+            "dtype": "float32",
+            "created": datetime.utcnow().isoformat() + "Z",
+            "metadata": self.metadata,
+        }
+        (self.store_dir / INDEX_FILE).write_text(json.dumps(index, indent=2), encoding="utf-8")
+        return self.store_dir
+
+    def abort(self) -> None:
+        """Discard the partially written store; readers fall back to the JSON files."""
+        del self._loads
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def __enter__(self) -> "LoadMatrixWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_load_matrix(
+    lfa_dir: Union[str, Path],
+    building_ids: Sequence,
+    loads: np.ndarray,
+    quantiles: Sequence[str] = QUANTILE_KEYS,
+    units: str = "kW",
+    metadata: Optional[Dict] = None,
+) -> Path:
+    """
+    Write a complete load matrix store.
+
+    Args:
+        lfa_dir: LFA output directory (the store goes to ``<lfa_dir>/load_matrix``)
+        building_ids: Building IDs, one per column
+        loads: Array (hours × buildings × quantiles)
+        quantiles: Quantile names along the last axis
+        units: Unit of the stored values
+        metadata: Extra index metadata (model version, scenario, ...)
+
+    Returns:
+        Store directory
+    """
+    loads = np.asarray(loads)
+    with LoadMatrixWriter(lfa_dir, building_ids, quantiles, loads.shape[0], units, metadata) as writer:
+        writer.write_block(building_ids, loads)
+    return writer.store_dir
+
+
+def remove_load_matrix(lfa_dir: Union[str, Path]) -> bool:
+    """Delete ``<lfa_dir>/load_matrix`` (e.g. when only JSON forecasts are rewritten); True if it existed."""
+    store_dir = Path(lfa_dir) / LOAD_MATRIX_DIR
+    if not store_dir.exists():
+        return False
+    shutil.rmtree(store_dir)
+    return True
+
+
+def open_load_matrix(lfa_dir: Union[str, Path], memory_map: bool = True) -> Optional[LoadMatrix]:
+    """Open ``<lfa_dir>/load_matrix`` (memory-mapped); None if there is no store."""
+    store_dir = Path(lfa_dir) / LOAD_MATRIX_DIR
+    index_path = store_dir / INDEX_FILE
+    if not index_path.exists():
+        return None
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    loads = np.load(store_dir / LOAD_MATRIX_FILE, mmap_mode="r" if memory_map else None)
+    return LoadMatrix(
+        loads=loads,
+        building_ids=index["building_ids"],
+        quantiles=index["quantiles"],
+        units=index.get("units", "kW"),
+        metadata=index.get("metadata", {}),
+    )
+
+
+def _read_json_forecasts(
+    lfa_dir: Path,
+    pattern: str,
+    buildings: Optional[Iterable],
+    quantiles: Sequence[str],
+    hours_required: Optional[int],
+) -> Optional[LoadMatrix]:
+    """Legacy fallback: assemble a LoadMatrix from per-building JSON files."""
+    if buildings is None:
+        paths = sorted(lfa_dir.glob(f"{pattern}.json"))
+    else:
+        paths = [lfa_dir / f"{b}.json" for b in buildings if fnmatch.fnmatchcase(str(b), pattern)]
+        paths = [p for p in paths if p.exists()]
+
+    series: Dict[str, List[np.ndarray]] = {}
+    for path in paths:
+        try:
+            data = json.loads(path.read_text())
+        except Exception as e:
+            print(f"   ❌ Error loading {path}: {e}")
+            continue
+        if not isinstance(data, dict) or not isinstance(data.get("series"), list) or not data["series"]:
+            continue
+        if hours_required is not None and len(data["series"]) != hours_required:
+            print(f"   ⚠️ Warning: {path.stem} has {len(data['series'])} hours (expected {hours_required})")
+            continue
+        # Files without units are LFA forecasts in kW
+        scale = UNIT_TO_KW.get((data.get("metadata") or {}).get("units", "kW"), 1.0)
+        series[path.stem] = [np.asarray(data.get(key) or [], dtype=float) * scale for key in quantiles]
+
+    if not series:
+        return None
+
+    n_hours = max(len(values) for columns in series.values() for values in columns)
+    loads = np.zeros((n_hours, len(series), len(quantiles)))
+    for i, columns in enumerate(series.values()):
+        for q, values in enumerate(columns):
+            loads[:len(values), i, q] = values
+    return LoadMatrix(loads=loads, building_ids=list(series), quantiles=list(quantiles))
+
+
+def _store_is_current(lfa_dir: Path) -> bool:
+    """True if the store index was written after every per-building JSON file."""
+    index_mtime = (lfa_dir / LOAD_MATRIX_DIR / INDEX_FILE).stat().st_mtime_ns
+    with os.scandir(lfa_dir) as entries:
+        return all(
+            entry.stat().st_mtime_ns <= index_mtime
+            for entry in entries if entry.name.endswith(".json") and entry.is_file()
+        )
+
+
+def to_kw(matrix: LoadMatrix) -> LoadMatrix:
+    """The matrix with loads in kW (converts stores written in other units, e.g. older W stores)."""
+    if matrix.units not in UNIT_TO_KW:
+        raise ValueError(f"Unknown load matrix units: {matrix.units}")
+    if matrix.units == "kW":
+        return matrix
+    loads = np.asarray(matrix.loads, dtype=np.float32) * np.float32(UNIT_TO_KW[matrix.units])
+    return LoadMatrix(loads, matrix.building_ids, matrix.quantiles, "kW", matrix.metadata)
+
+
+def load_lfa_matrix(
+    lfa_dir: Union[str, Path],
+    pattern: str = "*",
+    buildings: Optional[Iterable] = None,
+    quantiles: Sequence[str] = QUANTILE_KEYS,
+    hours_required: Optional[int] = None,
+) -> Optional[LoadMatrix]:
+    """
+    Load LFA forecasts of all buildings in a directory.
+
+    Uses the memory-mapped load matrix store if present and up to date,
+    otherwise the per-building JSON files. Only the selected buildings of a
+    store in other units than kW are converted (and thereby read into memory).
+
+    Args:
+        lfa_dir: LFA output directory
+        pattern: Shell-style building ID filter (e.g. ``"AN_DER_BAHN_*"``)
+        buildings: Building IDs to load (others are skipped); None for all
+        quantiles: Quantiles to read in JSON fallback mode
+        hours_required: In JSON fallback mode, skip series of a different length
+
+    Returns:
+        LoadMatrix in kW, or None if no forecasts were found
+    """
+    lfa_dir = Path(lfa_dir)
+    matrix = open_load_matrix(lfa_dir)
+    if matrix is not None and not _store_is_current(lfa_dir):
+        print(f"   ⚠️ Load matrix store in {lfa_dir} is older than the JSON forecasts, reading JSON files")
+        matrix = None
+    if matrix is None:
+        return _read_json_forecasts(lfa_dir, pattern, buildings, quantiles, hours_required)
+
+    if pattern != "*" or buildings is not None:
+        wanted = matrix.building_ids if buildings is None else [str(b) for b in buildings]
+        ids = [bid for bid in wanted if bid in matrix.building_index and fnmatch.fnmatchcase(bid, pattern)]
+        if ids != matrix.building_ids:
+            columns = np.array([matrix.building_index[b] for b in ids], dtype=np.intp)
+            matrix = LoadMatrix(matrix.loads[:, columns, :], ids, matrix.quantiles,
+                                matrix.units, matrix.metadata)
+    if not matrix.building_ids:
+        return None
+    return to_kw(matrix)
+
+
+def lfa_building_summary(lfa_dir: Union[str, Path], pattern: str = "*") -> pd.DataFrame:
+    """Annual total and peak of the main series per building (empty if no forecasts)."""
+    matrix = load_lfa_matrix(lfa_dir, pattern=pattern)
+    if matrix is None:
+        return pd.DataFrame({"building_id": [], "annual_sum": [], "peak": []})
+    return matrix.summary()
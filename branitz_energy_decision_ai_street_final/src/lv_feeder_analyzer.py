@@ -33,6 +33,9 @@ def pick_top10_hours(load_df: pd.DataFrame) -> List[int]:
 
 # ---------- New: pandapower backend ----------
 
+KPI_COLUMNS = ("utilization_max", "voltage_min", "voltage_max", "n_over80", "n_over100")
+
+
 def _ensure_pp():
     try:
         import pandapower as pp  # noqa: F401
@@ -40,14 +43,10 @@ def _ensure_pp():
         raise ImportError("pandapower backend requires pandapower") from e
 
 
-def _run_hour_for_feeder_pp(net, lv_bus: int, p_kw: float, q_kvar: float = 0.0) -> Dict[str, float]:
-    """
-    Update/insert a single aggregated SLoad at lv_bus, runpp, and return KPIs.
-    """
+def _set_agg_sgen(net, lv_bus: int, p_kw: float, q_kvar: float = 0.0) -> None:
+    """Create or update the aggregated sgen (P,Q at LV bus). Using sgen (PQ) is simple/robust."""
     import pandapower as pp
-    import numpy as np
 
-    # create or update an aggregated sgen (P,Q at LV bus). Using sgen (PQ) is simple/robust.
     p_mw = max(0.0, float(p_kw)) / 1000.0
     q_mvar = float(q_kvar) / 1000.0 if q_kvar else 0.0
 
@@ -61,29 +60,130 @@ def _run_hour_for_feeder_pp(net, lv_bus: int, p_kw: float, q_kvar: float = 0.0)
         net.sgen.at[idx, "p_mw"] = p_mw
         net.sgen.at[idx, "q_mvar"] = q_mvar
 
-    # run power flow
-    pp.runpp(net, algorithm="nr", max_iteration=20, numba=False)
+
+def _pp_kpis(net) -> Dict[str, float]:
+    """KPIs of the last power flow: utilization proxy, voltage extrema, overload counts."""
+    import numpy as np
 
     # utilization proxy = max of trafo & line loading
     loading = []
     if not net.trafo.empty and "loading_percent" in net.res_trafo.columns:
-        loading += list(net.res_trafo.loading_percent.values)
+        loading.append(net.res_trafo.loading_percent.to_numpy(dtype=float))
     if not net.line.empty and "loading_percent" in net.res_line.columns:
-        loading += list(net.res_line.loading_percent.values)
-    util_max = (max(loading) / 100.0) if loading else 0.0
+        loading.append(net.res_line.loading_percent.to_numpy(dtype=float))
+    loading = np.concatenate(loading) if loading else np.empty(0)
+    util_max = (loading.max() / 100.0) if loading.size else 0.0
 
     # voltage extrema
     vmin = float(net.res_bus.vm_pu.min())
     vmax = float(net.res_bus.vm_pu.max())
 
     # counts for context
-    over_80 = sum(1 for x in loading if x >= 80.0)
-    over_100 = sum(1 for x in loading if x >= 100.0)
+    over_80 = int((loading >= 80.0).sum())
+    over_100 = int((loading >= 100.0).sum())
 
-    return dict(utilization_max=util_max, voltage_min=vmin, voltage_max=vmax,
+    return dict(utilization_max=float(util_max), voltage_min=vmin, voltage_max=vmax,
                 n_over80=over_80, n_over100=over_100)
 
 
+def _run_hour_for_feeder_pp(net, lv_bus: int, p_kw: float, q_kvar: float = 0.0) -> Dict[str, float]:
+    """
+    Update/insert a single aggregated SLoad at lv_bus, runpp, and return KPIs.
+    """
+    import pandapower as pp
+
+    _set_agg_sgen(net, lv_bus, p_kw, q_kvar)
+
+    # run power flow
+    pp.runpp(net, algorithm="nr", max_iteration=20, numba=False)
+
+    return _pp_kpis(net)
+
+
+def run_feeder_timeseries_pp(net, lv_bus: int, p_kw, q_kvar):
+    """
+    Run all hours of one feeder on its model, warm-starting each hour from the last.
+
+    Returns:
+        Array (hours × len(KPI_COLUMNS)); rows of non-converged hours are NaN
+        (run_feeder_studies reports them with converged=False)
+    """
+    import numpy as np
+    import pandapower as pp
+
+    p_kw = np.asarray(p_kw, dtype=float)
+    q_kvar = np.asarray(q_kvar, dtype=float)
+    kpis = np.full((len(p_kw), len(KPI_COLUMNS)), np.nan)
+
+    init = "auto"
+    for i in range(len(p_kw)):
+        # only the aggregated sgen changes between hours
+        _set_agg_sgen(net, lv_bus, p_kw[i], q_kvar[i])
+        try:
+            pp.runpp(net, algorithm="nr", max_iteration=20, numba=False, init=init)
+        except Exception:
+            # restart from a flat start after a failed hour
+            init = "auto"
+            continue
+        k = _pp_kpis(net)
+        kpis[i] = [k[c] for c in KPI_COLUMNS]
+        init = "results"
+
+    return kpis
+
+
+def _feeder_study_task(task):
+    """Process-pool entry point: (feeder_id, feeder_model, p_kw, q_kvar) -> (feeder_id, kpis)."""
+    fid, fm, p_kw, q_kvar = task
+    return fid, run_feeder_timeseries_pp(fm["net"], int(fm["lv_bus"]), p_kw, q_kvar)
+
+
+def _aggregate_feeder_hours(
+    building_to_feeder: Dict[str, str],
+    hourly_building_kw: pd.DataFrame,
+    hours: List[int],
+):
+    """Feeder loads for all selected hours in one groupby: (feeder_ids, feeders × hours kW)."""
+    cols = [str(h) if str(h) in hourly_building_kw.columns else h for h in hours]
+    unique_cols = list(dict.fromkeys(cols))
+    feeder_sum = hourly_building_kw[unique_cols].groupby(building_to_feeder).sum(numeric_only=True)
+    return list(feeder_sum.index), feeder_sum[cols].to_numpy(dtype=float)
+
+
+def _study_frame(feeder_ids: List[str], hours: List[int], kpis, util_threshold: float, v_limits: tuple,
+                 converged=None) -> pd.DataFrame:
+    """
+    Tidy hour-major frame from a (feeders × hours × KPIs) array.
+
+    `converged` (feeders × hours, 1.0 / 0.0, NaN where no power flow was run)
+    defaults to all converged.
+    """
+    import numpy as np
+
+    n_feeders, n_hours = len(feeder_ids), len(hours)
+    flat = kpis.transpose(1, 0, 2).reshape(n_hours * n_feeders, -1)
+    df = pd.DataFrame({
+        "feeder_id": np.tile(np.asarray(feeder_ids, dtype=object), n_hours),
+        "hour": np.repeat(np.asarray(hours, dtype=int), n_feeders),
+    })
+    for j, c in enumerate(KPI_COLUMNS[:flat.shape[1]]):
+        df[c] = flat[:, j]
+
+    if converged is None:
+        converged = np.ones((n_feeders, n_hours))
+    converged = np.asarray(converged, dtype=float).T.reshape(-1)
+    df["converged"] = pd.array(
+        [pd.NA if np.isnan(c) else bool(c) for c in converged], dtype="boolean"
+    )
+    # A non-converged hour is treated as a violation; unknown feeders (NA) are not flagged
+    failed = ~np.isnan(converged) & (converged == 0.0)
+    df["violates_util>=0.8"] = (df["utilization_max"].to_numpy() >= util_threshold) | failed
+    df["violates_voltage_outside_±10%"] = (
+        (df["voltage_min"].to_numpy() < v_limits[0]) | (df["voltage_max"].to_numpy() > v_limits[1]) | failed
+    )
+    return df
+
+
 def run_feeder_studies(
     feeders_model: Dict[str, dict],
     building_to_feeder: Dict[str, str],
@@ -93,64 +193,59 @@ def run_feeder_studies(
     util_threshold: float = 0.8,
     v_limits: tuple = (0.90, 1.10),
     power_factor: float = 0.98,
+    workers: int = 1,
 ) -> pd.DataFrame:
     """
     Return a tidy DataFrame with:
       feeder_id, hour, utilization_max, voltage_min, voltage_max,
-      violates_util>=0.8, violates_voltage_outside_±10%
+      converged, violates_util>=0.8, violates_voltage_outside_±10%
+
+    Hours whose power flow did not converge have NaN KPIs, converged=False
+    and both violation flags set; feeders without a model have converged=NA.
+
+    All hours are aggregated per feeder up front; the pandapower backend then
+    solves each feeder's hours as one series on its model, optionally with
+    feeders spread over `workers` processes (each works on a copy of the net).
     """
-    rows = []
+    import numpy as np
+
+    hours = [int(h) for h in hours]
+    feeder_ids, feeder_kw = _aggregate_feeder_hours(building_to_feeder, hourly_building_kw, hours)
 
     if backend == "heuristic":
         # Preserve your current stub behavior as fallback
-        for h in hours:
-            col = str(h) if str(h) in hourly_building_kw.columns else h
-            feeder_sum = hourly_building_kw.groupby(building_to_feeder).sum(numeric_only=True)[col]
-            for fid, kw in feeder_sum.items():
-                util = float(kw)/1000.0  # assume 1 MW base rating
-                vmin = 1.0 - 0.15 * util
-                vmax = 1.0 + 0.05 * util
-                rows.append(dict(
-                    feeder_id=fid, hour=int(h),
-                    utilization_max=util, voltage_min=vmin, voltage_max=vmax,
-                    **{"violates_util>=0.8": util >= util_threshold,
-                       "violates_voltage_outside_±10%": (vmin < v_limits[0] or vmax > v_limits[1])}
-                ))
-        return pd.DataFrame(rows)
+        util = feeder_kw / 1000.0  # assume 1 MW base rating
+        kpis = np.stack([util, 1.0 - 0.15 * util, 1.0 + 0.05 * util], axis=2)
+        return _study_frame(feeder_ids, hours, kpis, util_threshold, v_limits)
 
     # pandapower backend
     _ensure_pp()
     import math
+    from concurrent.futures import ProcessPoolExecutor
+
+    # derive Q from PF (approx); Q = P * tan(arccos(pf))
+    q_factor = math.tan(math.acos(power_factor)) if power_factor < 1.0 else 0.0
+
+    # unknown feeders keep NaN rows
+    kpis = np.full((len(feeder_ids), len(hours), len(KPI_COLUMNS)), np.nan)
+    converged = np.full((len(feeder_ids), len(hours)), np.nan)
+    position = {fid: i for i, fid in enumerate(feeder_ids)}
+    tasks = [
+        (fid, feeders_model[fid], feeder_kw[i], feeder_kw[i] * q_factor)
+        for i, fid in enumerate(feeder_ids) if feeders_model.get(fid)
+    ]
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_feeder_study_task, tasks))
+    else:
+        results = [_feeder_study_task(task) for task in tasks]
+
+    for fid, feeder_kpis in results:
+        kpis[position[fid]] = feeder_kpis
+        converged[position[fid]] = ~np.isnan(feeder_kpis[:, 0])
 
-    # pre-aggregate by feeder for each hour
-    for h in hours:
-        col = str(h) if str(h) in hourly_building_kw.columns else h
-        feeder_kw = hourly_building_kw.groupby(building_to_feeder).sum(numeric_only=True)[col]
-
-        for fid, p_kw in feeder_kw.items():
-            fm = feeders_model.get(fid)
-            if not fm:
-                # unknown feeder; mark as NA row
-                rows.append(dict(
-                    feeder_id=fid, hour=int(h),
-                    utilization_max=float("nan"), voltage_min=float("nan"), voltage_max=float("nan"),
-                    **{"violates_util>=0.8": False, "violates_voltage_outside_±10%": False}
-                ))
-                continue
-
-            net = fm["net"]
-            lv_bus = int(fm["lv_bus"])
-            # derive Q from PF (approx); Q = P * tan(arccos(pf))
-            q_kvar = p_kw * math.tan(math.acos(power_factor)) if power_factor < 1.0 else 0.0
-
-            kpis = _run_hour_for_feeder_pp(net, lv_bus, float(p_kw), float(q_kvar))
-            rows.append(dict(
-                feeder_id=fid, hour=int(h), **kpis,
-                **{"violates_util>=0.8": kpis["utilization_max"] >= util_threshold,
-                   "violates_voltage_outside_±10%": (kpis["voltage_min"] < v_limits[0] or kpis["voltage_max"] > v_limits[1])}
-            ))
-
-    return pd.DataFrame(rows)
+    return _study_frame(feeder_ids, hours, kpis, util_threshold, v_limits, converged)
 
 
 # ---------- CLI shim ----------
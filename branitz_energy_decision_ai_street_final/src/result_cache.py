@@ -0,0 +1,345 @@
+"""
+Street Result Cache - Content-Addressed Cache of Full Street Analyses
+
+Generalizes the SimulationCache of the agents prototype for the agent tool
+layer. A street analysis (HP or DH) is identified by digests of everything it
+depends on:
+
+- the input building subset (the GeoJSON features of the street)
+- the relevant configuration (configs/dha.yml or configs/cha.yml, without
+  output-only keys)
+- the content of every input data file
+- the code version (content of the analysis modules)
+- the call parameters (street name, scenario)
+
+The cache key is the hash of these component digests. When one input file
+changes only its digest changes, the next lookup misses, and the entries of
+the same street built from the old file are dropped; the component that
+changed is reported. Results (KPIs, artifact paths, summaries) are stored as
+JSON and the cache is bounded by entry count and size, evicting the least
+recently used entries first.
+
+Cache Structure:
+    processed/result_cache/
+    ├── hp/
+    │   ├── {key}.json        # Result dict
+    │   └── {key}_meta.json   # Component digests, timestamps, size
+    └── dh/
+        └── ...
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+DEFAULT_CACHE_DIR = "processed/result_cache"
+
+# Configuration keys that only affect where or how results are written
+OUTPUT_CONFIG_KEYS = {
+    "output_dir", "out_dir", "eval_dir", "map_filename", "geopackage_filename", "export_network_csv",
+}
+
+# Inputs and code of each analysis type
+ANALYSIS_INPUTS = {
+    "HP": {
+        "config": "configs/dha.yml",
+        "files": [
+            "agents copy/street_final_copy_3/branitz_hp_feasibility_outputs/power_lines.geojson",
+            "agents copy/street_final_copy_3/branitz_hp_feasibility_outputs/power_substations.geojson",
+            "agents copy/street_final_copy_3/branitz_hp_feasibility_outputs/power_plants.geojson",
+            "agents copy/street_final_copy_3/branitz_hp_feasibility_outputs/power_generators.geojson",
+            "agents copy/street_final_copy_3/results_test/streets.geojson",
+            "thesis-data-2/power-sim/gebaeude_lastphasenV2.json",
+            "thesis-data-2/power-sim/branitzer_siedlung_ns_v3_ohne_UW.json",
+        ],
+        "code": ["src/dha_interactive.py", "src/dha_street_routing.py"],
+    },
+    "DH": {
+        "config": "configs/cha.yml",
+        "files": [],  # streets_path of the config is added at lookup time
+        "code": ["src/cha.py", "src/cha_interactive.py", "src/cha_connectivity.py",
+                 "src/cha_street_snapping.py", "src/cha_network_tables.py"],
+    },
+}
+
+# Content digests of files already hashed in this process, keyed by file state
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def _digest(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's content ("missing" if absent), hashed once per file state."""
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    stat = path.stat()
+    state = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if state not in _FILE_DIGESTS:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _FILE_DIGESTS[state] = h.hexdigest()
+    return _FILE_DIGESTS[state]
+
+
+def config_digest(config_path: Union[str, Path]) -> str:
+    """Digest of a YAML config without output-only keys."""
+    config_path = Path(config_path)
+    if not config_path.exists():
+        return "missing"
+    config = yaml.safe_load(config_path.read_text(encoding="utf-8")) or {}
+    return _digest({k: v for k, v in config.items() if k not in OUTPUT_CONFIG_KEYS})
+
+
+def buildings_digest(features: Iterable[dict]) -> str:
+    """Digest of a building subset (GeoJSON features, order-independent)."""
+    return _digest(sorted(_digest(feature) for feature in features))
+
+
+def street_features(street_name: str, geojson_path: Union[str, Path], match: str = "exact") -> List[dict]:
+    """
+    Building features of a street from the district street index.
+
+    Args:
+        geojson_path: District buildings file
+        match: "exact" (CHA street selection) or "search" (DHA substring match)
+    """
+    try:
+        from src.street_index import load_features, load_street_index
+    except ImportError:
+        # Fallback for direct execution
+        from street_index import load_features, load_street_index
+
+    index = load_street_index(geojson_path)
+    offsets = index.search(street_name) if match == "search" else index.offsets(street_name)
+    features = load_features(geojson_path)
+    return [features[i] for i in offsets]
+
+
+def _json_default(value):
+    # numpy scalars and paths in result dicts
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class StreetResultCache:
+    """
+    Content-addressed cache of street analysis results.
+
+    Example:
+        >>> cache = StreetResultCache()
+        >>> components = cache.components("HP", features, {"street_name": s, "scenario": sc})
+        >>> result = cache.get("HP", components)
+        >>> if result is None:
+        ...     result = run_analysis()
+        ...     cache.set("HP", components, result)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+        max_entries: int = 500,
+        max_mb: float = 200.0,
+        ttl_hours: Optional[float] = None
+    ):
+        """
+        Initialize the result cache.
+
+        Args:
+            cache_dir: Directory of the cache files
+            max_entries: Maximum number of cached results (all types)
+            max_mb: Maximum total size of the cached results
+            ttl_hours: Optional time-to-live (None: valid until an input changes)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = timedelta(hours=ttl_hours) if ttl_hours else None
+
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "invalidated": 0, "evicted": 0}
+
+    def _type_dir(self, analysis_type: str) -> Path:
+        path = self.cache_dir / analysis_type.lower()
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def components(
+        self,
+        analysis_type: str,
+        features: Iterable[dict],
+        params: Dict[str, Any],
+        extra_files: Iterable[Union[str, Path]] = ()
+    ) -> Dict[str, Any]:
+        """
+        Component digests of one analysis call.
+
+        Args:
+            analysis_type: "HP" or "DH"
+            features: Input building subset
+            params: Call parameters (street name, scenario, ...)
+            extra_files: Input files in addition to ANALYSIS_INPUTS
+        """
+        spec = ANALYSIS_INPUTS[analysis_type]
+        files = list(spec["files"]) + [str(f) for f in extra_files]
+        return {
+            "type": analysis_type,
+            "params": params,
+            "buildings": buildings_digest(features),
+            "config": config_digest(spec["config"]),
+            "files": {f: file_digest(f) for f in files},
+            "code": _digest({f: file_digest(f) for f in spec["code"]}),
+        }
+
+    @staticmethod
+    def key(components: Dict[str, Any]) -> str:
+        return _digest(components)
+
+    def _read_meta(self, meta_file: Path) -> Optional[Dict]:
+        try:
+            return json.loads(meta_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _remove(self, analysis_type: str, key: str):
+        for suffix in (".json", "_meta.json"):
+            path = self._type_dir(analysis_type) / f"{key}{suffix}"
+            if path.exists():
+                path.unlink()
+
+    @staticmethod
+    def _artifact_states(result: Dict) -> Dict[str, Optional[List[int]]]:
+        """(mtime_ns, size) of the artifacts (``*_path`` entries) of a result, None if missing."""
+        states = {}
+        for name, value in result.items():
+            if name.endswith("_path") and isinstance(value, (str, Path)) and str(value):
+                path = Path(value)
+                states[str(value)] = [path.stat().st_mtime_ns, path.stat().st_size] if path.exists() else None
+        return states
+
+    def _changed_components(self, old: Dict, new: Dict) -> List[str]:
+        changed = [name for name in ("buildings", "config", "code") if old.get(name) != new.get(name)]
+        old_files, new_files = old.get("files", {}), new.get("files", {})
+        changed += [f for f in sorted(set(old_files) | set(new_files)) if old_files.get(f) != new_files.get(f)]
+        return changed
+
+    def get(self, analysis_type: str, components: Dict[str, Any]) -> Optional[Dict]:
+        """
+        Cached result for the components, or None.
+
+        Results whose artifacts (``*_path`` entries) were deleted or rewritten
+        since they were cached are treated as missing. On a miss, entries of the same call built from other
+        inputs are dropped.
+        """
+        key = self.key(components)
+        type_dir = self._type_dir(analysis_type)
+        result_file, meta_file = type_dir / f"{key}.json", type_dir / f"{key}_meta.json"
+
+        meta = self._read_meta(meta_file) if meta_file.exists() else None
+        if meta is not None and result_file.exists():
+            age = datetime.now() - datetime.fromisoformat(meta["created"])
+            try:
+                result = json.loads(result_file.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                result = None
+            artifacts_ok = result is not None and meta.get("artifacts") == self._artifact_states(result)
+            if result is not None and artifacts_ok and (self.ttl is None or age <= self.ttl):
+                meta["last_access"] = datetime.now().isoformat()
+                meta_file.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+                self.stats["hits"] += 1
+                print(f"  💾 Cache HIT: {key[:12]} (age: {age.total_seconds() / 3600:.1f}h, "
+                      f"saved {meta.get('execution_time_s', 0):.1f}s)")
+                return dict(result, cached=True, cache_key=key)
+            self._remove(analysis_type, key)
+
+        # Fine-grained invalidation: same call, different inputs
+        self.stats["misses"] += 1
+        for other_meta_file in type_dir.glob("*_meta.json"):
+            other = self._read_meta(other_meta_file)
+            if other is None or other.get("components", {}).get("params") != components["params"]:
+                continue
+            changed = self._changed_components(other["components"], components)
+            print(f"  ♻️ Cache INVALIDATED: {other['cache_key'][:12]} (changed: {', '.join(changed)})")
+            self._remove(analysis_type, other["cache_key"])
+            self.stats["invalidated"] += 1
+        return None
+
+    def set(self, analysis_type: str, components: Dict[str, Any], result: Dict,
+            execution_time_s: float = 0.0) -> str:
+        """Store a result (KPIs, artifact paths, summary) and enforce the size bounds."""
+        key = self.key(components)
+        type_dir = self._type_dir(analysis_type)
+
+        payload = json.dumps({k: v for k, v in result.items() if k not in ("cached", "cache_key")},
+                             indent=2, default=_json_default)
+        (type_dir / f"{key}.json").write_text(payload, encoding="utf-8")
+
+        now = datetime.now().isoformat()
+        meta = {
+            "cache_key": key,
+            "analysis_type": analysis_type,
+            "created": now,
+            "last_access": now,
+            "size_bytes": len(payload.encode("utf-8")),
+            "execution_time_s": execution_time_s,
+            "artifacts": self._artifact_states(result),
+            "components": components,
+        }
+        (type_dir / f"{key}_meta.json").write_text(json.dumps(meta, indent=2, default=str), encoding="utf-8")
+        self.stats["sets"] += 1
+        print(f"  💾 Cached: {key[:12]}")
+
+        self._evict()
+        return key
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries / max_mb."""
+        entries = []
+        for meta_file in self.cache_dir.glob("*/*_meta.json"):
+            meta = self._read_meta(meta_file)
+            if meta is not None:
+                entries.append(meta)
+        entries.sort(key=lambda m: m.get("last_access", ""))
+
+        total = sum(m.get("size_bytes", 0) for m in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            oldest = entries.pop(0)
+            self._remove(oldest["analysis_type"], oldest["cache_key"])
+            total -= oldest.get("size_bytes", 0)
+            self.stats["evicted"] += 1
+
+    def clear(self, analysis_type: Optional[str] = None) -> int:
+        """Delete cached results of one type (or all); returns the number of files deleted."""
+        pattern = f"{analysis_type.lower()}/*.json" if analysis_type else "*/*.json"
+        files = list(self.cache_dir.glob(pattern))
+        for file in files:
+            file.unlink()
+        return len(files)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total_requests = self.stats["hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        return {**self.stats, "total_requests": total_requests, "hit_rate_pct": round(hit_rate, 1)}
+
+
+_CACHE: Optional[StreetResultCache] = None
+
+
+def get_result_cache() -> StreetResultCache:
+    """The result cache shared by the agent tools of this process."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = StreetResultCache()
+    return _CACHE
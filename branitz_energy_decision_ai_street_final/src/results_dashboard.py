@@ -11,6 +11,12 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 import argparse
 
+try:
+    from src.lfa_load_matrix import lfa_building_summary
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import lfa_building_summary
+
 
 def load_json_safe(path: Path) -> Optional[Dict[str, Any]]:
     """Safely load JSON file, return None if not found or invalid."""
@@ -39,15 +45,10 @@ def extract_results_metrics(slug: str, root: Path) -> Dict[str, str]:
     # LFA Metrics
     lfa_dir = root / "processed" / "lfa" / slug if slug else root / "processed" / "lfa"
     if lfa_dir.exists():
-        json_files = list(lfa_dir.glob("*.json"))
-        total_heat_kwh = 0.0
-        for json_file in json_files:
-            data = load_json_safe(json_file)
-            if data and "series" in data:
-                annual_kwh = sum(data["series"]) if isinstance(data["series"], list) else 0.0
-                total_heat_kwh += annual_kwh
-        
-        metrics["lfa_buildings"] = str(len(json_files))
+        per_building = lfa_building_summary(lfa_dir)
+        total_heat_kwh = float(per_building["annual_sum"].sum())
+        
+        metrics["lfa_buildings"] = str(len(per_building))
         metrics["lfa_annual_heat"] = f"{total_heat_kwh / 1000:.2f} MWh" if total_heat_kwh > 0 else "NA"
     else:
         metrics["lfa_buildings"] = "NA"
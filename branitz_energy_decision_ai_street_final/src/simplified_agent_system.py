@@ -493,10 +493,15 @@ def main():
             test_simplified_pipeline()
         elif command == "interactive":
             interactive_mode()
+        elif command == "batch":
+            # All streets in one process on one loaded district
+            from src.district_batch import main as batch_main
+            batch_main(sys.argv[2:])
         else:
-            print("Usage: python simplified_agent_system.py [test|interactive]")
+            print("Usage: python simplified_agent_system.py [test|interactive|batch]")
             print("  test: Run simplified pipeline test")
             print("  interactive: Run in interactive mode")
+            print("  batch: Run CHA + DHA + EAA for many streets (--streets, --all, --workers)")
     else:
         # Default to interactive mode
         interactive_mode()
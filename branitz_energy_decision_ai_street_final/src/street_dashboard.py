@@ -16,6 +16,12 @@ import io
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+try:
+    from src.lfa_load_matrix import lfa_building_summary
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import lfa_building_summary
+
 
 def load_json_safe(path: Path) -> Optional[Dict[str, Any]]:
     """Safely load JSON file, return None if not found or invalid."""
@@ -431,36 +437,26 @@ def extract_street_metrics(street_name: str, num_buildings: int = 14, root: Path
     if lfa_dir.exists():
         # Look for street-specific files (e.g., AN_DER_BAHN_*.json)
         street_prefix = street_name.upper().replace(" ", "_").replace("Ä", "AE").replace("Ö", "OE").replace("Ü", "UE")
-        json_files = list(lfa_dir.glob(f"{street_prefix}_*.json"))
+        per_building = lfa_building_summary(lfa_dir, pattern=f"{street_prefix}_*")
         
-        if not json_files:
-            # Fallback: look for any files if street-specific files not found
-            json_files = list(lfa_dir.glob("*.json"))
+        if per_building.empty:
+            # Fallback: look for any buildings if street-specific ones not found
+            per_building = lfa_building_summary(lfa_dir)
         
-        for json_file in json_files[:num_buildings]:  # Limit to requested number
-            try:
-                with open(json_file, 'r') as f:
-                    data = json.load(f)
-                
-                if "series" in data:
-                    annual_kwh = sum(data["series"]) if isinstance(data["series"], list) else 0.0
-                    peak_kw = max(data["series"]) if data["series"] else 0.0
-                    total_annual_heat += annual_kwh / 1000  # Convert to MWh
-                    peak_thermal_kw += peak_kw
-                    
-                    building_data.append({
-                        "building_id": json_file.stem,
-                        "annual_heat_mwh": annual_kwh / 1000,
-                        "peak_demand_kw": peak_kw
-                    })
-                    
-                    # Debug output
-                    data_source = data.get("metadata", {}).get("data_source", "unknown")
-                    street_name_data = data.get("metadata", {}).get("street_name", "unknown")
-                    print(f"✅ Loaded {json_file.stem}: {annual_kwh/1000:.1f} MWh, {peak_kw:.2f} kW (source: {data_source}, street: {street_name_data})")
-            except Exception as e:
-                print(f"Warning: Could not load {json_file}: {e}")
-                continue
+        for row in per_building.head(num_buildings).itertuples(index=False):  # Limit to requested number
+            annual_kwh = float(row.annual_sum)
+            peak_kw = float(row.peak)
+            total_annual_heat += annual_kwh / 1000  # Convert to MWh
+            peak_thermal_kw += peak_kw
+            
+            building_data.append({
+                "building_id": row.building_id,
+                "annual_heat_mwh": annual_kwh / 1000,
+                "peak_demand_kw": peak_kw
+            })
+            
+            # Debug output
+            print(f"✅ Loaded {row.building_id}: {annual_kwh/1000:.1f} MWh, {peak_kw:.2f} kW")
     
     # If no real data found, use mock data as fallback
     if not building_data:
@@ -0,0 +1,264 @@
+"""
+District Street Index - Street → Building Lookup for All Street Selection Tools
+
+The buildings GeoJSON is parsed once into an inverted index: normalized street
+name (stripped, lower case) → row offsets of the buildings with an address on
+that street, plus the street names as written in the data and one bounding box
+per street. The index is persisted next to the GeoJSON as
+``<name>.street_index.json`` and rebuilt automatically when the GeoJSON
+changes (size and modification time are recorded in the index).
+
+Row offsets are positions in the GeoJSON ``features`` list, which is also the
+row order of ``geopandas.read_file`` for that file.
+
+Author: Branitz Energy Decision AI
+Version: 1.0.0
+"""
+
+from __future__ import annotations
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+DEFAULT_BUILDINGS_GEOJSON = "data/geojson/hausumringe_mit_adressenV3.geojson"
+INDEX_SUFFIX = ".street_index.json"
+INDEX_VERSION = 1
+
+# Indexes and parsed features already loaded in this process: resolved source path ->
+# (file state, value). Only the latest file state of each path is kept.
+_INDEX_CACHE: Dict[str, Tuple[Tuple[str, int, int], "StreetIndex"]] = {}
+_FEATURE_CACHE: Dict[str, Tuple[Tuple[str, int, int], List[dict]]] = {}
+
+
+def normalize_street(name) -> str:
+    """Normalized street key (same matching rule as the street selection tools)."""
+    return str(name).strip().lower()
+
+
+@dataclass
+class StreetIndex:
+    """Normalized street name → building row offsets of one buildings GeoJSON."""
+    source: str
+    streets: Dict[str, Dict]  # key -> {"names": [...], "offsets": [...], "bbox": [minx, miny, maxx, maxy]}
+    building_ids: List[Optional[str]]  # gebaeude.oi per row
+    source_mtime_ns: int = 0
+    source_size: int = 0
+    metadata: Dict = field(default_factory=dict)
+
+    @property
+    def n_buildings(self) -> int:
+        return len(self.building_ids)
+
+    def street_names(self) -> List[str]:
+        """Sorted unique street names as written in the data."""
+        return sorted({name for entry in self.streets.values() for name in entry["names"]})
+
+    def offsets(self, street_name: str) -> List[int]:
+        """Row offsets of the buildings on one street (exact, case-insensitive)."""
+        entry = self.streets.get(normalize_street(street_name))
+        return list(entry["offsets"]) if entry else []
+
+    def offsets_for_streets(self, street_names: Iterable[str]) -> List[int]:
+        """Row offsets of the buildings on any of the streets, in file order."""
+        offsets = set()
+        for street_name in street_names:
+            offsets.update(self.offsets(street_name))
+        return sorted(offsets)
+
+    def search(self, text: str) -> List[int]:
+        """Row offsets of the buildings on every street whose name contains `text`."""
+        needle = normalize_street(text)
+        return self.offsets_for_streets(key for key in self.streets if needle in key)
+
+    def building_ids_for_street(self, street_name: str) -> List[str]:
+        """Building IDs (gebaeude.oi) on one street, in file order."""
+        return [self.building_ids[i] for i in self.offsets(street_name) if self.building_ids[i]]
+
+    def bbox(self, street_name: str) -> Optional[List[float]]:
+        """Bounding box [minx, miny, maxx, maxy] of the buildings on a street."""
+        entry = self.streets.get(normalize_street(street_name))
+        return list(entry["bbox"]) if entry and entry.get("bbox") else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": INDEX_VERSION,
+            "source": Path(self.source).name,
+            "source_mtime_ns": self.source_mtime_ns,
+            "source_size": self.source_size,
+            "n_buildings": self.n_buildings,
+            "building_ids": self.building_ids,
+            "streets": self.streets,
+            "metadata": self.metadata,
+        }
+
+
+def street_index_path(geojson_path: Union[str, Path]) -> Path:
+    """Path of the index persisted next to a buildings GeoJSON."""
+    geojson_path = Path(geojson_path)
+    return geojson_path.with_name(geojson_path.stem + INDEX_SUFFIX)
+
+
+def _file_state(path: Path) -> Tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def _cached(cache: Dict, state: Tuple[str, int, int]):
+    """Value cached for this file state, None if the path is not cached or has changed."""
+    entry = cache.get(state[0])
+    return entry[1] if entry and entry[0] == state else None
+
+
+def _coordinates(geometry: Optional[dict]) -> np.ndarray:
+    """All (x, y) vertices of a GeoJSON geometry."""
+    if not geometry:
+        return np.empty((0, 2))
+    if geometry.get("type") == "GeometryCollection":
+        parts = [_coordinates(g) for g in geometry.get("geometries", [])]
+        return np.vstack(parts) if parts else np.empty((0, 2))
+
+    def flatten(c):
+        if len(c) and not isinstance(c[0], (list, tuple)):
+            yield c[:2]
+        else:
+            for part in c:
+                yield from flatten(part)
+
+    points = list(flatten(geometry.get("coordinates") or []))
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def load_features(geojson_path: Union[str, Path] = DEFAULT_BUILDINGS_GEOJSON) -> List[dict]:
+    """Features of a buildings GeoJSON, parsed once per process and file state."""
+    path = Path(geojson_path)
+    state = _file_state(path)
+    features = _cached(_FEATURE_CACHE, state)
+    if features is None:
+        with open(path, "r", encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        _FEATURE_CACHE[state[0]] = (state, features)
+    return features
+
+
+def build_street_index(geojson_path: Union[str, Path] = DEFAULT_BUILDINGS_GEOJSON) -> StreetIndex:
+    """Build the street index from the buildings GeoJSON (one pass over all features)."""
+    path = Path(geojson_path)
+    _, mtime_ns, size = _file_state(path)
+    features = load_features(path)
+
+    streets: Dict[str, Dict] = {}
+    building_ids: List[Optional[str]] = []
+    bounds: Dict[str, List[np.ndarray]] = {}
+
+    for offset, feature in enumerate(features):
+        building_ids.append((feature.get("gebaeude") or {}).get("oi"))
+
+        keys = []
+        for adr in feature.get("adressen") or []:
+            street_val = adr.get("str")
+            if not street_val:
+                continue
+            key = normalize_street(street_val)
+            entry = streets.setdefault(key, {"names": [], "offsets": [], "bbox": None})
+            if street_val.strip() not in entry["names"]:
+                entry["names"].append(street_val.strip())
+            if key not in keys:
+                keys.append(key)
+                entry["offsets"].append(offset)
+
+        if keys:
+            points = _coordinates(feature.get("geometry"))
+            if len(points):
+                extent = np.r_[points.min(axis=0), points.max(axis=0)]
+                for key in keys:
+                    bounds.setdefault(key, []).append(extent)
+
+    for key, extents in bounds.items():
+        extents = np.vstack(extents)
+        streets[key]["bbox"] = [float(v) for v in np.r_[extents[:, :2].min(axis=0), extents[:, 2:].max(axis=0)]]
+
+    return StreetIndex(
+        source=str(path),
+        streets=streets,
+        building_ids=building_ids,
+        source_mtime_ns=mtime_ns,
+        source_size=size,
+        metadata={"n_streets": len(streets)},
+    )
+
+
+def write_street_index(index: StreetIndex, index_path: Union[str, Path, None] = None) -> Path:
+    """Persist the index as compact JSON (next to the GeoJSON by default)."""
+    index_path = Path(index_path) if index_path else street_index_path(index.source)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(index.to_dict(), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp_path.replace(index_path)
+    return index_path
+
+
+def read_street_index(geojson_path: Union[str, Path], index_path: Union[str, Path, None] = None) -> Optional[StreetIndex]:
+    """Read a persisted index; None if missing, unreadable or built from another file state."""
+    geojson_path = Path(geojson_path)
+    index_path = Path(index_path) if index_path else street_index_path(geojson_path)
+    if not index_path.exists():
+        return None
+    try:
+        data = json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    _, mtime_ns, size = _file_state(geojson_path)
+    if (data.get("version") != INDEX_VERSION or data.get("source_mtime_ns") != mtime_ns
+            or data.get("source_size") != size):
+        return None
+
+    return StreetIndex(
+        source=str(geojson_path),
+        streets=data["streets"],
+        building_ids=data["building_ids"],
+        source_mtime_ns=mtime_ns,
+        source_size=size,
+        metadata=data.get("metadata", {}),
+    )
+
+
+def load_street_index(geojson_path: Union[str, Path] = DEFAULT_BUILDINGS_GEOJSON, rebuild: bool = False) -> StreetIndex:
+    """
+    Street index for a buildings GeoJSON.
+
+    Returns the index already loaded in this process, else the persisted index
+    next to the GeoJSON, else builds it from the GeoJSON and persists it.
+    """
+    path = Path(geojson_path)
+    state = _file_state(path)
+
+    if not rebuild:
+        index = _cached(_INDEX_CACHE, state)
+        if index is not None:
+            return index
+        index = read_street_index(path)
+        if index is not None:
+            _INDEX_CACHE[state[0]] = (state, index)
+            return index
+
+    index = build_street_index(path)
+    try:
+        write_street_index(index)
+    except OSError as e:
+        print(f"⚠️ Could not persist street index next to {path}: {e}")
+    _INDEX_CACHE[state[0]] = (state, index)
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the district street index")
+    parser.add_argument("geojson", nargs="?", default=DEFAULT_BUILDINGS_GEOJSON, help="Buildings GeoJSON")
+    args = parser.parse_args()
+
+    index = load_street_index(args.geojson, rebuild=True)
+    print(f"✅ Indexed {len(index.streets)} streets, {index.n_buildings} buildings: {street_index_path(args.geojson)}")
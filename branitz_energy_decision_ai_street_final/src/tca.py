@@ -386,8 +386,10 @@ def run(config_path: str = "configs/tca.yml") -> dict:
     kpi_out = Path(paths["kpi_out"])
     kpi_out.parent.mkdir(parents=True, exist_ok=True)
 
+    from src.cha_network_tables import read_cha_table
+
     eaa = _read_summary_csv(paths["eaa_summary"])
-    cha = pd.read_csv(paths["cha_segments"])
+    cha = read_cha_table(paths["cha_segments"])
     dha = pd.read_csv(paths["dha_feeders"])
     
     # Validate CHA input requirements if configured
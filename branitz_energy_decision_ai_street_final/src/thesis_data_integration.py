@@ -13,7 +13,8 @@ Data Sources:
 - Electrical load profiles (for heat pump analysis)
 
 Output:
-- LFA-compatible JSON files with 8760-hour heat demand series
+- LFA-compatible JSON files with 8760-hour heat demand series (optional)
+- Load matrix store (hours × buildings × series/q10/q90) for fast bulk reads
 - Temperature-dependent heating demand
 - Physics-based COP calculations for heat pumps
 """
@@ -26,10 +27,18 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import yaml
-from scipy import interpolate
 import warnings
 
+try:
+    from src.lfa_load_matrix import UNIT_TO_KW, LoadMatrixWriter
+except ImportError:
+    # Fallback for direct execution
+    from lfa_load_matrix import UNIT_TO_KW, LoadMatrixWriter
+
 warnings.filterwarnings("ignore")
 
 # Configure logging
@@ -209,6 +218,103 @@ class ElectricalProfileProcessor:
         }
 
 
+HEATING_THRESHOLD_C = 15.0  # No heating above this outdoor temperature
+
+
+def interpolate_heating_series(temp_power_map: Dict[float, float], hourly_temps,
+                               heating_threshold: float = HEATING_THRESHOLD_C) -> np.ndarray:
+    """
+    Heating power (W) for every hourly temperature in one vectorized pass.
+    
+    Linear interpolation between the representative periods, extrapolated
+    linearly beyond the coldest/warmest period; zero at or above the heating
+    threshold and never negative.
+    """
+    if len(temp_power_map) < 2:
+        # Not enough data points for interpolation
+        avg_power = sum(temp_power_map.values()) / len(temp_power_map) if temp_power_map else 0
+        return np.full(8760, float(avg_power))
+    
+    temps = np.array(sorted(temp_power_map), dtype=float)
+    powers = np.array([temp_power_map[t] for t in sorted(temp_power_map)], dtype=float)
+    hourly_temps = np.asarray(hourly_temps, dtype=float)
+    
+    power = np.interp(hourly_temps, temps, powers)
+    # np.interp clamps at the ends; extend the outer segments instead
+    below = hourly_temps < temps[0]
+    above = hourly_temps > temps[-1]
+    power[below] = powers[0] + (hourly_temps[below] - temps[0]) * (powers[1] - powers[0]) / (temps[1] - temps[0])
+    power[above] = powers[-1] + (hourly_temps[above] - temps[-1]) * (powers[-1] - powers[-2]) / (temps[-1] - temps[-2])
+    
+    # No heating above threshold; ensure non-negative (NaN temperatures give 0)
+    heating = (hourly_temps < heating_threshold) & (power > 0.0)
+    return np.where(heating, power, 0.0)
+
+
+def heat_demand_record(building_id: str, temp_power_map: Dict[float, float], hourly_temps,
+                       scenario: str) -> Dict:
+    """LFA-compatible heat demand record (series/q10/q90 as arrays in W) for one building."""
+    heating_series = interpolate_heating_series(temp_power_map, hourly_temps)
+    
+    return {
+        'building_id': building_id,
+        'series': heating_series,  # 8760-hour series in W
+        # Generate quantiles (simplified - using ±10% of mean)
+        'q10': np.maximum(heating_series * 0.9, 0),
+        'q90': heating_series * 1.1,
+        'metadata': {
+            'scenario': scenario,
+            'model_version': 'thesis-data-v1.0.0',
+            'forecast_date': datetime.now().isoformat(),
+            'total_annual_kwh': float(heating_series.sum()) / 1000,  # Convert W to kW, then to kWh
+            'peak_kw': float(heating_series.max()) / 1000,  # Convert W to kW
+            'avg_kw': float(heating_series.mean()) / 1000,  # Convert W to kW
+            'units': 'W',
+            'data_source': 'physics_based'
+        }
+    }
+
+
+def _generate_building_chunk(chunk: List[Tuple[str, Dict[float, float]]], hourly_temps: np.ndarray,
+                             scenario: str, output_dir: str, write_json: bool) -> List[Tuple]:
+    """
+    Process one chunk of buildings (runs in a worker process).
+    
+    Returns:
+        One (building_id, loads, summary) tuple per building; loads is a float32
+        (hours × [series, q10, q90]) block in kW, or None if the building failed
+    """
+    results = []
+    for building_id, temp_power_map in chunk:
+        try:
+            record = heat_demand_record(building_id, temp_power_map, hourly_temps, scenario)
+            if write_json and not ThesisDataIntegrator.save_lfa_compatible_json(record, output_dir):
+                results.append((building_id, None, None))
+                continue
+            # The store holds kW so that readers can use it memory-mapped without conversion
+            loads = (np.stack([record['series'], record['q10'], record['q90']], axis=1)
+                     * UNIT_TO_KW['W']).astype(np.float32)
+            results.append((building_id, loads, {
+                'annual_kwh': record['metadata']['total_annual_kwh'],
+                'peak_kw': record['metadata']['peak_kw']
+            }))
+        except Exception as e:
+            logger.error(f"Failed to process building {building_id}: {e}")
+            results.append((building_id, None, None))
+    return results
+
+
+def _map_in_order(pool: ProcessPoolExecutor, fn, arg_lists, max_pending: int):
+    """Results of fn(*args) in order, with at most max_pending chunks submitted but not yet consumed."""
+    pending = deque()
+    for args in arg_lists:
+        pending.append(pool.submit(fn, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
 class ThesisDataIntegrator:
     """Main integrator class that combines all data sources."""
     
@@ -278,28 +384,7 @@ class ThesisDataIntegrator:
     
     def interpolate_heating_demand(self, temp_power_map: Dict[float, float], hourly_temps: List[float]) -> List[float]:
         """Interpolate heating demand for 8760 hours based on temperature."""
-        if len(temp_power_map) < 2:
-            # Not enough data points for interpolation
-            avg_power = sum(temp_power_map.values()) / len(temp_power_map) if temp_power_map else 0
-            return [avg_power] * 8760
-        
-        # Create interpolation function
-        temps = sorted(temp_power_map.keys())
-        powers = [temp_power_map[t] for t in temps]
-        
-        # Use linear interpolation
-        interp_func = interpolate.interp1d(temps, powers, kind='linear', bounds_error=False, fill_value='extrapolate')
-        
-        # Interpolate for all hours
-        heating_demands = []
-        for temp in hourly_temps:
-            if temp >= 15.0:  # No heating above heating threshold
-                heating_demands.append(0.0)
-            else:
-                power = float(interp_func(temp))
-                heating_demands.append(max(0.0, power))  # Ensure non-negative
-        
-        return heating_demands
+        return interpolate_heating_series(temp_power_map, hourly_temps).tolist()
     
     def generate_building_heat_demand(self, building_id: str, scenario: str = None) -> Optional[Dict]:
         """Generate 8760-hour heat demand series for a building."""
@@ -317,36 +402,15 @@ class ThesisDataIntegrator:
         # Create temperature-power mapping
         temp_power_map = self.heating_processor.create_temperature_power_mapping(heating_profile)
         
-        # Get hourly temperatures from weather data
-        hourly_temps = self.weather_data['temperature'].tolist()
-        
-        # Interpolate heating demand
-        heating_series = self.interpolate_heating_demand(temp_power_map, hourly_temps)
-        
-        # Calculate statistics
-        total_annual_kwh = sum(heating_series) / 1000  # Convert W to kW, then to kWh
-        peak_kw = max(heating_series) / 1000  # Convert W to kW
-        avg_kw = np.mean(heating_series) / 1000  # Convert W to kW
-        
-        # Generate quantiles (simplified - using ±10% of mean)
-        q10_series = [max(0, h * 0.9) for h in heating_series]
-        q90_series = [h * 1.1 for h in heating_series]
-        
-        return {
-            'building_id': building_id,
-            'series': heating_series,  # 8760-hour series in W
-            'q10': q10_series,
-            'q90': q90_series,
-            'metadata': {
-                'scenario': scenario,
-                'model_version': 'thesis-data-v1.0.0',
-                'forecast_date': datetime.now().isoformat(),
-                'total_annual_kwh': total_annual_kwh,
-                'peak_kw': peak_kw,
-                'avg_kw': avg_kw,
-                'data_source': 'physics_based'
-            }
-        }
+        # Interpolate heating demand for all hourly temperatures at once
+        record = heat_demand_record(building_id, temp_power_map, self._hourly_temps(), scenario)
+        for key in ('series', 'q10', 'q90'):
+            record[key] = record[key].tolist()
+        return record
+    
+    def _hourly_temps(self) -> np.ndarray:
+        """Hourly outdoor temperatures from the weather data."""
+        return np.asarray(self.weather_data['temperature'], dtype=float)
     
     def generate_heat_pump_profile(self, building_id: str) -> Optional[Dict]:
         """Generate heat pump electrical load profile for DHA."""
@@ -379,8 +443,9 @@ class ThesisDataIntegrator:
             }
         }
     
-    def save_lfa_compatible_json(self, building_data: Dict, output_dir: str) -> bool:
-        """Save building data in LFA-compatible JSON format."""
+    @staticmethod
+    def save_lfa_compatible_json(building_data: Dict, output_dir: str) -> bool:
+        """Save building data in LFA-compatible JSON format (compact, arrays as lists)."""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
@@ -388,8 +453,10 @@ class ThesisDataIntegrator:
         output_file = output_path / f"{building_id}.json"
         
         try:
+            data = {key: value.tolist() if isinstance(value, np.ndarray) else value
+                    for key, value in building_data.items()}
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(building_data, f, indent=2, ensure_ascii=False)
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
             
             logger.debug(f"Saved {building_id}.json")
             return True
@@ -398,59 +465,103 @@ class ThesisDataIntegrator:
             logger.error(f"Failed to save {building_id}.json: {e}")
             return False
     
-    def generate_all_buildings(self, output_dir: str = None, scenario: str = None) -> Dict:
-        """Generate heat demand data for all buildings."""
+    def generate_all_buildings(self, output_dir: str = None, scenario: str = None,
+                               workers: int = None, chunk_size: int = None,
+                               write_json: bool = None) -> Dict:
+        """
+        Generate heat demand data for all buildings.
+        
+        Buildings are processed in chunks; with workers > 1 the chunks fan out
+        over a process pool. All series go into the load matrix store, and the
+        per-building JSON files are only written when write_json is set.
+        
+        Args:
+            output_dir: Output directory (default: config output.dir)
+            scenario: Weather scenario (default: config scenarios.default)
+            workers: Worker processes (default: config processing.workers, 1 = serial)
+            chunk_size: Buildings per chunk (default: config processing.batch_size)
+            write_json: Also write per-building JSON (default: output.format == "lfa_compatible")
+        """
         if output_dir is None:
             output_dir = self.config['output']['dir']
         
         if scenario is None:
             scenario = self.config['scenarios']['default']
         
+        processing = self.config.get('processing', {})
+        if workers is None:
+            workers = processing.get('workers') or (os.cpu_count() if processing.get('parallel_processing') else 1)
+        if chunk_size is None:
+            chunk_size = processing.get('batch_size', 100)
+        if write_json is None:
+            write_json = self.config['output'].get('format', 'lfa_compatible') == 'lfa_compatible'
+        
         logger.info(f"Generating heat demand data for scenario: {scenario}")
         
-        # Get all heated buildings
+        # Get all heated buildings with their temperature-power mappings
         heated_buildings = []
+        failed_lookups = 0
         for building_id, building_data in self.heating_data['ergebnisse'].items():
-            if building_data.get('Szenarien') != 0:
-                heated_buildings.append(building_id)
+            if building_data.get('Szenarien') == 0:
+                continue
+            heating_profile = self.heating_processor.get_building_heating_profile(
+                self.heating_data, building_id, scenario
+            )
+            if heating_profile is None:
+                failed_lookups += 1
+                continue
+            heated_buildings.append(
+                (building_id, self.heating_processor.create_temperature_power_mapping(heating_profile))
+            )
         
-        logger.info(f"Processing {len(heated_buildings)} heated buildings")
+        logger.info(f"Processing {len(heated_buildings)} heated buildings "
+                    f"in chunks of {chunk_size} on {workers} worker(s)")
         
         results = {
             'processed_buildings': 0,
-            'failed_buildings': 0,
+            'failed_buildings': failed_lookups,
             'output_dir': output_dir,
             'scenario': scenario,
             'building_results': []
         }
         
-        # Process each building
-        for i, building_id in enumerate(heated_buildings):
-            if i % 100 == 0:
-                logger.info(f"Processing building {i+1}/{len(heated_buildings)}: {building_id}")
-            
-            try:
-                # Generate heat demand data
-                building_data = self.generate_building_heat_demand(building_id, scenario)
+        # Columnar load store, filled chunk by chunk
+        load_store = LoadMatrixWriter(
+            output_dir, [building_id for building_id, _ in heated_buildings],
+            units="kW", metadata={"scenario": scenario}
+        )
+        
+        hourly_temps = self._hourly_temps()
+        chunks = [heated_buildings[i:i + chunk_size] for i in range(0, len(heated_buildings), chunk_size)]
+        args = ([chunk, hourly_temps, scenario, output_dir, write_json] for chunk in chunks)
+        
+        # Chunks are written to the load store as they arrive, so only a few
+        # chunk blocks are held in memory at any time
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(chunks) > 1 else None
+        if pool is not None:
+            chunk_results = _map_in_order(pool, _generate_building_chunk, args, max_pending=2 * workers)
+        else:
+            chunk_results = (_generate_building_chunk(*a) for a in args)
+        
+        try:
+            for chunk_result in chunk_results:
+                done = [(building_id, loads, summary) for building_id, loads, summary in chunk_result if loads is not None]
+                results['failed_buildings'] += len(chunk_result) - len(done)
+                if not done:
+                    continue
                 
-                if building_data:
-                    # Save LFA-compatible JSON
-                    if self.save_lfa_compatible_json(building_data, output_dir):
-                        results['processed_buildings'] += 1
-                        results['building_results'].append({
-                            'building_id': building_id,
-                            'status': 'success',
-                            'annual_kwh': building_data['metadata']['total_annual_kwh'],
-                            'peak_kw': building_data['metadata']['peak_kw']
-                        })
-                    else:
-                        results['failed_buildings'] += 1
-                else:
-                    results['failed_buildings'] += 1
-                    
-            except Exception as e:
-                logger.error(f"Failed to process building {building_id}: {e}")
-                results['failed_buildings'] += 1
+                load_store.write_block([d[0] for d in done], np.stack([d[1] for d in done], axis=1))
+                results['processed_buildings'] += len(done)
+                results['building_results'].extend(
+                    {'building_id': building_id, 'status': 'success', **summary}
+                    for building_id, _, summary in done
+                )
+                logger.info(f"Processed {results['processed_buildings']}/{len(heated_buildings)} buildings")
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        
+        load_store.close()
         
         # Create .ready file for pipeline coordination
         ready_file = Path(output_dir) / '.ready'
@@ -471,6 +582,10 @@ def main():
                        help="Weather scenario (mittleres_jahr, kaltes_jahr, heisses_jahr)")
     parser.add_argument("--output", type=str, default="processed/lfa",
                        help="Output directory for generated files")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Worker processes for the building fan-out (default: from config)")
+    parser.add_argument("--store-only", action="store_true",
+                       help="Write only the load matrix store, no per-building JSON files")
     
     args = parser.parse_args()
     
@@ -483,7 +598,10 @@ def main():
         return 1
     
     # Generate heat demand data for all buildings
-    results = integrator.generate_all_buildings(args.output, args.scenario)
+    results = integrator.generate_all_buildings(
+        args.output, args.scenario, workers=args.workers,
+        write_json=False if args.store_only else None
+    )
     
     # Print summary
     print(f"\n=== THESIS DATA INTEGRATION SUMMARY ===")
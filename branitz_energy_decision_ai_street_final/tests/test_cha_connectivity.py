@@ -0,0 +1,78 @@
+from itertools import product
+from pathlib import Path
+import sys
+
+import networkx as nx
+import numpy as np
+import pytest
+from shapely.geometry import Point
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha_connectivity import ComponentStitcher
+
+
+def _fragmented_graph(seed: int = 0) -> nx.Graph:
+    """Several short random street chains scattered over a 1 km square."""
+    rng = np.random.default_rng(seed)
+    graph = nx.Graph()
+    for _ in range(12):
+        start = rng.uniform(0, 1000, size=2)
+        nodes = [tuple(start + step * rng.uniform(5, 20, size=2)) for step in range(4)]
+        for a, b in zip(nodes, nodes[1:]):
+            graph.add_edge(a, b, weight=Point(a).distance(Point(b)))
+    return graph
+
+
+def _brute_force_gap(graph: nx.Graph, comp_a, comp_b) -> float:
+    return min(Point(a).distance(Point(b)) for a, b in product(comp_a, comp_b))
+
+
+def test_star_links_match_brute_force():
+    """Star mode links each component to the largest one at the closest pair."""
+    graph = _fragmented_graph()
+    components = list(nx.connected_components(graph))
+    largest = max(components, key=len)
+
+    links = ComponentStitcher(mode="star").stitch(graph)
+
+    assert nx.is_connected(graph)
+    assert len(links) == len(components) - 1
+    for link in links:
+        assert link.node_a in largest
+        component = next(c for c in components if link.node_b in c)
+        assert link.distance_m == pytest.approx(_brute_force_gap(graph, largest, component))
+
+
+def test_mst_stitch_forest_is_minimal():
+    """MST mode adds the minimum spanning forest over component gaps."""
+    graph = _fragmented_graph(seed=1)
+    components = list(nx.connected_components(graph))
+
+    gaps = nx.Graph()
+    for i, j in product(range(len(components)), repeat=2):
+        if i < j:
+            gaps.add_edge(i, j, weight=_brute_force_gap(graph, components[i], components[j]))
+    expected = nx.minimum_spanning_tree(gaps).size(weight="weight")
+
+    links = ComponentStitcher(mode="mst").stitch(graph)
+
+    assert nx.is_connected(graph)
+    assert sum(link.distance_m for link in links) == pytest.approx(expected)
+    assert sum(link.distance_m for link in links) <= sum(
+        link.distance_m for link in ComponentStitcher(mode="star").find_links(_fragmented_graph(seed=1))
+    )
+
+
+def test_max_distance_and_collinear_fallback():
+    """Long links are skipped and collinear nodes still stitch in MST mode."""
+    graph = nx.Graph()
+    graph.add_edge((0.0, 0.0), (10.0, 0.0))
+    graph.add_edge((20.0, 0.0), (30.0, 0.0))
+    graph.add_edge((500.0, 0.0), (510.0, 0.0))
+
+    links = ComponentStitcher(mode="mst", max_distance_m=100).stitch(graph)
+
+    assert [round(link.distance_m, 6) for link in links] == [10.0]
+    assert nx.number_connected_components(graph) == 2
+    assert ComponentStitcher(mode="mst").find_links(graph)[0].distance_m == pytest.approx(470.0)
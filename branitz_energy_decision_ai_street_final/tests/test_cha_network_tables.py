@@ -0,0 +1,84 @@
+from pathlib import Path
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha_network_tables import (
+    build_network_tables,
+    load_network_tables,
+    read_cha_table,
+    write_network_tables,
+)
+
+pytest.importorskip("pyarrow")
+
+
+def _network():
+    """Plant -> junction -> building network as CHA keeps it in memory."""
+    supply = pd.DataFrame(
+        {
+            "start_node": [(0.0, 0.0), (100.0, 0.0)],
+            "end_node": [(100.0, 0.0), (100.0, 50.0)],
+            "length_m": [100.0, 50.0],
+            "street_id": ["plant_connection", 3],
+            "building_served": [7, 7],
+        }
+    )
+    returns = supply.rename(columns={"start_node": "end_node", "end_node": "start_node"})
+    services = pd.DataFrame(
+        {
+            "building_id": [7, 7],
+            "connection_x": [100.0, 100.0],
+            "connection_y": [50.0, 50.0],
+            "pipe_type": ["supply_service", "return_service"],
+        }
+    )
+    return build_network_tables(supply, returns, services)
+
+
+def test_parquet_round_trip(tmp_path: Path):
+    """Tables written as Parquet load back with integer IDs and float coordinates."""
+    tables = _network()
+    written = write_network_tables(tables, tmp_path)
+    assert set(written) == {"nodes", "supply_pipes", "return_pipes", "service_connections"}
+    assert not (tmp_path / "supply_pipes.csv").exists()
+
+    loaded = load_network_tables(tmp_path)
+
+    assert loaded.plant_node_id == tables.plant_node_id
+    pd.testing.assert_frame_equal(loaded.nodes, tables.nodes)
+    assert loaded.supply_pipes["from_node_id"].dtype == np.int64
+    assert loaded.nodes["x"].dtype == np.float64
+    assert loaded.supply_pipes["street_id"].tolist() == ["plant_connection", "3"]
+    assert loaded.service_connections["node_id"].tolist() == tables.service_connections["node_id"].tolist()
+
+
+def test_csv_fallback_and_table_reader(tmp_path: Path):
+    """Without Parquet files the loader parses the CSV exports; tables prefer Parquet siblings."""
+    tables = _network()
+    frame = pd.DataFrame({"start_node": ["(0.0, 0.0)"], "end_node": ["(1.0, 0.0)"], "length_m": [1.0]})
+    frame.to_csv(tmp_path / "supply_pipes.csv", index=False)
+    frame.rename(columns={"start_node": "end_node", "end_node": "start_node"}).to_csv(
+        tmp_path / "return_pipes.csv", index=False
+    )
+    tables.service_connections.iloc[:0].to_csv(tmp_path / "service_connections.csv", index=False)
+
+    loaded = load_network_tables(tmp_path)
+    assert loaded.nodes[["x", "y"]].values.tolist() == [[0.0, 0.0], [1.0, 0.0]]
+
+    segments = pd.DataFrame({"seg_id": ["a"], "v_ms": [1.2]})
+    segments.to_csv(tmp_path / "segments.csv", index=False)
+    assert read_cha_table(tmp_path / "segments.csv")["v_ms"].tolist() == [1.2]
+    segments.assign(v_ms=[0.8]).to_parquet(tmp_path / "segments.parquet")
+    assert read_cha_table(tmp_path / "segments.csv")["v_ms"].tolist() == [0.8]
+
+    # A CSV regenerated after the Parquet file is the current table
+    segments.assign(v_ms=[0.5]).to_csv(tmp_path / "segments.csv", index=False)
+    parquet_mtime = (tmp_path / "segments.parquet").stat().st_mtime_ns
+    os.utime(tmp_path / "segments.csv", ns=(parquet_mtime, parquet_mtime + 1_000_000_000))
+    assert read_cha_table(tmp_path / "segments.csv")["v_ms"].tolist() == [0.5]
@@ -0,0 +1,88 @@
+from pathlib import Path
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha_network_tables import build_network_tables, parse_node_coordinates
+
+
+def _write_cha_outputs(out: Path) -> None:
+    """Write a small plant -> junction -> two buildings network in CHA CSV form."""
+    out.mkdir(parents=True, exist_ok=True)
+    plant, junction, b1, b2 = "POINT (0 0)", (100.0, 0.0), (200.0, 0.0), (100.0, 80.0)
+    supply = pd.DataFrame(
+        {
+            "start_node": [plant, junction, junction],
+            "end_node": [junction, b1, b2],
+            "length_m": [100.0, 100.0, 80.0],
+            "street_id": [0, 0, 1],
+            "building_served": [1, 1, 2],
+            "pipe_type": "supply",
+        }
+    )
+    returns = supply.rename(columns={"start_node": "end_node", "end_node": "start_node"})
+    returns["pipe_type"] = "return"
+    services = pd.DataFrame(
+        {
+            "building_id": [1, 1, 2, 2],
+            "connection_x": [200.0, 200.0, 100.0, 100.0],
+            "connection_y": [0.0, 0.0, 80.0, 80.0],
+            "pipe_type": ["supply_service", "return_service"] * 2,
+        }
+    )
+    supply.to_csv(out / "supply_pipes.csv", index=False)
+    returns.to_csv(out / "return_pipes.csv", index=False)
+    services.to_csv(out / "service_connections.csv", index=False)
+    (out / "network_stats.json").write_text(json.dumps({}), encoding="utf-8")
+
+
+def test_network_tables_assign_numeric_node_ids(tmp_path: Path):
+    """CSV node strings become integer node IDs with a plant at the supply root."""
+    _write_cha_outputs(tmp_path)
+    tables = build_network_tables(
+        pd.read_csv(tmp_path / "supply_pipes.csv"),
+        pd.read_csv(tmp_path / "return_pipes.csv"),
+        pd.read_csv(tmp_path / "service_connections.csv"),
+    )
+
+    assert len(tables.nodes) == 4
+    plant = tables.nodes.loc[tables.plant_node_id]
+    assert (plant["x"], plant["y"], plant["node_type"]) == (0.0, 0.0, "plant")
+    service_xy = tables.nodes.loc[tables.service_connections["node_id"], ["x", "y"]].to_numpy()
+    np.testing.assert_array_equal(
+        service_xy, tables.service_connections[["connection_x", "connection_y"]].to_numpy()
+    )
+    assert "start_node" not in tables.supply_pipes
+    assert tables.supply_pipes["from_node_id"].dtype == np.int64
+
+
+def test_parse_node_coordinates_does_not_evaluate():
+    """Unparseable node strings yield NaN instead of being executed."""
+    coords = parse_node_coordinates(pd.Series(["__import__('os').getcwd()", "(1.0, 2.0)"]))
+    assert np.isnan(coords[0]).all()
+    assert coords[1].tolist() == [1.0, 2.0]
+
+
+def test_bulk_pandapipes_network_maps_sinks_to_buildings(tmp_path: Path):
+    """Bulk construction creates one sink per building at its own junction and converges."""
+    pytest.importorskip("pandapipes")
+    from src.cha_pandapipes import CHAPandapipesSimulator
+
+    _write_cha_outputs(tmp_path)
+    simulator = CHAPandapipesSimulator(str(tmp_path))
+    assert simulator.create_pandapipes_network()
+
+    net = simulator.net
+    assert len(net.junction) == 4
+    assert len(net.pipe) == 6
+    tables = simulator.network_tables
+    sink_xy = tables.nodes.loc[net.sink["junction"], ["x", "y"]].to_numpy()
+    assert sorted(map(tuple, sink_xy)) == [(100.0, 80.0), (200.0, 0.0)]
+    assert net.ext_grid["junction"].tolist() == [tables.plant_node_id]
+
+    assert simulator.run_hydraulic_simulation()
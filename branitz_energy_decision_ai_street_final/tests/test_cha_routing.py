@@ -0,0 +1,111 @@
+from pathlib import Path
+import sys
+
+import networkx as nx
+import pandas as pd
+import pytest
+from shapely.geometry import LineString
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha import CentralizedHeatingAgent
+
+
+def _agent(tmp_path: Path, routing_mode: str) -> CentralizedHeatingAgent:
+    """Create a CHA on a small grid street graph with a plant and three buildings."""
+    config_path = tmp_path / f"cha_{routing_mode}.yml"
+    config_path.write_text(f"routing_mode: {routing_mode}\n", encoding="utf-8")
+    cha = CentralizedHeatingAgent(str(config_path))
+
+    grid = nx.grid_2d_graph(4, 4)
+    for u, v in grid.edges:
+        start, end = (u[0] * 100.0, u[1] * 100.0), (v[0] * 100.0, v[1] * 100.0)
+        cha.street_graph.add_edge(
+            start,
+            end,
+            weight=100.0,
+            street_id=0,
+            geometry=LineString([start, end]),
+            street_name="Grid Street",
+            highway_type="residential",
+        )
+    cha.street_graph.nodes[(0.0, 0.0)]["node_type"] = "plant"
+
+    cha.service_connections = pd.DataFrame(
+        {
+            "building_id": [1, 2, 3],
+            "connection_x": [300.0, 300.0, 100.0],
+            "connection_y": [300.0, 200.0, 0.0],
+        }
+    )
+    return cha
+
+
+def test_tree_routing_matches_per_building_lengths(tmp_path: Path):
+    """Shortest-path-tree routing yields a tree with the same per-building path lengths."""
+    tree = _agent(tmp_path, "shortest_path_tree")
+    assert tree.create_dual_pipe_network()
+
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(
+        zip(tree.supply_pipes["start_node"], tree.supply_pipes["end_node"], tree.supply_pipes["length_m"])
+    )
+    assert nx.is_tree(graph)
+    for building in tree.service_connections.itertuples():
+        node = (building.connection_x, building.connection_y)
+        expected = nx.shortest_path_length(tree.street_graph, (0.0, 0.0), node, weight="weight")
+        assert nx.shortest_path_length(graph, (0.0, 0.0), node, weight="weight") == pytest.approx(expected)
+
+    assert len(tree.return_pipes) == len(tree.supply_pipes)
+    assert set(zip(tree.return_pipes["end_node"], tree.return_pipes["start_node"])) == set(
+        zip(tree.supply_pipes["start_node"], tree.supply_pipes["end_node"])
+    )
+
+
+def test_tree_routing_downstream_building_counts(tmp_path: Path):
+    """Each supply edge carries the number of buildings routed through it."""
+    tree = _agent(tmp_path, "shortest_path_tree")
+    assert tree.create_dual_pipe_network()
+
+    plant_edges = tree.supply_pipes[tree.supply_pipes["start_node"] == (0.0, 0.0)]
+    assert plant_edges["downstream_buildings"].sum() == 3
+
+    for pipe in tree.supply_pipes.itertuples():
+        end = pipe.end_node
+        children = tree.supply_pipes[tree.supply_pipes["start_node"] == end]["downstream_buildings"].sum()
+        served_here = sum(
+            (b.connection_x, b.connection_y) == end for b in tree.service_connections.itertuples()
+        )
+        assert pipe.downstream_buildings == children + served_here
+
+
+def test_per_building_routing_still_available(tmp_path: Path):
+    """The legacy per-building routing mode produces the same columns."""
+    legacy = _agent(tmp_path, "per_building")
+    tree = _agent(tmp_path, "shortest_path_tree")
+    assert legacy.create_dual_pipe_network()
+    assert tree.create_dual_pipe_network()
+
+    assert list(legacy.supply_pipes.columns) == list(tree.supply_pipes.columns)
+    assert legacy.supply_pipes["length_m"].sum() >= tree.supply_pipes["length_m"].sum()
+
+
+def test_tree_routing_with_zero_length_plant_connection(tmp_path: Path):
+    """A plant snapped exactly onto a street node (0 m link) still routes as a tree."""
+    cha = _agent(tmp_path, "shortest_path_tree")
+    del cha.street_graph.nodes[(0.0, 0.0)]["node_type"]
+    cha.street_graph.add_node("plant", node_type="plant")
+    cha.street_graph.add_edge(
+        "plant",
+        (0.0, 0.0),
+        weight=0.0,
+        street_id="plant_connection",
+        geometry=None,
+        street_name="Plant Connection",
+        highway_type="service",
+    )
+
+    assert cha.create_dual_pipe_network()
+    assert len(cha.supply_pipes) == 7
+    plant_edge = cha.supply_pipes[cha.supply_pipes["start_node"] == "plant"]
+    assert plant_edge["downstream_buildings"].tolist() == [3]
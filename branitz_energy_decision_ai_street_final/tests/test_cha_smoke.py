@@ -134,6 +134,8 @@ def test_cha_network_construction(tmp_path: Path, monkeypatch):
         assert (output_dir / "supply_pipes.csv").exists()
         assert (output_dir / "return_pipes.csv").exists()
         assert (output_dir / "service_connections.csv").exists()
+        assert (output_dir / "nodes.parquet").exists()
+        assert (output_dir / "supply_pipes.parquet").exists()
         assert (output_dir / "network_stats.json").exists()
         assert (output_dir / "network_map.html").exists()
         
@@ -0,0 +1,57 @@
+from pathlib import Path
+import sys
+
+import geopandas as gpd
+import numpy as np
+from shapely.geometry import Point, LineString
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha_street_snapping import StreetSnappingEngine
+
+
+def _streets() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {"name": ["South", "East", "North"]},
+        geometry=[
+            LineString([(0, 0), (100, 0)]),
+            LineString([(100, 0), (100, 100)]),
+            LineString([(100, 100), (0, 100)]),
+        ],
+        index=[10, 11, 12],
+        crs="EPSG:32633",
+    )
+
+
+def test_snap_matches_brute_force():
+    """Spatial-index snapping agrees with a full scan over all streets."""
+    streets = _streets()
+    rng = np.random.default_rng(0)
+    points = [Point(x, y) for x, y in rng.uniform(-20, 120, size=(50, 2))]
+
+    result = StreetSnappingEngine(streets).snap(points)
+
+    assert len(result) == len(points)
+    for i, point in enumerate(points):
+        distances = streets.geometry.distance(point)
+        assert np.isclose(result.distances[i], distances.min())
+        street = streets.geometry.loc[result.street_labels[i]]
+        expected = street.interpolate(street.project(point))
+        assert np.isclose(result.snapped_x[i], expected.x)
+        assert np.isclose(result.snapped_y[i], expected.y)
+
+
+def test_snap_point_returns_street_row():
+    """Single-point snapping returns the snapped point and its street row."""
+    snapped, street, distance = StreetSnappingEngine(_streets()).snap_point(Point(110, 50))
+
+    assert street.name == 11
+    assert street["name"] == "East"
+    assert np.isclose(distance, 10.0)
+    assert (snapped.x, snapped.y) == (100.0, 50.0)
+
+
+def test_snap_empty_input():
+    """Snapping no points returns an empty result."""
+    result = StreetSnappingEngine(_streets()).snap([])
+    assert len(result) == 0
@@ -0,0 +1,90 @@
+from pathlib import Path
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cha_timeseries import load_lfa_mass_flows, run_time_series, sink_mass_flow_matrix
+
+pp = pytest.importorskip("pandapipes")
+
+PIPEFLOW_OPTIONS = {"mode": "sequential", "iter": 100, "tol_p": 1e-6, "tol_v": 1e-6}
+
+
+def _net():
+    """Plant -> junction -> two building sinks, plus one sink without an LFA profile."""
+    net = pp.create_empty_network(fluid="water")
+    j = pp.create_junctions(net, 5, pn_bar=5.0, tfluid_k=353.15)
+    pp.create_ext_grid(net, j[0], p_bar=5.0, t_k=353.15)
+    pp.create_pipes_from_parameters(
+        net, [j[0], j[1], j[1], j[1]], [j[1], j[2], j[3], j[4]],
+        length_km=[0.1, 0.05, 0.05, 0.02], diameter_m=0.05, k_mm=0.1,
+        u_w_per_m2k=0.6, text_k=283.15, sections=1,
+    )
+    pp.create_sinks(net, [j[2], j[3], j[4]], mdot_kg_per_s=0.1, name=["Building_a", "Building_b", "Building_c"])
+    return net
+
+
+def _write_lfa(lfa_dir: Path, n_hours: int = 24) -> None:
+    lfa_dir.mkdir(parents=True, exist_ok=True)
+    hours = np.arange(n_hours)
+    for building_id, scale in [("a", 10.0), ("b", 20.0)]:
+        series = scale * (1.0 + 0.5 * np.sin(hours / 4.0))
+        (lfa_dir / f"{building_id}.json").write_text(json.dumps({"series": series.tolist()}))
+
+
+def test_lfa_series_drive_sink_mass_flows(tmp_path):
+    """Heat demand converts to ṁ = Q / (cp·ΔT); sinks without a forecast keep their design flow."""
+    _write_lfa(tmp_path)
+    mass_flows = load_lfa_mass_flows(tmp_path, ["a", "b", "c"], delta_t_k=30.0)
+
+    assert list(mass_flows.columns) == ["a", "b"]
+    series_a = json.loads((tmp_path / "a.json").read_text())["series"]
+    assert np.allclose(mass_flows["a"], np.asarray(series_a) / (4.18 * 30.0))
+
+    matrix = sink_mass_flow_matrix(_net(), mass_flows)
+    assert matrix.shape == (24, 3)
+    assert np.allclose(matrix[0], mass_flows["a"])
+    assert np.allclose(matrix[2], 0.1)
+
+
+def test_time_series_matches_single_snapshots(tmp_path):
+    """Each simulated hour equals a cold-started snapshot with the same sink flows."""
+    _write_lfa(tmp_path / "lfa")
+    net = _net()
+    matrix = sink_mass_flow_matrix(net, load_lfa_mass_flows(tmp_path / "lfa", ["a", "b"]))
+
+    result = run_time_series(net, matrix, tmp_path / "out", PIPEFLOW_OPTIONS, hours=[3, 7, 11], block_size=2)
+
+    assert list(result.hourly["hour"]) == [3, 7, 11]
+    assert result.annual["hours_converged"] == 3
+    assert (net.sink["mdot_kg_per_s"] == 0.1).all()  # input network untouched
+
+    snapshot = _net()
+    snapshot.sink["mdot_kg_per_s"] = matrix.loc[7].to_numpy()
+    pp.pipeflow(snapshot, **PIPEFLOW_OPTIONS)
+    streamed = pd.read_parquet(tmp_path / "out" / "pipe_results_block_0000.parquet")
+    hour_7 = streamed[streamed["hour"] == 7].set_index("pipe_id")
+    assert np.allclose(hour_7["p_to_bar"], snapshot.res_pipe["p_to_bar"], atol=1e-6)
+    assert np.allclose(hour_7["t_to_k"], snapshot.res_pipe["t_to_k"], atol=1e-4)
+
+    annual = json.loads((tmp_path / "out" / "annual_summary.json").read_text())
+    assert annual["pump_energy_kwh"] == pytest.approx(result.hourly["pump_power_w"].sum() / 1000.0)
+    assert annual["heat_loss_kwh"] > 0
+
+
+def test_parallel_blocks_match_serial(tmp_path):
+    """Hour blocks run in a process pool give the same hourly results as a serial run."""
+    _write_lfa(tmp_path / "lfa")
+    net = _net()
+    matrix = sink_mass_flow_matrix(net, load_lfa_mass_flows(tmp_path / "lfa", ["a", "b"]))
+
+    serial = run_time_series(net, matrix, tmp_path / "serial", PIPEFLOW_OPTIONS, block_size=8)
+    parallel = run_time_series(net, matrix, tmp_path / "parallel", PIPEFLOW_OPTIONS, block_size=8, n_workers=2)
+
+    assert len(list((tmp_path / "parallel").glob("pipe_results_block_*.parquet"))) == 3
+    pd.testing.assert_frame_equal(serial.hourly, parallel.hourly, atol=1e-6)
@@ -0,0 +1,70 @@
+"""
+Tests for the process-wide dataset registry (mtime invalidation, LRU memory bound).
+"""
+
+import json
+import os
+
+import pytest
+
+from src.dataset_registry import DatasetRegistry
+
+
+def _touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_json_is_parsed_once_and_reloaded_when_file_changes(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"B1": {"winter": 5.0}}), encoding="utf-8")
+    registry = DatasetRegistry(max_mb=10)
+
+    first = registry.read_json(path)
+    assert registry.read_json(path) is first
+    assert registry.stats()["hits"] == 1
+
+    path.write_text(json.dumps({"B1": {"winter": 7.0}}), encoding="utf-8")
+    _touch_later(path)
+    assert registry.read_json(path)["B1"]["winter"] == 7.0
+    assert registry.stats()["entries"] == 1  # the stale state was dropped
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    registry = DatasetRegistry(max_mb=1)
+    mb = 1024 * 1024
+
+    registry.get("a", lambda: "A", nbytes=0.4 * mb)
+    registry.get("b", lambda: "B", nbytes=0.4 * mb)
+    registry.get("a", lambda: "A2")  # hit, "a" becomes most recent
+    registry.get("c", lambda: "C", nbytes=0.4 * mb)
+
+    assert registry.get("a", lambda: "reloaded") == "A"
+    assert registry.get("b", lambda: "reloaded") == "reloaded"
+    assert registry.stats()["evictions"] >= 1
+
+
+def test_projected_copies_and_derived_structures_are_shared(tmp_path):
+    gpd = pytest.importorskip("geopandas")
+    from shapely.geometry import Point
+
+    path = tmp_path / "substations.geojson"
+    gpd.GeoDataFrame(geometry=[Point(14.33, 51.76), Point(14.35, 51.75)], crs="EPSG:4326").to_file(
+        path, driver="GeoJSON"
+    )
+    registry = DatasetRegistry(max_mb=10)
+
+    base = registry.read_geojson(path)
+    utm = registry.read_geojson(path, crs="EPSG:32633")
+    assert registry.read_geojson(path) is base
+    assert registry.read_geojson(path, crs="EPSG:32633") is utm
+    assert registry.read_geojson(path, crs="EPSG:4326") is base
+    assert utm.crs.to_epsg() == 32633
+
+    builds = []
+    for _ in range(2):
+        registry.derived("n_points", path, lambda: builds.append(1) or len(base), "EPSG:32633")
+    assert len(builds) == 1
+
+    registry.invalidate(path)
+    assert registry.stats()["entries"] == 0
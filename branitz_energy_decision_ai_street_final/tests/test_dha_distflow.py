@@ -0,0 +1,87 @@
+"""
+Tests for the LinDistFlow voltage screening backend of the DHA.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dha_distflow import (
+    build_distflow_model,
+    feeder_distflow_model,
+    run_distflow_for_hours,
+    screen_feeder_hours,
+    screen_voltages,
+)
+
+
+def test_shared_path_impedance_of_branching_feeder():
+    # 0 -> 1 -> 2, 1 -> 3
+    model = build_distflow_model([(0, 1, 0.1, 0.05), (1, 2, 0.2, 0.1), (3, 1, 0.4, 0.2)], slack_bus=0)
+
+    rows = model.positions([2, 3])
+    assert model.R[rows[0], rows[0]] == pytest.approx(0.3)
+    assert model.R[rows[1], rows[1]] == pytest.approx(0.5)
+    assert model.R[rows[0], rows[1]] == pytest.approx(0.1)  # only 0 -> 1 is shared
+    assert np.allclose(model.R, model.R.T)
+
+    # 100 kW at bus 2 (s_base 1 MVA): v^2 = 1 - 2 * R * 0.1
+    v = screen_voltages(model, np.array([[100.0]]), load_buses=[2])[0]
+    assert v[model.positions([2])[0]] == pytest.approx(np.sqrt(1 - 2 * 0.3 * 0.1))
+    assert v[model.positions([3])[0]] == pytest.approx(np.sqrt(1 - 2 * 0.1 * 0.1))
+
+    with pytest.raises(ValueError):
+        build_distflow_model([(0, 1, 0.1, 0.0), (1, 2, 0.1, 0.0), (2, 0, 0.1, 0.0)], slack_bus=0)
+
+
+def test_single_line_feeder_model_by_hand():
+    # 50 m, 0.2 + j0.1 ohm/km at 0.4 kV, 1 MVA base: z_base = 0.16 ohm
+    line = {"length_km": 0.05, "r_ohm_per_km": 0.2, "x_ohm_per_km": 0.1}
+    model = feeder_distflow_model(line)
+    r, x = 0.2 * 0.05 / 0.16, 0.1 * 0.05 / 0.16
+
+    assert model.buses.tolist() == [0, 1]
+    assert np.allclose(model.R, [[0.0, 0.0], [0.0, r]])
+    assert np.allclose(model.X, [[0.0, 0.0], [0.0, x]])
+
+    # 300 kW + 100 kvar at the load bus: v^2 = 1 - 2 * (r * 0.3 + x * 0.1)
+    v = screen_voltages(model, np.array([[300.0]]), np.array([[100.0]]), load_buses=[1])[0]
+    assert v[0] == pytest.approx(1.0)
+    assert v[1] == pytest.approx(np.sqrt(1 - 2 * (r * 0.3 + x * 0.1)))
+
+
+def test_screening_is_monotone_and_flags_near_limits():
+    feeder_kw = np.array([[0.0, 50.0], [400.0, 900.0], [200.0, 2500.0]])
+    v_end_pu, near = screen_feeder_hours(feeder_kw, (0.95, 1.05), margin_pu=0.01)
+
+    assert v_end_pu.shape == feeder_kw.shape
+    assert v_end_pu[0, 0] == pytest.approx(1.0)
+    order = np.argsort(feeder_kw.ravel())
+    assert np.all(np.diff(v_end_pu.ravel()[order]) <= 0)
+    assert near.tolist() == (v_end_pu < 0.96).tolist()
+
+
+def test_screened_voltage_close_to_newton_raphson():
+    pytest.importorskip("pandapower")
+    from src.dha_pandapower import run_feeder_timeseries
+
+    p_kw = np.array([20.0, 150.0, 400.0, 800.0])
+    v_screen = screen_voltages(feeder_distflow_model(), p_kw[:, None], load_buses=[1])[:, 1]
+    v_nr, converged = run_feeder_timeseries('F', p_kw)
+
+    assert converged.all()
+    assert np.allclose(v_screen, v_nr, atol=1e-2)
+
+
+def test_only_near_limit_hours_are_verified():
+    agg = pd.DataFrame({
+        'feeder_id': ['F1', 'F1', 'F2', 'F2'],
+        'hour': [0, 1, 0, 1],
+        'p_kw': [30.0, 2600.0, 20.0, 40.0],
+        'utilization_pct': [1.5, 130.0, 1.0, 2.0],
+    })
+    result = run_distflow_for_hours(agg, (0.90, 1.10), margin_pu=0.01)
+
+    assert list(result.columns[:4]) == list(agg.columns)
+    assert result['v_violation'].tolist() == [False, True, False, False]
+    assert not result['v_verified'].iloc[[0, 2, 3]].any()
@@ -0,0 +1,53 @@
+"""
+Tests for the DHA pandapower time-series backend (one model per feeder, hourly runs).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pp = pytest.importorskip("pandapower")
+
+from src.dha_pandapower import build_feeder_net, run_feeder_timeseries, run_loadflow_for_hours
+
+
+def _agg():
+    hours = np.arange(24)
+    return pd.DataFrame({
+        'feeder_id': np.repeat(['F1', 'F2', 'F3'], 24),
+        'hour': np.tile(hours[::-1], 3),
+        'p_kw': np.concatenate([50 + 10 * hours, 400 + 40 * hours, 5 + 0 * hours]).astype(float),
+        'utilization_pct': 10.0,
+    })
+
+
+def test_each_hour_gets_its_own_voltage():
+    agg = _agg()
+    result = run_loadflow_for_hours(agg, (0.90, 1.10))
+
+    f1 = result[result['feeder_id'] == 'F1']
+    assert f1['v_end_pu'].nunique() == 24
+    # Higher load, lower end voltage
+    assert np.all(np.diff(f1.sort_values('p_kw')['v_end_pu'].to_numpy()) < 0)
+    assert (result.loc[result['feeder_id'] == 'F3', 'v_end_pu'].nunique()) == 1
+
+
+def test_warm_started_series_matches_fresh_runs():
+    p_kw = np.array([120.0, 480.0, 30.0, 900.0])
+    v_end_pu, converged = run_feeder_timeseries('F', p_kw)
+
+    assert converged.all()
+    for p, v in zip(p_kw, v_end_pu):
+        net = build_feeder_net('F')
+        net.load.at[0, 'p_mw'] = p / 1000
+        pp.runpp(net)
+        assert v == pytest.approx(net.res_bus.vm_pu.iat[1], abs=1e-8)
+
+
+def test_parallel_feeders_match_serial():
+    agg = _agg()
+    serial = run_loadflow_for_hours(agg, (0.90, 1.10))
+    parallel = run_loadflow_for_hours(agg, (0.90, 1.10), workers=2)
+
+    assert np.allclose(serial['v_end_pu'], parallel['v_end_pu'])
+    assert serial['v_violation'].tolist() == parallel['v_violation'].tolist()
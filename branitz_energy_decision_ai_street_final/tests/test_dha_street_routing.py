@@ -0,0 +1,74 @@
+"""
+Tests for the KD-tree street graph and multi-source service-line routing of the DHA.
+"""
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import pytest
+from shapely.geometry import LineString, Point
+
+from src.dha_street_routing import StreetRouter
+
+
+@pytest.fixture
+def streets():
+    return gpd.GeoDataFrame(geometry=[
+        LineString([(0, 0), (100, 0), (200, 0)]),
+        LineString([(200, 0), (200, 100)]),     # shares the (200, 0) vertex
+        LineString([(103, 2), (103, 80)]),      # 3.6 m from (100, 0): connection edge
+        LineString([(500, 500), (600, 500)]),   # isolated
+    ], crs="EPSG:32633")
+
+
+def _reference_graph(streets, radius=5.0):
+    """The former graph: street edges plus all node pairs within the radius."""
+    G = nx.Graph()
+    for geometry in streets.geometry:
+        coords = list(geometry.coords)
+        for a, b in zip(coords[:-1], coords[1:]):
+            G.add_edge(a, b, weight=Point(a).distance(Point(b)))
+    nodes = list(G.nodes)
+    for i, a in enumerate(nodes):
+        for b in nodes[i + 1:]:
+            d = Point(a).distance(Point(b))
+            if d < radius and not G.has_edge(a, b):
+                G.add_edge(a, b, weight=d)
+    return G
+
+
+def test_graph_matches_pairwise_construction(streets):
+    router = StreetRouter(streets, connect_radius_m=5.0)
+    reference = _reference_graph(streets)
+
+    assert router.n_nodes == reference.number_of_nodes()
+    assert router.n_edges == reference.number_of_edges()
+    G = router.to_networkx()
+    edges = {frozenset((tuple(G.nodes[u]["pos"]), tuple(G.nodes[v]["pos"]))) for u, v in G.edges}
+    assert edges == {frozenset(e) for e in reference.edges}
+
+
+def test_service_lines_follow_shortest_street_path(streets):
+    router = StreetRouter(streets)
+    infra = gpd.GeoDataFrame({"power": ["substation", "plant"]},
+                             geometry=[Point(200, 110), Point(-10, 0)], crs="EPSG:32633")
+    buildings = [Point(190, 95), Point(103, 85), Point(40, 5), Point(550, 510)]
+
+    result = router.route_service_lines(buildings, infra)
+    reference = _reference_graph(streets)
+    for node, point in [((200, 100), infra.geometry[0]), ((0, 0), infra.geometry[1])]:
+        reference.add_edge(("infra", point.x, point.y), node, weight=Point(node).distance(point))
+    sources = [("infra", p.x, p.y) for p in infra.geometry]
+
+    assert len(result) == 4
+    for i, building in enumerate(buildings[:3]):
+        nearest = min((n for n in reference if n[0] != "infra"), key=lambda n: Point(n).distance(building))
+        dist, path = nx.multi_source_dijkstra(reference, sources, nearest)
+        assert result.methods[i] == "street_following"
+        assert result.infra_positions[i] == sources.index(path[0])
+        assert result.distances[i] == pytest.approx(building.distance(Point(nearest)) + dist)
+        assert np.allclose(result.lines[i].coords[-1], infra.geometry[result.infra_positions[i]].coords[0])
+
+    # The isolated street cannot reach any infrastructure
+    assert result.methods[3] == "straight_line_fallback"
+    assert result.infra_positions[3] == 0
@@ -0,0 +1,106 @@
+"""
+Tests for the vectorized DHA adapter (per-hour COP) and feeder aggregation (incidence product).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dha_adapter import cop_for_temps, heat_to_electric_kw, heat_to_electric_matrix, hourly_temperatures
+from src.dha_heuristic import (
+    aggregate_feeder_loads,
+    aggregate_feeder_matrix,
+    feeder_load_frame,
+    top_n_peak_hours,
+    top_n_peak_hours_matrix,
+)
+
+BINS = [
+    {'t_min': -20, 't_max': 0, 'cop': 2.5},
+    {'t_min': 0, 't_max': 10, 'cop': 3.0},
+    {'t_min': 10, 't_max': 25, 'cop': 3.8},
+]
+
+
+def _reference_cop(t, bins, cop_default):
+    """The former row-by-row COP lookup."""
+    for bin_info in bins:
+        if bin_info['t_min'] <= t <= bin_info['t_max']:
+            return bin_info['cop']
+    return cop_default
+
+
+def _loads(n_hours=48, n_buildings=9, seed=0):
+    rng = np.random.default_rng(seed)
+    heat = rng.uniform(0.0, 20.0, size=(n_hours, n_buildings))
+    building_ids = [f'B{i}' for i in range(n_buildings)]
+    feeder_ids = [['F2', 'F1', 'F3'][i % 3] for i in range(n_buildings - 1)]
+    topo = pd.DataFrame({
+        'building_id': building_ids[:-1],  # last building is not in the topology
+        'feeder_id': feeder_ids,
+        'feeder_rating_kw': [{'F1': 60.0, 'F2': 80.0, 'F3': 0.0}[f] for f in feeder_ids],
+    })
+    return heat, building_ids, topo
+
+
+def test_cop_per_hour_matches_row_lookup():
+    temps = np.array([-25.0, -20.0, -3.0, 0.0, 4.5, 10.0, 17.0, 25.0, 30.0, np.nan])
+    expected = [_reference_cop(t, BINS, 3.2) for t in temps]
+    assert cop_for_temps(temps, BINS, 3.2).tolist() == expected
+
+
+def test_heat_to_electric_long_and_matrix_agree():
+    heat, building_ids, _ = _loads(n_hours=24, n_buildings=3)
+    weather = pd.DataFrame({'hour': np.arange(24), 'T_out_c': np.linspace(-10, 20, 24)})
+    lfa = pd.DataFrame({
+        'building_id': np.repeat(building_ids, 24),
+        'hour': np.tile(np.arange(24), 3),
+        'q_kw': heat.T.reshape(-1),
+    })
+
+    long_el = heat_to_electric_kw(lfa, weather, BINS, 3.0)
+    p_kw, cop = heat_to_electric_matrix(heat, hourly_temperatures(weather, 24), BINS, 3.0)
+
+    expected_cop = [_reference_cop(t, BINS, 3.0) for t in weather['T_out_c']]
+    assert cop.tolist() == expected_cop
+    assert long_el['cop'].tolist() == expected_cop * 3
+    assert long_el['p_kw'].to_numpy() == pytest.approx(p_kw.T.reshape(-1))
+
+
+def test_incidence_product_matches_merge_groupby():
+    heat, building_ids, topo = _loads()
+    lfa_el = pd.DataFrame({
+        'building_id': np.repeat(building_ids, heat.shape[0]),
+        'hour': np.tile(np.arange(heat.shape[0]), len(building_ids)),
+        'p_kw': heat.T.reshape(-1),
+    })
+
+    # The former long-format merge and groupby
+    merged = lfa_el.merge(topo, on='building_id', how='inner')
+    expected = merged.groupby(['feeder_id', 'hour']).agg({'p_kw': 'sum', 'feeder_rating_kw': 'first'}).reset_index()
+    expected['utilization_pct'] = expected['p_kw'] / expected['feeder_rating_kw'] * 100
+    expected = expected.replace([np.inf, -np.inf], np.nan).dropna().reset_index(drop=True)
+
+    agg = aggregate_feeder_loads(lfa_el, topo)
+    pd.testing.assert_frame_equal(agg, expected, check_dtype=False)
+
+    feeder_kw, feeder_ids, ratings = aggregate_feeder_matrix(heat, building_ids, topo)
+    assert list(feeder_ids) == ['F1', 'F2', 'F3']
+    assert ratings.tolist() == [60.0, 80.0, 0.0]
+    pd.testing.assert_frame_equal(feeder_load_frame(feeder_kw, feeder_ids, ratings), expected, check_dtype=False)
+
+    with pytest.raises(ValueError, match="No buildings found in topology"):
+        aggregate_feeder_matrix(heat, [f'X{i}' for i in range(len(building_ids))], topo)
+    with pytest.raises(ValueError, match="not unique"):
+        aggregate_feeder_matrix(heat, [building_ids[0]] * len(building_ids), topo)
+
+
+def test_top_n_peak_hours_matrix_matches_nlargest():
+    heat, building_ids, topo = _loads(n_hours=200)
+    feeder_kw, _, _ = aggregate_feeder_matrix(heat, building_ids, topo)
+    feeder_kw[[7, 42, 99]] = feeder_kw.sum(axis=1).max() + 1.0  # ties keep the earliest hour first
+
+    expected = top_n_peak_hours(pd.Series(feeder_kw.sum(axis=1)), 5)
+    assert top_n_peak_hours_matrix(feeder_kw, 5) == expected
+    assert expected[:3] == [7, 42, 99]
+    assert top_n_peak_hours_matrix(feeder_kw, 500) == top_n_peak_hours(pd.Series(feeder_kw.sum(axis=1)), 500)
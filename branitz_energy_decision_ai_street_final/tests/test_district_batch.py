@@ -0,0 +1,119 @@
+"""
+Tests for the district batch runner (one loaded district, many streets).
+"""
+
+import json
+import multiprocessing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.district_batch as district_batch
+from src.eaa import EAAConfig, street_economics
+from src.lfa_load_matrix import LoadMatrix
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_street_economics_is_deterministic_and_scales_with_length():
+    cfg = EAAConfig(capex_per_m_eur={"default": 450})
+
+    short = street_economics(cfg, pipe_length_m=500.0, annual_heat_mwh=400.0)
+    again = street_economics(cfg, pipe_length_m=500.0, annual_heat_mwh=400.0)
+    long = street_economics(cfg, pipe_length_m=1000.0, annual_heat_mwh=400.0)
+
+    assert short == again
+    assert short["capex_eur"] == pytest.approx(500.0 * 450)
+    assert short["lcoh_p2_5"] <= short["lcoh_eur_per_mwh"] <= short["lcoh_p97_5"]
+    assert long["lcoh_eur_per_mwh"] > short["lcoh_eur_per_mwh"]
+    assert short["co2_kg_per_mwh"] == 0.0  # no pumping energy
+
+
+class _District:
+    def street_names(self):
+        return ["Parkstraße", "Gartenweg", "An der Bahn"]
+
+
+def _fake_analyze_street(district, street_name):
+    row = {column: None for column in district_batch.RESULT_COLUMNS}
+    row.update(street_name=street_name, status="success", error="", n_buildings=len(street_name))
+    return row
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_parallel_batch_matches_serial_and_writes_one_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(district_batch, "load_district", lambda **kwargs: _District())
+    monkeypatch.setattr(district_batch, "analyze_street", _fake_analyze_street)
+
+    serial = district_batch.run_district_batch(workers=1, output_dir=str(tmp_path / "serial"))
+    parallel = district_batch.run_district_batch(workers=2, output_dir=str(tmp_path / "parallel"))
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert list(serial.columns) == district_batch.RESULT_COLUMNS
+    assert serial["street_name"].tolist() == _District().street_names()
+
+    table = pd.read_csv(tmp_path / "parallel" / district_batch.RESULTS_FILE)
+    assert table["n_buildings"].tolist() == [10, 9, 11]
+
+
+class _StreetIndex:
+    def offsets(self, street_name):
+        return {"Main Street": [0, 2]}.get(street_name, [])
+
+
+class _DHA:
+    """DHA of the fixture district (the LV network data is not part of the repository)."""
+
+    def __init__(self, buildings):
+        self.buildings = buildings
+        self.street_index = _StreetIndex()
+        self.analyzed = []
+
+    def run_comprehensive_analysis(self, street_name, scenario, buildings=None):
+        self.analyzed.append(list(buildings["building_id"]))
+        return {"status": "success", "buildings_analyzed": 2, "output_dir": "processed/dha",
+                "power_results": {"min_voltage": 0.97, "max_voltage": 1.0, "max_transformer_loading": 41.0}}
+
+
+def test_analyze_street_on_fixture_district(tmp_path):
+    gpd = pytest.importorskip("geopandas")
+    from src.cha import CentralizedHeatingAgent
+
+    buildings = gpd.read_file(ROOT / "data" / "geojson" / "test_buildings_valid.geojson")
+    buildings["gebaeude"] = [json.dumps({"oi": bid}) for bid in buildings["building_id"]]
+
+    # Shared CHA street graph, prepared as in load_district
+    cha = CentralizedHeatingAgent(str(ROOT / "configs" / "cha.yml"))
+    cha.config.update(
+        streets_path=str(ROOT / "data" / "geojson" / "minimal_streets.geojson"),
+        buildings_path=str(ROOT / "data" / "geojson" / "test_buildings_valid.geojson"),
+        output_dir=str(tmp_path / "cha"),
+    )
+    assert cha.load_data()
+    cha.buildings_gdf = None
+    assert cha.build_connected_street_network()
+    n_edges = cha.street_graph.number_of_edges()
+
+    loads = np.full((8760, 3, 3), 2.0, dtype=np.float32)
+    district = district_batch.DistrictData(
+        dha=_DHA(buildings), cha=cha, eaa_config=EAAConfig(),
+        load_matrix=LoadMatrix(loads, ["B001", "B002", "B003"], ["series", "q10", "q90"]),
+    )
+
+    row = district_batch.analyze_street(district, "Main Street")
+
+    assert row["status"] == "success", row["error"]
+    assert list(row) == district_batch.RESULT_COLUMNS
+    assert row["n_buildings"] == 2
+    assert row["annual_heat_mwh"] == pytest.approx(2 * 8760 * 2.0 / 1000)
+    assert row["peak_heat_kw"] == pytest.approx(4.0)
+    assert row["dh_main_length_km"] > 0 and row["dh_capex_eur"] > 0
+    assert row["dh_lcoh_p2_5"] <= row["dh_lcoh_eur_per_mwh"] <= row["dh_lcoh_p97_5"]
+    assert row["hp_min_voltage_pu"] == 0.97
+    assert district.dha.analyzed == [["B001", "B003"]]  # same buildings as CHA and EAA
+    assert (Path(row["cha_output_dir"]) / "network_stats.json").exists()
+    assert cha.street_graph.number_of_edges() == n_edges  # routed on a copy
+
+    assert district_batch.analyze_street(district, "Nowhere")["status"] == "error"
@@ -0,0 +1,82 @@
+"""
+Tests for the vectorized DIN-physics label synthesis of the ETL pipelines.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from etl.label_synthesis import compute_label_matrix, read_labels, write_labels
+from src.lfa_load_matrix import open_load_matrix
+
+
+@pytest.fixture
+def buildings_df():
+    return pd.DataFrame({
+        'id': ['B1', 'B2', 'B3', 'B4', 'B5'],
+        'T_in': [20.0, 21.0, 19.0, 20.0, 22.0],
+        'H_tr': [180.0, 420.0, 95.0, 1300.0, 60.0],
+        'H_ve': [40.0, 95.0, 20.0, 310.0, 12.0],
+        'sanierungs_faktor': [1.0, 0.71, 0.30, 1.0, 0.71],
+    })
+
+
+@pytest.fixture
+def weather_df():
+    hours = np.arange(8760)
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=8760, freq='h'),
+        'T_out': 9 - 11 * np.cos(2 * np.pi * hours / 8760) + 3 * np.sin(2 * np.pi * hours / 24),
+    })
+
+
+def test_matrix_matches_din_formula(buildings_df, weather_df):
+    labels = compute_label_matrix(buildings_df, weather_df['T_out'].to_numpy())
+
+    assert labels.shape == (5, 8760)
+    for i, b in buildings_df.iterrows():
+        for h in (0, 2000, 4500, 8759):
+            P_h = (b['H_tr'] + b['H_ve']) * (b['T_in'] - weather_df['T_out'][h]) * b['sanierungs_faktor']
+            assert labels[i, h] == max(0.0, P_h) / 1000.0
+    assert (labels >= 0).all()
+
+
+def test_dataset_chunks_and_rewrite(buildings_df, weather_df, tmp_path):
+    write_labels(buildings_df, weather_df, tmp_path, output_format="dataset", chunk_buildings=2)
+    parts = sorted(tmp_path.glob("part-*.parquet"))
+    assert len(parts) == 3
+
+    labels = read_labels(tmp_path)
+    assert list(labels.columns) == ['building_id', 'timestamp', 'demand_kw']
+    assert len(labels) == 5 * 8760
+    expected = compute_label_matrix(buildings_df, weather_df['T_out'].to_numpy())
+    assert np.array_equal(labels['demand_kw'].to_numpy().reshape(5, 8760), expected)
+    assert read_labels(tmp_path, buildings=['B3'])['building_id'].unique().tolist() == ['B3']
+
+    # A rewrite with larger chunks leaves no stale parts behind
+    write_labels(buildings_df, weather_df, tmp_path, output_format="dataset", chunk_buildings=10)
+    assert len(list(tmp_path.glob("part-*.parquet"))) == 1
+    assert len(read_labels(tmp_path)) == 5 * 8760
+
+
+def test_load_matrix_and_legacy_layouts(buildings_df, weather_df, tmp_path):
+    expected = compute_label_matrix(buildings_df, weather_df['T_out'].to_numpy())
+
+    write_labels(buildings_df, weather_df.set_index('timestamp'), tmp_path / "store",
+                 output_format="load_matrix", chunk_buildings=3)
+    matrix = open_load_matrix(tmp_path / "store")
+    assert matrix.building_ids == buildings_df['id'].tolist()
+    assert np.allclose(matrix.select(quantile="series"), expected.T, rtol=1e-6)
+
+    write_labels(buildings_df, weather_df, tmp_path / "legacy", output_format="per_building")
+    b2 = pd.read_parquet(tmp_path / "legacy" / "B2.parquet")
+    assert list(b2.columns) == ['timestamp', 'demand_kw']
+    assert np.array_equal(b2['demand_kw'].to_numpy(), expected[1])
+
+    with pytest.raises(ValueError):
+        write_labels(buildings_df, weather_df, tmp_path, output_format="zarr")
@@ -0,0 +1,119 @@
+"""
+Test the global (head-budget DP) mode of the DH diameter optimizer.
+
+This module checks the DP against an exhaustive evaluate_quick search on a small
+network, that its lower bound brackets the optimum, that the head limit is
+enforced, and that compare_solvers reports both modes side by side.
+"""
+
+import itertools
+import random
+
+import pytest
+import pandas as pd
+from optimize.diameter_optimizer import Segment, DiameterOptimizer
+
+
+def _optimizer(tmp_path, segs, head_max_m=None):
+    catalog = pd.DataFrame({
+        "dn": [32, 40, 50, 65, 80, 100, 125],
+        "d_inner_m": [0.037, 0.043, 0.055, 0.070, 0.082, 0.107, 0.132],
+        "d_outer_m": [0.110, 0.110, 0.125, 0.140, 0.160, 0.200, 0.225],
+        "w_loss_w_per_m": [None, 14.0, None, 18.0, 20.0, None, 26.0],
+        "u_wpermk": [0.30, 0.30, 0.32, 0.35, 0.38, 0.40, 0.45],
+        "cost_eur_per_m": [180.0, 200.0, 230.0, 270.0, 310.0, 380.0, 460.0],
+    })
+    cpath = tmp_path / "catalog.csv"
+    catalog.to_csv(cpath, index=False)
+
+    design = dict(
+        T_supply=80, T_return=50, T_soil=10,
+        rho=1000.0, mu=4.5e-4, cp=4180.0,
+        eta_pump=0.65, hours=4000,
+        v_feasible_target=1.3, v_limit=1.5,
+        deltaT_min=30.0, K_minor=0.5, head_max_m=head_max_m
+    )
+    econ = dict(price_el=0.25, cost_heat_prod=55.0, years=30, r=0.04, o_and_m_rate=0.01)
+    return DiameterOptimizer(segs, design, econ, str(cpath))
+
+
+def _small_network():
+    return [
+        Segment("S0", 120.0, 0.010, 1000.0, "P0", True),
+        Segment("S1", 80.0, 0.004, 1000.0, "P0", True),
+        Segment("S2", 150.0, 0.006, 1000.0, "P1", True),
+        Segment("R0", 120.0, 0.010, 1000.0, "P0", False),
+    ]
+
+
+def _random_network(n=40):
+    rng = random.Random(3)
+    segs = []
+    for i in range(n):
+        path_id = f"P{i % 5}"
+        segs.append(Segment(f"S{i}", rng.uniform(20, 200), rng.uniform(0.0005, 0.012), 1000.0, path_id, True))
+        segs.append(Segment(f"R{i}", segs[-1].length_m, segs[-1].V_dot_m3s, 1000.0, path_id, False))
+    return segs
+
+
+def _exhaustive_best(opt):
+    """Lowest evaluate_quick NPV over all velocity- and head-feasible assignments."""
+    dns = [p.dn for p in opt.catalog]
+    best = None
+    for combo in itertools.product(dns, repeat=len(opt.segments)):
+        m = opt.evaluate_quick({seg.seg_id: dn for seg, dn in zip(opt.segments, combo)})
+        if not m["velocity_ok"] or not opt._head_ok(m):
+            continue
+        if best is None or m["npv_eur"] < best:
+            best = m["npv_eur"]
+    return best
+
+
+def test_global_matches_exhaustive_search(tmp_path):
+    """The DP assignment is the exhaustive optimum and its lower bound brackets it."""
+    opt = _optimizer(tmp_path, _small_network())
+    expected = _exhaustive_best(opt)
+
+    assignment, metrics, stats = opt.optimize_global(head_resolution_m=1e-4)
+
+    assert metrics["npv_eur"] == pytest.approx(expected, rel=1e-4)
+    assert stats["lower_bound_npv_eur"] <= expected + 1e-6
+    assert stats["optimality_gap"] < 1e-3
+    assert metrics["velocity_ok"]
+    assert assignment == opt.assignment
+
+
+def test_global_respects_head_limit(tmp_path):
+    """With a head limit below the unconstrained optimum, the DP stays within it."""
+    opt = _optimizer(tmp_path, _small_network())
+    _, free_metrics, _ = opt.optimize_global()
+    head_max_m = 0.5 * free_metrics["head_required_m"]
+
+    limited = _optimizer(tmp_path, _small_network(), head_max_m=head_max_m)
+    _, metrics, stats = limited.optimize_global(head_resolution_m=1e-3)
+
+    assert metrics["head_required_m"] <= head_max_m
+    assert stats["head_ok"]
+    assert metrics["npv_eur"] == pytest.approx(_exhaustive_best(limited), rel=1e-3)
+
+
+def test_compare_solvers_reports_both_modes(tmp_path):
+    """The global mode is never worse than the hill-climb and both carry time and gap."""
+    opt = _optimizer(tmp_path, _random_network())
+
+    report = opt.compare_solvers(head_resolution_m=1e-3)
+
+    heuristic, global_stats = report["heuristic"], report["global"]
+    for stats in (heuristic, global_stats):
+        assert stats["solve_time_s"] >= 0
+        assert 0 <= stats["optimality_gap"] < 1
+    assert heuristic["lower_bound_npv_eur"] == global_stats["lower_bound_npv_eur"]
+    assert global_stats["npv_eur"] <= heuristic["npv_eur"] * (1 + 1e-3)
+    assert opt.evaluate_quick(opt.assignment)["npv_eur"] == global_stats["npv_eur"]
+
+
+def test_run_rejects_unknown_mode(tmp_path):
+    """Only the heuristic and global modes exist."""
+    opt = _optimizer(tmp_path, _small_network())
+    with pytest.raises(ValueError):
+        opt.run(mode="milp")
@@ -0,0 +1,161 @@
+"""
+Test incremental delta-evaluation for the DH diameter optimizer.
+
+This module checks that single-segment DN changes scored from the precomputed
+segment × DN tables match full evaluate_quick runs, and that local_improve
+picks the same move as an exhaustive evaluate_quick hill-climb step.
+"""
+
+import random
+
+import pytest
+import pandas as pd
+from optimize.diameter_optimizer import Segment, DiameterOptimizer
+from optimize.incremental_eval import IncrementalEvaluator
+from optimize.physics_models import segment_hydraulics
+
+
+def _optimizer(tmp_path, n_segments=30, v_limit=1.5):
+    catalog = pd.DataFrame({
+        "dn": [32, 40, 50, 65, 80, 100, 125],
+        "d_inner_m": [0.037, 0.043, 0.055, 0.070, 0.082, 0.107, 0.132],
+        "d_outer_m": [0.110, 0.110, 0.125, 0.140, 0.160, 0.200, 0.225],
+        "w_loss_w_per_m": [None, 14.0, None, 18.0, 20.0, None, 26.0],
+        "u_wpermk": [0.30, 0.30, 0.32, 0.35, 0.38, 0.40, 0.45],
+        "cost_eur_per_m": [180.0, 200.0, 230.0, 270.0, 310.0, 380.0, 460.0],
+    })
+    cpath = tmp_path / "catalog.csv"
+    catalog.to_csv(cpath, index=False)
+
+    rng = random.Random(7)
+    segs = []
+    for i in range(n_segments):
+        path_id = f"P{i % 4}"
+        segs.append(Segment(f"S{i}", rng.uniform(20, 200), rng.uniform(0.0005, 0.012), 1000.0, path_id, True))
+        segs.append(Segment(f"R{i}", segs[-1].length_m, segs[-1].V_dot_m3s, 1000.0, path_id, False))
+
+    design = dict(
+        T_supply=80, T_return=50, T_soil=10,
+        rho=1000.0, mu=4.5e-4, cp=4180.0,
+        eta_pump=0.65, hours=4000,
+        v_feasible_target=1.3, v_limit=v_limit,
+        deltaT_min=30.0, K_minor=0.5
+    )
+    econ = dict(price_el=0.25, cost_heat_prod=55.0, years=30, r=0.04, o_and_m_rate=0.01)
+    return DiameterOptimizer(segs, design, econ, str(cpath))
+
+
+def _reference_local_improve(opt):
+    """Exhaustive best-improving ±1 DN step using evaluate_quick for every candidate."""
+    current = opt.assignment.copy()
+    best_npv = opt.evaluate_quick(current)["npv_eur"]
+    best = None
+    dns = [p.dn for p in opt.catalog]
+    for seg in opt.segments:
+        idx = dns.index(current[seg.seg_id])
+        for k in (idx - 1, idx + 1):
+            if not 0 <= k < len(dns):
+                continue
+            candidate = dict(current, **{seg.seg_id: dns[k]})
+            m = opt.evaluate_quick(candidate)
+            if m["velocity_ok"] and m["deltaT_ok"] and m["npv_eur"] < best_npv:
+                best_npv, best = m["npv_eur"], candidate
+    return best
+
+
+def test_candidate_npv_matches_evaluate_quick(tmp_path):
+    """Every ±1 DN delta-evaluation equals the full evaluate_quick NPV."""
+    opt = _optimizer(tmp_path, v_limit=10.0)
+    opt.initial_feasible()
+    evaluator = IncrementalEvaluator(opt.segments, opt.catalog, opt.design, opt.econ)
+    evaluator.reset(opt.assignment)
+    dns = [p.dn for p in opt.catalog]
+
+    for pos, seg in enumerate(opt.segments):
+        idx = dns.index(opt.assignment[seg.seg_id])
+        for k in (idx - 1, idx + 1):
+            if not 0 <= k < len(dns):
+                continue
+            expected = opt.evaluate_quick(dict(opt.assignment, **{seg.seg_id: dns[k]}))["npv_eur"]
+            assert evaluator.candidate_npv(pos, k) == pytest.approx(expected, rel=1e-12)
+
+
+def test_candidate_npv_rejects_velocity_violation(tmp_path):
+    """A downsizing that breaks the velocity limit is not offered as a candidate."""
+    opt = _optimizer(tmp_path, v_limit=1.5)
+    opt.initial_feasible()
+    evaluator = IncrementalEvaluator(opt.segments, opt.catalog, opt.design, opt.econ)
+    evaluator.reset(opt.assignment)
+
+    for pos, seg in enumerate(opt.segments):
+        idx = evaluator.dn_index[opt.assignment[seg.seg_id]]
+        if idx > 0 and evaluator.velocity[pos, idx - 1] > opt.design["v_limit"]:
+            assert evaluator.candidate_npv(pos, idx - 1) is None
+
+
+def test_local_improve_matches_exhaustive_step(tmp_path):
+    """Each hill-climb sweep picks the same move as the exhaustive evaluate_quick search."""
+    opt = _optimizer(tmp_path)
+    opt.initial_feasible()
+
+    for _ in range(5):
+        expected = _reference_local_improve(opt)
+        improved, assignment, metrics = opt.local_improve()
+        assert improved == (expected is not None)
+        if not improved:
+            break
+        assert assignment == expected
+        assert metrics == opt.evaluate_quick(expected)
+
+
+def test_evaluate_quick_uses_kernel_tables_with_scalar_values(tmp_path):
+    """Per-segment metrics from the kernel tables equal the scalar physics models."""
+    opt = _optimizer(tmp_path, n_segments=6)
+    dns = [p.dn for p in opt.catalog]
+    assignment = {seg.seg_id: dns[i % len(dns)] for i, seg in enumerate(opt.segments)}
+
+    scalar = opt.evaluate_quick(assignment)
+    assert opt._incremental is None  # a single evaluation does not build the tables
+
+    opt._evaluator()
+    metrics = opt.evaluate_quick(assignment)
+    for seg in opt.segments:
+        pipe = opt._pipe_for_dn(assignment[seg.seg_id])
+        v, dp, h = segment_hydraulics(seg.V_dot_m3s, pipe.d_inner_m, seg.length_m, opt.design['rho'],
+                                      opt.design['mu'], epsilon=4.5e-5, K_minor=opt.design['K_minor'])
+        result = metrics["per_segment"][seg.seg_id]
+        assert result["v"] == pytest.approx(v, rel=1e-12)
+        assert result["dp"] == pytest.approx(dp, rel=1e-12)
+        assert result["h"] == pytest.approx(h, rel=1e-12)
+        assert result["heat_loss_W"] == pytest.approx(opt._segment_heat_loss_W(seg, pipe), rel=1e-12)
+        assert result == pytest.approx(scalar["per_segment"][seg.seg_id], rel=1e-12)
+
+    # Pairs the kernel masks still raise the scalar model's error
+    opt.segments[0].V_dot_m3s = 0.0
+    with pytest.raises(ValueError):
+        opt.evaluate_quick(assignment)
+
+
+def test_tables_follow_changed_inputs(tmp_path):
+    """Changed segments, design or econ never reuse tables built from the old inputs."""
+    opt = _optimizer(tmp_path, n_segments=6)
+    opt.initial_feasible()
+    opt.local_improve()
+    tables = opt._incremental
+
+    opt.segments[1].V_dot_m3s *= 1.5
+    opt.design['T_soil'] = 0
+    opt.econ['price_el'] = 0.40
+    stale = opt.evaluate_quick(opt.assignment)
+    assert opt._incremental is tables  # not rebuilt, but not read either
+
+    fresh = _optimizer(tmp_path, n_segments=6)
+    fresh.segments[1].V_dot_m3s = opt.segments[1].V_dot_m3s
+    fresh.design['T_soil'] = 0
+    fresh.econ['price_el'] = 0.40
+    assert stale["npv_eur"] == fresh.evaluate_quick(opt.assignment)["npv_eur"]
+
+    opt.local_improve()
+    assert opt._incremental is not tables
+    expected = fresh.evaluate_quick(opt.assignment)["npv_eur"]
+    assert opt.evaluate_quick(opt.assignment)["npv_eur"] == pytest.approx(expected, rel=1e-12)
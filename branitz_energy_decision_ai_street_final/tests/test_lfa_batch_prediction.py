@@ -0,0 +1,99 @@
+"""
+Tests for batched multi-building LFA prediction and the load matrix output.
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agents.lfa import LoadForecastingAgent
+from src.lfa_load_matrix import open_load_matrix
+
+
+@pytest.fixture
+def trained_agent(tmp_path):
+    hours = np.arange(8760)
+    weather_df = pd.DataFrame({
+        'timestamp': [datetime(2024, 1, 1) + timedelta(hours=int(i)) for i in hours],
+        'T_out': 8 - 10 * np.cos(2 * np.pi * hours / 8760) + 4 * np.sin(2 * np.pi * hours / 24),
+        'RH': 70 + 10 * np.cos(2 * np.pi * hours / 24),
+    })
+    buildings_df = pd.DataFrame({
+        'building_id': [f'B{i:03d}' for i in range(7)],
+        'floor_area': [90.0, 140.0, 600.0, 1200.0, 75.0, 300.0, 220.0],
+        'year': [1955, 1972, 1995, 2012, 2021, 1988, 1964],
+    })
+
+    agent = LoadForecastingAgent({'seed': 1, 'lag_hours': [1], 'output_dir': str(tmp_path)})
+    features_df = agent.engineer_features(weather_df, buildings_df)
+    training_df = agent.generate_synthetic_training_data(features_df, buildings_df)
+    agent.train_models(training_df)
+    return agent, features_df, buildings_df, training_df
+
+
+def test_batch_matches_per_building_prediction(trained_agent):
+    agent, features_df, buildings_df, training_df = trained_agent
+
+    batch = agent.predict_quantiles_batch(features_df, buildings_df, batch_buildings=3)
+
+    assert set(batch) == {'q10', 'q50', 'q90'}
+    assert batch['q50'].shape == (8760, 7)
+    for i, building_id in enumerate(buildings_df['building_id']):
+        X = training_df.loc[training_df['building_id'] == building_id, agent.feature_columns].to_numpy(dtype=float)
+        expected = np.clip(agent.mean_model.predict(agent.scaler.transform(X)), 0.0, None)
+        assert batch['q50'][:, i] == pytest.approx(expected, rel=1e-9, abs=1e-9)
+    for values in batch.values():
+        assert np.isfinite(values).all() and (values >= 0).all()
+
+
+def test_threads_give_same_predictions(trained_agent):
+    agent, features_df, buildings_df, _ = trained_agent
+
+    sequential = agent.predict_quantiles_batch(features_df, buildings_df, batch_buildings=4)
+    threaded = agent.predict_quantiles_batch(features_df, buildings_df, batch_buildings=2, n_threads=3)
+
+    for key in sequential:
+        assert np.array_equal(sequential[key], threaded[key])
+
+
+def test_batches_write_into_load_matrix(trained_agent, tmp_path):
+    agent, features_df, buildings_df, _ = trained_agent
+    batch = agent.predict_quantiles_batch(features_df, buildings_df)
+
+    writer = agent._load_matrix_writer(buildings_df['building_id'].tolist())
+    for ids, predictions in agent.iter_forecast_batches(features_df, buildings_df, batch_buildings=3):
+        writer.write_block(ids, np.stack([predictions[k] for k in ('q50', 'q10', 'q90')], axis=2))
+    writer.close()
+
+    matrix = open_load_matrix(tmp_path)
+    assert matrix.building_ids == buildings_df['building_id'].tolist()
+    assert matrix.metadata['model_version'] == agent.model_version
+    for quantile, key in (('series', 'q50'), ('q10', 'q10'), ('q90', 'q90')):
+        assert np.allclose(matrix.select(quantile=quantile), batch[key], rtol=1e-6)
+
+
+def test_disabled_or_failed_writes_leave_no_stale_store(trained_agent, tmp_path):
+    agent, _, buildings_df, _ = trained_agent
+    ids = buildings_df['building_id'].tolist()
+
+    writer = agent._load_matrix_writer(ids)
+    writer.write_block(ids, np.ones((8760, len(ids), 3)))
+    writer.close()
+    assert open_load_matrix(tmp_path) is not None
+
+    # JSON-only runs drop the old store instead of leaving it to shadow the new forecasts
+    agent.config['write_load_matrix'] = False
+    assert agent._load_matrix_writer(ids) is None
+    assert open_load_matrix(tmp_path) is None
+
+    agent.config['write_load_matrix'] = True
+    writer = agent._load_matrix_writer(ids)
+    writer.write_block(ids[:2], np.ones((8760, 2, 3)))
+    writer.abort()
+    assert open_load_matrix(tmp_path) is None
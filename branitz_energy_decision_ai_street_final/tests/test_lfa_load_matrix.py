@@ -0,0 +1,115 @@
+"""
+Tests for the LFA load matrix store and its single loader.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.lfa_load_matrix import (
+    LoadMatrixWriter,
+    lfa_building_summary,
+    load_lfa_matrix,
+    open_load_matrix,
+    write_load_matrix,
+)
+from src.dha_adapter import load_lfa_series
+
+
+def _series(n_buildings=3, n_hours=8760):
+    rng = np.random.default_rng(0)
+    base = rng.uniform(1.0, 20.0, size=(n_hours, n_buildings)).astype(np.float32)
+    return np.stack([base, 0.9 * base, 1.1 * base], axis=2)
+
+
+def _write_json(lfa_dir: Path, ids, loads):
+    lfa_dir.mkdir(parents=True, exist_ok=True)
+    for i, bid in enumerate(ids):
+        data = {"building_id": bid, "series": loads[:, i, 0].tolist(),
+                "q10": loads[:, i, 1].tolist(), "q90": loads[:, i, 2].tolist()}
+        (lfa_dir / f"{bid}.json").write_text(json.dumps(data))
+
+
+def test_store_round_trip_is_memory_mapped(tmp_path):
+    ids = ["B1", "B2", "B3"]
+    loads = _series()
+    write_load_matrix(tmp_path, ids, loads, metadata={"model_version": "test"})
+
+    matrix = open_load_matrix(tmp_path)
+    assert isinstance(matrix.loads, np.memmap)
+    assert matrix.building_ids == ids
+    assert matrix.metadata["model_version"] == "test"
+    assert np.array_equal(matrix.select(["B3", "B1"], "q90"), loads[:, [2, 0], 2])
+    assert np.array_equal(matrix.select(hours=slice(24, 48)), loads[24:48, :, 0])
+
+    frame = matrix.to_frame(["B2", "unknown"], quantile="q10", hours=slice(0, 10))
+    assert list(frame.columns) == ["B2"]
+    assert list(frame.index) == list(range(10))
+
+
+def test_json_fallback_matches_store(tmp_path):
+    ids = ["S_1", "S_2", "T_1"]
+    loads = _series()
+    _write_json(tmp_path / "json", ids, loads)
+    write_load_matrix(tmp_path / "store", ids, loads)
+
+    from_json = load_lfa_matrix(tmp_path / "json", pattern="S_*")
+    from_store = load_lfa_matrix(tmp_path / "store", pattern="S_*")
+    assert from_json.building_ids == from_store.building_ids == ["S_1", "S_2"]
+    for q in ("series", "q10", "q90"):
+        assert np.allclose(from_json.select(quantile=q), from_store.select(quantile=q))
+
+    summary = lfa_building_summary(tmp_path / "store")
+    assert summary["annual_sum"].to_numpy() == pytest.approx(loads[:, :, 0].sum(axis=0, dtype=np.float64))
+    assert summary["peak"].to_numpy() == pytest.approx(loads[:, :, 0].max(axis=0))
+
+
+def test_writer_drops_unwritten_buildings(tmp_path):
+    loads = _series(n_buildings=1)
+    with LoadMatrixWriter(tmp_path, ["A", "B", "C"], units="W") as writer:
+        writer.write("B", {"series": loads[:, 0, 0], "q10": loads[:, 0, 1]})
+
+    matrix = open_load_matrix(tmp_path)
+    assert matrix.building_ids == ["B"]
+    assert matrix.units == "W"
+    assert np.array_equal(matrix.select(quantile="q10")[:, 0], loads[:, 0, 1])
+    assert not matrix.select(quantile="q90").any()
+
+
+def test_dha_long_frame_from_store(tmp_path):
+    ids = ["B1", "B2"]
+    loads = _series(n_buildings=2)
+    _write_json(tmp_path, ids, loads)
+    from_json = load_lfa_series(str(tmp_path / "*.json"))
+
+    write_load_matrix(tmp_path, ids, loads)
+    from_store = load_lfa_series(str(tmp_path / "*.json"))
+
+    assert list(from_store.columns) == ["building_id", "hour", "q_kw"]
+    assert len(from_store) == 2 * 8760
+    assert np.allclose(from_store["q_kw"], from_json["q_kw"])
+    assert list(from_store["building_id"]) == list(from_json["building_id"])
+
+
+def test_loader_skips_stale_store_and_returns_kw(tmp_path):
+    ids = ["B1", "B2"]
+    loads = _series(n_buildings=2)
+    write_load_matrix(tmp_path, ids, loads * 1000, units="W")
+    assert np.allclose(load_lfa_matrix(tmp_path).select(), loads[:, :, 0])
+    assert load_lfa_matrix(tmp_path).units == "kW"
+
+    # A selection without buildings is "no forecasts", like an empty JSON directory
+    assert load_lfa_matrix(tmp_path, pattern="X_*") is None
+
+    # JSON forecasts regenerated after the store was written
+    _write_json(tmp_path, ids, loads * 2)
+    index = tmp_path / "load_matrix" / "index.json"
+    stat = index.stat()
+    os.utime(index, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+    assert np.allclose(load_lfa_matrix(tmp_path).select(), loads[:, :, 0] * 2)
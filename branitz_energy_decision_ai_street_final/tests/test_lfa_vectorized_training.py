@@ -0,0 +1,142 @@
+"""
+Tests for the vectorized synthetic training pipeline of the LFA.
+
+The broadcast generator is checked against the former row-by-row formula,
+chunked generation against the full frame, and the streamed training rows
+against the long training frame.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agents.lfa import LoadForecastingAgent, _BuildingHourRows
+
+
+@pytest.fixture
+def buildings_df():
+    return pd.DataFrame({
+        'building_id': ['B001', 'B002', 'B003', 'B004', 'B005'],
+        'floor_area': [100.0, 500.0, 1000.0, 250.0, 80.0],
+        'year': [1960, 2000, 2010, 1985, 2020],
+    })
+
+
+@pytest.fixture
+def weather_df():
+    hours = np.arange(96)
+    return pd.DataFrame({
+        'timestamp': [datetime(2024, 12, 22) + timedelta(hours=int(i)) for i in hours],
+        'T_out': 2 + 5 * np.sin(2 * np.pi * hours / 24),
+        'RH': 70 + 10 * np.cos(2 * np.pi * hours / 24),
+        'GHI': np.clip(400 * np.sin(np.pi * (hours % 24 - 6) / 12), 0, None),
+    })
+
+
+def _agent():
+    return LoadForecastingAgent({'seed': 7, 'lag_hours': [1, 24]})
+
+
+def _reference_demand(agent, features_df, buildings_df):
+    """The former per-building, per-hour synthetic demand loop."""
+    demand = []
+    for _, building in buildings_df.iterrows():
+        base = agent._get_base_demand(building.get('function', 'residential'),
+                                      building.get('floor_area', 100.0), building.get('year', 1990))
+        for _, features in features_df.iterrows():
+            d = base * (1.0 + 0.02 * features['heating_degree_days'])
+            hour = features['hour']
+            if 6 <= hour <= 9:
+                d *= 1.3
+            elif 17 <= hour <= 21:
+                d *= 1.4
+            elif 23 <= hour or hour <= 5:
+                d *= 0.6
+            if features['is_weekend']:
+                d *= 1.1
+            d *= 1.0 + 0.4 * np.cos(2 * np.pi * (features['day_of_year'] - 15) / 365)
+            d *= 1.0 + np.random.normal(0, 0.05)
+            demand.append(max(0.0, d))
+    return np.array(demand)
+
+
+def test_broadcast_demand_matches_row_loop(weather_df, buildings_df):
+    agent = _agent()
+    features_df = agent.engineer_features(weather_df, buildings_df)
+
+    np.random.seed(11)
+    expected = _reference_demand(agent, features_df, buildings_df)
+    np.random.seed(11)
+    training_df = agent.generate_synthetic_training_data(features_df, buildings_df)
+
+    assert training_df['demand_kw'].to_numpy() == pytest.approx(expected, rel=1e-12)
+    assert list(training_df.columns[:3]) == ['building_id', 'timestamp', 'demand_kw']
+    assert list(training_df.columns[3:]) == list(features_df.columns) + ['floor_area', 'year']
+    assert list(training_df['building_id'][::len(features_df)]) == list(buildings_df['building_id'])
+    assert (training_df['hour'].to_numpy().reshape(5, -1) == features_df['hour'].to_numpy()).all()
+
+
+def test_chunks_concatenate_to_full_frame(weather_df, buildings_df):
+    agent = _agent()
+    features_df = agent.engineer_features(weather_df, buildings_df)
+
+    np.random.seed(3)
+    full = agent.generate_synthetic_training_data(features_df, buildings_df)
+    np.random.seed(3)
+    chunks = list(agent.iter_synthetic_training_chunks(features_df, buildings_df, chunk_buildings=2))
+
+    assert [len(c) for c in chunks] == [2 * 96, 2 * 96, 96]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+
+
+def test_streamed_rows_match_training_frame(weather_df, buildings_df):
+    agent = _agent()
+    features_df = agent.engineer_features(weather_df, buildings_df)
+    training_df = agent.generate_synthetic_training_data(features_df, buildings_df)
+
+    layout = agent._training_columns(features_df, buildings_df)
+    columns = [col for col, _ in layout]
+    hourly_cols = [col for col, source in layout if source == 'features']
+    building_cols = [col for col, source in layout if source == 'building']
+    rows = _BuildingHourRows(
+        features_df[hourly_cols].to_numpy(dtype=float),
+        buildings_df[building_cols].to_numpy(dtype=float),
+        [columns.index(c) for c in hourly_cols],
+        [columns.index(c) for c in building_cols],
+        batch_size=100,
+    )
+
+    expected = training_df[columns].to_numpy(dtype=float)
+    assert len(rows) == len(training_df)
+    assert np.array_equal(rows[0:len(rows)], expected)
+    assert np.array_equal(rows[250], expected[250])
+    assert np.array_equal(rows[[5, 300, 479]], expected[[5, 300, 479]])
+
+
+def test_chunked_training_uses_frame_features(weather_df, buildings_df):
+    agent = _agent()
+    features_df = agent.engineer_features(weather_df, buildings_df)
+    agent.train_models_chunked(features_df, buildings_df, chunk_buildings=2)
+
+    reference = _agent()
+    reference.train_models(reference.generate_synthetic_training_data(features_df, buildings_df))
+
+    assert agent.feature_columns == reference.feature_columns
+    assert agent.scaler.mean_ == pytest.approx(reference.scaler.mean_)
+    assert agent.scaler.scale_ == pytest.approx(reference.scaler.scale_)
+    assert agent.mean_model is not None
+
+    with pytest.raises(ValueError):
+        agent.train_models_chunked(features_df, buildings_df, chunk_buildings=0)
+
+
+def test_holidays_vectorized_over_full_year():
+    dates = pd.date_range('2024-01-01', periods=8760, freq='h')
+    holidays = _agent()._is_holiday(dates)
+
+    expected = [1 if (d.month, d.day) in {(1, 1), (12, 24), (12, 25), (12, 26), (4, 1), (4, 2), (4, 3)}
+                else 0 for d in dates]
+    assert holidays.tolist() == expected
+    assert holidays.index.equals(dates)
@@ -0,0 +1,114 @@
+"""
+Tests for batched LV feeder studies (one aggregation, one series per feeder).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.lv_feeder_analyzer import _run_hour_for_feeder_pp, run_feeder_studies
+
+
+def _hourly_kw(n_hours=12):
+    hours = np.arange(n_hours)
+    return pd.DataFrame(
+        {str(h): [40.0 + 20 * h, 60.0 + 5 * h, 30.0, 100.0 + 30 * h] for h in hours},
+        index=["B1", "B2", "B3", "B4"],
+    )
+
+
+def _build_lv_feeder():
+    import pandapower as pp
+
+    net = pp.create_empty_network(sn_mva=0.4)
+    bus_hv = pp.create_bus(net, vn_kv=20.0, name="MV")
+    bus_lv = pp.create_bus(net, vn_kv=0.4, name="LV")
+    bus_l1 = pp.create_bus(net, vn_kv=0.4, name="L1")
+    pp.create_ext_grid(net, bus=bus_hv)
+    pp.create_transformer_from_parameters(
+        net, hv_bus=bus_hv, lv_bus=bus_lv, sn_mva=0.4,
+        vn_hv_kv=20.0, vn_lv_kv=0.4,
+        vk_percent=6.0, vkr_percent=0.8, pfe_kw=0.5, i0_percent=0.2
+    )
+    pp.create_line_from_parameters(
+        net, from_bus=bus_lv, to_bus=bus_l1,
+        length_km=0.05, r_ohm_per_km=0.4, x_ohm_per_km=0.08,
+        c_nf_per_km=220, max_i_ka=0.6
+    )
+    return dict(net=net, lv_bus=bus_l1, rating_mva=0.4)
+
+
+def test_heuristic_matches_per_hour_groupby():
+    hourly = _hourly_kw()
+    b2f = {"B1": "F2", "B2": "F1", "B3": "F2", "B4": "F1"}
+    hours = [7, 0, 11, 3]
+
+    df = run_feeder_studies(None, b2f, hourly, hours, backend="heuristic")
+
+    assert list(df["hour"]) == [7, 7, 0, 0, 11, 11, 3, 3]
+    assert list(df["feeder_id"]) == ["F1", "F2"] * 4
+    for (_, row), h in zip(df.iterrows(), np.repeat(hours, 2)):
+        kw = hourly.groupby(b2f).sum(numeric_only=True)[str(h)][row["feeder_id"]]
+        assert row["utilization_max"] == pytest.approx(kw / 1000.0)
+        assert row["voltage_min"] == pytest.approx(1.0 - 0.15 * kw / 1000.0)
+        assert row["violates_util>=0.8"] == (kw / 1000.0 >= 0.8)
+
+
+def test_batched_series_matches_per_hour_runs():
+    pytest.importorskip("pandapower")
+    hourly = _hourly_kw()
+    b2f = {"B1": "F1", "B2": "F1", "B3": "F2", "B4": "F2"}
+    hours = list(range(12))
+
+    df = run_feeder_studies({"F1": _build_lv_feeder(), "F2": _build_lv_feeder()}, b2f, hourly, hours)
+
+    reference = _build_lv_feeder()
+    feeder_kw = hourly.groupby(b2f).sum(numeric_only=True)
+    q_factor = np.tan(np.arccos(0.98))
+    for h in hours:
+        kw = feeder_kw.loc["F1", str(h)]
+        expected = _run_hour_for_feeder_pp(reference["net"], reference["lv_bus"], kw, kw * q_factor)
+        row = df[(df["feeder_id"] == "F1") & (df["hour"] == h)].iloc[0]
+        for key in ("utilization_max", "voltage_min", "voltage_max"):
+            assert row[key] == pytest.approx(expected[key], abs=1e-6)
+
+
+def test_parallel_feeders_match_serial():
+    pytest.importorskip("pandapower")
+    hourly = _hourly_kw()
+    b2f = {"B1": "F1", "B2": "F1", "B3": "F2", "B4": "F3"}
+    hours = list(range(12))
+
+    serial = run_feeder_studies({"F1": _build_lv_feeder(), "F2": _build_lv_feeder()}, b2f, hourly, hours)
+    parallel = run_feeder_studies({"F1": _build_lv_feeder(), "F2": _build_lv_feeder()}, b2f, hourly, hours,
+                                  workers=2)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    # F3 has no model -> NaN KPIs, no flags
+    f3 = serial[serial["feeder_id"] == "F3"]
+    assert f3["utilization_max"].isna().all()
+    assert not f3["violates_util>=0.8"].any()
+    assert f3["converged"].isna().all()
+
+
+def test_non_converged_hour_is_flagged(monkeypatch):
+    pp = pytest.importorskip("pandapower")
+    hourly = _hourly_kw(4)
+    b2f = {"B1": "F1", "B2": "F1", "B3": "F1", "B4": "F1"}
+    heaviest_mw = hourly.sum()["3"] / 1000.0
+    runpp = pp.runpp
+
+    def failing_runpp(net, **kwargs):
+        if net.sgen.p_mw.sum() >= heaviest_mw - 1e-9:
+            raise RuntimeError("forced non-convergence")
+        return runpp(net, **kwargs)
+
+    monkeypatch.setattr(pp, "runpp", failing_runpp)
+    df = run_feeder_studies({"F1": _build_lv_feeder()}, b2f, hourly, [0, 3, 1]).set_index("hour")
+
+    assert df["converged"].tolist() == [True, False, True]
+    assert df.loc[3, ["utilization_max", "voltage_min", "voltage_max"]].isna().all()
+    assert df.loc[3, "violates_util>=0.8"] and df.loc[3, "violates_voltage_outside_±10%"]
+    assert not df.loc[[0, 1], "violates_util>=0.8"].any()
+    # The hour after the failure is solved from a flat start again
+    assert df.loc[1, ["utilization_max", "voltage_min", "voltage_max"]].notna().all()
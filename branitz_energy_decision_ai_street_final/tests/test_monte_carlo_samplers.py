@@ -0,0 +1,87 @@
+"""
+Vectorized Monte Carlo engine: samplers, closed-form NPV, convergence and sizing.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+from econ.monte_carlo import (
+    run_monte_carlo,
+    standard_normal_draws,
+    quantile_convergence,
+    trials_for_confidence,
+)
+from optimize.cost_models import npv
+
+
+def _tiny_inputs():
+    segments_df = pd.DataFrame({
+        "seg_id": ["S1", "S2"],
+        "length_m": [120.0, 150.0],
+        "DN": [80, 100],
+        "pump_MWh": [40.0, 60.0],
+        "heat_loss_MWh": [30.0, 50.0],
+    })
+    catalog_df = pd.DataFrame({"dn": [80, 100], "cost_eur_per_m": [150.0, 220.0]})
+    econ = {"price_el": 0.25, "cost_heat_prod": 55.0, "years": 30, "r": 0.04}
+    return {"S1": 80, "S2": 100}, segments_df, {}, econ, catalog_df
+
+
+def test_zero_sigma_matches_scalar_npv():
+    """Without uncertainty every trial equals the scalar cost_models.npv."""
+    res = run_monte_carlo(*_tiny_inputs(), n=8, capex_sigma=0.0, el_price_sigma=0.0,
+                          grid_co2_sigma=0.0, heat_co2_sigma=0.0)
+
+    capex = 120.0 * 150.0 + 150.0 * 220.0
+    expected = npv(capex, 100.0 * 1000.0 * 0.25 + 80.0 * 55.0 + 0.01 * capex, 30, 0.04)
+    assert res["npv"] == pytest.approx([expected] * 8, rel=1e-12)
+    assert res["co2_tons"] == pytest.approx([100.0 * 0.35 + 80.0 * 0.20] * 8, rel=1e-12)
+
+
+@pytest.mark.parametrize("sampler", ["random", "antithetic", "lhs", "sobol"])
+def test_samplers_are_deterministic_standard_normals(sampler):
+    if sampler == "sobol":
+        pytest.importorskip("scipy")
+    z1 = standard_normal_draws(4096, 4, sampler=sampler, seed=5)
+    z2 = standard_normal_draws(4096, 4, sampler=sampler, seed=5)
+
+    assert z1.shape == (4096, 4)
+    assert np.array_equal(z1, z2)
+    assert np.abs(z1.mean(axis=0)).max() < 0.1
+    assert np.abs(z1.std(axis=0) - 1).max() < 0.1
+
+
+def test_antithetic_pairs_and_lhs_strata():
+    z = standard_normal_draws(7, 2, sampler="antithetic", seed=1)
+    assert np.array_equal(z[1::2], -z[0:6:2])
+
+    # Each of the n equiprobable strata holds exactly one LHS draw per dimension
+    n = 200
+    z = standard_normal_draws(n, 3, sampler="lhs", seed=1)
+    cdf = np.vectorize(lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2))))(z)
+    for d in range(3):
+        assert sorted(np.floor(cdf[:, d] * n).astype(int)) == list(range(n))
+
+
+def test_unknown_sampler_rejected():
+    with pytest.raises(ValueError):
+        run_monte_carlo(*_tiny_inputs(), n=10, sampler="halton")
+
+
+def test_convergence_and_confidence_sizing():
+    """Convergence is reported per checkpoint and n=None sizes the run from a pilot."""
+    res = run_monte_carlo(*_tiny_inputs(), n=None, sampler="antithetic", target_rel_halfwidth=0.005)
+
+    n = res["summary"]["n"]
+    assert n >= 1024 and len(res["npv"]) == n
+    conv = res["convergence"]["npv"]
+    assert conv["n"][-1] == n
+    assert conv["p50"][-1] == pytest.approx(res["summary"]["npv_p50"])
+    assert all(a <= b <= c for a, b, c in zip(conv["p10"], conv["p50"], conv["p90"]))
+
+    # A tighter target needs about four times the trials
+    pilot = res["npv"][:4096]
+    assert trials_for_confidence(pilot, 0.005) == pytest.approx(4 * trials_for_confidence(pilot, 0.01), rel=0.01)
+    assert quantile_convergence([1.0, 2.0, 3.0], checkpoints=[2, 3, 10])["n"] == [2, 3]
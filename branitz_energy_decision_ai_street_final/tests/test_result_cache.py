@@ -0,0 +1,133 @@
+"""
+Tests for the content-addressed street result cache (hits, fine-grained invalidation, eviction).
+"""
+
+import os
+
+import pytest
+
+from src.result_cache import ANALYSIS_INPUTS, StreetResultCache
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Project layout with the DH config, one input file and the analysis code."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "cha.yml").write_text("supply_temperature_c: 70\noutput_dir: out\n", encoding="utf-8")
+    (tmp_path / "streets.geojson").write_text('{"features": []}', encoding="utf-8")
+    (tmp_path / "src").mkdir()
+    for path in ANALYSIS_INPUTS["DH"]["code"]:
+        (tmp_path / path).write_text("# v1\n", encoding="utf-8")
+    return tmp_path
+
+
+FEATURES = [
+    {"type": "Feature", "properties": {"gebaeude": "B1"}, "geometry": {"type": "Point", "coordinates": [1, 2]}},
+    {"type": "Feature", "properties": {"gebaeude": "B2"}, "geometry": {"type": "Point", "coordinates": [3, 4]}},
+]
+PARAMS = {"street_name": "Parkstraße"}
+
+
+def _touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _components(cache, features=FEATURES):
+    return cache.components("DH", features, PARAMS, extra_files=["streets.geojson"])
+
+
+def test_result_is_returned_until_an_input_changes(workdir):
+    cache = StreetResultCache(cache_dir="cache")
+    result = {"status": "success", "num_buildings": 2, "network_stats": {"total_length_m": 120.5}}
+
+    assert cache.get("DH", _components(cache)) is None
+    cache.set("DH", _components(cache), result)
+
+    # Building order and output-only config keys do not matter
+    (workdir / "configs" / "cha.yml").write_text("supply_temperature_c: 70\noutput_dir: other\n", encoding="utf-8")
+    _touch_later(workdir / "configs" / "cha.yml")
+    cached = cache.get("DH", _components(cache, FEATURES[::-1]))
+    assert cached["cached"] is True
+    assert cached["network_stats"] == {"total_length_m": 120.5}
+
+    # A changed input file drops the entry of this street
+    (workdir / "streets.geojson").write_text('{"features": [1]}', encoding="utf-8")
+    _touch_later(workdir / "streets.geojson")
+    assert cache.get("DH", _components(cache)) is None
+    assert cache.get_stats()["invalidated"] == 1
+    assert list((workdir / "cache" / "dh").iterdir()) == []
+
+
+def test_code_change_and_missing_artifacts_are_misses(workdir):
+    cache = StreetResultCache(cache_dir="cache")
+    dashboard = workdir / "dashboard.html"
+    dashboard.write_text("<html></html>", encoding="utf-8")
+    cache.set("DH", _components(cache), {"status": "success", "dashboard_path": str(dashboard)})
+
+    code_file = workdir / ANALYSIS_INPUTS["DH"]["code"][0]
+    code_file.write_text("# v2\n", encoding="utf-8")
+    _touch_later(code_file)
+    assert cache.get("DH", _components(cache)) is None
+
+    cache.set("DH", _components(cache), {"status": "success", "dashboard_path": str(dashboard)})
+    dashboard.unlink()
+    assert cache.get("DH", _components(cache)) is None
+
+
+def test_least_recently_used_results_are_evicted(workdir):
+    cache = StreetResultCache(cache_dir="cache", max_entries=2)
+    keys = []
+    for street in ["A", "B", "C"]:
+        components = cache.components("DH", FEATURES, {"street_name": street})
+        keys.append(cache.set("DH", components, {"status": "success"}))
+
+    remaining = {p.name.split("_")[0] for p in (workdir / "cache" / "dh").glob("*_meta.json")}
+    assert remaining == set(keys[1:])
+    assert cache.get_stats()["evicted"] == 1
+
+
+def test_rewritten_artifacts_are_misses(workdir):
+    cache = StreetResultCache(cache_dir="cache")
+    dashboard = workdir / "dashboard.html"
+    dashboard.write_text("<html>A</html>", encoding="utf-8")
+    cache.set("DH", _components(cache), {"status": "success", "dashboard_path": str(dashboard)})
+
+    # Another analysis writes the same file
+    dashboard.write_text("<html>B</html>", encoding="utf-8")
+    _touch_later(dashboard)
+    assert cache.get("DH", _components(cache)) is None
+
+
+def test_hp_tool_reuses_cached_analysis(workdir, monkeypatch):
+    pytest.importorskip("geopandas")
+    pytest.importorskip("folium")
+    from src import enhanced_tools
+
+    runs = []
+
+    class StubDHA:
+        def run_comprehensive_analysis(self, street_name, scenario):
+            runs.append(scenario)
+            dashboard = workdir / f"dha_dashboard_{scenario}.html"
+            dashboard.write_text(scenario, encoding="utf-8")
+            return {"status": "success", "num_buildings": 2, "dashboard_path": str(dashboard)}
+
+    cache = StreetResultCache(cache_dir="cache")
+    monkeypatch.setattr(enhanced_tools, "InteractiveDHA", StubDHA)
+    monkeypatch.setattr(enhanced_tools, "street_features", lambda *args, **kwargs: FEATURES)
+    monkeypatch.setattr(enhanced_tools, "get_result_cache", lambda: cache)
+
+    first = enhanced_tools.run_comprehensive_hp_analysis("Parkstraße", "winter")
+    second = enhanced_tools.run_comprehensive_hp_analysis("Parkstraße", "winter")
+    enhanced_tools.run_comprehensive_hp_analysis("Parkstraße", "summer")
+
+    assert runs == ["winter", "summer"]
+    assert "CACHED RESULT" not in first
+    assert "CACHED RESULT" in second and "dha_dashboard_winter.html" in second
+
+    result = enhanced_tools._cached_analysis(
+        "HP", FEATURES, {"street_name": "Parkstraße", "scenario": "winter"}, lambda: pytest.fail("not cached")
+    )
+    assert result["cached"] is True
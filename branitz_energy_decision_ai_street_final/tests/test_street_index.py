@@ -0,0 +1,96 @@
+"""
+Tests for the district street index (street → building row offsets).
+"""
+
+import json
+import os
+
+import pytest
+
+from src import street_index
+from src.street_index import build_street_index, load_street_index, read_street_index, street_index_path
+
+
+def _square(x, y, d=0.001):
+    return {"type": "Polygon", "coordinates": [[[x, y], [x + d, y], [x + d, y + d], [x, y + d], [x, y]]]}
+
+
+@pytest.fixture
+def buildings_geojson(tmp_path):
+    features = [
+        {"type": "Feature", "gebaeude": {"oi": "G1"}, "adressen": [{"str": "Parkstraße", "hnr": 1}],
+         "geometry": _square(14.30, 51.70)},
+        {"type": "Feature", "gebaeude": {"oi": "G2"}, "adressen": [{"str": " parkstraße ", "hnr": 2},
+                                                                  {"str": "Gartenweg", "hnr": 9}],
+         "geometry": _square(14.31, 51.71)},
+        {"type": "Feature", "gebaeude": {"oi": "G3"}, "adressen": [], "geometry": _square(14.32, 51.72)},
+        {"type": "Feature", "gebaeude": {}, "adressen": [{"str": "Gartenweg", "hnr": 3}],
+         "geometry": {"type": "MultiPolygon", "coordinates": [_square(14.35, 51.69)["coordinates"]]}},
+    ]
+    path = tmp_path / "buildings.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}), encoding="utf-8")
+    return path
+
+
+def _reference_offsets(features, streets):
+    """The former full scan of all features and addresses."""
+    street_set = {s.strip().lower() for s in streets}
+    return [i for i, feature in enumerate(features)
+            if any(adr.get("str") and adr["str"].strip().lower() in street_set
+                   for adr in feature.get("adressen", []))]
+
+
+def test_index_matches_full_scan(buildings_geojson):
+    features = json.loads(buildings_geojson.read_text(encoding="utf-8"))["features"]
+    index = build_street_index(buildings_geojson)
+
+    assert index.n_buildings == 4
+    assert index.street_names() == ["Gartenweg", "Parkstraße", "parkstraße"]
+    for streets in (["Parkstraße"], ["GARTENWEG "], ["Parkstraße", "Gartenweg"], ["Unknown"]):
+        assert index.offsets_for_streets(streets) == _reference_offsets(features, streets)
+    assert index.building_ids_for_street("gartenweg") == ["G2"]
+    assert index.search("weg") == [1, 3]
+    assert index.bbox("Gartenweg") == pytest.approx([14.31, 51.69, 14.351, 51.711])
+
+
+def test_index_is_persisted_and_rebuilt_when_source_changes(buildings_geojson):
+    index = load_street_index(buildings_geojson)
+    assert street_index_path(buildings_geojson).exists()
+
+    persisted = read_street_index(buildings_geojson)
+    assert persisted.streets == json.loads(json.dumps(index.streets))
+    assert persisted.building_ids == index.building_ids
+
+    # A changed GeoJSON invalidates the persisted index
+    data = json.loads(buildings_geojson.read_text(encoding="utf-8"))
+    data["features"].append({"type": "Feature", "gebaeude": {"oi": "G5"}, "adressen": [{"str": "Neue Straße"}],
+                             "geometry": _square(14.40, 51.70)})
+    buildings_geojson.write_text(json.dumps(data), encoding="utf-8")
+    stat = buildings_geojson.stat()
+    os.utime(buildings_geojson, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert read_street_index(buildings_geojson) is None
+    rebuilt = load_street_index(buildings_geojson)
+    assert rebuilt.building_ids_for_street("neue straße") == ["G5"]
+    assert read_street_index(buildings_geojson) is not None
+
+
+def test_process_caches_keep_only_the_latest_file_state(buildings_geojson):
+    key = str(buildings_geojson.resolve())
+    first = load_street_index(buildings_geojson, rebuild=True)
+    sizes = (len(street_index._INDEX_CACHE), len(street_index._FEATURE_CACHE))
+
+    for n in range(3):
+        data = json.loads(buildings_geojson.read_text(encoding="utf-8"))
+        data["features"].append({"type": "Feature", "gebaeude": {"oi": f"N{n}"}, "adressen": [{"str": "Neue Straße"}],
+                                 "geometry": _square(14.40, 51.70)})
+        buildings_geojson.write_text(json.dumps(data), encoding="utf-8")
+        stat = buildings_geojson.stat()
+        os.utime(buildings_geojson, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        latest = load_street_index(buildings_geojson)
+
+    assert latest is not first and latest.n_buildings == first.n_buildings + 3
+    assert load_street_index(buildings_geojson) is latest
+    assert (len(street_index._INDEX_CACHE), len(street_index._FEATURE_CACHE)) == sizes
+    for cache in (street_index._INDEX_CACHE, street_index._FEATURE_CACHE):
+        assert cache[key][0][1] == buildings_geojson.stat().st_mtime_ns
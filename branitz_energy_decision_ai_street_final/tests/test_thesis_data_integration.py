@@ -21,8 +21,10 @@ from thesis_data_integration import (
     ThesisDataIntegrator, 
     TRYWeatherProcessor, 
     HeatingDataProcessor, 
-    ElectricalProfileProcessor
+    ElectricalProfileProcessor,
+    interpolate_heating_series
 )
+from lfa_load_matrix import open_load_matrix
 
 
 class TestThesisDataIntegration(unittest.TestCase):
@@ -211,6 +213,57 @@ class TestThesisDataIntegration(unittest.TestCase):
         self.assertEqual(len(saved_data['series']), 8760)
         self.assertIn('metadata', saved_data)
 
+    def test_interpolation_extrapolates_linearly(self):
+        """Vectorized interpolation matches linear extrapolation beyond the periods."""
+        temp_power_map = {-5.0: 8000.0, 0.0: 6000.0, 10.0: 2000.0}
+        hourly_temps = [-15.0, -5.0, 2.5, 12.0, 14.9, 15.0, float('nan')]
+        
+        result = interpolate_heating_series(temp_power_map, hourly_temps)
+        
+        expected = [12000.0, 8000.0, 5000.0, 1200.0, 40.0, 0.0, 0.0]
+        for value, exp in zip(result, expected):
+            self.assertAlmostEqual(value, exp, places=6)
+    
+    def test_generate_all_buildings_process_pool(self):
+        """Chunked process-pool generation fills the store like the serial path."""
+        import numpy as np
+        
+        integrator = ThesisDataIntegrator()
+        integrator.config = self.config
+        integrator.weather_data = {'temperature': list(np.linspace(-12.0, 25.0, 8760))}
+        periods = [{'Durchschnitt': {'Temperatur': t, 'Momentane_Heizleistung_W': p}}
+                   for t, p in ((-10.0, 9000.0), (0.0, 5000.0), (12.0, 800.0))]
+        integrator.heating_data = {'ergebnisse': {
+            f'B{i}': {'Szenarien': {'mittleres_jahr': [
+                {'Durchschnitt': {'Temperatur': d['Durchschnitt']['Temperatur'],
+                                  'Momentane_Heizleistung_W': d['Durchschnitt']['Momentane_Heizleistung_W'] * (i + 1)}}
+                for d in periods
+            ]}} for i in range(5)
+        }}
+        integrator.heating_data['ergebnisse']['UNHEATED'] = {'Szenarien': 0}
+        
+        serial_dir = self.test_dir / 'serial'
+        pooled_dir = self.test_dir / 'pooled'
+        serial = integrator.generate_all_buildings(str(serial_dir), workers=1, chunk_size=2)
+        pooled = integrator.generate_all_buildings(str(pooled_dir), workers=2, chunk_size=2, write_json=False)
+        
+        self.assertEqual(serial['processed_buildings'], 5)
+        self.assertEqual(pooled['processed_buildings'], 5)
+        self.assertEqual(len(list(serial_dir.glob('*.json'))), 5)
+        self.assertEqual(len(list(pooled_dir.glob('*.json'))), 0)
+        
+        serial_store = open_load_matrix(serial_dir)
+        pooled_store = open_load_matrix(pooled_dir)
+        self.assertEqual(pooled_store.building_ids, ['B0', 'B1', 'B2', 'B3', 'B4'])
+        self.assertEqual(pooled_store.units, 'kW')
+        self.assertTrue(np.array_equal(serial_store.loads, pooled_store.loads))
+        
+        with open(serial_dir / 'B3.json', 'r') as f:
+            saved = json.load(f)
+        # JSON files keep W, the store holds kW
+        self.assertTrue(np.allclose(np.asarray(saved['series']) / 1000, serial_store.select(['B3'])[:, 0], rtol=1e-6))
+        self.assertEqual(saved['series'], integrator.generate_building_heat_demand('B3')['series'])
+
 
 class TestDataIntegrationEndToEnd(unittest.TestCase):
     """End-to-end tests for data integration."""